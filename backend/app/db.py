@@ -39,7 +39,7 @@ async def init_db():
     """Initialize database tables"""
     async with engine.begin() as conn:
         # Import all models to ensure they are registered
-        from app.models import User, Conversation, Message, AgentSession
+        from app.models import User, Conversation, Message, AgentSession, ConversationTurn, PatientMemoryContext, LLMResponseCacheEntry
         await conn.run_sync(SQLModel.metadata.create_all)
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
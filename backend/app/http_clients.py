@@ -0,0 +1,130 @@
+"""
+App-lifetime pooled HTTP clients for upstream APIs.
+
+Creating an `httpx.AsyncClient` per request pays DNS, TCP and TLS setup on
+every call. `HTTPClientRegistry` keeps one pooled keep-alive client per
+upstream provider for the lifetime of the process: clients are created on
+startup, shared by every router, and closed on shutdown. Routers receive them
+through the `upstream_client(provider)` FastAPI dependency.
+
+Pool limits come from HTTP_POOL_MAX_CONNECTIONS / HTTP_POOL_MAX_KEEPALIVE /
+HTTP_KEEPALIVE_EXPIRY_SECONDS; HTTP/2 is enabled with UPSTREAM_HTTP2=true when
+the optional `h2` package is installed; each provider's default timeout can be
+overridden with HTTP_TIMEOUT_<PROVIDER> (e.g. HTTP_TIMEOUT_GROQ=8).
+"""
+
+import os
+from typing import Callable, Dict
+
+import httpx
+
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "100"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "false").lower() == "true"
+
+# Upstream providers and their default request timeouts (seconds)
+UPSTREAM_PROVIDERS = {
+    "openai": {"base_url": "https://api.openai.com", "timeout": 30.0},
+    "groq": {"base_url": "https://api.groq.com", "timeout": 10.0},
+    "cartesia": {"base_url": "https://api.cartesia.ai", "timeout": 5.0},
+    "deepgram": {"base_url": "https://api.deepgram.com", "timeout": 10.0},
+    "elevenlabs": {"base_url": "https://api.elevenlabs.io", "timeout": 30.0},
+    "heygen": {"base_url": "https://api.heygen.com", "timeout": 30.0},
+    "videosdk": {"base_url": "https://api.videosdk.live", "timeout": 10.0},
+}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HTTPClientRegistry:
+    """One pooled `httpx.AsyncClient` per upstream provider."""
+
+    def __init__(self, providers: Dict[str, Dict] = UPSTREAM_PROVIDERS):
+        self.providers = providers
+        self.http2 = UPSTREAM_HTTP2 and _http2_available()
+        if UPSTREAM_HTTP2 and not self.http2:
+            print("⚠️  UPSTREAM_HTTP2 is set but the 'h2' package is not installed - using HTTP/1.1")
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self.requests: Dict[str, int] = {}
+
+    def timeout_for(self, provider: str) -> float:
+        default = self.providers.get(provider, {}).get("timeout", 30.0)
+        return float(os.getenv(f"HTTP_TIMEOUT_{provider.upper()}", default))
+
+    def _create_client(self, provider: str) -> httpx.AsyncClient:
+        config = self.providers.get(provider, {})
+        return httpx.AsyncClient(
+            base_url=config.get("base_url", ""),
+            timeout=httpx.Timeout(self.timeout_for(provider), connect=HTTP_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS
+            ),
+            http2=self.http2,
+            event_hooks={"request": [self._count_request(provider)]}
+        )
+
+    def _count_request(self, provider: str) -> Callable:
+        async def hook(request: httpx.Request) -> None:
+            self.requests[provider] = self.requests.get(provider, 0) + 1
+        return hook
+
+    async def start(self) -> None:
+        """Create a client for every known provider; called on application startup."""
+        for provider in self.providers:
+            self.get(provider)
+        print(f"🌐 Upstream HTTP clients ready: {', '.join(self._clients)} (http2={self.http2})")
+
+    def get(self, provider: str) -> httpx.AsyncClient:
+        """Return the shared client for `provider`, creating it on first use."""
+        client = self._clients.get(provider)
+        if client is None or client.is_closed:
+            client = self._create_client(provider)
+            self._clients[provider] = client
+        return client
+
+    async def close(self) -> None:
+        """Close every pooled client; called on application shutdown."""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "http2": self.http2,
+            "max_connections": HTTP_POOL_MAX_CONNECTIONS,
+            "max_keepalive_connections": HTTP_POOL_MAX_KEEPALIVE,
+            "providers": {
+                provider: {
+                    "timeout_seconds": self.timeout_for(provider),
+                    "open": provider in self._clients and not self._clients[provider].is_closed,
+                    "requests": self.requests.get(provider, 0)
+                }
+                for provider in self.providers
+            }
+        }
+
+
+http_clients = HTTPClientRegistry()
+
+
+def upstream_client(provider: str) -> Callable[[], httpx.AsyncClient]:
+    """FastAPI dependency factory: `client: httpx.AsyncClient = Depends(upstream_client("groq"))`."""
+    def dependency() -> httpx.AsyncClient:
+        return http_clients.get(provider)
+    dependency.__name__ = f"{provider}_http_client"
+    return dependency
+
+
+def get_http_client(provider: str) -> httpx.AsyncClient:
+    """Shared client lookup for helpers that are not request handlers."""
+    return http_clients.get(provider)
@@ -0,0 +1,11 @@
+"""
+Async LLM gateway shared by all routers.
+"""
+
+from app.llm.gateway import anthropic_client, close_llm_clients, openai_client
+
+__all__ = [
+    "anthropic_client",
+    "close_llm_clients",
+    "openai_client",
+]
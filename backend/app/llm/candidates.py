@@ -0,0 +1,96 @@
+"""
+Streaming completion candidates for the LLM router (app.llm.routing).
+
+A candidate is one provider/model/prompt combination. It starts no work until
+the router calls `stream()`, so fallbacks and hedges cost nothing unless they
+are used. Every candidate streams, because hedging decisions are taken on
+time-to-first-token.
+
+Pass a `CachedPrompt` (app.llm.prompt_cache) to get provider-side prompt
+caching. Each candidate records the provider's token usage on `usage` once
+its stream ends.
+"""
+
+import os
+from typing import AsyncIterator, Callable, Dict, List, Optional, Union
+
+from app.http_clients import get_http_client
+from app.llm.gateway import anthropic_client, openai_client
+from app.llm.prompt_cache import CachedPrompt, TokenUsage
+from app.llm.streaming import GROQ_CHAT_COMPLETIONS_URL, stream_chat_tokens
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+
+class LLMCandidate:
+    """
+    A provider call the router may start; `label` is the model name routes report.
+    `on_start` runs only if the router actually starts the call (e.g. prompt metrics).
+    """
+
+    def __init__(self, provider: str, model: str, stream: Callable[[], AsyncIterator[str]], label: Optional[str] = None,
+                 on_start: Optional[Callable[[], None]] = None):
+        self.provider = provider
+        self.model = model
+        self.stream = stream
+        self.label = label or model
+        self.on_start = on_start
+        self.usage: Optional[TokenUsage] = None
+
+
+def openai_candidate(messages: List[Dict], model: str = "gpt-4o-mini", label: Optional[str] = None,
+                     **params) -> Optional[LLMCandidate]:
+    """Chat completion through the shared AsyncOpenAI client; None if OpenAI is not configured."""
+    if openai_client is None:
+        return None
+
+    async def stream() -> AsyncIterator[str]:
+        response = await openai_client.chat.completions.create(model=model, messages=messages, stream=True,
+                                                                stream_options={"include_usage": True}, **params)
+        async for chunk in response:
+            if chunk.usage:
+                candidate.usage = TokenUsage.from_openai(chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    candidate = LLMCandidate("openai", model, stream, label)
+    return candidate
+
+
+def anthropic_candidate(system: Union[str, CachedPrompt], messages: List[Dict], model: str = "claude-3-5-sonnet-20241022",
+                        label: Optional[str] = None, **params) -> Optional[LLMCandidate]:
+    """Messages API through the shared AsyncAnthropic client; None if Anthropic is not configured."""
+    if anthropic_client is None:
+        return None
+    if isinstance(system, CachedPrompt):
+        system = system.anthropic_system()
+
+    async def stream() -> AsyncIterator[str]:
+        async with anthropic_client.messages.stream(model=model, system=system, messages=messages, **params) as response:
+            async for text in response.text_stream:
+                yield text
+            message = await response.get_final_message()
+            candidate.usage = TokenUsage.from_anthropic(message.usage)
+
+    candidate = LLMCandidate("anthropic", model, stream, label)
+    return candidate
+
+
+def groq_candidate(messages: List[Dict], model: str = "llama-3.3-70b-versatile", label: Optional[str] = None,
+                   timeout: Optional[float] = None, **params) -> Optional[LLMCandidate]:
+    """Groq's OpenAI-compatible endpoint on the pooled httpx client; None if Groq is not configured."""
+    if not GROQ_API_KEY:
+        return None
+
+    def stream() -> AsyncIterator[str]:
+        payload = {"model": model, "messages": messages, **params}
+        return stream_chat_tokens(get_http_client("groq"), GROQ_CHAT_COMPLETIONS_URL, GROQ_API_KEY, payload, timeout,
+                                  on_usage=lambda usage: setattr(candidate, "usage", TokenUsage.from_openai(usage)))
+
+    candidate = LLMCandidate("groq", model, stream, label)
+    return candidate
+
+
+def configured(*candidates: Optional[LLMCandidate]) -> List[LLMCandidate]:
+    """Drop the candidates whose provider is not configured, keeping preference order."""
+    return [candidate for candidate in candidates if candidate is not None]
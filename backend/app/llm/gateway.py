@@ -0,0 +1,42 @@
+"""
+Shared async LLM clients.
+
+Every router talks to OpenAI and Anthropic through these process-wide
+`AsyncOpenAI` / `AsyncAnthropic` instances, so upstream round-trips are awaited
+instead of blocking the uvicorn event loop, and connection pools are shared
+across requests. A client is None when its API key is not configured.
+"""
+
+import os
+from typing import Optional
+
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+
+
+def _is_configured(api_key: Optional[str]) -> bool:
+    return bool(api_key) and not api_key.startswith("PLEASE_ADD_") and api_key not in ("your-openai-key-here", "your-anthropic-key-here")
+
+
+if _is_configured(OPENAI_API_KEY):
+    openai_client: Optional[AsyncOpenAI] = AsyncOpenAI(api_key=OPENAI_API_KEY)
+else:
+    openai_client = None
+    print("⚠️  WARNING: No valid OpenAI API key configured")
+
+if _is_configured(ANTHROPIC_API_KEY):
+    anthropic_client: Optional[AsyncAnthropic] = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+else:
+    anthropic_client = None
+    print("⚠️  WARNING: No Anthropic API key configured")
+
+
+async def close_llm_clients() -> None:
+    """Close the shared clients' connection pools; called on application shutdown."""
+    if openai_client is not None:
+        await openai_client.close()
+    if anthropic_client is not None:
+        await anthropic_client.close()
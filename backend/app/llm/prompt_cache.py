@@ -0,0 +1,166 @@
+"""
+Provider-side prompt caching: a stable prefix plus a small per-patient suffix.
+
+The system prompts are thousands of tokens of identical instructions with a
+few lines of patient context (name, stage, memory) mixed in. `CachedPrompt`
+keeps the two apart so providers can reuse the prefix across calls:
+
+- Anthropic: every prefix block is sent as a system block with an ephemeral
+  `cache_control` breakpoint, followed by the uncached suffix block;
+- OpenAI-compatible providers (OpenAI, Groq) cache the longest previously
+  seen prompt prefix automatically, so the prefix is sent first as its own
+  system message and the suffix as a second one.
+
+The prefix must be byte-identical across patients for this to work: never
+format patient data into it. Providers only cache prefixes above a minimum
+length (1024 tokens for Sonnet and OpenAI), so shorter prompts still report
+zero cached tokens.
+
+`TokenUsage` normalizes each provider's usage report into cached vs uncached
+input tokens; `prompt_cache_metrics` aggregates them, with time-to-first-token,
+per route.
+"""
+
+from typing import Dict, List, Optional
+
+# Anthropic allows four cache breakpoints per request
+MAX_CACHE_BREAKPOINTS = 4
+
+
+class CachedPrompt:
+    """System prompt as cacheable prefix blocks (most shared first) and a per-call suffix."""
+
+    def __init__(self, *prefix: str, suffix: str = ""):
+        if len(prefix) > MAX_CACHE_BREAKPOINTS:
+            raise ValueError(f"At most {MAX_CACHE_BREAKPOINTS} cacheable prefix blocks are supported")
+        self.prefix = [block.strip() for block in prefix if block.strip()]
+        self.suffix = suffix.strip()
+
+    @property
+    def text(self) -> str:
+        """The whole prompt as one string, for providers without prompt caching."""
+        return "\n\n".join(self.prefix + ([self.suffix] if self.suffix else []))
+
+    def __str__(self) -> str:
+        return self.text
+
+    def anthropic_system(self) -> List[Dict]:
+        """System blocks with a cache breakpoint after each prefix block."""
+        blocks = [{"type": "text", "text": block, "cache_control": {"type": "ephemeral"}} for block in self.prefix]
+        if self.suffix:
+            blocks.append({"type": "text", "text": self.suffix})
+        return blocks
+
+    def openai_messages(self, messages: Optional[List[Dict]] = None) -> List[Dict]:
+        """Prefix system message first so the automatic prefix cache matches it, then the suffix."""
+        system = [{"role": "system", "content": "\n\n".join(self.prefix)}] if self.prefix else []
+        if self.suffix:
+            system.append({"role": "system", "content": self.suffix})
+        return system + list(messages or [])
+
+
+def _field(source, name: str):
+    if source is None:
+        return None
+    if isinstance(source, dict):
+        return source.get(name)
+    return getattr(source, name, None)
+
+
+class TokenUsage:
+    """Input tokens of one call, split into read from cache, written to cache and uncached."""
+
+    def __init__(self, input_tokens: int = 0, cached_tokens: int = 0, cache_write_tokens: int = 0,
+                 output_tokens: int = 0):
+        self.input_tokens = input_tokens
+        self.cached_tokens = cached_tokens
+        self.cache_write_tokens = cache_write_tokens
+        self.output_tokens = output_tokens
+
+    @property
+    def uncached_tokens(self) -> int:
+        return self.input_tokens - self.cached_tokens
+
+    @classmethod
+    def from_anthropic(cls, usage) -> "TokenUsage":
+        # Anthropic's input_tokens only counts tokens after the last breakpoint
+        read = _field(usage, "cache_read_input_tokens") or 0
+        written = _field(usage, "cache_creation_input_tokens") or 0
+        uncached = _field(usage, "input_tokens") or 0
+        return cls(uncached + read + written, read, written, _field(usage, "output_tokens") or 0)
+
+    @classmethod
+    def from_openai(cls, usage) -> "TokenUsage":
+        # OpenAI and Groq report the cached tokens as part of prompt_tokens
+        cached = _field(_field(usage, "prompt_tokens_details"), "cached_tokens") or 0
+        return cls(_field(usage, "prompt_tokens") or 0, cached, 0, _field(usage, "completion_tokens") or 0)
+
+    def summary(self) -> Dict:
+        return {
+            "input_tokens": self.input_tokens,
+            "cached_input_tokens": self.cached_tokens,
+            "uncached_input_tokens": self.uncached_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_hit_ratio": round(self.cached_tokens / self.input_tokens, 3) if self.input_tokens else 0.0
+        }
+
+
+class PromptCacheMetrics:
+    """Per-route cached vs uncached input tokens and time-to-first-token."""
+
+    def __init__(self):
+        self._routes: Dict[str, Dict] = {}
+
+    def record(self, route: str, usage: Optional[TokenUsage], ttft_ms: Optional[float] = None) -> None:
+        entry = self._routes.setdefault(route, {
+            "calls": 0,
+            "calls_without_usage": 0,
+            "calls_with_cache_hit": 0,
+            "input_tokens": 0,
+            "cached_input_tokens": 0,
+            "cache_write_tokens": 0,
+            "ttft_samples": 0,
+            "ttft_ms_sum": 0.0
+        })
+        entry["calls"] += 1
+        if ttft_ms is not None:
+            entry["ttft_samples"] += 1
+            entry["ttft_ms_sum"] += ttft_ms
+        if usage is None:
+            entry["calls_without_usage"] += 1
+            return
+        entry["input_tokens"] += usage.input_tokens
+        entry["cached_input_tokens"] += usage.cached_tokens
+        entry["cache_write_tokens"] += usage.cache_write_tokens
+        if usage.cached_tokens:
+            entry["calls_with_cache_hit"] += 1
+
+    def stats(self) -> Dict:
+        routes = {}
+        for route, entry in self._routes.items():
+            routes[route] = {
+                **{key: value for key, value in entry.items() if key not in ("ttft_samples", "ttft_ms_sum")},
+                "uncached_input_tokens": entry["input_tokens"] - entry["cached_input_tokens"],
+                "cached_token_ratio": round(entry["cached_input_tokens"] / entry["input_tokens"], 3) if entry["input_tokens"] else 0.0,
+                "avg_ttft_ms": round(entry["ttft_ms_sum"] / entry["ttft_samples"], 1) if entry["ttft_samples"] else None
+            }
+        return routes
+
+
+prompt_cache_metrics = PromptCacheMetrics()
+
+
+def get_prompt_cache_stats() -> Dict:
+    return prompt_cache_metrics.stats()
+
+
+def prompt_cache_headers(result) -> Dict[str, str]:
+    """Per-call TTFT and token headers for routes whose response body has a fixed schema."""
+    headers = {}
+    if result.ttft_ms is not None:
+        headers["X-LLM-TTFT-MS"] = str(round(result.ttft_ms, 1))
+    if result.usage is not None:
+        headers["X-LLM-Cached-Tokens"] = str(result.usage.cached_tokens)
+        headers["X-LLM-Uncached-Tokens"] = str(result.usage.uncached_tokens)
+    return headers
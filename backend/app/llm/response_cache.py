@@ -0,0 +1,240 @@
+"""
+Response cache for LLM endpoints whose answer depends only on their inputs.
+
+Endpoints such as treatment options return the same analysis for the same
+inputs, but each call is a multi-second Claude request. `LLMResponseCache`
+keys answers on (route, model, normalized input). Normalization sorts keys,
+drops empty values, and lowercases and whitespace-collapses strings.
+
+- memory tier: per-worker LRU with a TTL;
+- database tier: `LLMResponseCacheEntry` rows shared by every worker and kept
+  across restarts;
+- single-flight (app.singleflight): concurrent misses for one key wait on
+  the first caller's computation instead of each calling the model;
+- invalidation by route or for everything (admin endpoint in
+  app.routes.llm_cache).
+
+Only use it for endpoints whose prompt contains no patient identifiers or
+conversation history.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from app.db import async_session
+from app.models import LLMResponseCacheEntry
+from app.singleflight import singleflight_group
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_DB_ENABLED = os.getenv("LLM_CACHE_DB_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "500"))
+
+SOURCES = ("memory", "db", "coalesced", "miss")
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().lower()
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in sorted(value.items()) if item not in (None, "", [], {})}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def normalize_inputs(inputs: Dict) -> str:
+    """Canonical JSON of the inputs: equal for requests that would get the same answer."""
+    return json.dumps(_normalize(inputs), sort_keys=True, separators=(",", ":"))
+
+
+def llm_cache_key(route: str, model: str, normalized_input: str) -> str:
+    return hashlib.sha256(f"{route}\n{model}\n{normalized_input}".encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier (memory, database) response cache with single-flight misses."""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+                 enabled: bool = LLM_CACHE_ENABLED, db_enabled: bool = LLM_CACHE_DB_ENABLED):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.db_enabled = db_enabled
+        # key -> (expires_at monotonic, route, value)
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self.flight = singleflight_group("llm-response-cache")
+        self.counts = {source: 0 for source in SOURCES}
+        self.latency_ms = {source: 0.0 for source in SOURCES}
+        self.routes: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+        self.db_errors = 0
+        self.invalidations = 0
+
+    def _memory_get(self, key: str) -> Optional[Any]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: str, route: str, value: Any, ttl_seconds: float) -> None:
+        self._memory[key] = (time.monotonic() + ttl_seconds, route, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    async def _db_get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(value, remaining TTL seconds) of a live row; expired rows are deleted."""
+        try:
+            async with async_session() as session:
+                entry = (await session.execute(
+                    select(LLMResponseCacheEntry).where(LLMResponseCacheEntry.cache_key == key)
+                )).scalar_one_or_none()
+                if entry is None:
+                    return None
+                remaining = (entry.expires_at - datetime.utcnow()).total_seconds()
+                if remaining <= 0:
+                    await session.delete(entry)
+                    await session.commit()
+                    return None
+                return entry.response, remaining
+        except Exception as e:
+            self.db_errors += 1
+            print(f"⚠️ LLM cache read failed: {e}")
+            return None
+
+    async def _db_put(self, key: str, route: str, model: str, normalized_input: str, value: Any,
+                      ttl_seconds: float) -> None:
+        try:
+            async with async_session() as session:
+                await session.execute(delete(LLMResponseCacheEntry).where(LLMResponseCacheEntry.cache_key == key))
+                session.add(LLMResponseCacheEntry(
+                    cache_key=key,
+                    route=route,
+                    model=model,
+                    normalized_input=normalized_input,
+                    response=value,
+                    expires_at=datetime.utcnow() + timedelta(seconds=ttl_seconds)
+                ))
+                await session.commit()
+        except IntegrityError:
+            pass  # Another worker stored the same answer first
+        except Exception as e:
+            self.db_errors += 1
+            print(f"⚠️ LLM cache write failed: {e}")
+
+    def _record(self, route: str, source: str, started: float) -> None:
+        self.counts[source] += 1
+        self.latency_ms[source] += (time.perf_counter() - started) * 1000
+        route_counts = self.routes.setdefault(route, {name: 0 for name in SOURCES})
+        route_counts[source] += 1
+
+    async def get_or_compute(self, route: str, model: str, inputs: Dict, compute: Callable[[], Awaitable[Any]],
+                             ttl_seconds: Optional[float] = None) -> Tuple[Any, str]:
+        """
+        Cached answer for the inputs, or `compute()` stored in both tiers.
+
+        Returns (value, source) where source is "memory", "db", "coalesced" (waited
+        on a concurrent identical miss), "miss" or "bypass" (cache disabled).
+        Values must be JSON-serializable. Exceptions from `compute` are not cached.
+        """
+        if not self.enabled:
+            return await compute(), "bypass"
+
+        started = time.perf_counter()
+        ttl_seconds = ttl_seconds or self.ttl_seconds
+        normalized_input = normalize_inputs(inputs)
+        key = llm_cache_key(route, model, normalized_input)
+
+        value = self._memory_get(key)
+        if value is not None:
+            self._record(route, "memory", started)
+            return value, "memory"
+
+        async def load() -> Tuple[Any, str]:
+            stored = await self._db_get(key) if self.db_enabled else None
+            if stored is not None:
+                value, remaining = stored
+                self._memory_put(key, route, value, min(remaining, ttl_seconds))
+                return value, "db"
+            value = await compute()
+            self._memory_put(key, route, value, ttl_seconds)
+            if self.db_enabled:
+                await self._db_put(key, route, model, normalized_input, value, ttl_seconds)
+            return value, "miss"
+
+        (value, source), shared = await self.flight.do(key, load)
+        if shared:
+            source = "coalesced"
+
+        self._record(route, source, started)
+        return value, source
+
+    async def invalidate(self, route: Optional[str] = None) -> Dict:
+        """Drop cached answers for one route, or everything when route is None."""
+        keys = [key for key, (_, entry_route, _) in self._memory.items() if route is None or entry_route == route]
+        for key in keys:
+            del self._memory[key]
+
+        db_deleted = 0
+        if self.db_enabled:
+            statement = delete(LLMResponseCacheEntry)
+            if route is not None:
+                statement = statement.where(LLMResponseCacheEntry.route == route)
+            async with async_session() as session:
+                result = await session.execute(statement)
+                await session.commit()
+                db_deleted = result.rowcount or 0
+
+        self.invalidations += 1
+        print(f"🧹 LLM cache invalidated ({route or 'all routes'}): {len(keys)} in memory, {db_deleted} in database")
+        return {"route": route, "memory_deleted": len(keys), "db_deleted": db_deleted}
+
+    def stats(self) -> Dict:
+        hits = self.counts["memory"] + self.counts["db"] + self.counts["coalesced"]
+        lookups = hits + self.counts["miss"]
+
+        def average(*sources: str) -> Optional[float]:
+            count = sum(self.counts[source] for source in sources)
+            return round(sum(self.latency_ms[source] for source in sources) / count, 3) if count else None
+
+        return {
+            "enabled": self.enabled,
+            "db_enabled": self.db_enabled,
+            "ttl_seconds": self.ttl_seconds,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "inflight": self.flight.stats()["inflight"],
+            **self.counts,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "avg_memory_hit_ms": average("memory"),
+            "avg_db_hit_ms": average("db"),
+            "avg_coalesced_ms": average("coalesced"),
+            "avg_miss_ms": average("miss"),
+            "evictions": self.evictions,
+            "db_errors": self.db_errors,
+            "invalidations": self.invalidations,
+            "routes": {route: dict(counts) for route, counts in self.routes.items()}
+        }
+
+
+llm_response_cache = LLMResponseCache()
+
+
+def get_llm_cache_stats() -> Dict:
+    return llm_response_cache.stats()
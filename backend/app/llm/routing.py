@@ -0,0 +1,401 @@
+"""
+Hedged, fallback-aware LLM routing with per-provider circuit breakers.
+
+Routes hand `llm_router` an ordered list of candidates (app.llm.candidates)
+and a latency budget. The router:
+
+1. skips providers whose circuit breaker is open; after
+   `LLM_BREAKER_FAILURES` consecutive failures a provider is shut out for
+   `LLM_BREAKER_COOLDOWN_SECONDS`, then gets a single half-open trial;
+2. starts the first candidate. If it fails before producing a token, the
+   next candidate starts immediately (fallback);
+3. if it has produced no token within the hedge delay, the next candidate
+   starts as well (hedge). The hedge delay is the candidate's observed p95
+   time-to-first-token. When a hedge started that late could not produce
+   its typical first token inside the route's budget, no hedge is fired
+   (counted and logged as `hedges_skipped`); the next candidate then only
+   runs as a fallback;
+4. commits to whichever attempt produces a first token first, cancels the
+   loser, and streams the winner's tokens.
+
+Slow-but-healthy providers therefore cost at most one p95 of waiting instead
+of the whole request. Cancelled losers are not time-to-first-token samples:
+they were cut off before answering, so they are only counted. Every decision is counted per route and per provider
+(`get_routing_stats`); the winner's cached vs uncached input tokens and
+time-to-first-token go to app.llm.prompt_cache.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional
+
+from app.llm.prompt_cache import TokenUsage, prompt_cache_metrics
+
+LLM_HEDGING_ENABLED = os.getenv("LLM_HEDGING_ENABLED", "true").lower() == "true"
+# Hedge delay before a provider has enough samples for a p95
+LLM_HEDGE_DEFAULT_MS = float(os.getenv("LLM_HEDGE_DEFAULT_MS", "1500"))
+LLM_HEDGE_MIN_MS = float(os.getenv("LLM_HEDGE_MIN_MS", "100"))
+LLM_HEDGE_MIN_SAMPLES = 10
+LLM_LATENCY_WINDOW = int(os.getenv("LLM_LATENCY_WINDOW", "200"))
+LLM_MAX_CONCURRENT_ATTEMPTS = 2
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+
+class NoProviderAvailable(Exception):
+    """Every candidate was skipped (open breaker) or failed."""
+
+    def __init__(self, route: str, errors: Dict[str, str]):
+        self.route = route
+        self.errors = errors
+        super().__init__(f"No LLM provider available for {route}: {errors or 'all circuit breakers open'}")
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open trial after a cooldown."""
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, cooldown_seconds: float = LLM_BREAKER_COOLDOWN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+            self.state = "half_open"
+            self._trial_in_flight = False
+        if self.state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+                print(f"🔌 LLM circuit opened after {self.consecutive_failures} consecutive failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def release(self) -> None:
+        """A half-open trial was cancelled without an outcome; let the next request try."""
+        self._trial_in_flight = False
+
+
+class ProviderHealth:
+    """Breaker plus time-to-first-token window for one provider."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.breaker = CircuitBreaker()
+        self.ttft_ms: Deque[float] = deque(maxlen=LLM_LATENCY_WINDOW)
+        self.counters = {"attempts": 0, "successes": 0, "failures": 0, "cancelled": 0, "skipped_open": 0}
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if len(self.ttft_ms) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.ttft_ms)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def stats(self) -> Dict:
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            **self.counters,
+            "breaker": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "times_opened": self.breaker.times_opened,
+            "ttft_samples": len(self.ttft_ms),
+            "ttft_p50_ms": round(p50, 1) if p50 is not None else None,
+            "ttft_p95_ms": round(p95, 1) if p95 is not None else None
+        }
+
+
+class RoutingResult:
+    """Outcome of one routed request; filled in while the response streams."""
+
+    def __init__(self, route: str, budget_ms: Optional[float]):
+        self.route = route
+        self.budget_ms = budget_ms
+        self.provider: Optional[str] = None
+        self.model: Optional[str] = None
+        self.label: Optional[str] = None
+        self.ttft_ms: Optional[float] = None
+        self.total_ms: Optional[float] = None
+        self.usage: Optional[TokenUsage] = None
+        self.hedged = False
+        self.hedge_skipped = False
+        self.attempts: List[str] = []
+        self.errors: Dict[str, str] = {}
+
+    def summary(self) -> Dict:
+        return {
+            "route": self.route,
+            "provider": self.provider,
+            "model": self.model,
+            "ttft_ms": round(self.ttft_ms, 1) if self.ttft_ms is not None else None,
+            "total_ms": round(self.total_ms, 1) if self.total_ms is not None else None,
+            "budget_ms": self.budget_ms,
+            "within_budget": self.total_ms <= self.budget_ms if self.budget_ms and self.total_ms is not None else None,
+            "usage": self.usage.summary() if self.usage is not None else None,
+            "hedged": self.hedged,
+            "hedge_skipped": self.hedge_skipped,
+            "attempts": self.attempts,
+            "errors": self.errors
+        }
+
+
+class _Attempt:
+    """One candidate running in the background, buffering its tokens."""
+
+    def __init__(self, candidate, hedged: bool):
+        self.candidate = candidate
+        self.hedged = hedged
+        self.started = time.perf_counter()
+        self.ttft_ms: Optional[float] = None
+        self.error: Optional[BaseException] = None
+        self.tokens: asyncio.Queue = asyncio.Queue()
+        # Resolves True on the first token, False if the stream ends (or fails) without one
+        self.first_token: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        try:
+            if self.candidate.on_start:
+                self.candidate.on_start()
+            async for token in self.candidate.stream():
+                if not token:
+                    continue
+                if not self.first_token.done():
+                    self.ttft_ms = (time.perf_counter() - self.started) * 1000
+                    self.first_token.set_result(True)
+                self.tokens.put_nowait(token)
+        except Exception as e:
+            self.error = e
+        finally:
+            if not self.first_token.done():
+                self.first_token.set_result(False)
+            self.tokens.put_nowait(None)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    async def cancel(self) -> None:
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+
+class LLMRouter:
+    """Routes completions across candidates with breakers, fallback and hedging."""
+
+    def __init__(self, hedging: bool = LLM_HEDGING_ENABLED):
+        self.hedging = hedging
+        self.providers: Dict[str, ProviderHealth] = {}
+        self.route_stats: Dict[str, Dict] = {}
+
+    def _health(self, provider: str) -> ProviderHealth:
+        if provider not in self.providers:
+            self.providers[provider] = ProviderHealth(provider)
+        return self.providers[provider]
+
+    def _route_counters(self, route: str) -> Dict:
+        if route not in self.route_stats:
+            self.route_stats[route] = {
+                "requests": 0,
+                "completed": 0,
+                "failed": 0,
+                "fallbacks": 0,
+                "hedges_fired": 0,
+                "hedges_skipped": 0,
+                "hedge_wins": 0,
+                "budget_misses": 0,
+                "winners": {},
+                "total_ms_sum": 0.0
+            }
+        return self.route_stats[route]
+
+    def hedge_delay_ms(self, current, following, started_ms: float, budget_ms: Optional[float]) -> Optional[float]:
+        """
+        How long to wait for `current`'s first token before also starting `following`:
+        `current`'s p95 time-to-first-token. `started_ms` is when `current` started,
+        relative to the request. None means no hedge, because one started that late
+        would not get its typical first token inside the budget.
+        """
+        delay = max(self._health(current.provider).percentile(0.95) or LLM_HEDGE_DEFAULT_MS, LLM_HEDGE_MIN_MS)
+        if budget_ms:
+            expected = self._health(following.provider).percentile(0.5) or LLM_HEDGE_DEFAULT_MS / 2
+            if started_ms + delay + expected > budget_ms:
+                return None
+        return delay
+
+    async def stream(self, route: str, candidates: List, budget_ms: Optional[float] = None,
+                     result: Optional[RoutingResult] = None) -> AsyncIterator[str]:
+        """
+        Yield the winning candidate's tokens. Pass a RoutingResult to read the
+        routing outcome once the stream ends. Raises NoProviderAvailable if no
+        candidate produces a response.
+        """
+        result = result or RoutingResult(route, budget_ms)
+        counters = self._route_counters(route)
+        counters["requests"] += 1
+        started = time.perf_counter()
+        pending = list(candidates)
+        active: List[_Attempt] = []
+        winner: Optional[_Attempt] = None
+
+        def launch(hedged: bool) -> bool:
+            while pending:
+                candidate = pending.pop(0)
+                health = self._health(candidate.provider)
+                if not health.breaker.allow():
+                    health.counters["skipped_open"] += 1
+                    result.errors[candidate.provider] = "circuit open"
+                    continue
+                health.counters["attempts"] += 1
+                result.attempts.append(candidate.provider)
+                if hedged:
+                    counters["hedges_fired"] += 1
+                    result.hedged = True
+                elif len(result.attempts) > 1:
+                    counters["fallbacks"] += 1
+                active.append(_Attempt(candidate, hedged))
+                return True
+            return False
+
+        def fail(attempt: _Attempt) -> None:
+            health = self._health(attempt.candidate.provider)
+            health.counters["failures"] += 1
+            health.breaker.record_failure()
+            error = attempt.error or Exception("empty response")
+            result.errors[attempt.candidate.provider] = str(error)[:200]
+            print(f"⚠️ {route}: {attempt.candidate.provider} failed ({str(error)[:120]})")
+
+        try:
+            while winner is None:
+                if not active and not launch(hedged=False):
+                    counters["failed"] += 1
+                    raise NoProviderAvailable(route, result.errors)
+
+                timeout = None
+                if self.hedging and pending and len(active) < LLM_MAX_CONCURRENT_ATTEMPTS:
+                    latest = active[-1]
+                    latest_started_ms = (time.perf_counter() - started) * 1000 - latest.elapsed_ms()
+                    delay = self.hedge_delay_ms(latest.candidate, pending[0], latest_started_ms, budget_ms)
+                    if delay is not None:
+                        timeout = max(0.0, (delay - latest.elapsed_ms()) / 1000)
+                    elif not result.hedge_skipped:
+                        result.hedge_skipped = True
+                        counters["hedges_skipped"] += 1
+                        print(f"⏭️ {route}: no hedge to {pending[0].provider}, {latest.candidate.provider}'s p95 "
+                              f"leaves it no time inside the {budget_ms:.0f}ms budget; fallback only")
+
+                done, _ = await asyncio.wait([attempt.first_token for attempt in active], timeout=timeout,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch(hedged=True)
+                    continue
+
+                for attempt in list(active):
+                    if not attempt.first_token.done():
+                        continue
+                    if attempt.first_token.result():
+                        winner = attempt
+                        break
+                    # Ended without a token: error before first byte, or an empty completion
+                    await attempt.task
+                    active.remove(attempt)
+                    fail(attempt)
+
+            for loser in active:
+                if loser is winner:
+                    continue
+                health = self._health(loser.candidate.provider)
+                # Cut off before its first token: counted, but not a time-to-first-token sample
+                health.counters["cancelled"] += 1
+                health.breaker.release()
+                await loser.cancel()
+            active = [winner]
+
+            health = self._health(winner.candidate.provider)
+            health.ttft_ms.append(winner.ttft_ms)
+            result.provider = winner.candidate.provider
+            result.model = winner.candidate.model
+            result.label = winner.candidate.label
+            result.ttft_ms = (time.perf_counter() - started) * 1000
+            if winner.hedged:
+                counters["hedge_wins"] += 1
+
+            while True:
+                token = await winner.tokens.get()
+                if token is None:
+                    break
+                yield token
+
+            await winner.task
+            if winner.error is not None:
+                # Tokens were already delivered, so there is no transparent fallback mid-stream
+                fail(winner)
+                counters["failed"] += 1
+                raise winner.error
+
+            health.counters["successes"] += 1
+            health.breaker.record_success()
+            result.total_ms = (time.perf_counter() - started) * 1000
+            result.usage = getattr(winner.candidate, "usage", None)
+            prompt_cache_metrics.record(route, result.usage, result.ttft_ms)
+            counters["completed"] += 1
+            counters["total_ms_sum"] += result.total_ms
+            counters["winners"][winner.candidate.provider] = counters["winners"].get(winner.candidate.provider, 0) + 1
+            if budget_ms and result.total_ms > budget_ms:
+                counters["budget_misses"] += 1
+        finally:
+            for attempt in active:
+                if not attempt.task.done():
+                    self._health(attempt.candidate.provider).breaker.release()
+                    await attempt.cancel()
+
+    async def complete(self, route: str, candidates: List, budget_ms: Optional[float] = None) -> RoutingResult:
+        """Run `stream` to the end; the text is on `result.text`."""
+        result = RoutingResult(route, budget_ms)
+        parts = [token async for token in self.stream(route, candidates, budget_ms, result)]
+        result.text = "".join(parts)
+        return result
+
+    def stats(self) -> Dict:
+        routes = {}
+        for route, counters in self.route_stats.items():
+            completed = counters["completed"]
+            routes[route] = {
+                **{key: value for key, value in counters.items() if key != "total_ms_sum"},
+                "winners": dict(counters["winners"]),
+                "avg_total_ms": round(counters["total_ms_sum"] / completed, 1) if completed else None
+            }
+        return {
+            "hedging_enabled": self.hedging,
+            "routes": routes,
+            "providers": {name: health.stats() for name, health in self.providers.items()}
+        }
+
+
+llm_router = LLMRouter()
+
+
+def get_routing_stats() -> Dict:
+    return llm_router.stats()
@@ -0,0 +1,125 @@
+"""
+Token streaming from OpenAI-compatible chat completion endpoints (Groq, OpenAI).
+
+`stream_chat_tokens` opens the request with `client.stream(...)` on a pooled
+httpx client and yields content deltas as the server-sent events arrive, so
+callers can forward tokens before the completion has finished generating.
+Token usage arrives on the final chunk (`usage` with OpenAI's
+`stream_options.include_usage`, `x_groq.usage` on Groq) and is handed to
+`on_usage`.
+
+`sse_event` frames events for routes that stream to the browser as
+text/event-stream, with `SSE_HEADERS` to keep proxies from buffering them.
+"""
+
+import json
+from typing import AsyncIterator, Callable, Dict, Optional
+
+import httpx
+
+GROQ_CHAT_COMPLETIONS_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+# nginx and similar proxies buffer responses unless told not to, which holds tokens back
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+async def stream_chat_tokens(
+    client: httpx.AsyncClient,
+    url: str,
+    api_key: str,
+    payload: Dict,
+    timeout: Optional[float] = None,
+    on_usage: Optional[Callable[[Dict], None]] = None
+) -> AsyncIterator[str]:
+    """Yield content tokens from a streaming chat completion as they arrive."""
+    request_kwargs = {
+        "headers": {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        },
+        "json": {**payload, "stream": True}
+    }
+    if timeout is not None:
+        request_kwargs["timeout"] = timeout
+
+    async with client.stream("POST", url, **request_kwargs) as response:
+        if response.status_code != 200:
+            body = await response.aread()
+            raise Exception(f"Streaming completion failed: {response.status_code} {body[:200]!r}")
+
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            chunk_data = line[6:].strip()
+            if chunk_data == "[DONE]":
+                break
+            try:
+                chunk = json.loads(chunk_data)
+            except ValueError:
+                continue
+            usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage")
+            if usage and on_usage:
+                on_usage(usage)
+            choices = chunk.get("choices") or []
+            if choices:
+                token = (choices[0].get("delta") or {}).get("content")
+                if token:
+                    yield token
+
+
+class ThinkingFilter:
+    """
+    Incrementally drops a leading <thinking>...</thinking> block from streamed text.
+
+    Streaming counterpart of `extract_response_after_thinking`: text is held
+    back only while it could still be the start of a thinking block, then
+    everything after the closing tag is passed through as it arrives.
+    """
+
+    OPEN_TAG = "<thinking>"
+    CLOSE_TAG = "</thinking>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._state = "detect"
+
+    def feed(self, token: str) -> str:
+        """Return the part of `token` that should be shown to the user."""
+        if self._state == "pass":
+            return token
+        if self._state == "closed":
+            # Whitespace after </thinking> may arrive in later tokens
+            visible = token.lstrip()
+            if visible:
+                self._state = "pass"
+            return visible
+
+        self._buffer += token
+        if self._state == "detect":
+            head = self._buffer.lstrip()
+            if len(head) < len(self.OPEN_TAG) and self.OPEN_TAG.startswith(head):
+                return ""
+            if not head.startswith(self.OPEN_TAG):
+                self._state = "pass"
+                visible, self._buffer = self._buffer, ""
+                return visible
+            self._state = "thinking"
+
+        end = self._buffer.find(self.CLOSE_TAG)
+        if end == -1:
+            return ""
+        visible = self._buffer[end + len(self.CLOSE_TAG):].lstrip()
+        self._buffer = ""
+        self._state = "pass" if visible else "closed"
+        return visible
+
+    def flush(self) -> str:
+        """Release held-back text once the stream ends (an unclosed block is dropped)."""
+        visible = self._buffer if self._state == "detect" else ""
+        self._buffer = ""
+        return visible
+
+
+def sse_event(event: str, data: Dict) -> bytes:
+    """One server-sent event frame: the event name and its JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
@@ -11,13 +11,19 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app.db import get_session, init_db, close_db
+from app.http_clients import http_clients
+from app.voice.deepgram_pool import deepgram_pool
+from app.voice.greetings import start_greeting_warmup, stop_greeting_warmup
+from app.voice.provider_selector import tts_selector
+from app.llm import close_llm_clients
+from app.memory import flush_pending_memory
 from app.models import (
     User, UserCreate, UserRead, UserUpdate,
     Conversation, ConversationCreate, ConversationRead, ConversationUpdate,
     Message, MessageCreate, MessageRead,
     AgentSession, AgentSessionCreate, AgentSessionRead, AgentSessionUpdate
 )
-from app.routes import awareness, ai_chat, ultra_low_latency, videosdk, tts_comparison, journey
+from app.routes import awareness, ai_chat, ultra_low_latency, videosdk, tts_comparison, journey, llm_cache
 
 # Create FastAPI app
 app = FastAPI(
@@ -35,6 +41,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Metadata for binary audio responses (delivery=binary) and LLM cache/TTFT figures travels in these headers
+    expose_headers=["X-Latency-MS", "X-Provider", "X-Voice", "X-Audio-Size", "X-Tts-Cache", "X-Selection-US", "X-LLM-Cache",
+                    "X-LLM-TTFT-MS", "X-LLM-Cached-Tokens", "X-LLM-Uncached-Tokens"],
 )
 
 # Security
@@ -47,15 +56,26 @@ app.include_router(ultra_low_latency.router)
 app.include_router(tts_comparison.router)
 app.include_router(videosdk.router)
 app.include_router(journey.router)
+app.include_router(llm_cache.router)
 
 @app.on_event("startup")
 async def on_startup():
-    """Initialize database on startup"""
+    """Initialize database, pooled upstream HTTP clients, warm Deepgram connections, greeting audio and TTS provider probes on startup"""
     await init_db()
+    await http_clients.start()
+    await deepgram_pool.start()
+    start_greeting_warmup()
+    await tts_selector.start()
 
 @app.on_event("shutdown") 
 async def on_shutdown():
-    """Close database connections on shutdown"""
+    """Flush queued conversation memory, then close database connections on shutdown"""
+    await stop_greeting_warmup()
+    await tts_selector.close()
+    await flush_pending_memory()
+    await close_llm_clients()
+    await deepgram_pool.close()
+    await http_clients.close()
     await close_db()
 
 # Health check endpoint - no logging to reduce noise
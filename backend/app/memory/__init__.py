@@ -0,0 +1,36 @@
+"""
+Patient conversation memory shared by the chat, copilot and voice routers.
+"""
+
+from app.memory.service import (
+    load_patient_conversation_history,
+    save_patient_conversation_history,
+    get_patient_context_summary,
+    count_patient_turns,
+    clear_patient_memory,
+    get_memory_stats,
+    flush_pending_memory,
+    memory_cache,
+    write_queue,
+)
+from app.memory.insights import update_patient_insights
+from app.memory.store import ConversationMemoryStore, get_memory_store
+from app.memory.summarizer import format_summary_block, prompt_token_metrics, recent_prompt_turns
+
+__all__ = [
+    "load_patient_conversation_history",
+    "save_patient_conversation_history",
+    "get_patient_context_summary",
+    "update_patient_insights",
+    "count_patient_turns",
+    "clear_patient_memory",
+    "get_memory_stats",
+    "flush_pending_memory",
+    "memory_cache",
+    "write_queue",
+    "ConversationMemoryStore",
+    "get_memory_store",
+    "format_summary_block",
+    "prompt_token_metrics",
+    "recent_prompt_turns",
+]
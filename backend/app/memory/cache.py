@@ -0,0 +1,72 @@
+"""
+In-process LRU + TTL cache of hot patient memory records.
+
+A record holds the patient's context, total turn count and a bounded window of
+their most recent turns, so a chat turn for a cached patient needs no reads
+from the memory store. The cache is per worker process; entries expire after
+`ttl_seconds` so other workers' writes become visible within that window.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+MEMORY_CACHE_MAX_PATIENTS = int(os.getenv("MEMORY_CACHE_MAX_PATIENTS", "1000"))
+MEMORY_CACHE_TTL_SECONDS = float(os.getenv("MEMORY_CACHE_TTL_SECONDS", "300"))
+
+
+class PatientMemoryCache:
+    """Bounded LRU cache with per-entry TTL and hit/miss/eviction counters."""
+
+    def __init__(self, max_entries: int = MEMORY_CACHE_MAX_PATIENTS, ttl_seconds: float = MEMORY_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, patient_id: str) -> Optional[Dict]:
+        entry = self._entries.get(patient_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, record = entry
+        if expires_at < time.monotonic():
+            del self._entries[patient_id]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(patient_id)
+        self.hits += 1
+        return record
+
+    def put(self, patient_id: str, record: Dict) -> None:
+        self._entries[patient_id] = (time.monotonic() + self.ttl_seconds, record)
+        self._entries.move_to_end(patient_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, patient_id: str) -> None:
+        self._entries.pop(patient_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
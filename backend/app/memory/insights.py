@@ -0,0 +1,92 @@
+"""
+Patient-insight extraction from conversation turns.
+
+All condition keywords and concern phrases are compiled once at import into a
+single regex alternation. It is wrapped in a lookahead, so overlapping terms
+such as "chronic pain" and "pain" are both reported. Extraction runs only over
+newly appended turns and merges its findings into the stored patient context,
+so the cost grows with the new text rather than with history × keyword count.
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, List
+
+CONDITION_KEYWORDS = [
+    "cancer", "diabetes", "heart disease", "arthritis", "lupus",
+    "fibromyalgia", "depression", "anxiety", "chronic pain",
+    "rare disease", "autoimmune", "neurological", "hypertension",
+    "asthma", "copd", "stroke", "alzheimer", "parkinson"
+]
+
+CONCERN_PHRASES = [
+    "worried about", "concerned about", "afraid of", "struggling with",
+    "pain", "symptoms", "treatment", "side effects", "diagnosis"
+]
+
+MAX_KEY_CONCERNS = 5
+
+_TERM_KINDS = {term: "condition" for term in CONDITION_KEYWORDS}
+_TERM_KINDS.update({phrase: "concern" for phrase in CONCERN_PHRASES})
+
+# Longest terms first so the alternation prefers "heart disease" over any shorter prefix
+INSIGHT_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(term) for term in sorted(_TERM_KINDS, key=len, reverse=True)) + "))"
+)
+
+
+def extract_turn_insights(content: str):
+    """Return (conditions, concerns) found in one message, in order of appearance."""
+    conditions = []
+    concerns = []
+    seen = set()
+    for match in INSIGHT_PATTERN.finditer(content):
+        term = match.group(1)
+        if term in seen:
+            continue
+        # Only the first occurrence of each term counts, as with str.find
+        seen.add(term)
+        if _TERM_KINDS[term] == "condition":
+            conditions.append(term.title())
+        else:
+            start = match.start()
+            concern_context = content[max(0, start - 20):start + 50].strip()
+            if len(concern_context) > 10:
+                concerns.append(concern_context)
+    return conditions, concerns
+
+
+def update_patient_insights(patient_context: Dict, new_messages: List[Dict], total_turns: int):
+    """Merge insights from newly appended turns into the patient context in place."""
+    try:
+        conditions = list(patient_context.get("conditions", []))
+        new_concerns = []
+
+        for msg in new_messages:
+            found_conditions, found_concerns = extract_turn_insights(msg.get("content", "").lower())
+
+            for condition in found_conditions:
+                if condition not in conditions:
+                    conditions.append(condition)
+            new_concerns.extend(found_concerns)
+
+            # Journey stage tracking - latest turn wins
+            if msg.get("journey_stage"):
+                patient_context["journey_stage"] = msg["journey_stage"]
+
+        patient_context["conditions"] = conditions
+
+        if new_concerns:
+            # Most recent concerns first, keep the top few
+            merged = []
+            for concern in new_concerns[::-1] + list(patient_context.get("key_concerns", [])):
+                if concern not in merged:
+                    merged.append(concern)
+            patient_context["key_concerns"] = merged[:MAX_KEY_CONCERNS]
+
+        # Add conversation insights
+        patient_context["total_conversations"] = total_turns
+        patient_context["last_interaction"] = datetime.utcnow().isoformat()
+
+    except Exception as e:
+        print(f"❌ Error updating patient insights: {e}")
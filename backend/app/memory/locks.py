@@ -0,0 +1,45 @@
+"""
+Per-patient asyncio lock registry.
+
+Serializes read-modify-write sequences on a single patient's memory while
+letting different patients proceed concurrently. Locks are held in a
+WeakValueDictionary, so a patient's lock disappears once no coroutine is
+using it and the registry does not grow with the number of patients seen.
+"""
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict
+
+
+class PatientLockRegistry:
+    """Hands out one asyncio.Lock per patient id."""
+
+    def __init__(self):
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.acquisitions = 0
+        self.contended = 0
+
+    def get(self, patient_id: str) -> asyncio.Lock:
+        lock = self._locks.get(patient_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[patient_id] = lock
+        return lock
+
+    @asynccontextmanager
+    async def lock(self, patient_id: str):
+        patient_lock = self.get(patient_id)
+        if patient_lock.locked():
+            self.contended += 1
+        async with patient_lock:
+            self.acquisitions += 1
+            yield
+
+    def stats(self) -> Dict:
+        return {
+            "active_locks": len(self._locks),
+            "acquisitions": self.acquisitions,
+            "contended": self.contended
+        }
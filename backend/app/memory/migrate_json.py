@@ -0,0 +1,89 @@
+"""
+One-shot import of legacy `conversation_memory/*_conversations.json` files
+into the database-backed conversation memory tables.
+
+Usage (from the backend directory):
+    python -m app.memory.migrate_json [--source conversation_memory] [--dry-run] [--force]
+
+Each patient is imported in one transaction (turns and context together),
+so an interrupted run leaves every patient either fully imported or absent.
+On a re-run, patients whose stored turn count matches their file are
+skipped unless --force is given. Patients with fewer turns stored (left
+partial by an interrupted run of an older version of this tool) are cleared
+and re-imported. Patients with more turns stored have live conversations on
+top of the import, so they are left alone.
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+from app.db import init_db, close_db
+from app.memory.store import (
+    CONVERSATION_MEMORY_DIR,
+    DatabaseMemoryStore,
+    default_patient_context,
+)
+
+BATCH_SIZE = 500
+
+
+async def import_patient_file(store: DatabaseMemoryStore, memory_file: Path, dry_run: bool, force: bool) -> int:
+    """Import one patient record and return the number of turns written."""
+    with open(memory_file, 'r') as f:
+        record = json.load(f)
+
+    patient_id = record.get("patient_id") or memory_file.name[:-len("_conversations.json")]
+    history = record.get("conversation_history", [])
+
+    existing = await store.count_turns(patient_id)
+    if existing and not force:
+        if existing >= len(history):
+            print(f"⏭️  {patient_id}: {existing} turns already in database, skipping")
+            return 0
+        print(f"♻️  {patient_id}: only {existing} of {len(history)} turns in database, re-importing")
+
+    if dry_run:
+        print(f"🔍 {patient_id}: would import {len(history)} turns")
+        return len(history)
+
+    context = record.get("patient_context") or default_patient_context(patient_id)
+    await store.import_patient(patient_id, history, context, batch_size=BATCH_SIZE)
+
+    print(f"✅ {patient_id}: imported {len(history)} turns")
+    return len(history)
+
+
+async def migrate(source: Path, dry_run: bool = False, force: bool = False) -> None:
+    await init_db()
+    store = DatabaseMemoryStore()
+
+    memory_files = sorted(source.glob("*_conversations.json"))
+    print(f"📦 Found {len(memory_files)} patient memory files in {source}")
+
+    total_turns = 0
+    failures = 0
+    for memory_file in memory_files:
+        try:
+            total_turns += await import_patient_file(store, memory_file, dry_run, force)
+        except Exception as e:
+            failures += 1
+            print(f"❌ Failed to import {memory_file}: {e}")
+
+    await close_db()
+    print(f"🏁 Imported {total_turns} turns from {len(memory_files) - failures} files ({failures} failures)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import JSON conversation memory into the database")
+    parser.add_argument("--source", type=Path, default=CONVERSATION_MEMORY_DIR,
+                        help="Directory containing *_conversations.json files")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be imported without writing")
+    parser.add_argument("--force", action="store_true", help="Re-import patients that already have turns")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.source, dry_run=args.dry_run, force=args.force))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Conversation memory API shared by the chat, copilot and ultra-low-latency routers.
+
+Reads are served from the in-process `PatientMemoryCache` when the patient is
+hot; misses load the recent-turn window and context from the configured
+`ConversationMemoryStore` once and cache them for subsequent turns. Saves
+update the cached record and hand the write to the `WriteBehindQueue`, so the
+chat response never waits on the store.
+"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from app.memory.cache import PatientMemoryCache
+from app.memory.insights import update_patient_insights
+from app.memory.locks import PatientLockRegistry
+from app.memory.store import get_memory_store, default_patient_context
+from app.memory.summarizer import (
+    SUMMARY_FOLD_BATCH,
+    SUMMARY_MAX_FOLD_TURNS,
+    SUMMARY_RECENT_TURNS,
+    prompt_token_metrics,
+    summarize_turns,
+    summarizer_stats,
+)
+from app.memory.write_behind import MEMORY_WRITE_BEHIND, WriteBehindQueue
+
+# Number of most recent turns kept per cached patient record
+RECENT_TURNS_CACHED = 40
+
+memory_cache = PatientMemoryCache()
+write_queue = WriteBehindQueue()
+patient_locks = PatientLockRegistry()
+
+# patient_id -> in-flight rolling summary refresh
+_summary_tasks: Dict[str, asyncio.Task] = {}
+
+
+async def _get_patient_record(patient_id: str) -> Dict:
+    """Return the cached patient record, loading it from the store on a miss."""
+    record = memory_cache.get(patient_id)
+    if record is not None:
+        return record
+
+    store = get_memory_store()
+    while True:
+        # Retry if a queued write landed in the store while we were reading it: it would be counted twice or not at all
+        persisted_writes = write_queue.persisted_writes
+        pending = write_queue.pending_for(patient_id)
+        stored_turns = await store.load_recent_turns(patient_id, RECENT_TURNS_CACHED)
+        record = {
+            "turns": (stored_turns + pending["turns"])[-RECENT_TURNS_CACHED:],
+            "context": pending["context"] or await store.get_patient_context(patient_id),
+            "turn_count": await store.count_turns(patient_id) + len(pending["turns"])
+        }
+        if write_queue.persisted_writes == persisted_writes:
+            break
+    memory_cache.put(patient_id, record)
+    return record
+
+
+async def load_patient_conversation_history(patient_id: str, limit: Optional[int] = 20) -> List[Dict]:
+    """Load the patient's most recent conversation turns."""
+    try:
+        if limit is None or limit > RECENT_TURNS_CACHED:
+            turns = await get_memory_store().load_recent_turns(patient_id, limit)
+            turns += write_queue.pending_for(patient_id)["turns"]
+            return turns[-limit:] if limit is not None else turns
+
+        record = await _get_patient_record(patient_id)
+        return list(record["turns"][-limit:]) if limit > 0 else []
+    except Exception as e:
+        print(f"❌ Error loading conversation history for {patient_id}: {e}")
+        return []
+
+
+async def get_patient_context_summary(patient_id: str) -> Dict:
+    """Get a summary of patient's context for building personalized prompts."""
+    try:
+        record = await _get_patient_record(patient_id)
+        return dict(record["context"])
+    except Exception as e:
+        print(f"❌ Error loading patient context for {patient_id}: {e}")
+        return {}
+
+
+async def count_patient_turns(patient_id: str) -> int:
+    """Total number of stored turns for the patient."""
+    record = await _get_patient_record(patient_id)
+    return record["turn_count"]
+
+
+async def save_patient_conversation_history(patient_id: str, new_turns: List[Dict], journey_stage: str = "awareness") -> int:
+    """Append this turn's messages to patient memory and refresh patient insights.
+
+    With write-behind enabled the turns are acknowledged once the cached record
+    is updated; the store write happens on the next background flush. The
+    patient's lock keeps concurrent turns (e.g. chat and voice in two tabs)
+    from overwriting each other's cached record.
+    """
+    try:
+        async with patient_locks.lock(patient_id):
+            total_turns = await _save_turns_locked(patient_id, new_turns, journey_stage)
+        schedule_summary_refresh(patient_id)
+        return total_turns
+    except Exception as e:
+        # Drop the cached record so the next turn reloads a consistent view
+        memory_cache.invalidate(patient_id)
+        print(f"❌ Error saving conversation history for {patient_id}: {e}")
+        return 0
+
+
+async def _save_turns_locked(patient_id: str, new_turns: List[Dict], journey_stage: str) -> int:
+    record = await _get_patient_record(patient_id)
+
+    record["turn_count"] += len(new_turns)
+    record["turns"] = (record["turns"] + list(new_turns))[-RECENT_TURNS_CACHED:]
+
+    context = dict(record["context"]) or default_patient_context(patient_id, journey_stage)
+    update_patient_insights(context, new_turns, record["turn_count"])
+    record["context"] = context
+
+    if MEMORY_WRITE_BEHIND:
+        write_queue.enqueue(patient_id, new_turns, context)
+    else:
+        store = get_memory_store()
+        record["turn_count"] = await store.append_turns(patient_id, new_turns)
+        await store.save_patient_context(patient_id, context)
+
+    print(f"✅ Saved conversation history for {patient_id} ({record['turn_count']} messages)")
+    return record["turn_count"]
+
+
+def _unsummarized_turns(record: Dict) -> int:
+    """Turns that have left the recent prompt window but are not in the rolling summary yet."""
+    summarized = record["context"].get("summarized_turns", 0)
+    return record["turn_count"] - SUMMARY_RECENT_TURNS - summarized
+
+
+def schedule_summary_refresh(patient_id: str) -> None:
+    """Fold older turns into the patient's rolling summary in the background, if due."""
+    record = memory_cache.get(patient_id)
+    if record is None or _unsummarized_turns(record) < SUMMARY_FOLD_BATCH:
+        return
+    task = _summary_tasks.get(patient_id)
+    if task is not None and not task.done():
+        return
+    task = asyncio.create_task(_refresh_rolling_summary(patient_id))
+    _summary_tasks[patient_id] = task
+    task.add_done_callback(lambda _: _summary_tasks.pop(patient_id, None))
+
+
+async def _refresh_rolling_summary(patient_id: str) -> None:
+    try:
+        # Snapshot the turns to fold while no new turns can be appended
+        async with patient_locks.lock(patient_id):
+            record = await _get_patient_record(patient_id)
+            pending = _unsummarized_turns(record)
+            if pending < SUMMARY_FOLD_BATCH:
+                return
+            summarized = record["context"].get("summarized_turns", 0)
+            previous_summary = record["context"].get("rolling_summary", "")
+            # Oldest unsummarized turns first; a backlog over SUMMARY_MAX_FOLD_TURNS is folded over several refreshes
+            window = await load_patient_conversation_history(patient_id, pending + SUMMARY_RECENT_TURNS)
+            to_fold = window[:max(0, min(pending, SUMMARY_MAX_FOLD_TURNS, len(window) - SUMMARY_RECENT_TURNS))]
+            if not to_fold:
+                return
+            summarized_upto = summarized + len(to_fold)
+
+        summary = await summarize_turns(previous_summary, to_fold)
+
+        async with patient_locks.lock(patient_id):
+            record = await _get_patient_record(patient_id)
+            context = dict(record["context"]) or default_patient_context(patient_id)
+            context["rolling_summary"] = summary
+            context["summarized_turns"] = summarized_upto
+            record["context"] = context
+            if MEMORY_WRITE_BEHIND:
+                write_queue.enqueue(patient_id, [], context)
+            else:
+                await get_memory_store().save_patient_context(patient_id, context)
+
+        print(f"📝 Rolling summary for {patient_id} now covers {summarized_upto} turns")
+
+    except Exception as e:
+        print(f"❌ Error refreshing rolling summary for {patient_id}: {e}")
+
+
+async def clear_patient_memory(patient_id: str) -> None:
+    """Delete the patient's stored turns and context."""
+    write_queue.discard(patient_id)
+    memory_cache.invalidate(patient_id)
+    await get_memory_store().clear_patient(patient_id)
+
+
+async def get_memory_stats() -> Dict:
+    """Aggregate store statistics plus cache counters."""
+    store = get_memory_store()
+    stats = await store.stats()
+    stats["memory_backend"] = store.backend_name
+    stats["cache"] = memory_cache.stats()
+    stats["write_behind"] = write_queue.stats()
+    stats["patient_locks"] = patient_locks.stats()
+    stats["summaries"] = dict(summarizer_stats, in_flight=len(_summary_tasks))
+    stats["prompt_tokens"] = prompt_token_metrics.stats()
+    return stats
+
+
+async def flush_pending_memory() -> None:
+    """Persist all queued memory writes; called from the application shutdown hook."""
+    # Summaries are recomputed on a later turn, so in-flight refreshes are simply dropped
+    for task in list(_summary_tasks.values()):
+        task.cancel()
+    await write_queue.drain()
@@ -0,0 +1,410 @@
+"""
+Conversation memory storage backends.
+
+Patient conversation memory used to live in one JSON file per patient that was
+read and fully rewritten on every chat turn. `ConversationMemoryStore` is the
+pluggable interface the routers talk to; `DatabaseMemoryStore` is the default
+append-only backend on the shared async SQLModel engine, and
+`JsonFileMemoryStore` keeps the legacy file layout available for local use.
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import aiofiles
+from sqlalchemy import delete, func, select
+
+from app.db import async_session
+from app.memory.locks import PatientLockRegistry
+from app.models import ConversationTurn, PatientMemoryContext
+
+# Columns stored natively on ConversationTurn; every other key of a turn dict
+# is kept in the turn_metadata JSON column.
+TURN_COLUMNS = ("role", "content", "timestamp", "journey_stage")
+
+CONVERSATION_MEMORY_DIR = Path("conversation_memory")
+
+
+def default_patient_context(patient_id: str, journey_stage: str = "awareness") -> Dict:
+    """Initial context for a patient we have no memory of yet."""
+    return {
+        "name": patient_id.replace("patient_", "").replace("_", " ").title(),
+        "journey_stage": journey_stage,
+        "user_role": "patient",
+        "conditions": [],
+        "key_concerns": [],
+        "preferences": {}
+    }
+
+
+def _parse_timestamp(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if value:
+        try:
+            return datetime.fromisoformat(str(value))
+        except ValueError:
+            pass
+    return datetime.utcnow()
+
+
+class ConversationMemoryStore(ABC):
+    """Interface for persisting patient conversation turns and context."""
+
+    backend_name = "abstract"
+
+    @abstractmethod
+    async def append_turns(self, patient_id: str, turns: List[Dict]) -> int:
+        """Append turns to the patient's history and return the new total turn count."""
+
+    @abstractmethod
+    async def load_recent_turns(self, patient_id: str, limit: Optional[int] = 20) -> List[Dict]:
+        """Return the last `limit` turns in chronological order (all turns if limit is None)."""
+
+    @abstractmethod
+    async def get_patient_context(self, patient_id: str) -> Dict:
+        """Return the stored patient context, or {} if the patient is unknown."""
+
+    @abstractmethod
+    async def save_patient_context(self, patient_id: str, context: Dict) -> None:
+        """Replace the stored patient context."""
+
+    @abstractmethod
+    async def count_turns(self, patient_id: str) -> int:
+        """Return the total number of stored turns for the patient."""
+
+    @abstractmethod
+    async def clear_patient(self, patient_id: str) -> None:
+        """Delete all turns and context for the patient."""
+
+    @abstractmethod
+    async def stats(self) -> Dict:
+        """Return aggregate statistics about the stored memory."""
+
+    async def append_turn(self, patient_id: str, turn: Dict) -> int:
+        return await self.append_turns(patient_id, [turn])
+
+
+class DatabaseMemoryStore(ConversationMemoryStore):
+    """Append-only memory store backed by the ConversationTurn/PatientMemoryContext tables."""
+
+    backend_name = "database"
+
+    def __init__(self, session_factory=async_session):
+        self.session_factory = session_factory
+        # Guards the turn_count read-modify-write on the patient's context row
+        self.locks = PatientLockRegistry()
+
+    @staticmethod
+    def _turn_to_row(patient_id: str, turn: Dict) -> ConversationTurn:
+        metadata = {k: v for k, v in turn.items() if k not in TURN_COLUMNS}
+        return ConversationTurn(
+            patient_id=patient_id,
+            role=turn.get("role", "user"),
+            content=turn.get("content", ""),
+            timestamp=_parse_timestamp(turn.get("timestamp")),
+            journey_stage=turn.get("journey_stage"),
+            turn_metadata=metadata or None
+        )
+
+    @staticmethod
+    def _row_to_turn(row: ConversationTurn) -> Dict:
+        turn = {
+            "role": row.role,
+            "content": row.content,
+            "timestamp": row.timestamp.isoformat()
+        }
+        if row.journey_stage is not None:
+            turn["journey_stage"] = row.journey_stage
+        if row.turn_metadata:
+            turn.update(row.turn_metadata)
+        return turn
+
+    async def _get_context_row(self, session, patient_id: str) -> Optional[PatientMemoryContext]:
+        result = await session.execute(
+            select(PatientMemoryContext).where(PatientMemoryContext.patient_id == patient_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def append_turns(self, patient_id: str, turns: List[Dict]) -> int:
+        async with self.locks.lock(patient_id), self.session_factory() as session:
+            context_row = await self._get_context_row(session, patient_id)
+            if context_row is None:
+                context_row = PatientMemoryContext(
+                    patient_id=patient_id,
+                    context=default_patient_context(patient_id),
+                    turn_count=0
+                )
+            session.add_all([self._turn_to_row(patient_id, turn) for turn in turns])
+            context_row.turn_count += len(turns)
+            context_row.updated_at = datetime.utcnow()
+            session.add(context_row)
+            await session.commit()
+            return context_row.turn_count
+
+    async def load_recent_turns(self, patient_id: str, limit: Optional[int] = 20) -> List[Dict]:
+        query = (
+            select(ConversationTurn)
+            .where(ConversationTurn.patient_id == patient_id)
+            .order_by(ConversationTurn.timestamp.desc(), ConversationTurn.id.desc())
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        async with self.session_factory() as session:
+            result = await session.execute(query)
+            rows = result.scalars().all()
+        return [self._row_to_turn(row) for row in reversed(rows)]
+
+    async def get_patient_context(self, patient_id: str) -> Dict:
+        async with self.session_factory() as session:
+            context_row = await self._get_context_row(session, patient_id)
+        if context_row is None:
+            return {}
+        return dict(context_row.context or {})
+
+    async def save_patient_context(self, patient_id: str, context: Dict) -> None:
+        async with self.locks.lock(patient_id), self.session_factory() as session:
+            context_row = await self._get_context_row(session, patient_id)
+            if context_row is None:
+                context_row = PatientMemoryContext(patient_id=patient_id, turn_count=0)
+            context_row.context = dict(context)
+            context_row.updated_at = datetime.utcnow()
+            session.add(context_row)
+            await session.commit()
+
+    async def count_turns(self, patient_id: str) -> int:
+        async with self.session_factory() as session:
+            context_row = await self._get_context_row(session, patient_id)
+        return context_row.turn_count if context_row else 0
+
+    async def clear_patient(self, patient_id: str) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                delete(ConversationTurn).where(ConversationTurn.patient_id == patient_id)
+            )
+            await session.execute(
+                delete(PatientMemoryContext).where(PatientMemoryContext.patient_id == patient_id)
+            )
+            await session.commit()
+
+    async def import_patient(self, patient_id: str, turns: List[Dict], context: Dict, batch_size: int = 500) -> int:
+        """Replace the patient's turns and context in a single transaction (legacy JSON import)."""
+        async with self.locks.lock(patient_id), self.session_factory() as session:
+            await session.execute(
+                delete(ConversationTurn).where(ConversationTurn.patient_id == patient_id)
+            )
+            await session.execute(
+                delete(PatientMemoryContext).where(PatientMemoryContext.patient_id == patient_id)
+            )
+            for start in range(0, len(turns), batch_size):
+                session.add_all([self._turn_to_row(patient_id, turn) for turn in turns[start:start + batch_size]])
+                await session.flush()
+            session.add(PatientMemoryContext(patient_id=patient_id, context=dict(context), turn_count=len(turns)))
+            await session.commit()
+        return len(turns)
+
+    async def stats(self) -> Dict:
+        async with self.session_factory() as session:
+            total_patients = (await session.execute(
+                select(func.count()).select_from(PatientMemoryContext)
+            )).scalar_one()
+            total_messages = (await session.execute(
+                select(func.count()).select_from(ConversationTurn)
+            )).scalar_one()
+            total_conversations = (await session.execute(
+                select(func.count()).select_from(ConversationTurn).where(ConversationTurn.role == "user")
+            )).scalar_one()
+        return {
+            "total_patients": total_patients,
+            "total_conversations": total_conversations,
+            "total_messages": total_messages
+        }
+
+
+class JsonFileMemoryStore(ConversationMemoryStore):
+    """Legacy backend: one `{patient_id}_conversations.json` record per patient.
+
+    Every read-modify-write of a patient's file runs under that patient's lock,
+    and concurrent appends for the same patient are coalesced so whichever
+    caller gets the lock writes all of them in one pass. Files are replaced
+    atomically (temp file + os.replace) so a crash never leaves a truncated record.
+    """
+
+    backend_name = "json"
+
+    def __init__(self, memory_dir: Path = CONVERSATION_MEMORY_DIR):
+        self.memory_dir = Path(memory_dir)
+        self.memory_dir.mkdir(exist_ok=True)
+        self.locks = PatientLockRegistry()
+        # patient_id -> (turns, future the writer resolves) waiting for the patient's lock
+        self._pending_appends: Dict[str, List[Tuple[List[Dict], asyncio.Future]]] = {}
+        self.coalesced_writes = 0
+
+    def _memory_file(self, patient_id: str) -> Path:
+        return self.memory_dir / f"{patient_id}_conversations.json"
+
+    async def _read_record(self, patient_id: str) -> Optional[Dict]:
+        memory_file = self._memory_file(patient_id)
+        if not memory_file.exists():
+            return None
+        async with aiofiles.open(memory_file, 'r') as f:
+            return json.loads(await f.read())
+
+    @staticmethod
+    def _write_file(memory_file: Path, data: str) -> None:
+        temp_file = memory_file.with_name(f".{memory_file.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_file, 'w') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, memory_file)
+        except BaseException:
+            if temp_file.exists():
+                temp_file.unlink()
+            raise
+
+    async def _write_record(self, patient_id: str, record: Dict) -> None:
+        # Write, fsync and replace in a worker thread: fsync blocks for the whole disk flush
+        write = asyncio.ensure_future(asyncio.to_thread(self._write_file, self._memory_file(patient_id), json.dumps(record)))
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            # The thread cannot be stopped; wait for it so callers know whether the file was replaced
+            await write
+            raise
+
+    def _new_record(self, patient_id: str) -> Dict:
+        return {
+            "patient_id": patient_id,
+            "created_at": datetime.utcnow().isoformat(),
+            "conversation_history": [],
+            "patient_context": default_patient_context(patient_id)
+        }
+
+    async def append_turns(self, patient_id: str, turns: List[Dict]) -> int:
+        written = asyncio.get_running_loop().create_future()
+        self._pending_appends.setdefault(patient_id, []).append((turns, written))
+        try:
+            async with self.locks.lock(patient_id):
+                # Empty if an earlier lock holder already wrote our turns along with its own
+                batch = self._pending_appends.pop(patient_id, [])
+                if batch:
+                    await self._write_batch(patient_id, batch, written)
+            return await written
+        except asyncio.CancelledError:
+            written.cancel()  # Nobody will read our outcome
+            raise
+
+    async def _write_batch(self, patient_id: str, batch: List[Tuple[List[Dict], asyncio.Future]],
+                           own: asyncio.Future) -> None:
+        """Write every queued caller's turns in one pass and resolve (or fail) each caller's future."""
+        writing = False
+        try:
+            record = await self._read_record(patient_id) or self._new_record(patient_id)
+            history = record.setdefault("conversation_history", [])
+            for turns, _ in batch:
+                history.extend(turns)
+            if len(batch) > 1:
+                self.coalesced_writes += 1
+            record["last_updated"] = datetime.utcnow().isoformat()
+            record["conversation_count"] = len(history)
+            writing = True
+            await self._write_record(patient_id, record)
+        except asyncio.CancelledError:
+            if writing:
+                # Cancelled while the file was being replaced; _write_record let it finish, so it is written
+                for _, waiter in batch:
+                    if not waiter.done():
+                        waiter.set_result(len(history))
+                raise
+            # The writer was cancelled: leave the other callers' turns for the next lock holder
+            pending = [(turns, waiter) for turns, waiter in batch if waiter is not own and not waiter.done()]
+            if pending:
+                self._pending_appends[patient_id] = pending + self._pending_appends.get(patient_id, [])
+            raise
+        except Exception as e:
+            # Every caller whose turns were in this write sees the failure, not just the writer
+            for _, waiter in batch:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        for _, waiter in batch:
+            if not waiter.done():
+                waiter.set_result(len(history))
+
+    async def load_recent_turns(self, patient_id: str, limit: Optional[int] = 20) -> List[Dict]:
+        record = await self._read_record(patient_id)
+        if not record:
+            return []
+        history = record.get("conversation_history", [])
+        return history[-limit:] if limit is not None else history
+
+    async def get_patient_context(self, patient_id: str) -> Dict:
+        record = await self._read_record(patient_id)
+        return record.get("patient_context", {}) if record else {}
+
+    async def save_patient_context(self, patient_id: str, context: Dict) -> None:
+        async with self.locks.lock(patient_id):
+            record = await self._read_record(patient_id) or self._new_record(patient_id)
+            record["patient_context"] = dict(context)
+            record["last_updated"] = datetime.utcnow().isoformat()
+            await self._write_record(patient_id, record)
+
+    async def count_turns(self, patient_id: str) -> int:
+        record = await self._read_record(patient_id)
+        return len(record.get("conversation_history", [])) if record else 0
+
+    async def clear_patient(self, patient_id: str) -> None:
+        async with self.locks.lock(patient_id):
+            for _, waiter in self._pending_appends.pop(patient_id, []):
+                if not waiter.done():
+                    waiter.set_result(0)
+            memory_file = self._memory_file(patient_id)
+            if memory_file.exists():
+                memory_file.unlink()
+
+    async def stats(self) -> Dict:
+        total_patients = 0
+        total_conversations = 0
+        total_messages = 0
+        for memory_file in self.memory_dir.glob("*_conversations.json"):
+            try:
+                async with aiofiles.open(memory_file, 'r') as f:
+                    history = json.loads(await f.read()).get("conversation_history", [])
+            except Exception as e:
+                print(f"Error reading {memory_file}: {e}")
+                continue
+            total_patients += 1
+            total_messages += len(history)
+            total_conversations += len([msg for msg in history if msg.get("role") == "user"])
+        return {
+            "total_patients": total_patients,
+            "total_conversations": total_conversations,
+            "total_messages": total_messages,
+            "coalesced_writes": self.coalesced_writes,
+            "locks": self.locks.stats()
+        }
+
+
+# Backend selection: "database" (default) or "json"
+CONVERSATION_MEMORY_BACKEND = os.getenv("CONVERSATION_MEMORY_BACKEND", "database")
+
+_memory_store: Optional[ConversationMemoryStore] = None
+
+
+def get_memory_store() -> ConversationMemoryStore:
+    """Return the process-wide conversation memory store."""
+    global _memory_store
+    if _memory_store is None:
+        if CONVERSATION_MEMORY_BACKEND == "json":
+            _memory_store = JsonFileMemoryStore()
+        else:
+            _memory_store = DatabaseMemoryStore()
+    return _memory_store
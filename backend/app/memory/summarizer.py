@@ -0,0 +1,169 @@
+"""
+Rolling conversation summaries and prompt-size accounting.
+
+Instead of resending the last 20 raw messages on every turn, prompts are built
+from a per-patient rolling summary of older turns (stored in the patient
+context as `rolling_summary`) plus the last `SUMMARY_RECENT_TURNS` turns.
+The summary is refreshed in the background by the memory service once enough
+turns have fallen out of the recent window; `summarize_turns` folds those
+turns into the previous summary using Groq or OpenAI, with an extractive
+fallback when neither is configured.
+"""
+
+import os
+from collections import deque
+from typing import Dict, List
+
+from app.http_clients import get_http_client
+from app.llm import openai_client
+
+# Turns sent verbatim to the LLM; everything older is represented by the summary
+SUMMARY_RECENT_TURNS = int(os.getenv("MEMORY_SUMMARY_RECENT_TURNS", "12"))
+# Minimum number of turns outside the recent window before a fold is triggered
+SUMMARY_FOLD_BATCH = int(os.getenv("MEMORY_SUMMARY_FOLD_BATCH", "8"))
+# Upper bound on turns folded in one pass (bootstrapping long imported histories)
+SUMMARY_MAX_FOLD_TURNS = 200
+SUMMARY_MAX_CHARS = 1500
+
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+SUMMARIZER_SYSTEM_PROMPT = """You maintain a running clinical-conversation summary for a patient support assistant.
+Merge the new conversation turns into the existing summary. Keep: conditions, symptoms, treatments,
+medications, appointments, decisions, open questions, emotional state and preferences.
+Drop greetings and filler. Write in third person, plain prose, at most 200 words."""
+
+summarizer_stats = {
+    "refreshes": 0,
+    "folded_turns": 0,
+    "llm_failures": 0,
+    "extractive_fallbacks": 0
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for prompt-size metrics."""
+    return len(text) // 4 + 1 if text else 0
+
+
+def recent_prompt_turns(conversation_history: List[Dict], recent_turns: int = SUMMARY_RECENT_TURNS) -> List[Dict]:
+    """Last `recent_turns` user/assistant messages, trimmed to start on a user turn."""
+    messages = [
+        {"role": msg["role"], "content": msg["content"]}
+        for msg in conversation_history[-recent_turns:]
+        if msg.get("role") in ["user", "assistant"]
+    ]
+    while messages and messages[0]["role"] != "user":
+        messages.pop(0)
+    return messages
+
+
+def format_summary_block(patient_context: Dict) -> str:
+    """System-prompt section carrying the rolling summary, or "" if there is none yet."""
+    summary = (patient_context or {}).get("rolling_summary")
+    if not summary:
+        return ""
+    return f"""
+
+EARLIER CONVERSATION SUMMARY (older turns, condensed):
+{summary}"""
+
+
+class PromptTokenMetrics:
+    """Per-source estimated input tokens per turn, to verify prompt size plateaus."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._sources: Dict[str, Dict] = {}
+
+    def record(self, source: str, system_prompt: str, messages: List[Dict]) -> int:
+        tokens = estimate_tokens(system_prompt) + sum(estimate_tokens(m.get("content", "")) for m in messages)
+        entry = self._sources.setdefault(source, {"turns": 0, "max": 0, "recent": deque(maxlen=self.window)})
+        entry["turns"] += 1
+        entry["max"] = max(entry["max"], tokens)
+        entry["recent"].append(tokens)
+        return tokens
+
+    def stats(self) -> Dict:
+        return {
+            source: {
+                "turns": entry["turns"],
+                "last": entry["recent"][-1],
+                "recent_avg": sum(entry["recent"]) / len(entry["recent"]),
+                "max": entry["max"]
+            }
+            for source, entry in self._sources.items()
+        }
+
+
+prompt_token_metrics = PromptTokenMetrics()
+
+
+def _format_turns(turns: List[Dict]) -> str:
+    return "\n".join(f"{turn.get('role', 'user')}: {turn.get('content', '')}" for turn in turns)
+
+
+def _extractive_summary(previous_summary: str, turns: List[Dict]) -> str:
+    lines = [f"{turn.get('role', 'user')}: {turn.get('content', '')[:120]}" for turn in turns if turn.get("role") == "user"]
+    merged = "\n".join(filter(None, [previous_summary, *lines]))
+    # Keep the most recent material when the summary outgrows its budget
+    return merged[-SUMMARY_MAX_CHARS:]
+
+
+async def _llm_summary(previous_summary: str, turns: List[Dict]) -> str:
+    user_prompt = f"""EXISTING SUMMARY:
+{previous_summary or '(none yet)'}
+
+NEW TURNS:
+{_format_turns(turns)}
+
+Return only the updated summary."""
+
+    if GROQ_API_KEY:
+        response = await get_http_client("groq").post(
+            "https://api.groq.com/openai/v1/chat/completions",
+            timeout=15.0,
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": "llama-3.1-8b-instant",
+                "messages": [
+                    {"role": "system", "content": SUMMARIZER_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt}
+                ],
+                "temperature": 0.2,
+                "max_tokens": 350
+            }
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"].strip()
+
+    response = await openai_client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": SUMMARIZER_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ],
+        temperature=0.2,
+        max_tokens=350
+    )
+    return response.choices[0].message.content.strip()
+
+
+async def summarize_turns(previous_summary: str, turns: List[Dict]) -> str:
+    """Fold `turns` into `previous_summary` and return the updated summary."""
+    summarizer_stats["refreshes"] += 1
+    summarizer_stats["folded_turns"] += len(turns)
+
+    if GROQ_API_KEY or openai_client is not None:
+        try:
+            summary = await _llm_summary(previous_summary, turns)
+            if summary:
+                return summary[:SUMMARY_MAX_CHARS]
+        except Exception as e:
+            summarizer_stats["llm_failures"] += 1
+            print(f"⚠️ Rolling summary LLM call failed, using extractive summary: {e}")
+
+    summarizer_stats["extractive_fallbacks"] += 1
+    return _extractive_summary(previous_summary, turns)
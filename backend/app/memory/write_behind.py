@@ -0,0 +1,166 @@
+"""
+Write-behind queue for conversation memory.
+
+Chat handlers hand their new turns and refreshed patient context to the queue
+and return immediately; a background asyncio task flushes the pending writes
+to the `ConversationMemoryStore` in batches, either when enough turns are
+queued or after `flush_interval` seconds. `drain()` is awaited from the
+FastAPI shutdown hook so nothing queued is lost on a clean stop.
+
+Writes in progress stay visible through `pending_for` until each part is
+persisted, and `persisted_writes` changes whenever one is, so readers can
+tell that the store moved while they were reading it.
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from app.memory.store import get_memory_store
+
+MEMORY_WRITE_BEHIND = os.getenv("MEMORY_WRITE_BEHIND", "true").lower() == "true"
+MEMORY_FLUSH_INTERVAL_SECONDS = float(os.getenv("MEMORY_FLUSH_INTERVAL_SECONDS", "1.0"))
+MEMORY_FLUSH_BATCH_TURNS = int(os.getenv("MEMORY_FLUSH_BATCH_TURNS", "200"))
+
+
+class WriteBehindQueue:
+    """Per-patient pending turns/context, flushed to the memory store in the background."""
+
+    def __init__(self, flush_interval: float = MEMORY_FLUSH_INTERVAL_SECONDS, batch_turns: int = MEMORY_FLUSH_BATCH_TURNS):
+        self.flush_interval = flush_interval
+        self.batch_turns = batch_turns
+        # patient_id -> {"turns": [...], "context": dict or None}
+        self._pending: Dict[str, Dict] = {}
+        # Entries of the batch being flushed; each part is cleared once it is persisted
+        self._inflight: Dict[str, Dict] = {}
+        self._pending_turns = 0
+        self.persisted_writes = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.flushes = 0
+        self.flushed_turns = 0
+        self.failures = 0
+
+    def start(self) -> None:
+        """Start the background flusher on the running event loop (idempotent)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    def enqueue(self, patient_id: str, turns: List[Dict], context: Optional[Dict] = None) -> None:
+        """Queue turns (and optionally the latest context) for the patient."""
+        self.start()
+        entry = self._pending.setdefault(patient_id, {"turns": [], "context": None})
+        entry["turns"].extend(turns)
+        if context is not None:
+            entry["context"] = dict(context)
+        self._pending_turns += len(turns)
+        if self._pending_turns >= self.batch_turns:
+            self._wakeup.set()
+
+    def pending_for(self, patient_id: str) -> Dict:
+        """Turns and context queued or being written for the patient, but not yet persisted."""
+        inflight = self._inflight.get(patient_id, {"turns": [], "context": None})
+        queued = self._pending.get(patient_id, {"turns": [], "context": None})
+        return {
+            "turns": inflight["turns"] + queued["turns"],
+            "context": queued["context"] if queued["context"] is not None else inflight["context"]
+        }
+
+    def discard(self, patient_id: str) -> None:
+        entry = self._pending.pop(patient_id, None)
+        if entry is not None:
+            self._pending_turns -= len(entry["turns"])
+
+    async def _run(self) -> None:
+        # Stops cooperatively (see drain) so a flush in progress is never cut off
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Persist everything queued so far and return the number of turns written."""
+        if not self._pending:
+            return 0
+        async with self._flush_lock:
+            batch, self._pending = self._pending, {}
+            self._inflight = dict(batch)
+            self._pending_turns = 0
+            store = get_memory_store()
+            written = 0
+            # Entries are cleared part by part as they are written, so a failure requeues only the rest
+            unwritten = dict(batch)
+            try:
+                for patient_id, entry in batch.items():
+                    try:
+                        if entry["turns"]:
+                            await store.append_turns(patient_id, entry["turns"])
+                            written += len(entry["turns"])
+                            entry["turns"] = []
+                            self.persisted_writes += 1
+                        if entry["context"] is not None:
+                            await store.save_patient_context(patient_id, entry["context"])
+                            entry["context"] = None
+                            self.persisted_writes += 1
+                    except Exception as e:
+                        self.failures += 1
+                        print(f"❌ Write-behind flush failed for {patient_id}: {e}")
+                        self._requeue(patient_id, entry)
+                    del unwritten[patient_id]
+                    self._inflight.pop(patient_id, None)
+            except BaseException:
+                # Cancelled mid-flush: keep what was not written yet
+                for patient_id, entry in unwritten.items():
+                    self._requeue(patient_id, entry)
+                raise
+            finally:
+                self._inflight = {}
+                self.flushed_turns += written
+            self.flushes += 1
+            return written
+
+    def _requeue(self, patient_id: str, entry: Dict) -> None:
+        # Failed writes go back in front of anything queued since the batch was taken
+        if not entry["turns"] and entry["context"] is None:
+            return
+        newer = self._pending.pop(patient_id, {"turns": [], "context": None})
+        self._pending[patient_id] = {
+            "turns": entry["turns"] + newer["turns"],
+            "context": newer["context"] if newer["context"] is not None else entry["context"]
+        }
+        self._pending_turns += len(entry["turns"])
+
+    async def drain(self) -> None:
+        """Stop the background flusher and persist any queued writes."""
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        written = await self.flush()
+        if written:
+            print(f"💾 Drained {written} queued conversation turns")
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": MEMORY_WRITE_BEHIND,
+            "pending_patients": len(self._pending),
+            "pending_turns": self._pending_turns,
+            "inflight_patients": len(self._inflight),
+            "flush_interval_seconds": self.flush_interval,
+            "batch_turns": self.batch_turns,
+            "flushes": self.flushes,
+            "flushed_turns": self.flushed_turns,
+            "failures": self.failures
+        }
@@ -1,7 +1,7 @@
 from typing import Optional, List
 from datetime import datetime, date
 from sqlmodel import SQLModel, Field, Relationship, Column
-from sqlalchemy import JSON, Text
+from sqlalchemy import JSON, Text, Index
 from enum import Enum
 
 class ConversationStatus(str, Enum):
@@ -410,4 +410,46 @@ class AIGeneratedContent(SQLModel, table=True):
     personalization_data: Optional[dict] = Field(default=None, sa_column=Column(JSON))
     generated_by_agent: str
     is_reviewed: bool = Field(default=False)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+# ============================================================================
+# CONVERSATION MEMORY MODELS
+# ============================================================================
+
+# Conversation Turn Model (append-only, one row per chat/voice message)
+class ConversationTurn(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_conversationturn_patient_id_timestamp", "patient_id", "timestamp"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    patient_id: str
+    role: str  # user, assistant
+    content: str = Field(sa_column=Column(Text))
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    journey_stage: Optional[str] = None
+    turn_metadata: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+
+# Patient Memory Context Model (one row per patient, insights used for prompts)
+class PatientMemoryContext(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    patient_id: str = Field(index=True, unique=True)
+    context: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    turn_count: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
+
+# ============================================================================
+# LLM RESPONSE CACHE
+# ============================================================================
+
+# Cached answer of a non-personalized LLM endpoint, keyed on (route, model, normalized input)
+class LLMResponseCacheEntry(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    cache_key: str = Field(index=True, unique=True)
+    route: str = Field(index=True)
+    model: str
+    normalized_input: str = Field(sa_column=Column(Text))
+    response: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
@@ -2,15 +2,14 @@ from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional
-from anthropic import AsyncAnthropic
-import os
 from app.db import get_session
+from app.llm import anthropic_client
 from app.security import HIPAASecurityManager, get_client_ip
 
 router = APIRouter(prefix="/ai", tags=["AI Analysis"])
 
-# Configure Anthropic Claude client
-client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+# Shared async Anthropic Claude client
+client = anthropic_client
 
 class SymptomAnalysisRequest(BaseModel):
     symptom: str
@@ -41,6 +40,9 @@ async def analyze_symptoms(
     appropriate disclaimers about not replacing professional medical advice.
     """
     
+    if client is None:
+        raise HTTPException(status_code=503, detail="Anthropic API not configured")
+
     try:
         # Create a comprehensive prompt for medical symptom analysis
         system_prompt = """You are SymptomSage, a compassionate AI health assistant designed to provide supportive, evidence-based guidance for people experiencing health concerns. Your role is to:
@@ -1,17 +1,33 @@
 from fastapi import APIRouter, HTTPException, File, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import os
-import openai
-import tempfile
-import anthropic
-import aiofiles
-import json
-from pathlib import Path
+import time
 from datetime import datetime
+from app.llm import anthropic_client, openai_client
+from app.llm.candidates import LLMCandidate, anthropic_candidate, configured, openai_candidate
+from app.llm.prompt_cache import CachedPrompt, get_prompt_cache_stats
+from app.llm.routing import NoProviderAvailable, RoutingResult, get_routing_stats, llm_router
+from app.llm.streaming import SSE_HEADERS, ThinkingFilter, sse_event
+from app.voice.transport import DELIVERY_MODES, binary_audio_response
+from app.voice.greetings import spliced_speech
+from app.voice.speech import SPEECH_PROFILES
+from app.voice.uploads import whisper_upload
+from app.memory import (
+    load_patient_conversation_history,
+    save_patient_conversation_history,
+    get_patient_context_summary,
+    format_summary_block,
+    prompt_token_metrics,
+    recent_prompt_turns,
+)
 
 router = APIRouter(prefix="/api/v1/ai", tags=["ai"])
 
+# Time-to-complete the chat route aims for; the LLM router hedges to stay inside it
+AI_CHAT_LATENCY_BUDGET_MS = float(os.getenv("AI_CHAT_LATENCY_BUDGET_MS", "4000"))
+
 def extract_response_after_thinking(raw_response: str) -> str:
     """
     CRITICAL: Extract only the actual response after <thinking> tags.
@@ -32,28 +48,6 @@ def extract_response_after_thinking(raw_response: str) -> str:
         # No thinking tags found, return original response
         return raw_response.strip()
 
-# AI Configuration
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-
-# Initialize clients
-if OPENAI_API_KEY and not OPENAI_API_KEY.startswith("PLEASE_ADD_") and OPENAI_API_KEY != "your-openai-key-here":
-    openai.api_key = OPENAI_API_KEY
-    openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
-else:
-    openai_client = None
-    print("⚠️  WARNING: No valid OpenAI API key configured")
-
-if ANTHROPIC_API_KEY:
-    anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-else:
-    anthropic_client = None
-    print("⚠️  WARNING: No Anthropic API key configured")
-
-# Conversation Memory Configuration  
-CONVERSATION_MEMORY_DIR = Path("conversation_memory")
-CONVERSATION_MEMORY_DIR.mkdir(exist_ok=True)
-
 # Request Models
 class ChatRequest(BaseModel):
     message: str
@@ -64,167 +58,6 @@ class ConversationMessage(BaseModel):
     content: str
     timestamp: str
 
-# ============================================================================
-# CONVERSATION MEMORY FUNCTIONS - JSON-based EMR Integration
-# ============================================================================
-
-async def load_patient_conversation_history(patient_id: str) -> List[Dict]:
-    """Load patient's conversation history from JSON file."""
-    try:
-        memory_file = CONVERSATION_MEMORY_DIR / f"{patient_id}_conversations.json"
-        
-        if not memory_file.exists():
-            # Create new patient record
-            initial_record = {
-                "patient_id": patient_id,
-                "created_at": datetime.utcnow().isoformat(),
-                "last_updated": datetime.utcnow().isoformat(),
-                "conversation_history": [],
-                "patient_context": {
-                    "name": patient_id.replace("patient_", "").replace("_", " ").title(),
-                    "journey_stage": "awareness",
-                    "user_role": "patient",
-                    "conditions": [],
-                    "key_concerns": [],
-                    "preferences": {}
-                }
-            }
-            
-            async with aiofiles.open(memory_file, 'w') as f:
-                await f.write(json.dumps(initial_record, indent=2))
-            
-            return []
-        
-        async with aiofiles.open(memory_file, 'r') as f:
-            content = await f.read()
-            data = json.loads(content)
-            return data.get("conversation_history", [])
-            
-    except Exception as e:
-        print(f"❌ Error loading conversation history for {patient_id}: {e}")
-        return []
-
-async def save_patient_conversation_history(patient_id: str, conversation_history: List[Dict]):
-    """Save patient's conversation history to JSON file."""
-    try:
-        memory_file = CONVERSATION_MEMORY_DIR / f"{patient_id}_conversations.json"
-        
-        # Load existing record or create new one
-        if memory_file.exists():
-            async with aiofiles.open(memory_file, 'r') as f:
-                content = await f.read()
-                data = json.loads(content)
-        else:
-            data = {
-                "patient_id": patient_id,
-                "created_at": datetime.utcnow().isoformat(),
-                "patient_context": {
-                    "name": patient_id.replace("patient_", "").replace("_", " ").title(),
-                    "journey_stage": "awareness",
-                    "user_role": "patient",
-                    "conditions": [],
-                    "key_concerns": [],
-                    "preferences": {}
-                }
-            }
-        
-        # Update conversation history and metadata
-        data["conversation_history"] = conversation_history
-        data["last_updated"] = datetime.utcnow().isoformat()
-        data["conversation_count"] = len(conversation_history)
-        
-        # Extract and update patient insights from recent conversations
-        await update_patient_insights(data, conversation_history)
-        
-        # Save updated record
-        async with aiofiles.open(memory_file, 'w') as f:
-            await f.write(json.dumps(data, indent=2))
-            
-        print(f"✅ Saved conversation history for {patient_id} ({len(conversation_history)} messages)")
-        
-    except Exception as e:
-        print(f"❌ Error saving conversation history for {patient_id}: {e}")
-
-async def update_patient_insights(patient_record: Dict, conversation_history: List[Dict]):
-    """Extract key insights from conversations to build patient context."""
-    try:
-        # Analyze recent conversations for key information
-        recent_messages = conversation_history[-10:]  # Last 10 messages
-        
-        # Extract conditions mentioned
-        conditions = set()
-        concerns = set()
-        journey_stages = set()
-        
-        for msg in recent_messages:
-            content = msg.get("content", "").lower()
-            
-            # Common condition keywords
-            condition_keywords = [
-                "cancer", "diabetes", "heart disease", "arthritis", "lupus", 
-                "fibromyalgia", "depression", "anxiety", "chronic pain", 
-                "rare disease", "autoimmune", "neurological", "hypertension",
-                "asthma", "copd", "stroke", "alzheimer", "parkinson"
-            ]
-            
-            for keyword in condition_keywords:
-                if keyword in content:
-                    conditions.add(keyword.title())
-            
-            # Journey stage tracking
-            if "journey_stage" in msg:
-                journey_stages.add(msg["journey_stage"])
-            
-            # Key concerns extraction
-            concern_phrases = [
-                "worried about", "concerned about", "afraid of", "struggling with",
-                "pain", "symptoms", "treatment", "side effects", "diagnosis"
-            ]
-            
-            for phrase in concern_phrases:
-                if phrase in content:
-                    # Extract context around the phrase
-                    context_start = max(0, content.find(phrase) - 20)
-                    context_end = min(len(content), content.find(phrase) + 50)
-                    concern_context = content[context_start:context_end].strip()
-                    if len(concern_context) > 10:
-                        concerns.add(concern_context)
-        
-        # Update patient context
-        if conditions:
-            patient_record["patient_context"]["conditions"] = list(conditions)
-        
-        if concerns:
-            patient_record["patient_context"]["key_concerns"] = list(concerns)[:5]  # Keep top 5
-        
-        if journey_stages:
-            # Use most recent journey stage
-            patient_record["patient_context"]["journey_stage"] = list(journey_stages)[-1]
-        
-        # Add conversation insights
-        patient_record["patient_context"]["total_conversations"] = len(conversation_history)
-        patient_record["patient_context"]["last_interaction"] = datetime.utcnow().isoformat()
-        
-    except Exception as e:
-        print(f"❌ Error updating patient insights: {e}")
-
-async def get_patient_context_summary(patient_id: str) -> Dict:
-    """Get a summary of patient's context for building personalized prompts."""
-    try:
-        memory_file = CONVERSATION_MEMORY_DIR / f"{patient_id}_conversations.json"
-        
-        if not memory_file.exists():
-            return {}
-        
-        async with aiofiles.open(memory_file, 'r') as f:
-            content = await f.read()
-            data = json.loads(content)
-            return data.get("patient_context", {})
-            
-    except Exception as e:
-        print(f"❌ Error loading patient context for {patient_id}: {e}")
-        return {}
-
 @router.post("/speech-to-text")
 async def speech_to_text(audio_file: UploadFile = File(...)):
     """
@@ -234,38 +67,86 @@ async def speech_to_text(audio_file: UploadFile = File(...)):
         raise HTTPException(status_code=503, detail="OpenAI API not configured")
     
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            content = await audio_file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # In-memory upload: 16 kHz mono, silence trimmed, clips with no speech rejected
+        whisper_input, preprocessing = await whisper_upload(audio_file)
         
         # Process with Whisper
-        with open(temp_file_path, 'rb') as audio:
-            transcript = openai_client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio,
-                language="en"
-            )
-        
-        # Clean up temporary file
-        os.unlink(temp_file_path)
+        transcript = await openai_client.audio.transcriptions.create(
+            model="whisper-1",
+            file=whisper_input,
+            language="en"
+        )
         
         return {
             "text": transcript.text,
+            "audio_preprocessing": preprocessing,
             "status": "success"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in speech-to-text: {str(e)}")
-        # Clean up temp file if it exists
-        try:
-            if temp_file_path:
-                os.unlink(temp_file_path)
-        except:
-            pass
         raise HTTPException(status_code=500, detail=f"Speech-to-text failed: {str(e)}")
 
+async def prepare_chat_turn(request: ChatRequest) -> Dict[str, Any]:
+    """
+    Load the patient's memory and build the routed candidates for one chat turn.
+    Shared by /chat and /chat/stream; raises 503 if no AI service is configured.
+    """
+    # Extract context
+    patient_name = request.context.get("patientName", "Patient")
+    emotional_state = request.context.get("emotionalState", "calm")
+    journey_stage = request.context.get("journeyStage", "awareness")
+    patient_id = request.context.get("patient_id", f"patient_{patient_name.lower().replace(' ', '_')}")
+    user_role = request.context.get("userRole", "patient")
+    
+    # Load conversation history and patient context from memory
+    conversation_history = await load_patient_conversation_history(patient_id)
+    patient_context = await get_patient_context_summary(patient_id)
+    
+    # Add current user message to history
+    user_turn = {
+        "role": "user",
+        "content": request.message,
+        "timestamp": datetime.utcnow().isoformat(),
+        "journey_stage": journey_stage,
+        "user_role": user_role,
+        "emotional_state": emotional_state
+    }
+    conversation_history.append(user_turn)
+    
+    system_prompt = build_healthcare_system_prompt_with_memory(
+        patient_name, emotional_state, journey_stage, patient_context
+    )
+    
+    # Claude first (better for medical conversations), hedged/fallen back to OpenAI by the router
+    candidates = configured(
+        claude_candidate_with_memory(system_prompt, conversation_history),
+        openai_candidate_with_memory(system_prompt, conversation_history)
+    )
+    if not candidates:
+        # No AI services available
+        raise HTTPException(status_code=503, detail="No AI services available")
+    
+    return {
+        "patient_id": patient_id,
+        "journey_stage": journey_stage,
+        "user_turn": user_turn,
+        "candidates": candidates
+    }
+
+async def save_chat_turn(turn: Dict[str, Any], response: str, model: str) -> int:
+    """Append the user message and the assistant reply to memory; returns the stored turn count."""
+    assistant_turn = {
+        "role": "assistant",
+        "content": response,
+        "timestamp": datetime.utcnow().isoformat(),
+        "journey_stage": turn["journey_stage"],
+        "model": model
+    }
+    return await save_patient_conversation_history(turn["patient_id"], [turn["user_turn"], assistant_turn])
+
 @router.post("/chat")
 async def chat_with_ai(request: ChatRequest):
     """
@@ -273,125 +154,105 @@ async def chat_with_ai(request: ChatRequest):
     Uses Claude 3.7 for medical expertise with conversation continuity.
     """
     try:
-        # Extract context
-        patient_name = request.context.get("patientName", "Patient")
-        emotional_state = request.context.get("emotionalState", "calm")
-        journey_stage = request.context.get("journeyStage", "awareness")
-        patient_id = request.context.get("patient_id", f"patient_{patient_name.lower().replace(' ', '_')}")
-        user_role = request.context.get("userRole", "patient")
+        turn = await prepare_chat_turn(request)
         
-        # Load conversation history and patient context from memory
-        conversation_history = await load_patient_conversation_history(patient_id)
-        patient_context = await get_patient_context_summary(patient_id)
+        try:
+            routed = await llm_router.complete("ai-chat", turn["candidates"], budget_ms=AI_CHAT_LATENCY_BUDGET_MS)
+        except NoProviderAvailable as e:
+            print(f"❌ {e}")
+            raise HTTPException(status_code=503, detail="No AI services available")
         
-        # Add current user message to history
-        conversation_history.append({
-            "role": "user",
-            "content": request.message,
-            "timestamp": datetime.utcnow().isoformat(),
-            "journey_stage": journey_stage,
-            "user_role": user_role,
-            "emotional_state": emotional_state
-        })
+        # CRITICAL: Strip out <thinking> tags - only use actual response
+        response = extract_response_after_thinking(routed.text)
         
-        # Build conversation context with memory
-        enhanced_context = {
-            **request.context,
-            "patient_context": patient_context,
-            "total_conversations": len(conversation_history),
-            "known_conditions": patient_context.get("conditions", []),
-            "key_concerns": patient_context.get("key_concerns", [])
+        # Append this exchange to the conversation memory store
+        total_turns = await save_chat_turn(turn, response, routed.model)
+
+        return {
+            "response": response,
+            "model": routed.label,
+            "conversation_length": total_turns,
+            "patient_id": turn["patient_id"],
+            "has_memory": total_turns > 2,
+            "routing": routed.summary()
         }
         
-        system_prompt = build_healthcare_system_prompt_with_memory(
-            patient_name, emotional_state, journey_stage, patient_context
-        )
-        
-        # Try Claude first (better for medical conversations)
-        if anthropic_client:
-            try:
-                response = await get_claude_response_with_memory(
-                    system_prompt, request.message, conversation_history
-                )
-                
-                # Add assistant response to conversation history
-                conversation_history.append({
-                    "role": "assistant",
-                    "content": response,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "journey_stage": journey_stage,
-                    "model": "claude-3-5-sonnet"
-                })
-                
-                # Save updated conversation history
-                await save_patient_conversation_history(patient_id, conversation_history)
-                
-                return {
-                    "response": response, 
-                    "model": "claude-3.5-sonnet",
-                    "conversation_length": len(conversation_history),
-                    "patient_id": patient_id,
-                    "has_memory": len(conversation_history) > 2
-                }
-            except Exception as e:
-                print(f"Claude API failed, falling back to OpenAI: {str(e)}")
-        
-        # Fallback to OpenAI
-        if openai_client:
-            response = await get_openai_response_with_memory(
-                system_prompt, request.message, conversation_history
-            )
-            
-            # Add assistant response to conversation history
-            conversation_history.append({
-                "role": "assistant",
-                "content": response,
-                "timestamp": datetime.utcnow().isoformat(),
-                "journey_stage": journey_stage,
-                "model": "gpt-4o-mini"
-            })
-            
-            # Save updated conversation history
-            await save_patient_conversation_history(patient_id, conversation_history)
-            
-            return {
-                "response": response, 
-                "model": "gpt-4o-mini",
-                "conversation_length": len(conversation_history),
-                "patient_id": patient_id,
-                "has_memory": len(conversation_history) > 2
-            }
-        
-        # No AI services available
-        raise HTTPException(status_code=503, detail="No AI services available")
-        
     except HTTPException:
         raise
     except Exception as e:
         print(f"Error in AI chat: {str(e)}")
         raise HTTPException(status_code=500, detail=f"AI chat failed: {str(e)}")
 
-def build_healthcare_system_prompt_with_memory(patient_name: str, emotional_state: str, journey_stage: str, patient_context: Dict) -> str:
-    """Build system prompt for premium healthcare AI specialist with conversation memory and extended thinking capabilities."""
+@router.post("/chat/stream")
+async def chat_with_ai_stream(request: ChatRequest):
+    """
+    Server-Sent Events variant of /chat: tokens are sent as the model writes them.
     
-    # Extract patient context
-    conditions = patient_context.get("conditions", [])
-    key_concerns = patient_context.get("key_concerns", [])
-    total_conversations = patient_context.get("total_conversations", 0)
+    Thinking is stripped as the tokens arrive (nothing is sent until
+    </thinking> closes). Events:
+    - `ttft` once, before the first token: {"ttft_ms": ..., "model_ttft_ms": ...}
+    - `token` per chunk of visible text: {"text": ...}
+    - `done` at the end, with the same fields as /chat
+    - `error` if the model fails mid-stream: {"detail": ...}
     
-    # Build memory context
-    memory_context = ""
-    if total_conversations > 0:
-        memory_context = f"""
-PATIENT MEMORY & CONTINUITY:
-- We have had {total_conversations} previous conversations
-- Known conditions: {', '.join(conditions) if conditions else 'None specified yet'}
-- Key concerns: {', '.join(key_concerns[:3]) if key_concerns else 'Exploring together'}
-- Continue our conversation with PERFECT MEMORY of all previous discussions
-- Reference past conversations naturally and show you remember their journey
-- Build on previous insights and show progression in understanding"""
+    ttft_ms is measured from the request to the first visible token, so it
+    includes memory loading and the thinking block; model_ttft_ms is the
+    router's time to the model's first token. The exchange is saved to memory
+    only once the reply is complete.
+    """
+    started = time.perf_counter()
+    try:
+        turn = await prepare_chat_turn(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in AI chat stream: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"AI chat failed: {str(e)}")
+    
+    async def event_stream():
+        routed = RoutingResult("ai-chat", AI_CHAT_LATENCY_BUDGET_MS)
+        thinking = ThinkingFilter()
+        response_parts: List[str] = []
+        ttft_ms = None
+        try:
+            async for token in llm_router.stream("ai-chat", turn["candidates"], AI_CHAT_LATENCY_BUDGET_MS, routed):
+                visible = thinking.feed(token)
+                if not visible:
+                    continue
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+                    yield sse_event("ttft", {"ttft_ms": ttft_ms, "model_ttft_ms": routed.summary()["ttft_ms"]})
+                response_parts.append(visible)
+                yield sse_event("token", {"text": visible})
+            tail = thinking.flush()
+            if tail:
+                response_parts.append(tail)
+                yield sse_event("token", {"text": tail})
+            
+            response = "".join(response_parts).strip()
+            total_turns = await save_chat_turn(turn, response, routed.model)
+            print(f"✅ AI chat stream: first token {ttft_ms}ms, total {(time.perf_counter() - started) * 1000:.0f}ms")
+            
+            yield sse_event("done", {
+                "response": response,
+                "model": routed.label,
+                "conversation_length": total_turns,
+                "patient_id": turn["patient_id"],
+                "has_memory": total_turns > 2,
+                "ttft_ms": ttft_ms,
+                "routing": routed.summary()
+            })
+        except NoProviderAvailable as e:
+            print(f"❌ {e}")
+            yield sse_event("error", {"detail": "No AI services available"})
+        except Exception as e:
+            print(f"Error in AI chat stream: {str(e)}")
+            yield sse_event("error", {"detail": f"AI chat failed: {str(e)}"})
     
-    return f"""You are Dr. Maya, a world-class AI healthcare specialist with board-certified expertise across all medical specialties and PERFECT MEMORY of all interactions. You provide premium virtual care through an advanced avatar interface to {patient_name}.
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+# Identical for every patient, so providers can cache it (app.llm.prompt_cache); patient details go in the suffix
+HEALTHCARE_SYSTEM_PROMPT_PREFIX = """You are Dr. Maya, a world-class AI healthcare specialist with board-certified expertise across all medical specialties and PERFECT MEMORY of all interactions. You provide premium virtual care through an advanced avatar interface to the patient described in PATIENT CONTEXT below.
 
 CORE IDENTITY & MEDICAL EXPERTISE:
 - World-renowned specialist with deep knowledge across all medical conditions
@@ -412,11 +273,6 @@ For EVERY patient interaction, use this thinking process:
 - What are the key concerns they might have that I should address?
 </thinking>
 
-PATIENT CONTEXT:
-- Name: {patient_name}
-- Current emotional state: {emotional_state}
-- Journey stage: {journey_stage}{memory_context}
-
 EMPATHETIC COMMUNICATION WITH MEMORY:
 - Remember and reference previous conversations naturally
 - Show genuine care and emotional intelligence built over time
@@ -449,7 +305,11 @@ When a patient mentions ANY medical condition:
 5. Show deep understanding of their unique health journey
 
 EMOTIONAL INTELLIGENCE:
-- {emotional_state} state requires: {"Extra gentle, reassuring approach" if emotional_state == "anxious" else "Clear, simple explanations" if emotional_state == "overwhelmed" else "Encouraging, momentum-building" if emotional_state == "hopeful" else "Patient clarification and simplification" if emotional_state == "confused" else "Supportive, informative tone"}
+- Anxious patients require: Extra gentle, reassuring approach
+- Overwhelmed patients require: Clear, simple explanations
+- Hopeful patients require: Encouraging, momentum-building
+- Confused patients require: Patient clarification and simplification
+- Otherwise: Supportive, informative tone
 
 PREMIUM CARE DELIVERY:
 - Sound like the world's best specialist who truly cares
@@ -466,76 +326,71 @@ IMPORTANT DISCLAIMERS:
 
 Voice delivery: Keep responses conversational yet authoritative, showing expertise while maintaining warmth. This is premium virtual care - every word should reflect world-class medical expertise combined with genuine human caring."""
 
-async def get_claude_response_with_memory(system_prompt: str, user_message: str, conversation_history: List[Dict]) -> str:
-    """Get response from Claude (Anthropic)."""
-    try:
-        # Build message history
-        messages = []
-        
-        # Add recent conversation history for context (last 20 messages = 10 exchanges)
-        recent_history = conversation_history[-20:]
-        for msg in recent_history:
-            if msg.get("role") in ["user", "assistant"]:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-        
-        # Current user message is already in conversation_history, so don't add it again
-        
-        response = anthropic_client.messages.create(
-            model="claude-3-5-sonnet-20241022",  # Most advanced model for medical expertise
-            max_tokens=500,  # Allow more detailed medical responses
-            temperature=0.7,  # Balanced creativity for personalized care
-            system=system_prompt,
-            messages=messages
-        )
-        
-        raw_response = response.content[0].text
-        # CRITICAL: Strip out <thinking> tags - only use actual response
-        return extract_response_after_thinking(raw_response)
-        
-    except Exception as e:
-        print(f"Claude API error: {str(e)}")
-        raise
-
-async def get_openai_response_with_memory(system_prompt: str, user_message: str, conversation_history: List[Dict]) -> str:
-    """Get response from OpenAI GPT."""
-    try:
-        # Build message history
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add recent conversation history (last 20 messages = 10 exchanges)
-        recent_history = conversation_history[-20:]
-        for msg in recent_history:
-            if msg.get("role") in ["user", "assistant"]:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-        
-        # Current user message is already in conversation_history
-        
-        response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",  # Fast and cost-effective
-            messages=messages,
-            max_tokens=300,  # Keep responses concise for voice
-            temperature=0.7  # Slightly creative but consistent
-        )
-        
-        raw_response = response.choices[0].message.content
-        # CRITICAL: Strip out <thinking> tags - only use actual response
-        return extract_response_after_thinking(raw_response)
-        
-    except Exception as e:
-        print(f"OpenAI API error: {str(e)}")
-        raise
+def build_healthcare_system_prompt_with_memory(patient_name: str, emotional_state: str, journey_stage: str, patient_context: Dict) -> CachedPrompt:
+    """Build system prompt for premium healthcare AI specialist with conversation memory and extended thinking capabilities."""
+    
+    # Extract patient context
+    conditions = patient_context.get("conditions", [])
+    key_concerns = patient_context.get("key_concerns", [])
+    total_conversations = patient_context.get("total_conversations", 0)
+    
+    # Build memory context
+    memory_context = ""
+    if total_conversations > 0:
+        memory_context = f"""
+PATIENT MEMORY & CONTINUITY:
+- We have had {total_conversations} previous conversations
+- Known conditions: {', '.join(conditions) if conditions else 'None specified yet'}
+- Key concerns: {', '.join(key_concerns[:3]) if key_concerns else 'Exploring together'}
+- Continue our conversation with PERFECT MEMORY of all previous discussions
+- Reference past conversations naturally and show you remember their journey
+- Build on previous insights and show progression in understanding"""
+    memory_context += format_summary_block(patient_context)
+    
+    return CachedPrompt(HEALTHCARE_SYSTEM_PROMPT_PREFIX, suffix=f"""PATIENT CONTEXT:
+- Name: {patient_name}
+- Current emotional state: {emotional_state}
+- Journey stage: {journey_stage}{memory_context}""")
+
+def claude_candidate_with_memory(system_prompt: CachedPrompt, conversation_history: List[Dict]) -> Optional[LLMCandidate]:
+    """Claude (Anthropic) candidate for the LLM router; None if Anthropic is not configured."""
+    # Recent turns only; older turns reach the model via the rolling summary in the system prompt
+    # Current user message is already in conversation_history, so don't add it again
+    messages = recent_prompt_turns(conversation_history)
+    candidate = anthropic_candidate(
+        system_prompt,
+        messages,
+        model="claude-3-5-sonnet-20241022",  # Most advanced model for medical expertise
+        label="claude-3.5-sonnet",
+        max_tokens=500,  # Allow more detailed medical responses
+        temperature=0.7  # Balanced creativity for personalized care
+    )
+    if candidate:
+        candidate.on_start = lambda: prompt_token_metrics.record("ai-chat-claude", system_prompt.text, messages)
+    return candidate
+
+def openai_candidate_with_memory(system_prompt: CachedPrompt, conversation_history: List[Dict]) -> Optional[LLMCandidate]:
+    """OpenAI GPT candidate for the LLM router; None if OpenAI is not configured."""
+    # Recent turns only; older turns reach the model via the rolling summary in the system prompt
+    recent_messages = recent_prompt_turns(conversation_history)
+    candidate = openai_candidate(
+        system_prompt.openai_messages(recent_messages),
+        model="gpt-4o-mini",  # Fast and cost-effective
+        max_tokens=300,  # Keep responses concise for voice
+        temperature=0.7  # Slightly creative but consistent
+    )
+    if candidate:
+        candidate.on_start = lambda: prompt_token_metrics.record("ai-chat-openai", system_prompt.text, recent_messages)
+    return candidate
 
 @router.post("/text-to-speech")
-async def text_to_speech(request: dict):
+async def text_to_speech(request: dict, delivery: str = "json"):
     """
     Convert text to speech using OpenAI's advanced TTS API.
+    `?delivery=binary` returns raw audio/mpeg instead of base64 JSON.
     """
+    if delivery not in DELIVERY_MODES:
+        raise HTTPException(status_code=400, detail=f"delivery must be one of {DELIVERY_MODES}")
     if not openai_client:
         raise HTTPException(status_code=503, detail="OpenAI API not configured")
     
@@ -544,23 +399,23 @@ async def text_to_speech(request: dict):
         if not text:
             raise HTTPException(status_code=400, detail="Text is required")
         
-        # Use OpenAI's TTS API with natural voice
-        response = openai_client.audio.speech.create(
-            model="tts-1",  # Fast model for real-time
-            voice="nova",   # Natural female voice - warm and engaging
-            input=text,
-            speed=0.9       # Slower for natural healthcare conversation
-        )
+        # OpenAI nova at 0.9, slower for natural healthcare conversation; the greeting warmup pre-renders this profile
+        speak = SPEECH_PROFILES["openai-chat"]
+        
+        spliced = await spliced_speech(text, speak)
+        audio_content, cache_source = spliced or await speak(text)
+        if delivery == "binary":
+            return binary_audio_response(audio_content, {"provider": "openai", "voice": "nova", "tts_cache": cache_source})
         
         # Convert audio to base64 for frontend
         import base64
-        audio_content = response.content
         audio_base64 = base64.b64encode(audio_content).decode('utf-8')
         
         return {
             "audio_base64": audio_base64,
             "provider": "openai",
             "voice": "nova",
+            "tts_cache": cache_source,
             "status": "success"
         }
         
@@ -580,7 +435,7 @@ async def generate_avatar():
         print("🎨 Generating Dr. Maya avatar using GPT IMAGE responses API...")
         
         # Generate image using OpenAI's responses API with image generation tool
-        response = openai_client.responses.create(
+        response = await openai_client.responses.create(
             model="gpt-4.1-mini",
             input="Generate an image of a compassionate female doctor with warm, kind eyes and a gentle smile. Professional medical attire, soft lighting, approachable and trustworthy appearance. Healthcare professional portrait, clean background, photorealistic style. Conveying empathy, expertise, and caring bedside manner.",
             tools=[{"type": "image_generation"}],
@@ -631,5 +486,7 @@ async def ai_health_check():
         "whisper_available": openai_client is not None,
         "tts_available": openai_client is not None,
         "image_generation_available": openai_client is not None,
+        "llm_routing": get_routing_stats(),
+        "prompt_cache": get_prompt_cache_stats(),
         "status": "healthy"
     }
\ No newline at end of file
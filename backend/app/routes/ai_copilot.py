@@ -1,24 +1,40 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-import openai
 import os
+import time
 from datetime import datetime
 import io
-import tempfile
-import aiofiles
-import json
-from pathlib import Path
+from app.llm import openai_client
+from app.llm.candidates import anthropic_candidate, configured, openai_candidate
+from app.llm.prompt_cache import CachedPrompt
+from app.llm.routing import RoutingResult, llm_router
+from app.llm.streaming import SSE_HEADERS, ThinkingFilter, sse_event
+from app.voice.greetings import (
+    FALLBACK_GREETING,
+    FALLBACK_SUGGESTIONS,
+    STAGE_GREETINGS,
+    STAGE_SUGGESTIONS,
+    render,
+    spliced_speech,
+)
+from app.voice.speech import openai_speech
+from app.voice.uploads import whisper_upload
+from app.memory import (
+    load_patient_conversation_history,
+    save_patient_conversation_history,
+    get_patient_context_summary,
+    format_summary_block,
+    prompt_token_metrics,
+    recent_prompt_turns,
+)
 
 router = APIRouter()
 
-# Initialize OpenAI client
-openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Time-to-complete copilot chat aims for; the LLM router hedges to stay inside it
+COPILOT_CHAT_LATENCY_BUDGET_MS = float(os.getenv("COPILOT_CHAT_LATENCY_BUDGET_MS", "6000"))
 
-# Conversation Memory Configuration  
-CONVERSATION_MEMORY_DIR = Path("conversation_memory")
-CONVERSATION_MEMORY_DIR.mkdir(exist_ok=True)
 
 class ChatMessage(BaseModel):
     message: str
@@ -97,141 +113,24 @@ def get_stage_context(stage: str) -> str:
     }
     return stage_contexts.get(stage, "The patient is navigating their healthcare journey.")
 
-# ============================================================================
-# CONVERSATION MEMORY FUNCTIONS - JSON-based EMR Integration
-# ============================================================================
-
-async def load_patient_conversation_history(patient_id: str) -> List[Dict]:
-    """Load patient's conversation history from JSON file."""
-    try:
-        memory_file = CONVERSATION_MEMORY_DIR / f"{patient_id}_conversations.json"
-        
-        if not memory_file.exists():
-            return []
-        
-        async with aiofiles.open(memory_file, 'r') as f:
-            content = await f.read()
-            data = json.loads(content)
-            return data.get("conversation_history", [])
-            
-    except Exception as e:
-        print(f"❌ Error loading conversation history for {patient_id}: {e}")
-        return []
-
-async def save_patient_conversation_history(patient_id: str, conversation_history: List[Dict]):
-    """Save patient's conversation history to JSON file."""
-    try:
-        memory_file = CONVERSATION_MEMORY_DIR / f"{patient_id}_conversations.json"
-        
-        # Load existing record or create new one
-        if memory_file.exists():
-            async with aiofiles.open(memory_file, 'r') as f:
-                content = await f.read()
-                data = json.loads(content)
-        else:
-            data = {
-                "patient_id": patient_id,
-                "created_at": datetime.utcnow().isoformat(),
-                "patient_context": {
-                    "name": patient_id.replace("patient_", "").replace("_", " ").title(),
-                    "journey_stage": "awareness",
-                    "user_role": "patient",
-                    "conditions": [],
-                    "key_concerns": [],
-                    "preferences": {}
-                }
-            }
-        
-        # Update conversation history and metadata
-        data["conversation_history"] = conversation_history
-        data["last_updated"] = datetime.utcnow().isoformat()
-        data["conversation_count"] = len(conversation_history)
-        
-        # Extract and update patient insights from recent conversations
-        await update_patient_insights(data, conversation_history)
-        
-        # Save updated record
-        async with aiofiles.open(memory_file, 'w') as f:
-            await f.write(json.dumps(data, indent=2))
-            
-        print(f"✅ Saved conversation history for {patient_id} ({len(conversation_history)} messages)")
-        
-    except Exception as e:
-        print(f"❌ Error saving conversation history for {patient_id}: {e}")
-
-async def update_patient_insights(patient_record: Dict, conversation_history: List[Dict]):
-    """Extract key insights from conversations to build patient context."""
-    try:
-        # Analyze recent conversations for key information
-        recent_messages = conversation_history[-10:]  # Last 10 messages
-        
-        # Extract conditions mentioned
-        conditions = set()
-        concerns = set()
-        
-        for msg in recent_messages:
-            content = msg.get("content", "").lower()
-            
-            # Common condition keywords
-            condition_keywords = [
-                "cancer", "diabetes", "heart disease", "arthritis", "lupus", 
-                "fibromyalgia", "depression", "anxiety", "chronic pain", 
-                "rare disease", "autoimmune", "neurological", "hypertension",
-                "asthma", "copd", "stroke", "alzheimer", "parkinson"
-            ]
-            
-            for keyword in condition_keywords:
-                if keyword in content:
-                    conditions.add(keyword.title())
-            
-            # Key concerns extraction
-            concern_phrases = [
-                "worried about", "concerned about", "afraid of", "struggling with",
-                "pain", "symptoms", "treatment", "side effects", "diagnosis"
-            ]
-            
-            for phrase in concern_phrases:
-                if phrase in content:
-                    # Extract context around the phrase
-                    context_start = max(0, content.find(phrase) - 20)
-                    context_end = min(len(content), content.find(phrase) + 50)
-                    concern_context = content[context_start:context_end].strip()
-                    if len(concern_context) > 10:
-                        concerns.add(concern_context)
-        
-        # Update patient context
-        if conditions:
-            patient_record["patient_context"]["conditions"] = list(conditions)
-        
-        if concerns:
-            patient_record["patient_context"]["key_concerns"] = list(concerns)[:5]  # Keep top 5
-        
-        # Add conversation insights
-        patient_record["patient_context"]["total_conversations"] = len(conversation_history)
-        patient_record["patient_context"]["last_interaction"] = datetime.utcnow().isoformat()
-        
-    except Exception as e:
-        print(f"❌ Error updating patient insights: {e}")
+# Memory guidance for every patient; appended to the personality prompt to form the cacheable prefix
+MEMORY_GUIDANCE_PROMPT = """
+EMPATHETIC COMMUNICATION WITH MEMORY:
+- Remember and reference previous conversations naturally
+- Show genuine care and emotional intelligence built over time
+- Acknowledge their journey and progress since we first met
+- Be attentive to their evolving emotional state and concerns
+- Build deeper trust through consistent, compassionate care across all interactions
 
-async def get_patient_context_summary(patient_id: str) -> Dict:
-    """Get a summary of patient's context for building personalized prompts."""
-    try:
-        memory_file = CONVERSATION_MEMORY_DIR / f"{patient_id}_conversations.json"
-        
-        if not memory_file.exists():
-            return {}
-        
-        async with aiofiles.open(memory_file, 'r') as f:
-            content = await f.read()
-            data = json.loads(content) 
-            return data.get("patient_context", {})
-            
-    except Exception as e:
-        print(f"❌ Error loading patient context for {patient_id}: {e}")
-        return {}
+Remember: You have perfect memory of all our previous conversations. Use this to provide increasingly personalized and empathetic care."""
 
-def build_memory_enhanced_system_prompt(patient_context: Dict) -> str:
-    """Enhance the system prompt with patient memory context."""
+def build_memory_enhanced_system_prompt(patient_context: Dict, current_context: str = "") -> CachedPrompt:
+    """
+    Enhance the system prompt with patient memory context.
+    
+    The personality and memory guidance are the cacheable prefix; the patient's
+    memory and `current_context` form the suffix.
+    """
     conditions = patient_context.get("conditions", [])
     key_concerns = patient_context.get("key_concerns", [])
     total_conversations = patient_context.get("total_conversations", 0)
@@ -246,20 +145,131 @@ PATIENT MEMORY & CONTINUITY:
 - Continue our conversation with PERFECT MEMORY of all previous discussions
 - Reference past conversations naturally and show you remember their journey
 - Build deeper trust through consistent, compassionate care across all interactions"""
+    memory_context += format_summary_block(patient_context)
     
-    # Enhance the existing RadiantCompass system prompt with memory
-    enhanced_prompt = RADIANT_COMPASS_SYSTEM_PROMPT + memory_context + """
+    return CachedPrompt(RADIANT_COMPASS_SYSTEM_PROMPT + MEMORY_GUIDANCE_PROMPT, suffix=f"{memory_context}\n\n{current_context}")
 
-EMPATHETIC COMMUNICATION WITH MEMORY:
-- Remember and reference previous conversations naturally
-- Show genuine care and emotional intelligence built over time
-- Acknowledge their journey and progress since we first met
-- Be attentive to their evolving emotional state and concerns
-- Build deeper trust through consistent, compassionate care across all interactions
+async def prepare_copilot_turn(request: ChatMessage) -> Dict[str, Any]:
+    """Load the patient's memory and build the routed candidates for one copilot turn (/chat and /chat/stream)."""
+    # Extract context information
+    context = request.context or {}
+    patient_name = context.get("patientName", "Friend")
+    current_stage = context.get("currentStage", "awareness")
+    patient_id = context.get("patient_id", f"patient_{patient_name.lower().replace(' ', '_')}")
+    
+    # Load conversation history and patient context from memory
+    conversation_history = await load_patient_conversation_history(patient_id)
+    patient_context = await get_patient_context_summary(patient_id)
+    
+    # Add current user message to history
+    user_turn = {
+        "role": "user",
+        "content": request.message,
+        "timestamp": datetime.utcnow().isoformat(),
+        "journey_stage": current_stage,
+        "patient_name": patient_name
+    }
+    conversation_history.append(user_turn)
+    
+    # Build conversation context with memory
+    stage_context = get_stage_context(current_stage)
+    
+    # Create conversation history with memory-enhanced system prompt
+    system_prompt = build_memory_enhanced_system_prompt(
+        patient_context,
+        f"CURRENT CONTEXT:\n- Patient Name: {patient_name}\n- Current Journey Stage: {current_stage}\n- Stage Context: {stage_context}"
+    )
+    
+    # Add recent turns from memory; older turns are covered by the rolling summary
+    recent_messages = recent_prompt_turns(conversation_history)
+    prompt_token_metrics.record("copilot-chat", system_prompt.text, recent_messages)
+    
+    # Current user message is already in conversation_history, so don't add it again
+    
+    # OpenAI GPT-4, hedged/fallen back to Claude with the same prompt by the LLM router
+    candidates = configured(
+        openai_candidate(
+            system_prompt.openai_messages(recent_messages),
+            model="gpt-4",
+            max_tokens=800,
+            temperature=0.7,
+            presence_penalty=0.1,
+            frequency_penalty=0.1
+        ),
+        anthropic_candidate(
+            system_prompt,
+            recent_messages,
+            model="claude-3-5-sonnet-20241022",
+            max_tokens=800,
+            temperature=0.7
+        )
+    )
+    
+    return {
+        "patient_name": patient_name,
+        "current_stage": current_stage,
+        "patient_id": patient_id,
+        "emotional_state": context.get("emotionalState", "calm"),
+        "patient_context": patient_context,
+        "user_turn": user_turn,
+        "candidates": candidates
+    }
 
-Remember: You have perfect memory of all our previous conversations. Use this to provide increasingly personalized and empathetic care."""
+async def complete_copilot_turn(request: ChatMessage, turn: Dict[str, Any], ai_response: str, routed) -> ChatResponse:
+    """Save the exchange to memory and build the reply with suggestions and voice."""
+    # Add assistant response to conversation history
+    assistant_turn = {
+        "role": "assistant",
+        "content": ai_response,
+        "timestamp": datetime.utcnow().isoformat(),
+        "journey_stage": turn["current_stage"],
+        "model": routed.model
+    }
+    
+    # Append this exchange to the conversation memory store
+    total_turns = await save_patient_conversation_history(turn["patient_id"], [turn["user_turn"], assistant_turn])
+    
+    # Generate contextual suggestions
+    suggestions = generate_contextual_suggestions(turn["current_stage"], request.message)
     
-    return enhanced_prompt
+    # Select voice based on emotional state and content
+    recommended_voice = get_recommended_voice(turn["emotional_state"], ai_response)
+    
+    return ChatResponse(
+        response=ai_response,
+        context={
+            "stage": turn["current_stage"],
+            "timestamp": datetime.utcnow().isoformat(),
+            "model_used": routed.model,
+            "routing": routed.summary(),
+            "emotional_state": turn["emotional_state"],
+            "patient_id": turn["patient_id"],
+            "conversation_length": total_turns,
+            "has_memory": total_turns > 2,
+            "known_conditions": turn["patient_context"].get("conditions", []),
+            "total_conversations": turn["patient_context"].get("total_conversations", 0)
+        },
+        suggestions=suggestions,
+        audio_available=True,
+        recommended_voice=recommended_voice
+    )
+
+def copilot_fallback_response(patient_name: str) -> ChatResponse:
+    # Provide a warm fallback response
+    fallback_response = f"I'm experiencing a brief moment of connection difficulty, {patient_name}. While I sort that out, please know that I'm here for you and your questions are important to me. Can you tell me a bit more about what's on your mind regarding your healthcare journey? I want to make sure I give you the support you need. 💙"
+    
+    return ChatResponse(
+        response=fallback_response,
+        context={"error": "openai_unavailable", "fallback": True},
+        suggestions=[
+            "Tell me about any symptoms you're experiencing",
+            "Help me understand my treatment options",
+            "I need emotional support right now"
+        ]
+    )
+
+def request_patient_name(request: ChatMessage) -> str:
+    return request.context.get("patientName", "Friend") if request.context else "Friend"
 
 @router.post("/chat", response_model=ChatResponse)
 async def ai_chat(request: ChatMessage):
@@ -268,111 +278,63 @@ async def ai_chat(request: ChatMessage):
     Provides empathetic, contextual responses using OpenAI GPT-4.
     """
     try:
-        # Extract context information
-        patient_name = request.context.get("patientName", "Friend") if request.context else "Friend"
-        current_stage = request.context.get("currentStage", "awareness") if request.context else "awareness"
-        previous_messages = request.context.get("previousMessages", []) if request.context else []
-        patient_id = request.context.get("patient_id", f"patient_{patient_name.lower().replace(' ', '_')}") if request.context else f"patient_{patient_name.lower().replace(' ', '_')}"
-        
-        # Load conversation history and patient context from memory
-        conversation_history = await load_patient_conversation_history(patient_id)
-        patient_context = await get_patient_context_summary(patient_id)
-        
-        # Add current user message to history
-        conversation_history.append({
-            "role": "user",
-            "content": request.message,
-            "timestamp": datetime.utcnow().isoformat(),
-            "journey_stage": current_stage,
-            "patient_name": patient_name
-        })
-        
-        # Build conversation context with memory
-        stage_context = get_stage_context(current_stage)
-        
-        # Create conversation history with memory-enhanced system prompt
-        memory_enhanced_prompt = build_memory_enhanced_system_prompt(patient_context)
-        messages = [
-            {
-                "role": "system",
-                "content": f"{memory_enhanced_prompt}\n\nCURRENT CONTEXT:\n- Patient Name: {patient_name}\n- Current Journey Stage: {current_stage}\n- Stage Context: {stage_context}"
-            }
-        ]
-        
-        # Add recent conversation history from memory (last 20 messages = 10 exchanges)
-        recent_history = conversation_history[-20:]
-        for msg in recent_history:
-            if msg.get("role") in ["user", "assistant"]:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-        
-        # Current user message is already in conversation_history, so don't add it again
-        
-        # Call OpenAI GPT-4
-        response = openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=messages,
-            max_tokens=800,
-            temperature=0.7,
-            presence_penalty=0.1,
-            frequency_penalty=0.1
-        )
-        
-        ai_response = response.choices[0].message.content
-        
-        # Add assistant response to conversation history
-        conversation_history.append({
-            "role": "assistant",
-            "content": ai_response,
-            "timestamp": datetime.utcnow().isoformat(),
-            "journey_stage": current_stage,
-            "model": "gpt-4"
-        })
-        
-        # Save updated conversation history
-        await save_patient_conversation_history(patient_id, conversation_history)
-        
-        # Generate contextual suggestions
-        suggestions = generate_contextual_suggestions(current_stage, request.message)
-        
-        # Select voice based on emotional state and content
-        emotional_state = request.context.get("emotionalState", "calm") if request.context else "calm"
-        recommended_voice = get_recommended_voice(emotional_state, ai_response)
-        
-        return ChatResponse(
-            response=ai_response,
-            context={
-                "stage": current_stage,
-                "timestamp": datetime.utcnow().isoformat(),
-                "model_used": "gpt-4",
-                "emotional_state": emotional_state,
-                "patient_id": patient_id,
-                "conversation_length": len(conversation_history),
-                "has_memory": len(conversation_history) > 2,
-                "known_conditions": patient_context.get("conditions", []),
-                "total_conversations": patient_context.get("total_conversations", 0)
-            },
-            suggestions=suggestions,
-            audio_available=True,
-            recommended_voice=recommended_voice
-        )
+        turn = await prepare_copilot_turn(request)
+        routed = await llm_router.complete("copilot-chat", turn["candidates"], budget_ms=COPILOT_CHAT_LATENCY_BUDGET_MS)
+        return await complete_copilot_turn(request, turn, routed.text, routed)
         
     except Exception as e:
         print(f"AI Chat Error: {str(e)}")
-        # Provide a warm fallback response
-        fallback_response = f"I'm experiencing a brief moment of connection difficulty, {patient_name}. While I sort that out, please know that I'm here for you and your questions are important to me. Can you tell me a bit more about what's on your mind regarding your healthcare journey? I want to make sure I give you the support you need. 💙"
-        
-        return ChatResponse(
-            response=fallback_response,
-            context={"error": "openai_unavailable", "fallback": True},
-            suggestions=[
-                "Tell me about any symptoms you're experiencing",
-                "Help me understand my treatment options",
-                "I need emotional support right now"
-            ]
-        )
+        return copilot_fallback_response(request_patient_name(request))
+
+@router.post("/chat/stream")
+async def ai_chat_stream(request: ChatMessage):
+    """
+    Server-Sent Events variant of /chat, so the reply appears while GPT-4 writes it.
+    
+    Events:
+    - `ttft` once, before the first token: {"ttft_ms": ..., "model_ttft_ms": ...}
+    - `token` per chunk of visible text: {"text": ...}
+    - `done` at the end: the ChatResponse /chat would have returned
+    - `error` if the model fails: {"detail": ..., "fallback": <fallback ChatResponse>}
+    
+    Any leading <thinking> block is held back until it closes. The exchange is
+    saved to memory only once the reply is complete.
+    """
+    started = time.perf_counter()
+    
+    async def event_stream():
+        routed = RoutingResult("copilot-chat", COPILOT_CHAT_LATENCY_BUDGET_MS)
+        thinking = ThinkingFilter()
+        response_parts: List[str] = []
+        ttft_ms = None
+        try:
+            turn = await prepare_copilot_turn(request)
+            async for token in llm_router.stream("copilot-chat", turn["candidates"], COPILOT_CHAT_LATENCY_BUDGET_MS, routed):
+                visible = thinking.feed(token)
+                if not visible:
+                    continue
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+                    yield sse_event("ttft", {"ttft_ms": ttft_ms, "model_ttft_ms": routed.summary()["ttft_ms"]})
+                response_parts.append(visible)
+                yield sse_event("token", {"text": visible})
+            tail = thinking.flush()
+            if tail:
+                response_parts.append(tail)
+                yield sse_event("token", {"text": tail})
+            
+            reply = await complete_copilot_turn(request, turn, "".join(response_parts).strip(), routed)
+            reply.context["ttft_ms"] = ttft_ms
+            print(f"✅ Copilot chat stream: first token {ttft_ms}ms, total {(time.perf_counter() - started) * 1000:.0f}ms")
+            yield sse_event("done", reply.dict())
+        except Exception as e:
+            print(f"AI Chat Stream Error: {str(e)}")
+            yield sse_event("error", {
+                "detail": f"AI chat failed: {str(e)}",
+                "fallback": copilot_fallback_response(request_patient_name(request)).dict()
+            })
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 @router.post("/proactive-suggestions")
 async def get_proactive_suggestions(request: ProactiveSuggestionRequest):
@@ -380,25 +342,8 @@ async def get_proactive_suggestions(request: ProactiveSuggestionRequest):
     Generate proactive suggestions based on the patient's current stage and activity.
     """
     try:
-        stage_suggestions = {
-            "awareness": [
-                f"Hi {request.patientName}! I notice you're exploring your symptoms. Would you like me to help you prepare questions for your next doctor's appointment? 🤝",
-                f"It's completely normal to feel anxious about health concerns, {request.patientName}. I'm here to help you understand what you're experiencing step by step. ✨",
-                f"Would you like me to explain any medical terms you've encountered in simple language, {request.patientName}? I love helping make complex things clear! 🌟"
-            ],
-            "diagnosis": [
-                f"{request.patientName}, receiving a diagnosis can feel overwhelming. I'm here to help you process this information at your own pace. 💙",
-                f"I can help you understand what your diagnosis means for your journey ahead, {request.patientName}. What questions are most important to you right now?",
-                f"Would you like me to help you prepare a list of questions for your care team, {request.patientName}? I want to make sure you get all the information you need! 🌈"
-            ],
-            "treatment": [
-                f"Managing treatment can feel like a lot, {request.patientName}. I'm here to help you understand your options and what to expect. What's on your mind? 🤝",
-                f"I can help you explore strategies for managing treatment side effects, {request.patientName}. Your comfort and well-being are so important! ✨",
-                f"Would you like me to help you organize your questions about treatment, {request.patientName}? I want to make sure you feel prepared and confident! 🌟"
-            ]
-        }
-        
-        suggestions = stage_suggestions.get(request.currentStage, stage_suggestions["awareness"])
+        templates = STAGE_SUGGESTIONS.get(request.currentStage, STAGE_SUGGESTIONS["awareness"])
+        suggestions = [render(template, request.patientName) for template in templates]
         
         return {
             "suggestions": suggestions,
@@ -409,11 +354,7 @@ async def get_proactive_suggestions(request: ProactiveSuggestionRequest):
     except Exception as e:
         print(f"Proactive Suggestions Error: {str(e)}")
         return {
-            "suggestions": [
-                f"I'm here for you, {request.patientName}! How can I support you today? 💙",
-                "What questions do you have about your healthcare journey?",
-                "I'm ready to help with anything you need to understand better! ✨"
-            ],
+            "suggestions": [render(template, request.patientName) for template in FALLBACK_SUGGESTIONS],
             "stage": request.currentStage,
             "error": str(e)
         }
@@ -423,10 +364,17 @@ async def personality_check():
     """
     Quick endpoint to test the AI personality and responsiveness.
     """
+    if not openai_client:
+        return {
+            "error": "OpenAI API not configured",
+            "status": "unhealthy",
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
     try:
         test_message = "Hello! Can you tell me about yourself and how you help patients?"
         
-        response = openai_client.chat.completions.create(
+        response = await openai_client.chat.completions.create(
             model="gpt-4",
             messages=[
                 {"role": "system", "content": RADIANT_COMPASS_SYSTEM_PROMPT},
@@ -466,24 +414,21 @@ async def text_to_speech(request: TextToSpeechRequest):
         
         selected_voice = request.voice if request.voice in voice_options else "nova"
         
-        # Generate speech using OpenAI TTS
-        response = openai_client.audio.speech.create(
-            model="tts-1-hd",  # High quality model for better voice naturalness
-            voice=selected_voice,
-            input=request.text,
-            speed=request.speed,
-            response_format="mp3"
-        )
+        async def speak(text: str):
+            return await openai_speech(text, voice=selected_voice, speed=request.speed, model="tts-1-hd")
         
-        # Get audio content directly
-        audio_content = response.content
+        # Greetings and stage suggestions repeat verbatim, so most come from the TTS cache;
+        # with a patient name in them only the name is synthesized
+        spliced = await spliced_speech(request.text, speak)
+        audio_content, cache_source = spliced or await speak(request.text)
         
         return Response(
             content=audio_content,
             media_type="audio/mpeg",
             headers={
                 "Content-Disposition": "inline; filename=ai_response.mp3",
-                "Cache-Control": "no-cache"
+                "Cache-Control": "no-cache",
+                "X-Tts-Cache": cache_source
             }
         )
         
@@ -536,6 +481,9 @@ async def speech_to_text(audio_file: UploadFile = File(...)):
     Convert speech to text using OpenAI's Whisper API.
     Optimized for healthcare conversations with medical terminology support.
     """
+    if not openai_client:
+        raise HTTPException(status_code=503, detail="OpenAI API not configured")
+    
     try:
         # Validate audio file
         if not audio_file.content_type.startswith('audio/'):
@@ -544,33 +492,27 @@ async def speech_to_text(audio_file: UploadFile = File(...)):
                 detail="File must be an audio file"
             )
         
-        # Read audio file content
-        audio_content = await audio_file.read()
+        # In-memory upload (large files stream from the request spool); no temp files
+        whisper_input, preprocessing = await whisper_upload(audio_file)
         
-        # Create temporary file for Whisper API
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            temp_file.write(audio_content)
-            temp_file.flush()
-            
-            # Use Whisper API for transcription
-            with open(temp_file.name, "rb") as audio:
-                transcript = openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio,
-                    language="en",  # Specify English for better medical term recognition
-                    prompt="Healthcare conversation with medical terminology including symptoms, treatments, medications, and patient concerns."
-                )
-        
-        # Clean up temporary file
-        os.unlink(temp_file.name)
+        # Use Whisper API for transcription
+        transcript = await openai_client.audio.transcriptions.create(
+            model="whisper-1",
+            file=whisper_input,
+            language="en",  # Specify English for better medical term recognition
+            prompt="Healthcare conversation with medical terminology including symptoms, treatments, medications, and patient concerns."
+        )
         
         return {
             "text": transcript.text,
             "language": "en",
             "timestamp": datetime.utcnow().isoformat(),
-            "confidence": "high"  # Whisper doesn't provide confidence scores
+            "confidence": "high",  # Whisper doesn't provide confidence scores
+            "audio_preprocessing": preprocessing
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Speech-to-Text Error: {str(e)}")
         raise HTTPException(
@@ -585,20 +527,8 @@ async def generate_proactive_greeting(request: ProactiveSuggestionRequest):
     Creates contextual, warm welcome message based on patient journey stage.
     """
     try:
-        # Create contextual greeting based on stage and recent activity
-        stage_greetings = {
-            "awareness": f"Hello {request.patientName}! 🌟 Welcome to RadiantCompass. I can sense you might be exploring some health concerns, and I want you to know I'm here to support you every step of the way. Would you like me to help you understand what you're experiencing?",
-            
-            "diagnosis": f"Welcome back, {request.patientName}. 💙 I know receiving a diagnosis can bring up many emotions and questions. I'm here to help you process this information at your own pace and guide you through what comes next. How are you feeling today?",
-            
-            "treatment": f"Hi {request.patientName}! ✨ I see you're in your treatment journey. This takes incredible strength, and I'm so proud of you for taking these important steps. I'm here to support you through every aspect of your care. What would be most helpful for you right now?",
-            
-            "recovery": f"Hello {request.patientName}! 🌈 It's wonderful to see you in your recovery phase. You've come so far, and I'm here to help you continue moving forward with confidence. How has your recovery been going?",
-            
-            "living": f"Welcome, {request.patientName}! 🌟 I'm so glad to see you thriving in your ongoing journey. Living well with your condition is an ongoing process, and I'm here to help you maintain your quality of life. What brings you here today?"
-        }
-        
-        greeting = stage_greetings.get(request.currentStage, stage_greetings["awareness"])
+        # Contextual greeting based on stage; the fixed parts are pre-rendered in the TTS cache at startup
+        greeting = render(STAGE_GREETINGS.get(request.currentStage, STAGE_GREETINGS["awareness"]), request.patientName)
         
         return {
             "greeting": greeting,
@@ -613,7 +543,7 @@ async def generate_proactive_greeting(request: ProactiveSuggestionRequest):
     except Exception as e:
         print(f"Proactive Greeting Error: {str(e)}")
         return {
-            "greeting": f"Hello {request.patientName}! 💙 Welcome to RadiantCompass. I'm here to support you on your healthcare journey. How can I help you today?",
+            "greeting": render(FALLBACK_GREETING, request.patientName),
             "error": str(e),
             "timestamp": datetime.utcnow().isoformat()
         }
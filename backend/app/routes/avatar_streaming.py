@@ -6,6 +6,7 @@ import httpx
 import uuid
 from datetime import datetime, timedelta
 import jwt
+from app.http_clients import get_http_client, upstream_client
 
 router = APIRouter()
 
@@ -80,7 +81,7 @@ async def create_avatar_token(request: AvatarTokenRequest):
         raise HTTPException(status_code=500, detail="Failed to create session token")
 
 @router.post("/create-session")
-async def create_avatar_session(request: AvatarSessionRequest):
+async def create_avatar_session(request: AvatarSessionRequest, client: httpx.AsyncClient = Depends(upstream_client("heygen"))):
     """
     Create a new HeyGen avatar streaming session.
     Proxies the request to HeyGen API to keep API keys secure.
@@ -127,35 +128,34 @@ async def create_avatar_session(request: AvatarSessionRequest):
             }
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{HEYGEN_CONFIG['server_url']}/v1/streaming.new",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {heygen_token}"
-                },
-                json=session_data
+        response = await client.post(
+            f"{HEYGEN_CONFIG['server_url']}/v1/streaming.new",
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {heygen_token}"
+            },
+            json=session_data
+        )
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"HeyGen API error: {response.text}"
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"HeyGen API error: {response.text}"
-                )
-            
-            session_info = response.json()
-            
-            # Store session info for later use
-            session_id = session_info.get("session_id")
-            if session_id:
-                active_sessions[session_id] = {
-                    "heygen_token": heygen_token,
-                    "patient_context": request.patientContext,
-                    "created_at": datetime.utcnow(),
-                    "session_info": session_info
-                }
-            
-            return session_info
+        
+        session_info = response.json()
+        
+        # Store session info for later use
+        session_id = session_info.get("session_id")
+        if session_id:
+            active_sessions[session_id] = {
+                "heygen_token": heygen_token,
+                "patient_context": request.patientContext,
+                "created_at": datetime.utcnow(),
+                "session_info": session_info
+            }
+        
+        return session_info
             
     except HTTPException:
         raise
@@ -164,7 +164,7 @@ async def create_avatar_session(request: AvatarSessionRequest):
         raise HTTPException(status_code=500, detail="Failed to create avatar session")
 
 @router.post("/start-session")
-async def start_avatar_session(request: AvatarControlRequest):
+async def start_avatar_session(request: AvatarControlRequest, client: httpx.AsyncClient = Depends(upstream_client("heygen"))):
     """
     Start the avatar streaming session.
     """
@@ -175,23 +175,22 @@ async def start_avatar_session(request: AvatarControlRequest):
         
         # All sessions are real HeyGen sessions
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{HEYGEN_CONFIG['server_url']}/v1/streaming.start",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {session_data['heygen_token']}"
-                },
-                json={"session_id": request.sessionId}
+        response = await client.post(
+            f"{HEYGEN_CONFIG['server_url']}/v1/streaming.start",
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {session_data['heygen_token']}"
+            },
+            json={"session_id": request.sessionId}
+        )
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"HeyGen API error: {response.text}"
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"HeyGen API error: {response.text}"
-                )
-            
-            return response.json()
+        
+        return response.json()
             
     except HTTPException:
         raise
@@ -200,7 +199,7 @@ async def start_avatar_session(request: AvatarControlRequest):
         raise HTTPException(status_code=500, detail="Failed to start avatar session")
 
 @router.post("/send-text")
-async def send_text_to_avatar(request: AvatarTextRequest):
+async def send_text_to_avatar(request: AvatarTextRequest, client: httpx.AsyncClient = Depends(upstream_client("heygen"))):
     """
     Send text to the avatar for speech synthesis.
     """
@@ -217,27 +216,26 @@ async def send_text_to_avatar(request: AvatarTextRequest):
             session_data["patient_context"]
         )
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{HEYGEN_CONFIG['server_url']}/v1/streaming.task",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {session_data['heygen_token']}"
-                },
-                json={
-                    "session_id": request.sessionId,
-                    "text": enhanced_text,
-                    "task_type": request.taskType
-                }
+        response = await client.post(
+            f"{HEYGEN_CONFIG['server_url']}/v1/streaming.task",
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {session_data['heygen_token']}"
+            },
+            json={
+                "session_id": request.sessionId,
+                "text": enhanced_text,
+                "task_type": request.taskType
+            }
+        )
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"HeyGen API error: {response.text}"
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"HeyGen API error: {response.text}"
-                )
-            
-            return response.json()
+        
+        return response.json()
             
     except HTTPException:
         raise
@@ -246,7 +244,7 @@ async def send_text_to_avatar(request: AvatarTextRequest):
         raise HTTPException(status_code=500, detail="Failed to send text to avatar")
 
 @router.post("/close-session")
-async def close_avatar_session(request: AvatarControlRequest):
+async def close_avatar_session(request: AvatarControlRequest, client: httpx.AsyncClient = Depends(upstream_client("heygen"))):
     """
     Close the avatar streaming session.
     """
@@ -257,25 +255,24 @@ async def close_avatar_session(request: AvatarControlRequest):
         
         # All sessions are real HeyGen sessions
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{HEYGEN_CONFIG['server_url']}/v1/streaming.stop",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {session_data['heygen_token']}"
-                },
-                json={"session_id": request.sessionId}
-            )
-            
-            # Clean up session data regardless of response
-            if request.sessionId in active_sessions:
-                del active_sessions[request.sessionId]
-            
-            if response.status_code != 200:
-                print(f"Warning: HeyGen session close error: {response.text}")
-                # Don't raise an error here, as the session is being cleaned up anyway
-            
-            return {"status": "closed", "message": "Session closed successfully"}
+        response = await client.post(
+            f"{HEYGEN_CONFIG['server_url']}/v1/streaming.stop",
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {session_data['heygen_token']}"
+            },
+            json={"session_id": request.sessionId}
+        )
+        
+        # Clean up session data regardless of response
+        if request.sessionId in active_sessions:
+            del active_sessions[request.sessionId]
+        
+        if response.status_code != 200:
+            print(f"Warning: HeyGen session close error: {response.text}")
+            # Don't raise an error here, as the session is being cleaned up anyway
+        
+        return {"status": "closed", "message": "Session closed successfully"}
             
     except HTTPException:
         raise
@@ -290,20 +287,19 @@ async def close_avatar_session(request: AvatarControlRequest):
 async def get_heygen_session_token() -> str:
     """Get session token from HeyGen API."""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{HEYGEN_CONFIG['server_url']}/v1/streaming.create_token",
-                headers={
-                    "Content-Type": "application/json",
-                    "X-Api-Key": HEYGEN_CONFIG["api_key"]
-                }
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"HeyGen token error: {response.text}")
-            
-            data = response.json()
-            return data["data"]["token"]
+        response = await get_http_client("heygen").post(
+            f"{HEYGEN_CONFIG['server_url']}/v1/streaming.create_token",
+            headers={
+                "Content-Type": "application/json",
+                "X-Api-Key": HEYGEN_CONFIG["api_key"]
+            }
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"HeyGen token error: {response.text}")
+        
+        data = response.json()
+        return data["data"]["token"]
             
     except Exception as e:
         print(f"Error getting HeyGen token: {str(e)}")
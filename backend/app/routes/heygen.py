@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 import os
 import httpx
 import base64
 import asyncio
+from app.http_clients import upstream_client
 
 router = APIRouter(prefix="/api/v1/heygen", tags=["heygen"])
 
@@ -24,7 +25,7 @@ class StreamingSessionResponse(BaseModel):
     session_info: Dict[str, Any]
 
 @router.post("/create-session", response_model=StreamingSessionResponse)
-async def create_streaming_session(request: StreamingSessionRequest):
+async def create_streaming_session(request: StreamingSessionRequest, client: httpx.AsyncClient = Depends(upstream_client("heygen"))):
     """
     Create a new HeyGen streaming session for avatar video.
     """
@@ -56,32 +57,31 @@ async def create_streaming_session(request: StreamingSessionRequest):
             "video_encoding": "h264"
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{HEYGEN_BASE_URL}/v1/streaming.new",
-                headers=headers,
-                json=payload
-            )
-            
-            print(f"📡 HeyGen API Response Status: {response.status_code}")
+        response = await client.post(
+            f"{HEYGEN_BASE_URL}/v1/streaming.new",
+            headers=headers,
+            json=payload
+        )
+        
+        print(f"📡 HeyGen API Response Status: {response.status_code}")
+        
+        if response.status_code == 200:
+            data = response.json()
+            print("✅ HeyGen streaming session created successfully")
             
-            if response.status_code == 200:
-                data = response.json()
-                print("✅ HeyGen streaming session created successfully")
-                
-                return StreamingSessionResponse(
-                    session_id=data.get("session_id", ""),
-                    sdp=data.get("sdp", ""),
-                    ice_servers=data.get("ice_servers", []),
-                    session_info=data
-                )
-            else:
-                error_text = response.text
-                print(f"❌ HeyGen API Error: {response.status_code} - {error_text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"HeyGen API error: {error_text}"
-                )
+            return StreamingSessionResponse(
+                session_id=data.get("session_id", ""),
+                sdp=data.get("sdp", ""),
+                ice_servers=data.get("ice_servers", []),
+                session_info=data
+            )
+        else:
+            error_text = response.text
+            print(f"❌ HeyGen API Error: {response.status_code} - {error_text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"HeyGen API error: {error_text}"
+            )
                 
     except httpx.TimeoutException:
         print("❌ HeyGen API timeout")
@@ -91,7 +91,7 @@ async def create_streaming_session(request: StreamingSessionRequest):
         raise HTTPException(status_code=500, detail=f"Session creation failed: {str(e)}")
 
 @router.post("/speak")
-async def speak_with_avatar(session_id: str, text: str):
+async def speak_with_avatar(session_id: str, text: str, client: httpx.AsyncClient = Depends(upstream_client("heygen"))):
     """
     Make the HeyGen avatar speak the given text.
     """
@@ -118,30 +118,30 @@ async def speak_with_avatar(session_id: str, text: str):
             "task_type": "talk"
         }
         
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.post(
-                f"{HEYGEN_BASE_URL}/v1/streaming.task",
-                headers=headers,
-                json=payload
+        response = await client.post(
+            f"{HEYGEN_BASE_URL}/v1/streaming.task",
+            timeout=15.0,
+            headers=headers,
+            json=payload
+        )
+        
+        if response.status_code == 200:
+            print("✅ HeyGen avatar speech initiated")
+            return {"status": "success", "message": "Avatar is speaking"}
+        else:
+            error_text = response.text
+            print(f"❌ HeyGen speak error: {response.status_code} - {error_text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"HeyGen speak error: {error_text}"
             )
-            
-            if response.status_code == 200:
-                print("✅ HeyGen avatar speech initiated")
-                return {"status": "success", "message": "Avatar is speaking"}
-            else:
-                error_text = response.text
-                print(f"❌ HeyGen speak error: {response.status_code} - {error_text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"HeyGen speak error: {error_text}"
-                )
                 
     except Exception as e:
         print(f"❌ Error making avatar speak: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Avatar speak failed: {str(e)}")
 
 @router.post("/close-session")
-async def close_streaming_session(session_id: str):
+async def close_streaming_session(session_id: str, client: httpx.AsyncClient = Depends(upstream_client("heygen"))):
     """
     Close a HeyGen streaming session.
     """
@@ -166,28 +166,28 @@ async def close_streaming_session(session_id: str):
             "session_id": session_id
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                f"{HEYGEN_BASE_URL}/v1/streaming.stop",
-                headers=headers,
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                print("✅ HeyGen session closed successfully")
-                return {"status": "success", "message": "Session closed"}
-            else:
-                error_text = response.text
-                print(f"❌ HeyGen close error: {response.status_code} - {error_text}")
-                # Don't raise exception for close errors, just log
-                return {"status": "warning", "message": f"Close warning: {error_text}"}
+        response = await client.post(
+            f"{HEYGEN_BASE_URL}/v1/streaming.stop",
+            timeout=10.0,
+            headers=headers,
+            json=payload
+        )
+        
+        if response.status_code == 200:
+            print("✅ HeyGen session closed successfully")
+            return {"status": "success", "message": "Session closed"}
+        else:
+            error_text = response.text
+            print(f"❌ HeyGen close error: {response.status_code} - {error_text}")
+            # Don't raise exception for close errors, just log
+            return {"status": "warning", "message": f"Close warning: {error_text}"}
                 
     except Exception as e:
         print(f"❌ Error closing HeyGen session: {str(e)}")
         return {"status": "error", "message": f"Close failed: {str(e)}"}
 
 @router.get("/avatars")
-async def get_available_avatars():
+async def get_available_avatars(client: httpx.AsyncClient = Depends(upstream_client("heygen"))):
     """
     Get list of available HeyGen avatars.
     """
@@ -205,22 +205,22 @@ async def get_available_avatars():
             "x-api-key": decoded_key
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                f"{HEYGEN_BASE_URL}/v1/avatar.list",
-                headers=headers
+        response = await client.get(
+            f"{HEYGEN_BASE_URL}/v1/avatar.list",
+            timeout=10.0,
+            headers=headers
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            return {"avatars": data.get("avatars", [])}
+        else:
+            error_text = response.text
+            print(f"❌ HeyGen avatars error: {response.status_code} - {error_text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"HeyGen avatars error: {error_text}"
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return {"avatars": data.get("avatars", [])}
-            else:
-                error_text = response.text
-                print(f"❌ HeyGen avatars error: {response.status_code} - {error_text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"HeyGen avatars error: {error_text}"
-                )
                 
     except Exception as e:
         print(f"❌ Error getting avatars: {str(e)}")
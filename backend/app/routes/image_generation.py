@@ -6,6 +6,7 @@ import os
 import httpx
 from app.db import get_session
 from app.security import HIPAASecurityManager, get_client_ip
+from app.http_clients import upstream_client
 
 router = APIRouter(prefix="/ai", tags=["AI Image Generation"])
 
@@ -23,7 +24,8 @@ class ImageResponse(BaseModel):
 async def generate_calming_image(
     request_data: CalmingImageRequest,
     request: Request,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_session),
+    client: httpx.AsyncClient = Depends(upstream_client("openai"))
 ):
     """
     Generate calming, wellness-focused illustrations using GPT-4o + DALL-E 3
@@ -54,28 +56,28 @@ async def generate_calming_image(
         """
         
         # Step 1: Use GPT-4o to enhance and optimize the prompt for medical accuracy
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            prompt_response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {openai_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4o",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a wellness art expert specializing in calming, therapeutic illustrations for healthcare environments. Create prompts for beautiful, soothing artwork that promotes healing and peace."
-                        },
-                        {
-                            "role": "user",
-                            "content": f"Create an optimized prompt for a calming wellness illustration based on this request: {enhanced_prompt}"
-                        }
-                    ],
-                    "max_tokens": 300
-                }
-            )
+        prompt_response = await client.post(
+            "https://api.openai.com/v1/chat/completions",
+            timeout=60.0,
+            headers={
+                "Authorization": f"Bearer {openai_api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": "gpt-4o",
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": "You are a wellness art expert specializing in calming, therapeutic illustrations for healthcare environments. Create prompts for beautiful, soothing artwork that promotes healing and peace."
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Create an optimized prompt for a calming wellness illustration based on this request: {enhanced_prompt}"
+                    }
+                ],
+                "max_tokens": 300
+            }
+        )
         
         if prompt_response.status_code != 200:
             raise HTTPException(status_code=500, detail="Failed to optimize prompt with GPT-4o")
@@ -83,22 +85,22 @@ async def generate_calming_image(
         optimized_prompt = prompt_response.json()["choices"][0]["message"]["content"]
         
         # Step 2: Use DALL-E 3 to generate the actual image with the GPT-4o optimized prompt
-        async with httpx.AsyncClient(timeout=300.0) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/images/generations",
-                headers={
-                    "Authorization": f"Bearer {openai_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "dall-e-3",
-                    "prompt": optimized_prompt,
-                    "n": 1,
-                    "size": request_data.size,
-                    "quality": request_data.quality,
-                    "style": "natural"
-                }
-            )
+        response = await client.post(
+            "https://api.openai.com/v1/images/generations",
+            timeout=300.0,
+            headers={
+                "Authorization": f"Bearer {openai_api_key}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": "dall-e-3",
+                "prompt": optimized_prompt,
+                "n": 1,
+                "size": request_data.size,
+                "quality": request_data.quality,
+                "style": "natural"
+            }
+        )
         
         if response.status_code != 200:
             error_detail = response.text
@@ -175,7 +177,7 @@ async def generate_calming_image(
         )
 
 @router.get("/test-openai-connection")
-async def test_openai_connection():
+async def test_openai_connection(client: httpx.AsyncClient = Depends(upstream_client("openai"))):
     """Test OpenAI API connectivity"""
     try:
         openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -183,13 +185,12 @@ async def test_openai_connection():
             return {"status": "error", "message": "OpenAI API key not configured"}
         
         # Test with a simple API call
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                "https://api.openai.com/v1/models",
-                headers={
-                    "Authorization": f"Bearer {openai_api_key}",
-                }
-            )
+        response = await client.get(
+            "https://api.openai.com/v1/models",
+            headers={
+                "Authorization": f"Bearer {openai_api_key}",
+            }
+        )
         
         if response.status_code == 200:
             models = response.json()
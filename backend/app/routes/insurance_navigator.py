@@ -1,17 +1,59 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from anthropic import AsyncAnthropic
-import os
 from datetime import datetime
 from app.db import get_session
+from app.llm.candidates import anthropic_candidate, configured
+from app.llm.prompt_cache import CachedPrompt, prompt_cache_headers
+from app.llm.routing import llm_router
 from app.security import HIPAASecurityManager, get_client_ip
 
 router = APIRouter(prefix="/insurance-navigator", tags=["Insurance Navigator"])
 
-# Configure Anthropic Claude client
-client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+# Static instructions, sent as cached prompt prefixes (app.llm.prompt_cache); patient details follow them
+INSURANCE_NAVIGATION_SYSTEM_PROMPT = """You are InsuranceNavigator, an expert healthcare financial advocate and insurance specialist. Your expertise includes:
+
+1. Insurance plan analysis and benefit interpretation
+2. Prior authorization strategies and appeal processes
+3. Financial assistance program identification and eligibility
+4. Healthcare cost reduction and payment negotiation
+5. Patient advocacy and financial toxicity prevention
+6. Medicare, Medicaid, and private insurance navigation
+
+Your mission:
+1. Analyze insurance coverage for each proposed treatment
+2. Calculate realistic out-of-pocket cost estimates
+3. Identify applicable financial assistance programs
+4. Develop prior authorization and appeal strategies
+5. Recommend cost reduction approaches
+6. Assess financial toxicity risk and mitigation
+7. Provide actionable next steps and resources
+
+Guidelines:
+- Prioritize patient financial protection and advocacy
+- Provide realistic cost estimates with ranges
+- Include both immediate and long-term financial planning
+- Address insurance denial and appeal processes
+- Consider patient's ability to pay and income level
+- Recommend patient advocacy and social work resources
+- Include emergency financial assistance options
+- Address transportation, lodging, and indirect costs
+
+Response should be comprehensive, actionable, and focused on reducing financial burden while ensuring access to necessary care."""
+
+APPEAL_SYSTEM_PROMPT = """You are AppealAdvocate, an expert in insurance appeals and medical necessity documentation. Your role is to craft compelling, evidence-based appeal letters that maximize the likelihood of coverage approval.
+
+Key principles:
+1. Lead with clear medical necessity and urgency
+2. Reference specific insurance policy language when possible
+3. Include relevant clinical guidelines and evidence
+4. Address the specific denial reason directly
+5. Maintain professional, factual tone
+6. Include physician perspective and clinical rationale
+7. Emphasize patient safety and standard of care
+
+Your appeals should be thorough, well-organized, and persuasive while maintaining complete medical accuracy."""
 
 class InsuranceProfile(BaseModel):
     insurance_type: str  # "private", "medicare", "medicaid", "tricare", "uninsured"
@@ -71,6 +113,7 @@ class NavigationResponse(BaseModel):
 async def analyze_insurance_coverage(
     request_data: InsuranceNavigationRequest,
     request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -81,16 +124,7 @@ async def analyze_insurance_coverage(
     """
     
     try:
-        system_prompt = f"""You are InsuranceNavigator, an expert healthcare financial advocate and insurance specialist. Your expertise includes:
-
-1. Insurance plan analysis and benefit interpretation
-2. Prior authorization strategies and appeal processes
-3. Financial assistance program identification and eligibility
-4. Healthcare cost reduction and payment negotiation
-5. Patient advocacy and financial toxicity prevention
-6. Medicare, Medicaid, and private insurance navigation
-
-Patient Insurance Profile:
+        patient_profile = f"""Patient Insurance Profile:
 - Insurance Type: {request_data.insurance_profile.insurance_type}
 - Plan: {request_data.insurance_profile.plan_name or 'Not specified'}
 - Deductible: ${request_data.insurance_profile.deductible or 'Unknown'}
@@ -106,28 +140,7 @@ Financial Context:
 - Annual Income: ${request_data.annual_income or 'Not provided'}
 - Household Size: {request_data.household_size or 'Not provided'}
 - Employment Status: {request_data.employment_status}
-- Location: {request_data.geographic_location}
-
-Your mission:
-1. Analyze insurance coverage for each proposed treatment
-2. Calculate realistic out-of-pocket cost estimates
-3. Identify applicable financial assistance programs
-4. Develop prior authorization and appeal strategies
-5. Recommend cost reduction approaches
-6. Assess financial toxicity risk and mitigation
-7. Provide actionable next steps and resources
-
-Guidelines:
-- Prioritize patient financial protection and advocacy
-- Provide realistic cost estimates with ranges
-- Include both immediate and long-term financial planning
-- Address insurance denial and appeal processes
-- Consider patient's ability to pay and income level
-- Recommend patient advocacy and social work resources
-- Include emergency financial assistance options
-- Address transportation, lodging, and indirect costs
-
-Response should be comprehensive, actionable, and focused on reducing financial burden while ensuring access to necessary care."""
+- Location: {request_data.geographic_location}"""
 
         user_prompt = f"""Please provide comprehensive insurance navigation and financial planning for this patient:
 
@@ -161,18 +174,17 @@ Please provide:
 
 Focus on practical, actionable advice that empowers the patient to navigate insurance challenges and minimize financial burden while accessing necessary care."""
 
-        # Call Claude API for insurance navigation
-        response = await client.messages.create(
+        # Call Claude API for insurance navigation; the instructions are a cached prompt prefix
+        routed = await llm_router.complete("insurance-coverage", configured(anthropic_candidate(
+            CachedPrompt(INSURANCE_NAVIGATION_SYSTEM_PROMPT, suffix=patient_profile),
+            [{"role": "user", "content": user_prompt}],
             model="claude-3-7-sonnet-20250219",
             max_tokens=3000,
-            temperature=0.3,  # Balanced temperature for practical financial advice
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
-        )
+            temperature=0.3  # Balanced temperature for practical financial advice
+        )))
+        response.headers.update(prompt_cache_headers(routed))
         
-        ai_response = response.content[0].text
+        ai_response = routed.text
         
         # Parse AI response into structured navigation advice
         navigation_result = parse_insurance_navigation_response(ai_response, request_data)
@@ -222,6 +234,7 @@ async def generate_appeal_letter(
     insurance_profile: InsuranceProfile,
     medical_justification: str,
     request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -232,19 +245,6 @@ async def generate_appeal_letter(
     """
     
     try:
-        system_prompt = """You are AppealAdvocate, an expert in insurance appeals and medical necessity documentation. Your role is to craft compelling, evidence-based appeal letters that maximize the likelihood of coverage approval.
-
-Key principles:
-1. Lead with clear medical necessity and urgency
-2. Reference specific insurance policy language when possible
-3. Include relevant clinical guidelines and evidence
-4. Address the specific denial reason directly
-5. Maintain professional, factual tone
-6. Include physician perspective and clinical rationale
-7. Emphasize patient safety and standard of care
-
-Your appeals should be thorough, well-organized, and persuasive while maintaining complete medical accuracy."""
-
         user_prompt = f"""Please generate a comprehensive insurance appeal letter for the following case:
 
 TREATMENT: {treatment_name}
@@ -264,17 +264,16 @@ Please provide:
 
 Format the letter professionally with appropriate medical and insurance terminology."""
 
-        response = await client.messages.create(
+        routed = await llm_router.complete("insurance-appeal", configured(anthropic_candidate(
+            CachedPrompt(APPEAL_SYSTEM_PROMPT),
+            [{"role": "user", "content": user_prompt}],
             model="claude-3-7-sonnet-20250219",
             max_tokens=2000,
-            temperature=0.2,
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
-        )
+            temperature=0.2
+        )))
+        response.headers.update(prompt_cache_headers(routed))
         
-        appeal_result = parse_appeal_response(response.content[0].text)
+        appeal_result = parse_appeal_response(routed.text)
         
         # Log the appeal generation
         await HIPAASecurityManager.log_audit_event(
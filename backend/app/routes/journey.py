@@ -15,6 +15,9 @@ class JourneyStageManifest(BaseModel):
     tools: List[Tool]
     chat_prompt: str
 
+# Bump when stage tools or triggers change; compiled voice prompts (app.voice.prompts) are keyed on it
+JOURNEY_MANIFEST_VERSION = "1"
+
 # This registry is now more detailed, including conversational triggers for each tool.
 # This information is derived from the COMPREHENSIVE_FEATURE_REQUIREMENTS.md document.
 journey_manifest_registry = {
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from typing import Optional
+import os
+import secrets
+from app.llm.response_cache import get_llm_cache_stats, llm_response_cache
+
+router = APIRouter(prefix="/api/v1/admin/llm-cache", tags=["admin"])
+
+# Shared secret for cache administration; the endpoints are disabled while it is unset
+LLM_CACHE_ADMIN_TOKEN = os.getenv("LLM_CACHE_ADMIN_TOKEN")
+
+async def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    """Check the X-Admin-Token header against LLM_CACHE_ADMIN_TOKEN."""
+    if not LLM_CACHE_ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="LLM cache administration is disabled")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, LLM_CACHE_ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token")
+
+@router.get("/stats", dependencies=[Depends(require_admin)])
+async def llm_cache_stats():
+    """Hit/miss counts and hit vs miss latency of the LLM response cache."""
+    return get_llm_cache_stats()
+
+@router.delete("", dependencies=[Depends(require_admin)])
+async def invalidate_llm_cache(route: Optional[str] = None):
+    """Invalidate cached LLM answers for one route (e.g. `treatment-options`), or all of them."""
+    return await llm_response_cache.invalidate(route)
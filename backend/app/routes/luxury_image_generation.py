@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional, Literal
 import os
@@ -6,6 +6,8 @@ import httpx
 import asyncio
 import time
 import json
+from app.http_clients import upstream_client
+from app.singleflight import get_singleflight_stats, singleflight
 
 router = APIRouter(prefix="/api/v1/luxury", tags=["luxury-imaging"])
 
@@ -24,7 +26,7 @@ class ImageAnalysisRequest(BaseModel):
     analysis_prompt: str
 
 @router.post("/generate-luxury-healthcare-image")
-async def generate_luxury_healthcare_image(request: LuxuryImageRequest):
+async def generate_luxury_healthcare_image(request: LuxuryImageRequest, client: httpx.AsyncClient = Depends(upstream_client("openai"))):
     """
     Generate luxury healthcare environment images using OpenAI DALL-E 3 
     with specialized healthcare prompts for premium patient experiences.
@@ -60,48 +62,48 @@ async def generate_luxury_healthcare_image(request: LuxuryImageRequest):
         
         print(f"🎨 Generating luxury healthcare image: {request.prompt[:50]}...")
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/images/generations",
-                headers={
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "dall-e-3",
-                    "prompt": enhanced_prompt,
-                    "size": request.size,
-                    "quality": request.quality,
-                    "style": request.style,
-                    "n": 1
-                }
-            )
+        response = await client.post(
+            "https://api.openai.com/v1/images/generations",
+            timeout=60.0,
+            headers={
+                "Authorization": f"Bearer {OPENAI_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": "dall-e-3",
+                "prompt": enhanced_prompt,
+                "size": request.size,
+                "quality": request.quality,
+                "style": request.style,
+                "n": 1
+            }
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            image_url = data["data"][0]["url"]
+            revised_prompt = data["data"][0].get("revised_prompt", enhanced_prompt)
             
-            if response.status_code == 200:
-                data = response.json()
-                image_url = data["data"][0]["url"]
-                revised_prompt = data["data"][0].get("revised_prompt", enhanced_prompt)
-                
-                latency_ms = int((time.time() - start_time) * 1000)
-                
-                print(f"✅ Luxury healthcare image generated: {latency_ms}ms")
-                
-                return {
-                    "image_url": image_url,
-                    "revised_prompt": revised_prompt,
-                    "original_prompt": request.prompt,
-                    "generation_time_ms": latency_ms,
-                    "size": request.size,
-                    "quality": request.quality,
-                    "style": request.style
-                }
-            else:
-                error_text = response.text
-                print(f"❌ OpenAI Image Generation Error: {response.status_code} - {error_text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Image generation failed: {error_text}"
-                )
+            latency_ms = int((time.time() - start_time) * 1000)
+            
+            print(f"✅ Luxury healthcare image generated: {latency_ms}ms")
+            
+            return {
+                "image_url": image_url,
+                "revised_prompt": revised_prompt,
+                "original_prompt": request.prompt,
+                "generation_time_ms": latency_ms,
+                "size": request.size,
+                "quality": request.quality,
+                "style": request.style
+            }
+        else:
+            error_text = response.text
+            print(f"❌ OpenAI Image Generation Error: {response.status_code} - {error_text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Image generation failed: {error_text}"
+            )
                 
     except httpx.TimeoutException:
         print("❌ OpenAI Image Generation timeout")
@@ -111,7 +113,7 @@ async def generate_luxury_healthcare_image(request: LuxuryImageRequest):
         raise HTTPException(status_code=500, detail=f"Image generation failed: {str(e)}")
 
 @router.post("/analyze-image")
-async def analyze_luxury_image(request: ImageAnalysisRequest):
+async def analyze_luxury_image(request: ImageAnalysisRequest, client: httpx.AsyncClient = Depends(upstream_client("openai"))):
     """
     Analyze images using GPT-4 Vision to ensure they meet luxury healthcare standards.
     """
@@ -123,73 +125,74 @@ async def analyze_luxury_image(request: ImageAnalysisRequest):
     try:
         print(f"🔍 Analyzing luxury healthcare image with GPT-4 Vision...")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-4-vision-preview",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a luxury healthcare design expert and medical facility consultant. Analyze images for adherence to premium healthcare design standards, patient comfort, and therapeutic environment principles."
-                        },
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": f"Please analyze this luxury healthcare environment image. {request.analysis_prompt}\n\nProvide detailed feedback on:\n1. Luxury design quality and premium aesthetics\n2. Healthcare functionality and patient comfort\n3. Healing environment principles (lighting, color, materials)\n4. Areas for improvement\n5. Overall rating (1-10) for luxury healthcare standards"
-                                },
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": request.image_url,
-                                        "detail": "high"
-                                    }
+        response = await client.post(
+            "https://api.openai.com/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {OPENAI_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": "gpt-4-vision-preview",
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": "You are a luxury healthcare design expert and medical facility consultant. Analyze images for adherence to premium healthcare design standards, patient comfort, and therapeutic environment principles."
+                    },
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": f"Please analyze this luxury healthcare environment image. {request.analysis_prompt}\n\nProvide detailed feedback on:\n1. Luxury design quality and premium aesthetics\n2. Healthcare functionality and patient comfort\n3. Healing environment principles (lighting, color, materials)\n4. Areas for improvement\n5. Overall rating (1-10) for luxury healthcare standards"
+                            },
+                            {
+                                "type": "image_url",
+                                "image_url": {
+                                    "url": request.image_url,
+                                    "detail": "high"
                                 }
-                            ]
-                        }
-                    ],
-                    "max_tokens": 500,
-                    "temperature": 0.7
-                }
-            )
+                            }
+                        ]
+                    }
+                ],
+                "max_tokens": 500,
+                "temperature": 0.7
+            }
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            analysis = data["choices"][0]["message"]["content"]
             
-            if response.status_code == 200:
-                data = response.json()
-                analysis = data["choices"][0]["message"]["content"]
-                
-                latency_ms = int((time.time() - start_time) * 1000)
-                
-                print(f"✅ Image analysis completed: {latency_ms}ms")
-                
-                return {
-                    "analysis": analysis,
-                    "image_url": request.image_url,
-                    "analysis_prompt": request.analysis_prompt,
-                    "analysis_time_ms": latency_ms,
-                    "model": "gpt-4-vision-preview"
-                }
-            else:
-                error_text = response.text
-                print(f"❌ GPT-4 Vision Analysis Error: {response.status_code} - {error_text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Image analysis failed: {error_text}"
-                )
+            latency_ms = int((time.time() - start_time) * 1000)
+            
+            print(f"✅ Image analysis completed: {latency_ms}ms")
+            
+            return {
+                "analysis": analysis,
+                "image_url": request.image_url,
+                "analysis_prompt": request.analysis_prompt,
+                "analysis_time_ms": latency_ms,
+                "model": "gpt-4-vision-preview"
+            }
+        else:
+            error_text = response.text
+            print(f"❌ GPT-4 Vision Analysis Error: {response.status_code} - {error_text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Image analysis failed: {error_text}"
+            )
                 
     except Exception as e:
         print(f"❌ Error analyzing luxury healthcare image: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Image analysis failed: {str(e)}")
 
 @router.post("/generate-stage-imagery")
-async def generate_stage_imagery():
+@singleflight("generate-stage-imagery")
+async def generate_stage_imagery(client: httpx.AsyncClient = Depends(upstream_client("openai"))):
     """
     Generate complete set of luxury healthcare images for all journey stages.
+    Dashboards loading at the same moment share one generation run (app.singleflight).
     """
     if not OPENAI_API_KEY:
         raise HTTPException(status_code=503, detail="OpenAI API key not configured")
@@ -232,7 +235,7 @@ async def generate_stage_imagery():
                 style="natural"
             )
             
-            result = await generate_luxury_healthcare_image(request)
+            result = await generate_luxury_healthcare_image(request, client=client)
             results.append({
                 "stage_id": stage_info["stage"],
                 "stage_title": stage_info["title"],
@@ -266,5 +269,6 @@ async def luxury_imaging_health():
         "openai_configured": OPENAI_API_KEY is not None,
         "dall_e_3_available": True,
         "gpt_4_vision_available": True,
+        "singleflight": get_singleflight_stats(),
         "status": "healthy"
     }
\ No newline at end of file
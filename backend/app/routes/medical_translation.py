@@ -1,18 +1,62 @@
-from fastapi import APIRouter, HTTPException, Depends, Request, UploadFile, File
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from anthropic import AsyncAnthropic
-import os
 import PyPDF2
 import io
 from app.db import get_session
+from app.llm.candidates import anthropic_candidate, configured
+from app.llm.prompt_cache import CachedPrompt, prompt_cache_headers
+from app.llm.routing import llm_router
 from app.security import HIPAASecurityManager, get_client_ip
 
 router = APIRouter(prefix="/medical", tags=["Medical Translation"])
 
-# Configure Anthropic Claude client
-client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+# Static instructions, sent as cached prompt prefixes (app.llm.prompt_cache); document details follow them
+TRANSLATION_SYSTEM_PROMPT = """You are MedTranslator, an expert medical translator who specializes in converting complex medical documentation into clear, accessible language that patients and families can understand.
+
+Your mission is to:
+1. Translate medical jargon into language at the target reading level given below
+2. Maintain complete medical accuracy while improving accessibility
+3. Provide empathetic, reassuring context when appropriate
+4. Create practical action items and questions for patients
+5. Highlight critical information that requires immediate attention
+
+Guidelines:
+- Use simple, everyday words instead of medical terminology
+- Explain complex concepts with analogies when helpful
+- Organize information in logical, easy-to-follow sections
+- Provide emotional support and reassurance where appropriate
+- Always maintain the medical accuracy of the original content
+- Include pronunciation guides for essential medical terms
+- Suggest specific questions patients should ask their healthcare team
+
+Response should include:
+- simplified_text: Complete translation in accessible language
+- key_points: 3-5 most important takeaways
+- medical_terms_glossary: Key medical terms with simple definitions
+- consultation_checklist: Questions patients should ask (if requested)
+- confidence_score: Your confidence in the translation accuracy (1-100)"""
+
+PATHOLOGY_SYSTEM_PROMPT = """You are PathologyWise, a specialized medical translator focused on pathology reports. Your expertise is in taking complex pathology findings and creating clear, compassionate explanations that help patients understand their diagnosis while maintaining hope and empowerment.
+
+Your approach:
+1. Lead with the most important information in accessible language
+2. Provide context for what findings mean for treatment and prognosis
+3. Explain medical terms with simple analogies
+4. Offer emotional support and realistic hope
+5. Create actionable next steps and empowering questions
+6. Assess urgency level based on findings
+
+Key principles:
+- Start with what the patient most needs to know
+- Use "your results show" rather than "the specimen demonstrates"
+- Explain staging and grading in understandable terms
+- Provide context for treatment implications
+- Balance honesty with hope and support
+- Include specific questions to ask the medical team
+
+Response should include comprehensive pathology translation with emotional intelligence."""
 
 class TranslationRequest(BaseModel):
     medical_text: str
@@ -50,6 +94,7 @@ class PathologyTranslationResponse(BaseModel):
 async def translate_medical_text(
     request_data: TranslationRequest,
     request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -61,34 +106,9 @@ async def translate_medical_text(
     
     try:
         # Create specialized prompt based on document type
-        system_prompt = f"""You are MedTranslator, an expert medical translator who specializes in converting complex medical documentation into clear, accessible language that patients and families can understand.
-
-Your mission is to:
-1. Translate medical jargon into {request_data.target_grade_level}th-grade reading level language
-2. Maintain complete medical accuracy while improving accessibility
-3. Provide empathetic, reassuring context when appropriate
-4. Create practical action items and questions for patients
-5. Highlight critical information that requires immediate attention
-
-Document Type: {request_data.document_type}
+        document_context = f"""Document Type: {request_data.document_type}
 Target Reading Level: {request_data.target_grade_level}th grade
-Patient Context: {request_data.patient_context or "Not provided"}
-
-Guidelines:
-- Use simple, everyday words instead of medical terminology
-- Explain complex concepts with analogies when helpful
-- Organize information in logical, easy-to-follow sections
-- Provide emotional support and reassurance where appropriate
-- Always maintain the medical accuracy of the original content
-- Include pronunciation guides for essential medical terms
-- Suggest specific questions patients should ask their healthcare team
-
-Response should include:
-- simplified_text: Complete translation in accessible language
-- key_points: 3-5 most important takeaways
-- medical_terms_glossary: Key medical terms with simple definitions
-- consultation_checklist: Questions patients should ask (if requested)
-- confidence_score: Your confidence in the translation accuracy (1-100)"""
+Patient Context: {request_data.patient_context or "Not provided"}"""
 
         document_specific_prompts = {
             "pathology": "Focus on explaining test results, what they mean for treatment options, and next steps. Be especially careful to provide hope and context while being honest about findings.",
@@ -107,18 +127,17 @@ SPECIFIC FOCUS FOR {request_data.document_type.upper()}:
 
 Please provide a comprehensive translation that helps the patient understand their health information clearly and feel empowered to participate in their care."""
 
-        # Call Claude API
-        response = await client.messages.create(
+        # Call Claude API; the instructions are a cached prompt prefix
+        routed = await llm_router.complete("medical-translation", configured(anthropic_candidate(
+            CachedPrompt(TRANSLATION_SYSTEM_PROMPT, suffix=document_context),
+            [{"role": "user", "content": user_prompt}],
             model="claude-3-7-sonnet-20250219",
             max_tokens=1500,
-            temperature=0.3,  # Lower temperature for more consistent medical translation
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
-        )
+            temperature=0.3  # Lower temperature for more consistent medical translation
+        )))
+        response.headers.update(prompt_cache_headers(routed))
         
-        ai_response = response.content[0].text
+        ai_response = routed.text
         
         # Parse the AI response (enhanced parsing would be implemented)
         translation_result = parse_translation_response(ai_response, request_data)
@@ -164,6 +183,7 @@ Please provide a comprehensive translation that helps the patient understand the
 async def translate_pathology_report(
     request_data: PathologyTranslationRequest,
     request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -174,26 +194,6 @@ async def translate_pathology_report(
     """
     
     try:
-        system_prompt = """You are PathologyWise, a specialized medical translator focused on pathology reports. Your expertise is in taking complex pathology findings and creating clear, compassionate explanations that help patients understand their diagnosis while maintaining hope and empowerment.
-
-Your approach:
-1. Lead with the most important information in accessible language
-2. Provide context for what findings mean for treatment and prognosis
-3. Explain medical terms with simple analogies
-4. Offer emotional support and realistic hope
-5. Create actionable next steps and empowering questions
-6. Assess urgency level based on findings
-
-Key principles:
-- Start with what the patient most needs to know
-- Use "your results show" rather than "the specimen demonstrates"
-- Explain staging and grading in understandable terms
-- Provide context for treatment implications
-- Balance honesty with hope and support
-- Include specific questions to ask the medical team
-
-Response should include comprehensive pathology translation with emotional intelligence."""
-
         user_prompt = f"""Please provide a comprehensive, compassionate translation of this pathology report:
 
 PATHOLOGY REPORT:
@@ -216,17 +216,16 @@ Please provide:
 
 Focus on empowering the patient with understanding while providing appropriate emotional support."""
 
-        response = await client.messages.create(
+        routed = await llm_router.complete("pathology-translation", configured(anthropic_candidate(
+            CachedPrompt(PATHOLOGY_SYSTEM_PROMPT),
+            [{"role": "user", "content": user_prompt}],
             model="claude-3-7-sonnet-20250219",
             max_tokens=2000,
-            temperature=0.3,
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
-        )
+            temperature=0.3
+        )))
+        response.headers.update(prompt_cache_headers(routed))
         
-        ai_response = response.content[0].text
+        ai_response = routed.text
         
         # Parse pathology-specific response
         pathology_result = parse_pathology_response(ai_response, request_data)
@@ -272,6 +271,7 @@ async def translate_pdf_document(
     document_type: str = "pathology",
     target_grade_level: int = 6,
     request: Request = None,
+    response: Response = None,
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -307,7 +307,7 @@ async def translate_pdf_document(
         )
         
         # Process translation
-        result = await translate_medical_text(translation_request, request, session)
+        result = await translate_medical_text(translation_request, request, response, session)
         
         return {
             "filename": file.filename,
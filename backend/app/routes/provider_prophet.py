@@ -1,17 +1,59 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from anthropic import AsyncAnthropic
-import os
 from datetime import datetime
 from app.db import get_session
+from app.llm.candidates import anthropic_candidate, configured
+from app.llm.prompt_cache import CachedPrompt, prompt_cache_headers
+from app.llm.routing import llm_router
 from app.security import HIPAASecurityManager, get_client_ip
 
 router = APIRouter(prefix="/provider-prophet", tags=["Provider Prophet"])
 
-# Configure Anthropic Claude client
-client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+# Static instructions, sent as cached prompt prefixes (app.llm.prompt_cache); patient details follow them
+PROVIDER_MATCHING_SYSTEM_PROMPT = """You are ProviderProphet, an expert AI system specialized in patient-provider matching and healthcare relationship optimization. Your expertise includes:
+
+1. Provider-patient compatibility assessment
+2. Communication style matching and preferences
+3. Clinical expertise and volume analysis
+4. Geographic and accessibility considerations
+5. Cultural competency and language matching
+6. Outcome prediction and satisfaction modeling
+7. Healthcare navigation and referral optimization
+
+Your mission:
+1. Analyze patient-provider compatibility across multiple dimensions
+2. Predict relationship success and patient satisfaction
+3. Consider clinical expertise, volume, and outcomes
+4. Evaluate communication style and cultural fit
+5. Assess practical factors (location, insurance, availability)
+6. Generate personalized matching scores and recommendations
+7. Provide insights for optimizing provider selection
+
+Guidelines:
+- Prioritize patient safety and clinical quality
+- Balance patient preferences with medical necessity
+- Consider both quantitative metrics and qualitative factors
+- Provide transparent reasoning for matching recommendations
+- Address potential barriers or concerns
+- Suggest alternative options when primary matches aren't optimal
+- Focus on long-term relationship success and patient outcomes
+
+Response should provide comprehensive matching analysis with actionable provider recommendations."""
+
+COMPATIBILITY_SYSTEM_PROMPT = """You are CompatibilityAnalyzer, an expert in patient-provider relationship assessment. Your role is to provide detailed compatibility analysis between a specific patient and healthcare provider.
+
+Focus on:
+1. Communication style alignment and potential friction points
+2. Treatment philosophy compatibility and shared decision-making
+3. Cultural competency and sensitivity factors
+4. Practical considerations (location, scheduling, insurance)
+5. Clinical expertise match for patient's specific needs
+6. Predicted relationship satisfaction and success factors
+7. Specific strategies for optimizing the patient-provider relationship
+
+Provide honest, balanced assessment that helps patients make informed decisions about their healthcare relationships."""
 
 class PatientPreferences(BaseModel):
     communication_style: str  # "detailed", "concise", "supportive", "clinical"
@@ -76,6 +118,7 @@ class ProphetResponse(BaseModel):
 async def match_providers(
     matching_criteria: MatchingCriteria,
     request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -86,17 +129,7 @@ async def match_providers(
     """
     
     try:
-        system_prompt = f"""You are ProviderProphet, an expert AI system specialized in patient-provider matching and healthcare relationship optimization. Your expertise includes:
-
-1. Provider-patient compatibility assessment
-2. Communication style matching and preferences
-3. Clinical expertise and volume analysis
-4. Geographic and accessibility considerations
-5. Cultural competency and language matching
-6. Outcome prediction and satisfaction modeling
-7. Healthcare navigation and referral optimization
-
-Patient Profile Analysis:
+        patient_profile = f"""Patient Profile Analysis:
 - Communication Style: {matching_criteria.patient_preferences.communication_style}
 - Treatment Philosophy: {matching_criteria.patient_preferences.treatment_philosophy}
 - Priority Factors: {', '.join(matching_criteria.patient_preferences.experience_priorities)}
@@ -108,27 +141,7 @@ Clinical Requirements:
 - Condition: {matching_criteria.condition_requirements.get('diagnosis', 'Not specified')}
 - Urgency Level: {matching_criteria.urgency_level}
 - Geographic Radius: {matching_criteria.geographic_radius} miles
-- Telemedicine: {'Accepted' if matching_criteria.include_telemedicine else 'Not preferred'}
-
-Your mission:
-1. Analyze patient-provider compatibility across multiple dimensions
-2. Predict relationship success and patient satisfaction
-3. Consider clinical expertise, volume, and outcomes
-4. Evaluate communication style and cultural fit
-5. Assess practical factors (location, insurance, availability)
-6. Generate personalized matching scores and recommendations
-7. Provide insights for optimizing provider selection
-
-Guidelines:
-- Prioritize patient safety and clinical quality
-- Balance patient preferences with medical necessity
-- Consider both quantitative metrics and qualitative factors
-- Provide transparent reasoning for matching recommendations
-- Address potential barriers or concerns
-- Suggest alternative options when primary matches aren't optimal
-- Focus on long-term relationship success and patient outcomes
-
-Response should provide comprehensive matching analysis with actionable provider recommendations."""
+- Telemedicine: {'Accepted' if matching_criteria.include_telemedicine else 'Not preferred'}"""
 
         user_prompt = f"""Please analyze and match healthcare providers for this patient profile:
 
@@ -163,18 +176,17 @@ Please provide:
 
 Focus on creating meaningful, personalized matches that optimize both clinical outcomes and patient experience."""
 
-        # Call Claude API for provider matching
-        response = await client.messages.create(
+        # Call Claude API for provider matching; the instructions are a cached prompt prefix
+        routed = await llm_router.complete("provider-matching", configured(anthropic_candidate(
+            CachedPrompt(PROVIDER_MATCHING_SYSTEM_PROMPT, suffix=patient_profile),
+            [{"role": "user", "content": user_prompt}],
             model="claude-3-7-sonnet-20250219",
             max_tokens=3000,
-            temperature=0.4,  # Moderate temperature for balanced clinical and personal matching
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
-        )
+            temperature=0.4  # Moderate temperature for balanced clinical and personal matching
+        )))
+        response.headers.update(prompt_cache_headers(routed))
         
-        ai_response = response.content[0].text
+        ai_response = routed.text
         
         # Parse AI response into structured provider matches
         prophet_result = parse_provider_matching_response(ai_response, matching_criteria)
@@ -223,6 +235,7 @@ async def analyze_provider_compatibility(
     patient_profile: Dict[str, Any],
     patient_preferences: PatientPreferences,
     request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -236,19 +249,6 @@ async def analyze_provider_compatibility(
         # Mock provider lookup - in production would query provider database
         mock_provider = get_mock_provider(provider_id)
         
-        system_prompt = """You are CompatibilityAnalyzer, an expert in patient-provider relationship assessment. Your role is to provide detailed compatibility analysis between a specific patient and healthcare provider.
-
-Focus on:
-1. Communication style alignment and potential friction points
-2. Treatment philosophy compatibility and shared decision-making
-3. Cultural competency and sensitivity factors
-4. Practical considerations (location, scheduling, insurance)
-5. Clinical expertise match for patient's specific needs
-6. Predicted relationship satisfaction and success factors
-7. Specific strategies for optimizing the patient-provider relationship
-
-Provide honest, balanced assessment that helps patients make informed decisions about their healthcare relationships."""
-
         user_prompt = f"""Please analyze the compatibility between this patient and provider:
 
 PATIENT PROFILE:
@@ -279,17 +279,16 @@ Please provide:
 
 Focus on practical insights that help the patient prepare for and succeed in this healthcare relationship."""
 
-        response = await client.messages.create(
+        routed = await llm_router.complete("provider-compatibility", configured(anthropic_candidate(
+            CachedPrompt(COMPATIBILITY_SYSTEM_PROMPT),
+            [{"role": "user", "content": user_prompt}],
             model="claude-3-7-sonnet-20250219",
             max_tokens=1500,
-            temperature=0.3,
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
-        )
+            temperature=0.3
+        )))
+        response.headers.update(prompt_cache_headers(routed))
         
-        compatibility_result = parse_compatibility_analysis(response.content[0].text, mock_provider)
+        compatibility_result = parse_compatibility_analysis(routed.text, mock_provider)
         
         # Log the compatibility analysis
         await HIPAASecurityManager.log_audit_event(
@@ -1,17 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from pydantic import BaseModel
 from typing import List, Dict, Any
-from anthropic import AsyncAnthropic
-import os
 from app.db import get_session
+from app.llm import anthropic_client
+from app.llm.response_cache import llm_response_cache
 from app.security import HIPAASecurityManager, get_client_ip
 from sqlalchemy.ext.asyncio import AsyncSession
 import json
+import time
 
 router = APIRouter()
 
-# Configure Anthropic Claude client
-client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+# Shared async Anthropic Claude client
+client = anthropic_client
+
+TREATMENT_OPTIONS_MODEL = "claude-3-7-sonnet-20250219"
 
 class TreatmentRequest(BaseModel):
     cancer_type: str
@@ -26,8 +29,12 @@ class TreatmentResponse(BaseModel):
 async def get_treatment_options(
     request_data: TreatmentRequest,
     request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_session)
 ):
+    if client is None:
+        raise HTTPException(status_code=503, detail="Anthropic API not configured")
+
     try:
         system_prompt = """You are TreatmentArchitect, an AI expert in oncology and personalized medicine. Your role is to provide a comparative analysis of treatment options based on patient data. You must return a JSON object with a single key: 'treatmentOptions'. Each option should include fields for name, category, description, efficacy, sideEffects, duration, cost, and novelty, each with a 'value' (numeric 1-10, except for duration in months) and a 'label' (string)."""
 
@@ -39,18 +46,29 @@ async def get_treatment_options(
 
 Provide a comparative analysis of at least 3 relevant treatment modalities (e.g., Chemotherapy, Targeted Therapy, Immunotherapy). For each, provide the name, category, description, efficacy, side effects, duration, cost, and novelty. Return the response as a JSON object with a single key: 'treatmentOptions'."""
 
-        response = await client.messages.create(
-            model="claude-3-7-sonnet-20250219",
-            max_tokens=2048,
-            temperature=0.5,
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
-        )
+        async def generate() -> Dict[str, Any]:
+            message = await client.messages.create(
+                model=TREATMENT_OPTIONS_MODEL,
+                max_tokens=2048,
+                temperature=0.5,
+                system=system_prompt,
+                messages=[
+                    {"role": "user", "content": user_prompt}
+                ]
+            )
 
-        ai_response = response.content[0].text
-        parsed_response = json.loads(ai_response)
+            ai_response = message.content[0].text
+            return json.loads(ai_response)
+
+        # Same normalized inputs, same analysis: served from the LLM response cache
+        started = time.perf_counter()
+        parsed_response, cache_source = await llm_response_cache.get_or_compute(
+            "treatment-options", TREATMENT_OPTIONS_MODEL, request_data.dict(), generate
+        )
+        latency_ms = (time.perf_counter() - started) * 1000
+        print(f"🧬 Treatment options: {latency_ms:.1f}ms (cache: {cache_source})")
+        response.headers["X-LLM-Cache"] = cache_source
+        response.headers["X-Latency-MS"] = f"{latency_ms:.1f}"
 
         await HIPAASecurityManager.log_audit_event(
             session=session,
@@ -63,6 +81,7 @@ Provide a comparative analysis of at least 3 relevant treatment modalities (e.g.
             details={
                 "cancer_type": request_data.cancer_type,
                 "cancer_stage": request_data.cancer_stage,
+                "cache": cache_source,
             }
         )
 
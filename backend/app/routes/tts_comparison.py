@@ -1,13 +1,17 @@
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from typing import Optional, Literal
+from pydantic import BaseModel, Field
+from typing import List, Optional, Literal
 import os
-import httpx
 import asyncio
 import time
 from io import BytesIO
 import json
+from app.http_clients import get_http_client
+from app.voice.provider_selector import tts_selector
+from app.voice.speech import ELEVENLABS_MODEL, ELEVENLABS_VOICE_SETTINGS
+from app.voice.tts_benchmark import configured_providers, run_suite
+from app.voice.tts_cache import cached_speech, get_tts_cache_stats
 
 router = APIRouter(prefix="/api/v1/tts", tags=["tts"])
 
@@ -22,16 +26,20 @@ class TTSRequest(BaseModel):
     provider: Optional[Literal["openai", "elevenlabs", "heygen", "fastest"]] = "fastest"
     speed: Optional[float] = 0.6  # FIXED: Much slower default for natural healthcare conversation
 
-class TTSBenchmarkResult(BaseModel):
-    provider: str
-    latency_ms: int
-    audio_size_bytes: int
-    tokens_per_second: Optional[float] = None
-    quality_score: Optional[int] = None  # 1-10 scale
+class TTSBenchmarkRequest(BaseModel):
+    text: str
+    providers: Optional[List[Literal["openai", "elevenlabs", "cartesia"]]] = None  # Default: every configured provider
+    iterations: int = Field(default=5, ge=1, le=200)
+    warmups: int = Field(default=1, ge=0, le=20)
+    concurrency: int = Field(default=1, ge=1, le=20)
+    persist: bool = True
 
 @router.post("/openai")
-async def openai_tts(request: TTSRequest):
-    """OpenAI TTS - High quality, good speed, excellent healthcare voices."""
+async def openai_tts(request: TTSRequest, cache: bool = True):
+    """
+    OpenAI TTS - High quality, good speed, excellent healthcare voices.
+    Repeated phrases are served from the TTS cache; `?cache=false` always calls the provider.
+    """
     if not OPENAI_API_KEY:
         raise HTTPException(status_code=503, detail="OpenAI API key not configured")
     
@@ -40,48 +48,56 @@ async def openai_tts(request: TTSRequest):
     try:
         print(f"🎵 OpenAI TTS: {request.text[:50]}... (voice: {request.voice})")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://api.openai.com/v1/audio/speech",
-                headers={
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "tts-1-hd",  # High quality model
-                    "input": request.text,
-                    "voice": request.voice,
-                    "speed": request.speed,
-                    "response_format": "mp3"
-                }
-            )
-            
-            if response.status_code == 200:
-                audio_data = response.content
-                latency_ms = int((time.time() - start_time) * 1000)
-                
-                print(f"✅ OpenAI TTS completed: {latency_ms}ms, {len(audio_data)} bytes")
-                
-                return StreamingResponse(
-                    BytesIO(audio_data),
-                    media_type="audio/mpeg",
+        async def synthesize() -> bytes:
+            with tts_selector.measure("openai"):
+                response = await get_http_client("openai").post(
+                    "https://api.openai.com/v1/audio/speech",
                     headers={
-                        "X-Latency-MS": str(latency_ms),
-                        "X-Provider": "openai",
-                        "X-Audio-Size": str(len(audio_data)),
-                        "Cache-Control": "no-cache"
+                        "Authorization": f"Bearer {OPENAI_API_KEY}",
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "model": "tts-1-hd",  # High quality model
+                        "input": request.text,
+                        "voice": request.voice,
+                        "speed": request.speed,
+                        "response_format": "mp3"
                     }
                 )
-            else:
-                raise HTTPException(status_code=response.status_code, detail=f"OpenAI TTS failed: {response.text}")
+                if response.status_code != 200:
+                    raise HTTPException(status_code=response.status_code, detail=f"OpenAI TTS failed: {response.text}")
+                return response.content
+        
+        audio_data, cache_source = await cached_speech(
+            "openai", request.voice, request.text, synthesize,
+            speed=request.speed, model="tts-1-hd", use_cache=cache
+        )
+        latency_ms = int((time.time() - start_time) * 1000)
+        
+        print(f"✅ OpenAI TTS completed: {latency_ms}ms, {len(audio_data)} bytes (cache: {cache_source})")
+        
+        return StreamingResponse(
+            BytesIO(audio_data),
+            media_type="audio/mpeg",
+            headers={
+                "X-Latency-MS": str(latency_ms),
+                "X-Provider": "openai",
+                "X-Audio-Size": str(len(audio_data)),
+                "X-Tts-Cache": cache_source,
+                "Cache-Control": "no-cache"
+            }
+        )
                 
     except Exception as e:
         print(f"❌ OpenAI TTS error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"OpenAI TTS failed: {str(e)}")
 
 @router.post("/elevenlabs")
-async def elevenlabs_tts(request: TTSRequest):
-    """ElevenLabs TTS - Ultra-realistic voices, premium quality."""
+async def elevenlabs_tts(request: TTSRequest, cache: bool = True):
+    """
+    ElevenLabs TTS - Ultra-realistic voices, premium quality.
+    Repeated phrases are served from the TTS cache; `?cache=false` always calls the provider.
+    """
     if not ELEVENLABS_API_KEY:
         raise HTTPException(status_code=503, detail="ElevenLabs API key not configured")
     
@@ -102,43 +118,43 @@ async def elevenlabs_tts(request: TTSRequest):
     try:
         print(f"🎵 ElevenLabs TTS: {request.text[:50]}... (voice: {voice_id})")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
-                headers={
-                    "xi-api-key": ELEVENLABS_API_KEY,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "text": request.text,
-                    "model_id": "eleven_turbo_v2",  # Fastest model
-                    "voice_settings": {
-                        "stability": 0.7,
-                        "similarity_boost": 0.8,
-                        "style": 0.2,  # Professional style
-                        "use_speaker_boost": True
-                    }
-                }
-            )
-            
-            if response.status_code == 200:
-                audio_data = response.content
-                latency_ms = int((time.time() - start_time) * 1000)
-                
-                print(f"✅ ElevenLabs TTS completed: {latency_ms}ms, {len(audio_data)} bytes")
-                
-                return StreamingResponse(
-                    BytesIO(audio_data),
-                    media_type="audio/mpeg",
+        async def synthesize() -> bytes:
+            with tts_selector.measure("elevenlabs"):
+                response = await get_http_client("elevenlabs").post(
+                    f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
                     headers={
-                        "X-Latency-MS": str(latency_ms),
-                        "X-Provider": "elevenlabs",
-                        "X-Audio-Size": str(len(audio_data)),
-                        "Cache-Control": "no-cache"
+                        "xi-api-key": ELEVENLABS_API_KEY,
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "text": request.text,
+                        "model_id": ELEVENLABS_MODEL,
+                        "voice_settings": ELEVENLABS_VOICE_SETTINGS
                     }
                 )
-            else:
-                raise HTTPException(status_code=response.status_code, detail=f"ElevenLabs TTS failed: {response.text}")
+                if response.status_code != 200:
+                    raise HTTPException(status_code=response.status_code, detail=f"ElevenLabs TTS failed: {response.text}")
+                return response.content
+        
+        # Speed is not sent to ElevenLabs, so it is not part of the cache key
+        audio_data, cache_source = await cached_speech(
+            "elevenlabs", voice_id, request.text, synthesize, model=ELEVENLABS_MODEL, use_cache=cache
+        )
+        latency_ms = int((time.time() - start_time) * 1000)
+        
+        print(f"✅ ElevenLabs TTS completed: {latency_ms}ms, {len(audio_data)} bytes (cache: {cache_source})")
+        
+        return StreamingResponse(
+            BytesIO(audio_data),
+            media_type="audio/mpeg",
+            headers={
+                "X-Latency-MS": str(latency_ms),
+                "X-Provider": "elevenlabs",
+                "X-Audio-Size": str(len(audio_data)),
+                "X-Tts-Cache": cache_source,
+                "Cache-Control": "no-cache"
+            }
+        )
                 
     except Exception as e:
         print(f"❌ ElevenLabs TTS error: {str(e)}")
@@ -156,152 +172,105 @@ async def heygen_tts(request: TTSRequest):
         print(f"🎵 HeyGen TTS: {request.text[:50]}... (voice: {request.voice})")
         
         # HeyGen typically requires avatar setup, but we'll try direct TTS
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://api.heygen.com/v1/streaming.create_token",
-                headers={
-                    "x-api-key": HEYGEN_API_KEY,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "text": request.text,
-                    "voice_id": request.voice,
-                    "avatar_id": "default_professional_female"  # Healthcare-appropriate
-                }
-            )
+        response = await get_http_client("heygen").post(
+            "https://api.heygen.com/v1/streaming.create_token",
+            headers={
+                "x-api-key": HEYGEN_API_KEY,
+                "Content-Type": "application/json"
+            },
+            json={
+                "text": request.text,
+                "voice_id": request.voice,
+                "avatar_id": "default_professional_female"  # Healthcare-appropriate
+            }
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            # HeyGen typically returns a streaming token, not direct audio
+            # This would need avatar session setup for full functionality
+            latency_ms = int((time.time() - start_time) * 1000)
             
-            if response.status_code == 200:
-                data = response.json()
-                # HeyGen typically returns a streaming token, not direct audio
-                # This would need avatar session setup for full functionality
-                latency_ms = int((time.time() - start_time) * 1000)
-                
-                print(f"⚠️ HeyGen requires avatar session setup - falling back to OpenAI")
-                # Fallback to OpenAI for now
-                return await openai_tts(request)
-                
-            else:
-                print(f"⚠️ HeyGen TTS not available - falling back to OpenAI")
-                return await openai_tts(request)
+            print(f"⚠️ HeyGen requires avatar session setup - falling back to OpenAI")
+            # Fallback to OpenAI for now
+            return await openai_tts(request)
+            
+        else:
+            print(f"⚠️ HeyGen TTS not available - falling back to OpenAI")
+            return await openai_tts(request)
                 
     except Exception as e:
         print(f"⚠️ HeyGen TTS error: {str(e)} - falling back to OpenAI")
         return await openai_tts(request)
 
+# Providers the adaptive selector chooses between; probes are one short uncached synthesis
+PROBE_TEXT = "Speed test"
+if OPENAI_API_KEY:
+    tts_selector.register("openai", quality=8, reliability_bonus=20,  # OpenAI is more reliable
+                          probe=lambda: openai_tts(TTSRequest(text=PROBE_TEXT), cache=False))
+if ELEVENLABS_API_KEY:
+    tts_selector.register("elevenlabs", quality=10,  # Best quality
+                          probe=lambda: elevenlabs_tts(TTSRequest(text=PROBE_TEXT), cache=False))
+
+@router.get("/fastest")
+async def fastest_provider():
+    """Which provider /fastest would use right now, with the statistics behind the choice."""
+    start_time = time.perf_counter()
+    provider = tts_selector.choose()
+    selection_us = (time.perf_counter() - start_time) * 1_000_000
+    return {
+        "provider": provider,
+        "selection_us": round(selection_us, 2),
+        "selector": tts_selector.stats()
+    }
+
 @router.post("/fastest")
 async def fastest_tts(request: TTSRequest):
-    """Automatically select the fastest available TTS provider."""
-    
-    # Benchmark all available providers
-    results = []
-    
-    # Test OpenAI
-    if OPENAI_API_KEY:
-        try:
-            start_time = time.time()
-            test_response = await openai_tts(TTSRequest(text="Speed test", voice=request.voice))
-            latency = int((time.time() - start_time) * 1000)
-            results.append({"provider": "openai", "latency_ms": latency, "quality": 8})
-        except:
-            pass
-    
-    # Test ElevenLabs  
-    if ELEVENLABS_API_KEY:
-        try:
-            start_time = time.time()
-            test_response = await elevenlabs_tts(TTSRequest(text="Speed test", voice=request.voice))
-            latency = int((time.time() - start_time) * 1000)
-            results.append({"provider": "elevenlabs", "latency_ms": latency, "quality": 10})
-        except:
-            pass
+    """
+    Synthesize with the provider that currently scores best for healthcare.
     
-    if not results:
+    The choice comes from live latency/error statistics (app.voice.provider_selector),
+    so no provider is probed on the request path.
+    """
+    start_time = time.perf_counter()
+    provider = tts_selector.choose()
+    selection_us = (time.perf_counter() - start_time) * 1_000_000
+    if provider is None:
         raise HTTPException(status_code=503, detail="No TTS providers available")
     
-    # For healthcare, balance speed and quality
-    # ElevenLabs gets bonus for quality, OpenAI gets bonus for reliability
-    def score_provider(result):
-        speed_score = max(0, 100 - (result["latency_ms"] / 50))  # Penalty for slow
-        quality_bonus = result["quality"] * 10
-        if result["provider"] == "openai":
-            reliability_bonus = 20  # OpenAI is more reliable
-        else:
-            reliability_bonus = 0
-        return speed_score + quality_bonus + reliability_bonus
-    
-    best_provider = max(results, key=score_provider)
-    
-    print(f"🏆 Fastest TTS for healthcare: {best_provider['provider']} ({best_provider['latency_ms']}ms)")
+    print(f"🏆 Fastest TTS for healthcare: {provider} (selected in {selection_us:.1f}us)")
     
     # Use the best provider
-    if best_provider["provider"] == "elevenlabs":
-        return await elevenlabs_tts(request)
+    if provider == "elevenlabs":
+        response = await elevenlabs_tts(request)
     else:
-        return await openai_tts(request)
+        response = await openai_tts(request)
+    response.headers["X-Selection-US"] = f"{selection_us:.1f}"
+    return response
 
 @router.post("/benchmark")
-async def benchmark_all_tts(request: TTSRequest):
-    """Benchmark all available TTS providers and return results."""
-    results = []
+async def benchmark_all_tts(request: TTSBenchmarkRequest):
+    """
+    Benchmark the configured TTS providers (app.voice.tts_benchmark).
     
-    # Test OpenAI
-    if OPENAI_API_KEY:
-        try:
-            start_time = time.time()
-            response = await openai_tts(request)
-            latency_ms = int((time.time() - start_time) * 1000)
-            results.append({
-                "provider": "openai",
-                "latency_ms": latency_ms,
-                "quality_score": 8,  # High quality, reliable
-                "healthcare_optimized": True,
-                "status": "success"
-            })
-        except Exception as e:
-            results.append({
-                "provider": "openai", 
-                "status": "failed",
-                "error": str(e)
-            })
-    
-    # Test ElevenLabs
-    if ELEVENLABS_API_KEY:
-        try:
-            start_time = time.time()
-            response = await elevenlabs_tts(request)
-            latency_ms = int((time.time() - start_time) * 1000)
-            results.append({
-                "provider": "elevenlabs",
-                "latency_ms": latency_ms,
-                "quality_score": 10,  # Best quality
-                "healthcare_optimized": True,
-                "status": "success"
-            })
-        except Exception as e:
-            results.append({
-                "provider": "elevenlabs",
-                "status": "failed", 
-                "error": str(e)
-            })
+    Each provider gets `warmups` discarded requests, then `iterations` measured
+    ones at `concurrency`. Results carry TTFB/total percentiles and throughput,
+    are appended to the benchmark history, and are compared with the previous run.
+    """
+    providers = request.providers or configured_providers()
+    if not providers:
+        raise HTTPException(status_code=503, detail="No TTS providers configured")
     
-    # Test HeyGen
-    if HEYGEN_API_KEY:
-        results.append({
-            "provider": "heygen",
-            "status": "requires_avatar_setup",
-            "quality_score": 9,
-            "healthcare_optimized": True,
-            "note": "Requires avatar session for full functionality"
-        })
-    else:
-        results.append({
-            "provider": "heygen",
-            "status": "not_configured"
-        })
+    results = await run_suite(
+        providers, request.text, iterations=request.iterations, warmups=request.warmups,
+        concurrency=request.concurrency, persist=request.persist
+    )
     
+    succeeded = [result for result in results if result["succeeded"]]
     return {
         "benchmark_results": results,
-        "recommendation": "elevenlabs" if any(r.get("provider") == "elevenlabs" and r.get("status") == "success" for r in results) else "openai",
+        "recommendation": min(succeeded, key=lambda result: result["total"]["p50_ms"])["provider"] if succeeded else None,
+        "heygen": "requires_avatar_setup" if HEYGEN_API_KEY else "not_configured",
         "test_text": request.text
     }
 
@@ -312,5 +281,7 @@ async def tts_health_check():
         "openai_configured": OPENAI_API_KEY is not None,
         "elevenlabs_configured": ELEVENLABS_API_KEY is not None,
         "heygen_configured": HEYGEN_API_KEY is not None,
+        "tts_cache": get_tts_cache_stats(),
+        "provider_selector": tts_selector.stats(),
         "status": "healthy"
     }
\ No newline at end of file
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, File, UploadFile, Form
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, File, UploadFile, Form, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import os
@@ -7,13 +8,37 @@ import asyncio
 import websockets
 import httpx
 import base64
-import openai
-import anthropic
-import aiofiles
 import time
 import logging
-from pathlib import Path
 from datetime import datetime
+from app.http_clients import http_clients, upstream_client
+from app.singleflight import get_singleflight_stats
+from app.llm import anthropic_client, openai_client
+from app.llm.candidates import configured, groq_candidate
+from app.llm.prompt_cache import TokenUsage, get_prompt_cache_stats, prompt_cache_metrics
+from app.llm.routing import NoProviderAvailable, get_routing_stats, llm_router
+from app.llm.streaming import GROQ_CHAT_COMPLETIONS_URL, ThinkingFilter, stream_chat_tokens
+from app.memory import (
+    load_patient_conversation_history,
+    save_patient_conversation_history,
+    get_patient_context_summary,
+    prompt_token_metrics,
+    recent_prompt_turns,
+    count_patient_turns,
+    clear_patient_memory,
+    get_memory_stats,
+    get_memory_store,
+)
+from app.voice.deepgram_pool import CLOSE_STREAM_MESSAGE, deepgram_pool
+from app.voice.relay import RealtimeRelay, get_relay_stats
+from app.voice.sentences import SentenceSplitter
+from app.voice.preprocess import get_preprocess_stats, prepare_stt_audio
+from app.voice.prompts import build_ultra_fast_medical_prompt, get_prompt_template_stats
+from app.voice.greetings import get_greeting_stats, spliced_speech
+from app.voice.speech import CARTESIA_VOICE_ID, cartesia_speech, openai_speech
+from app.voice.tts_cache import get_tts_cache_stats
+from app.voice.uploads import upload_stats, whisper_file
+from app.voice.transport import DELIVERY_MODES, FRAME_MEDIA_TYPE, binary_audio_response, encode_audio_frame
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -46,23 +71,10 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")  # Need to add this
 CARTESIA_API_KEY = os.getenv("CARTESIA_API_KEY")  # Need to add this
 DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")  # Need to add this
+# LLM share of the voice pipeline's latency target; the LLM router hedges to stay inside it
+VOICE_LLM_LATENCY_BUDGET_MS = float(os.getenv("VOICE_LLM_LATENCY_BUDGET_MS", "800"))
 
-# Conversation Memory Configuration
-CONVERSATION_MEMORY_DIR = Path("conversation_memory")
-CONVERSATION_MEMORY_DIR.mkdir(exist_ok=True)
-
-# Initialize OpenAI client for Realtime API
-if OPENAI_API_KEY:
-    openai_client = openai.OpenAI(api_key=OPENAI_API_KEY)
-else:
-    openai_client = None
-
-# Initialize Anthropic client for Claude
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-if ANTHROPIC_API_KEY:
-    anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-else:
-    anthropic_client = None
 
 class UltraFastConfig(BaseModel):
     patient_name: str
@@ -110,7 +122,7 @@ async def realtime_voice_chat(websocket: WebSocket, patient_name: str = "Patient
                 "type": "session.update",
                 "session": {
                     "modalities": ["text", "audio"],
-                    "instructions": build_ultra_fast_medical_prompt(patient_name),
+                    "instructions": build_ultra_fast_medical_prompt(patient_name).text,
                     "voice": "shimmer",  # Natural female voice
                     "input_audio_format": "pcm16",
                     "output_audio_format": "pcm16",
@@ -131,46 +143,33 @@ async def realtime_voice_chat(websocket: WebSocket, patient_name: str = "Patient
             await openai_ws.send(json.dumps(session_config))
             print("✅ OpenAI Realtime session configured")
             
-            # Create bidirectional message forwarding
-            async def forward_to_openai():
-                try:
-                    async for message in websocket.iter_text():
-                        data = json.loads(message)
-                        await openai_ws.send(json.dumps(data))
-                except WebSocketDisconnect:
-                    print("🔌 Client WebSocket disconnected")
-                except Exception as e:
-                    print(f"❌ Error forwarding to OpenAI: {e}")
-            
-            async def forward_from_openai():
-                try:
-                    async for message in openai_ws:
-                        data = json.loads(message)
-                        
-                        # Add performance metrics
-                        if data.get("type") == "response.audio.delta":
-                            data["timestamp"] = datetime.utcnow().isoformat()
-                            data["latency_optimized"] = True
-                        
-                        await websocket.send_json(data)
-                except Exception as e:
-                    print(f"❌ Error forwarding from OpenAI: {e}")
+            # Relay frames untouched in both directions; only control events are inspected
+            def log_control_event(direction: str, event_type: str, frame):
+                if event_type == "error":
+                    print(f"❌ OpenAI Realtime error ({direction}): {frame[:200]}")
+                else:
+                    print(f"📡 Realtime {event_type} ({direction})")
             
-            # Run both forwarding tasks concurrently
-            await asyncio.gather(
-                forward_to_openai(),
-                forward_from_openai()
-            )
+            await RealtimeRelay(websocket, openai_ws, on_control=log_control_event).run()
+            print(f"🔌 Realtime session for {patient_name} closed")
             
     except Exception as e:
         print(f"❌ Realtime voice chat error: {e}")
         await websocket.send_json({"error": f"Realtime chat failed: {str(e)}"})
 
+# Max tokens buffered between the Groq stream and a slow websocket client
+GROQ_STREAM_QUEUE_SIZE = 64
+
 @router.websocket("/groq-streaming")
-async def groq_streaming_chat(websocket: WebSocket, patient_name: str = "Patient"):
+async def groq_streaming_chat(websocket: WebSocket, patient_name: str = "Patient", client: httpx.AsyncClient = Depends(upstream_client("groq"))):
     """
     Ultra-fast LLM inference using Groq (241+ tokens/second).
     For text-based interactions with minimal latency.
+
+    Tokens are forwarded as Groq streams them. A bounded queue sits between the
+    upstream reader and the websocket writer: when the client reads slowly the
+    queue fills and the reader stops pulling from Groq, and tokens that pile up
+    while a send is in flight are coalesced into a single frame.
     """
     await websocket.accept()
     
@@ -191,67 +190,90 @@ async def groq_streaming_chat(websocket: WebSocket, patient_name: str = "Patient
                     continue
                 
                 # Stream response from Groq
-                start_time = datetime.utcnow()
+                start_time = time.perf_counter()
+                token_queue: asyncio.Queue = asyncio.Queue(maxsize=GROQ_STREAM_QUEUE_SIZE)
+                
+                async def read_groq_stream():
+                    try:
+                        async for token in stream_chat_tokens(
+                            client,
+                            GROQ_CHAT_COMPLETIONS_URL,
+                            GROQ_API_KEY,
+                            {
+                                "model": "llama-3.3-70b-versatile",  # Fastest large model
+                                "messages": build_ultra_fast_medical_prompt(patient_name).openai_messages([
+                                    {
+                                        "role": "user",
+                                        "content": user_message
+                                    }
+                                ]),
+                                "temperature": 0.7,
+                                "max_tokens": 300
+                            },
+                            timeout=30.0
+                        ):
+                            await token_queue.put(token)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        # Hand upstream failures to the writer instead of losing them in the task
+                        await token_queue.put(e)
+                        return
+                    await token_queue.put(None)
                 
-                async with httpx.AsyncClient(timeout=30.0) as client:
-                    response = await client.post(
-                        "https://api.groq.com/openai/v1/chat/completions",
-                        headers={
-                            "Authorization": f"Bearer {GROQ_API_KEY}",
-                            "Content-Type": "application/json"
-                        },
-                        json={
-                            "model": "llama-3.3-70b-versatile",  # Fastest large model
-                            "messages": [
-                                {
-                                    "role": "system",
-                                    "content": build_ultra_fast_medical_prompt(patient_name)
-                                },
-                                {
-                                    "role": "user", 
-                                    "content": user_message
-                                }
-                            ],
-                            "stream": True,
-                            "temperature": 0.7,
-                            "max_tokens": 300
-                        }
-                    )
+                reader = asyncio.create_task(read_groq_stream())
                 
-                # Stream tokens as they arrive
+                # Forward tokens as they arrive
                 response_text = ""
-                async for line in response.aiter_lines():
-                    if line.startswith("data: "):
-                        chunk_data = line[6:]
-                        if chunk_data == "[DONE]":
-                            break
+                ttft_ms = None
+                frames_sent = 0
+                stream_done = False
+                try:
+                    while not stream_done:
+                        items = [await token_queue.get()]
+                        # Coalesce whatever queued up while the previous frame was sending
+                        while not token_queue.empty():
+                            items.append(token_queue.get_nowait())
                         
-                        try:
-                            chunk = json.loads(chunk_data)
-                            if chunk["choices"][0]["delta"].get("content"):
-                                token = chunk["choices"][0]["delta"]["content"]
-                                response_text += token
-                                
-                                # Send token immediately
-                                await websocket.send_json({
-                                    "type": "token",
-                                    "content": token,
-                                    "timestamp": datetime.utcnow().isoformat()
-                                })
-                        except:
+                        tokens = []
+                        for item in items:
+                            if isinstance(item, Exception):
+                                raise item
+                            if item is None:
+                                stream_done = True
+                                break
+                            tokens.append(item)
+                        if not tokens:
                             continue
+                        
+                        content = "".join(tokens)
+                        if ttft_ms is None:
+                            ttft_ms = (time.perf_counter() - start_time) * 1000
+                        response_text += content
+                        frames_sent += 1
+                        await websocket.send_json({
+                            "type": "token",
+                            "content": content,
+                            "timestamp": datetime.utcnow().isoformat()
+                        })
+                finally:
+                    if not reader.done():
+                        reader.cancel()
                 
                 # Send completion
-                end_time = datetime.utcnow()
-                latency_ms = (end_time - start_time).total_seconds() * 1000
+                latency_ms = (time.perf_counter() - start_time) * 1000
                 
                 await websocket.send_json({
                     "type": "complete",
                     "full_response": response_text,
+                    "ttft_ms": ttft_ms,
                     "latency_ms": latency_ms,
-                    "tokens_per_second": len(response_text.split()) / (latency_ms / 1000)
+                    "frames_sent": frames_sent,
+                    "tokens_per_second": len(response_text.split()) / (latency_ms / 1000) if latency_ms > 0 else 0
                 })
                 
+            except WebSocketDisconnect:
+                raise
             except Exception as e:
                 await websocket.send_json({"error": f"Groq streaming error: {str(e)}"})
                 
@@ -261,10 +283,13 @@ async def groq_streaming_chat(websocket: WebSocket, patient_name: str = "Patient
         print(f"❌ Groq streaming error: {e}")
 
 @router.post("/cartesia-tts")
-async def cartesia_ultra_fast_tts(request: dict):
+async def cartesia_ultra_fast_tts(request: dict, delivery: str = "json", client: httpx.AsyncClient = Depends(upstream_client("cartesia"))):
     """
     Ultra-fast TTS using Cartesia Sonic (40ms time-to-first-audio).
+    `?delivery=binary` returns raw audio/mpeg instead of base64 JSON.
     """
+    if delivery not in DELIVERY_MODES:
+        raise HTTPException(status_code=400, detail=f"delivery must be one of {DELIVERY_MODES}")
     if not CARTESIA_API_KEY:
         raise HTTPException(status_code=503, detail="Cartesia API not configured")
     
@@ -276,57 +301,34 @@ async def cartesia_ultra_fast_tts(request: dict):
         print(f"🎵 Cartesia Sonic TTS: {text[:50]}...")
         start_time = datetime.utcnow()
         
-        # Debug: Print exact request payload
-        request_payload = {
-            "model_id": "sonic-english",  # Sonic model for natural speech
-            "transcript": text,
-            "voice": {
-                "mode": "id",
-                "id": "5abd2130-146a-41b1-bcdb-974ea8e19f56"  # Joan - clear, warm American female voice for natural conversations
-            },
-            "output_format": {
-                "container": "mp3",
-                "encoding": "mp3", 
-                "sample_rate": 22050  # Natural speech rate
-            },
-            "language": "en",
-            "speed": "slow"  # FIXED: Use slow speed for natural, empathetic healthcare conversations
-        }
-        print(f"🔍 DEBUG Cartesia payload: {request_payload}")
+        # Greetings are spliced from pre-rendered segments; only the patient's name is synthesized
+        spliced = await spliced_speech(text, lambda segment: cartesia_speech(segment, client))
+        audio_content, cache_source = spliced or await cartesia_speech(text, client)
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                "https://api.cartesia.ai/tts/bytes",
-                headers={
-                    "X-API-Key": CARTESIA_API_KEY,
-                    "Cartesia-Version": "2024-06-10",
-                    "Content-Type": "application/json"
-                },
-                json=request_payload
-            )
+        end_time = datetime.utcnow()
+        latency_ms = (end_time - start_time).total_seconds() * 1000
         
-        if response.status_code == 200:
-            end_time = datetime.utcnow()
-            latency_ms = (end_time - start_time).total_seconds() * 1000
-            
-            print(f"✅ Cartesia TTS completed in {latency_ms:.1f}ms")
-            
-            # Convert audio to base64 for frontend
-            import base64
-            audio_content = response.content
-            audio_base64 = base64.b64encode(audio_content).decode('utf-8')
-            
-            return {
-                "audio_base64": audio_base64,
-                "latency_ms": latency_ms,
+        print(f"✅ Cartesia TTS completed in {latency_ms:.1f}ms (cache: {cache_source})")
+        
+        if delivery == "binary":
+            return binary_audio_response(audio_content, {
+                "latency_ms": f"{latency_ms:.1f}",
                 "provider": "cartesia-sonic",
-                "voice": "joan-5abd2130-146a-41b1-bcdb-974ea8e19f56",
-                "status": "success"
-            }
-        else:
-            error_detail = response.text
-            print(f"❌ Cartesia API Error {response.status_code}: {error_detail}")
-            raise HTTPException(status_code=response.status_code, detail=f"Cartesia TTS failed: {error_detail}")
+                "voice": f"joan-{CARTESIA_VOICE_ID}",
+                "tts_cache": cache_source
+            })
+        
+        # Convert audio to base64 for frontend
+        audio_base64 = base64.b64encode(audio_content).decode('utf-8')
+        
+        return {
+            "audio_base64": audio_base64,
+            "latency_ms": latency_ms,
+            "provider": "cartesia-sonic",
+            "voice": f"joan-{CARTESIA_VOICE_ID}",
+            "tts_cache": cache_source,
+            "status": "success"
+        }
             
     except Exception as e:
         print(f"❌ Cartesia TTS error: {e}")
@@ -347,28 +349,9 @@ async def deepgram_ultra_fast_stt(websocket: WebSocket):
     try:
         print("🎤 Starting Deepgram Nova-2 ultra-fast STT")
         
-        # Connect to Deepgram streaming API
-        deepgram_url = "wss://api.deepgram.com/v1/listen"
-        params = {
-            "model": "nova-2",  # Fastest, most accurate model
-            "language": "en-US",
-            "encoding": "linear16",
-            "sample_rate": "16000",
-            "channels": "1",
-            "interim_results": "true",
-            "endpointing": "300",  # 300ms silence detection
-            "vad_events": "true",
-            "punctuate": "true",
-            "smart_format": "true"
-        }
-        
-        headers = {
-            "Authorization": f"Token {DEEPGRAM_API_KEY}"
-        }
-        
-        deepgram_ws_url = f"{deepgram_url}?" + "&".join([f"{k}={v}" for k, v in params.items()])
-        
-        async with websockets.connect(deepgram_ws_url, extra_headers=headers) as deepgram_ws:
+        # Warm standby connection from the pool (connects inline if the pool is empty)
+        deepgram_ws = await deepgram_pool.acquire()
+        try:
             print("✅ Connected to Deepgram Nova-2 streaming")
             
             async def forward_audio():
@@ -378,6 +361,11 @@ async def deepgram_ultra_fast_stt(websocket: WebSocket):
                         await deepgram_ws.send(message)
                 except WebSocketDisconnect:
                     print("🔌 Audio WebSocket disconnected")
+                # Ask Deepgram to flush final results and close the stream
+                try:
+                    await deepgram_ws.send(CLOSE_STREAM_MESSAGE)
+                except Exception:
+                    pass
             
             async def forward_transcription():
                 try:
@@ -404,407 +392,13 @@ async def deepgram_ultra_fast_stt(websocket: WebSocket):
                 forward_audio(),
                 forward_transcription()
             )
+        finally:
+            await deepgram_ws.close()
             
     except Exception as e:
         print(f"❌ Deepgram STT error: {e}")
         await websocket.send_json({"error": f"Ultra-fast STT failed: {str(e)}"})
 
-def build_ultra_fast_medical_prompt(patient_name: str, journey_stage: str = "general", user_role: str = "patient", context: dict = None) -> str:
-    """Build RadiantCompass-optimized medical prompt with patient memory context and dynamic tools."""
-    
-    # Get patient context for personalization
-    patient_context = context.get("patient_context", {}) if context else {}
-    conditions = patient_context.get("conditions", [])
-    key_concerns = patient_context.get("key_concerns", [])
-    total_conversations = patient_context.get("total_conversations", 0)
-    
-    # Get available tools and triggered tools from context
-    available_tools = context.get("availableTools", []) if context else []
-    triggered_tools = context.get("triggeredTools", []) if context else []
-    
-    # Debug logging for tool integration
-    logger.info(f"🔧 DEBUG: Available tools: {len(available_tools)} - {[t.get('name') for t in available_tools]}")
-    logger.info(f"🔧 DEBUG: Triggered tools: {len(triggered_tools)} - {[t.get('name') for t in triggered_tools]}")
-    
-    # Build memory-aware introduction
-    memory_context = ""
-    if total_conversations > 0:
-        memory_context = f"""
-PATIENT MEMORY & CONTINUITY:
-- We have had {total_conversations} previous conversations
-- Known conditions: {', '.join(conditions) if conditions else 'None specified yet'}
-- Key concerns: {', '.join(key_concerns[:3]) if key_concerns else 'Exploring together'}
-- Continue our conversation with full awareness of our previous discussions
-- Reference past conversations naturally and show you remember their journey"""
-    
-    # Build dynamic tool context
-    tool_context = ""
-    if available_tools:
-        tool_names = [tool.get('name', 'Unknown Tool') for tool in available_tools]
-        tool_context = f"""
-AVAILABLE TOOLS FOR {journey_stage.upper()} STAGE:
-- You have access to: {', '.join(tool_names)}
-- These tools can help {patient_name} with stage-specific guidance
-- Naturally mention relevant tools when they would be helpful
-- Present tools as practical solutions, not just features"""
-        
-        if triggered_tools:
-            triggered_names = [tool.get('name', 'Unknown Tool') for tool in triggered_tools]
-            tool_context += f"""
-- TRIGGERED TOOLS: {', '.join(triggered_names)} (patient's message suggests these would be helpful)
-- IMPORTANT: Proactively mention using these tools and starting to track/explain immediately
-- Say things like "Let me start tracking your symptoms" or "I'll help you understand this condition"
-- Be ready to fill out forms and gather specific information"""
-    
-    # Base RadiantCompass expertise system
-    radiant_compass_expertise = f"""You are Dr. Maya, a warm and empathetic AI healthcare companion helping {patient_name}.
-
-CORE IDENTITY:
-- Dr. Maya: Caring, knowledgeable healthcare companion with perfect memory
-- Speak naturally and warmly like a trusted doctor friend
-- Expert in patient healthcare guidance and emotional support
-
-CURRENT CONTEXT:
-- Patient: {patient_name}
-- Journey Stage: {journey_stage.replace('_', ' ').title()}
-- Role: {user_role.title()}{memory_context}{tool_context}
-
-VOICE CONVERSATION RULES:
-- Speak directly as Dr. Maya - NO thinking out loud
-- Keep responses very brief (20-40 words for voice)
-- Use warm, everyday language - no medical jargon
-- Sound caring and genuinely interested in helping
-- When tools are triggered, IMMEDIATELY offer to start using them (e.g., "Let me track that symptom for you")
-- Be proactive about tool activation - don't just mention, but actively suggest starting
-- Say things like "I'll start a symptom log" or "Let me explain this condition"
-- NO verbose explanations or clinical reasoning
-- Just provide direct, compassionate responses with immediate tool activation offers"""
-
-    # Journey stage-specific expertise
-    stage_expertise = get_journey_stage_expertise(journey_stage)
-    
-    # Role-specific guidance
-    role_guidance = get_role_specific_guidance(user_role)
-    
-    # RadiantCompass features and tools
-    # Simplified features for voice conversations
-    radiant_features = """
-DR. MAYA'S SUPPORT:
-- Remember everything about your healthcare journey
-- Provide caring guidance for your specific situation
-- Help you understand next steps in simple terms
-- Connect you with the right resources when needed
-
-VOICE CONVERSATION APPROACH:
-- Listen to their concern or question
-- Respond warmly and directly as Dr. Maya
-- Keep it simple and actionable
-- Offer specific next steps or gentle guidance
-- Sound like a caring friend who knows healthcare"""
-    
-    # Ultra-low latency voice optimization  
-    latency_optimization = """
-VOICE RESPONSE RULES:
-- Maximum 40 words per response
-- Speak naturally as Dr. Maya - no thinking chains
-- Use simple, caring language
-- Be immediately helpful and supportive
-- Sound warm and genuinely interested
-
-IMPORTANT:
-- NO <thinking> tags or reasoning
-- NO verbose medical explanations
-- Just direct, empathetic responses
-- Focus on what they need right now"""
-
-    # Medical disclaimers
-    disclaimers = """
-IMPORTANT MEDICAL GUIDANCE:
-- You're a supportive AI companion, not a replacement for medical care
-- Encourage regular consultation with their healthcare team
-- Respect HIPAA privacy principles
-- Focus on support, education, and healthcare navigation
-- Direct to emergency services for urgent medical situations"""
-
-    return f"{radiant_compass_expertise}\n\n{stage_expertise}\n\n{role_guidance}\n\n{radiant_features}\n\n{latency_optimization}\n\n{disclaimers}"
-
-def get_journey_stage_expertise(stage: str) -> str:
-    """Get specialized expertise for specific journey stages."""
-    stage_expertise_map = {
-        "first_hints": """
-STAGE 1 EXPERTISE - First Hints & Initial Doctor Visit:
-- Expert in early symptom recognition and medical history taking
-- Skilled in preparing patients for first doctor visits
-- Guide initial testing and documentation strategies
-- Help identify red flags requiring immediate attention""",
-        
-        "getting_answers": """
-STAGE 2 EXPERTISE - Getting Answers & Testing:
-- Expert in diagnostic testing interpretation
-- Guide through complex medical workups
-- Help understand test results and next steps
-- Coordinate between multiple specialists and testing""",
-        
-        "the_diagnosis": """
-STAGE 3 EXPERTISE - The Diagnosis:
-- Expert in condition-specific diagnosis education
-- Help process emotional impact of diagnosis
-- Guide understanding of prognosis and treatment options
-- Prepare for care team discussions""",
-        
-        "second_opinions": """
-STAGE 4 EXPERTISE - Second Opinions & Care Teams:
-- Expert in healthcare provider matching and evaluation
-- Guide second opinion seeking strategies
-- Help build optimal care teams
-- Navigate specialist referrals and coordination""",
-        
-        "treatment_decisions": """
-STAGE 5 EXPERTISE - Treatment Decisions:
-- Expert in treatment option analysis and comparison
-- Guide shared decision-making processes
-- Help weigh risks, benefits, and personal preferences
-- Support informed consent processes""",
-        
-        "insurance_advocacy": """
-STAGE 6 EXPERTISE - Insurance & Advocacy:
-- Expert in insurance coverage optimization
-- Guide appeals and prior authorization processes
-- Help navigate healthcare financing
-- Support patient advocacy strategies""",
-        
-        "active_treatment": """
-STAGE 7 EXPERTISE - Active Treatment:
-- Expert in treatment monitoring and side effect management
-- Guide through treatment protocols and schedules
-- Help optimize treatment adherence and outcomes
-- Support during intensive treatment phases""",
-        
-        "care_coordination": """
-STAGE 8 EXPERTISE - Care Coordination:
-- Expert in multi-provider care coordination
-- Guide communication between care team members
-- Help manage complex care schedules
-- Optimize care transitions and handoffs""",
-        
-        "monitoring_adjustments": """
-STAGE 9 EXPERTISE - Monitoring & Adjustments:
-- Expert in ongoing treatment monitoring
-- Guide through dose adjustments and modifications
-- Help track symptoms and treatment response
-- Support long-term treatment optimization""",
-        
-        "family_impact": """
-STAGE 10 EXPERTISE - Family & Relationships:
-- Expert in family dynamics during illness
-- Guide caregiver support and communication
-- Help manage relationship challenges
-- Support family coordination and planning""",
-        
-        "financial_work": """
-STAGE 11 EXPERTISE - Financial & Work Impact:
-- Expert in healthcare financial planning
-- Guide workplace accommodation strategies
-- Help navigate disability and leave policies
-- Support financial assistance programs""",
-        
-        "long_term_living": """
-STAGE 12 EXPERTISE - Long-term Living:
-- Expert in chronic condition management
-- Guide lifestyle adaptations and modifications
-- Help maintain quality of life
-- Support long-term health planning"""
-    }
-    
-    return stage_expertise_map.get(stage, "GENERAL EXPERTISE - Comprehensive healthcare guidance across all journey stages")
-
-def get_role_specific_guidance(role: str) -> str:
-    """Get role-specific guidance and communication style."""
-    role_guidance_map = {
-        "patient": """
-PATIENT-FOCUSED GUIDANCE:
-- Speak directly to patient experience and concerns
-- Provide clear, accessible medical explanations
-- Focus on empowerment and self-advocacy
-- Address emotional and psychological aspects of care""",
-        
-        "caregiver": """
-CAREGIVER-FOCUSED GUIDANCE:
-- Address caregiver-specific challenges and needs
-- Provide guidance on supporting patient effectively
-- Focus on caregiver self-care and sustainability
-- Help navigate family dynamics and communication""",
-        
-        "provider": """
-PROVIDER-FOCUSED GUIDANCE:
-- Use clinical terminology and evidence-based recommendations
-- Focus on care coordination and optimization strategies
-- Provide specialist-level insights and considerations
-- Support clinical decision-making processes"""
-    }
-    
-    return role_guidance_map.get(role, "GENERAL GUIDANCE - Comprehensive support for all healthcare stakeholders")
-
-# ============================================================================
-# CONVERSATION MEMORY FUNCTIONS - JSON-based EMR Integration
-# ============================================================================
-
-async def load_patient_conversation_history(patient_id: str) -> List[Dict]:
-    """Load patient's conversation history from JSON file."""
-    try:
-        memory_file = CONVERSATION_MEMORY_DIR / f"{patient_id}_conversations.json"
-        
-        if not memory_file.exists():
-            # Create new patient record
-            initial_record = {
-                "patient_id": patient_id,
-                "created_at": datetime.utcnow().isoformat(),
-                "last_updated": datetime.utcnow().isoformat(),
-                "conversation_history": [],
-                "patient_context": {
-                    "name": patient_id.replace("patient_", "").replace("_", " ").title(),
-                    "journey_stage": "general",
-                    "user_role": "patient",
-                    "conditions": [],
-                    "key_concerns": [],
-                    "preferences": {}
-                }
-            }
-            
-            async with aiofiles.open(memory_file, 'w') as f:
-                await f.write(json.dumps(initial_record, indent=2))
-            
-            return []
-        
-        async with aiofiles.open(memory_file, 'r') as f:
-            content = await f.read()
-            data = json.loads(content)
-            return data.get("conversation_history", [])
-            
-    except Exception as e:
-        print(f"❌ Error loading conversation history for {patient_id}: {e}")
-        return []
-
-async def save_patient_conversation_history(patient_id: str, conversation_history: List[Dict]):
-    """Save patient's conversation history to JSON file."""
-    try:
-        memory_file = CONVERSATION_MEMORY_DIR / f"{patient_id}_conversations.json"
-        
-        # Load existing record or create new one
-        if memory_file.exists():
-            async with aiofiles.open(memory_file, 'r') as f:
-                content = await f.read()
-                data = json.loads(content)
-        else:
-            data = {
-                "patient_id": patient_id,
-                "created_at": datetime.utcnow().isoformat(),
-                "patient_context": {
-                    "name": patient_id.replace("patient_", "").replace("_", " ").title(),
-                    "journey_stage": "general",
-                    "user_role": "patient",
-                    "conditions": [],
-                    "key_concerns": [],
-                    "preferences": {}
-                }
-            }
-        
-        # Update conversation history and metadata
-        data["conversation_history"] = conversation_history
-        data["last_updated"] = datetime.utcnow().isoformat()
-        data["conversation_count"] = len(conversation_history)
-        
-        # Extract and update patient insights from recent conversations
-        await update_patient_insights(data, conversation_history)
-        
-        # Save updated record
-        async with aiofiles.open(memory_file, 'w') as f:
-            await f.write(json.dumps(data, indent=2))
-            
-        print(f"✅ Saved conversation history for {patient_id} ({len(conversation_history)} messages)")
-        
-    except Exception as e:
-        print(f"❌ Error saving conversation history for {patient_id}: {e}")
-
-async def update_patient_insights(patient_record: Dict, conversation_history: List[Dict]):
-    """Extract key insights from conversations to build patient context."""
-    try:
-        # Analyze recent conversations for key information
-        recent_messages = conversation_history[-10:]  # Last 10 messages
-        
-        # Extract conditions mentioned
-        conditions = set()
-        concerns = set()
-        journey_stages = set()
-        
-        for msg in recent_messages:
-            content = msg.get("content", "").lower()
-            
-            # Common condition keywords
-            condition_keywords = [
-                "cancer", "diabetes", "heart disease", "arthritis", "lupus", 
-                "fibromyalgia", "depression", "anxiety", "chronic pain", 
-                "rare disease", "autoimmune", "neurological"
-            ]
-            
-            for keyword in condition_keywords:
-                if keyword in content:
-                    conditions.add(keyword.title())
-            
-            # Journey stage tracking
-            if "journey_stage" in msg:
-                journey_stages.add(msg["journey_stage"])
-            
-            # Key concerns extraction
-            concern_phrases = [
-                "worried about", "concerned about", "afraid of", "struggling with",
-                "pain", "symptoms", "treatment", "side effects", "diagnosis"
-            ]
-            
-            for phrase in concern_phrases:
-                if phrase in content:
-                    # Extract context around the phrase
-                    context_start = max(0, content.find(phrase) - 20)
-                    context_end = min(len(content), content.find(phrase) + 50)
-                    concern_context = content[context_start:context_end].strip()
-                    if len(concern_context) > 10:
-                        concerns.add(concern_context)
-        
-        # Update patient context
-        if conditions:
-            patient_record["patient_context"]["conditions"] = list(conditions)
-        
-        if concerns:
-            patient_record["patient_context"]["key_concerns"] = list(concerns)[:5]  # Keep top 5
-        
-        if journey_stages:
-            # Use most recent journey stage
-            patient_record["patient_context"]["journey_stage"] = list(journey_stages)[-1]
-        
-        # Add conversation insights
-        patient_record["patient_context"]["total_conversations"] = len(conversation_history)
-        patient_record["patient_context"]["last_interaction"] = datetime.utcnow().isoformat()
-        
-    except Exception as e:
-        print(f"❌ Error updating patient insights: {e}")
-
-async def get_patient_context_summary(patient_id: str) -> Dict:
-    """Get a summary of patient's context for building personalized prompts."""
-    try:
-        memory_file = CONVERSATION_MEMORY_DIR / f"{patient_id}_conversations.json"
-        
-        if not memory_file.exists():
-            return {}
-        
-        async with aiofiles.open(memory_file, 'r') as f:
-            content = await f.read()
-            data = json.loads(content)
-            return data.get("patient_context", {})
-            
-    except Exception as e:
-        print(f"❌ Error loading patient context for {patient_id}: {e}")
-        return {}
-
 @router.post("/optimize-pipeline")
 async def optimize_audio_pipeline():
     """
@@ -921,7 +515,7 @@ def get_latency_recommendations(services_status: Dict) -> List[str]:
     return recommendations
 
 @router.post("/groq-chat")
-async def groq_fast_chat(request: dict):
+async def groq_fast_chat(request: dict, client: httpx.AsyncClient = Depends(upstream_client("groq"))):
     """
     Ultra-fast chat using Groq (241+ tokens/second) with conversation memory.
     """
@@ -950,57 +544,42 @@ async def groq_fast_chat(request: dict):
         context["patient_context"] = patient_context
         
         # Add current user message to history
-        conversation_history.append({
+        user_turn = {
             "role": "user",
             "content": message,
             "timestamp": datetime.utcnow().isoformat(),
             "journey_stage": journey_stage,
             "user_role": user_role
-        })
+        }
+        conversation_history.append(user_turn)
         
         start_time = datetime.utcnow()
         
-        # Debug: Print context for tool integration
-        logger.info(f"🔧 DEBUG GROQ-CHAT: Available tools in context: {context.get('availableTools', [])}")
-        logger.info(f"🔧 DEBUG GROQ-CHAT: Triggered tools in context: {context.get('triggeredTools', [])}")
-        
-        # Build messages with memory context
+        # Build messages with memory context; the stage/role/tool part of the prompt is precompiled
         system_prompt = build_ultra_fast_medical_prompt(patient_name, journey_stage, user_role, context)
-        logger.info(f"🔧 DEBUG GROQ-CHAT: System prompt length: {len(system_prompt)} chars")
-        logger.info(f"🔧 DEBUG GROQ-CHAT: Tool mentions in prompt: {'Symptom Tracker' in system_prompt}")
-        
-        messages = [
-            {
-                "role": "system",
-                "content": system_prompt
+        logger.debug("🔧 GROQ-CHAT: %d available tools, %d-char prompt suffix",
+                     len(context.get("availableTools", [])), len(system_prompt.suffix))
+        
+        # Add recent turns after the cacheable prompt prefix; older turns are covered by the rolling summary
+        recent_messages = recent_prompt_turns(conversation_history)
+        prompt_token_metrics.record("groq-chat", system_prompt.text, recent_messages)
+        messages = system_prompt.openai_messages(recent_messages)
+        
+        # Shared keep-alive client: no per-request DNS/TCP/TLS setup
+        response = await client.post(
+            "https://api.groq.com/openai/v1/chat/completions",
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": "llama-3.3-70b-versatile",  # Fastest large model on Groq
+                "messages": messages,
+                "temperature": 0.7,
+                "max_tokens": 300,
+                "stream": False  # Non-streaming for simple integration
             }
-        ]
-        
-        # Add recent conversation history (last 10 exchanges to stay within token limits)
-        recent_history = conversation_history[-20:]  # Last 20 messages (10 exchanges)
-        for msg in recent_history:
-            if msg["role"] in ["user", "assistant"]:
-                messages.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-        
-        # Use httpx for ultra-fast HTTP requests
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {GROQ_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "llama-3.3-70b-versatile",  # Fastest large model on Groq
-                    "messages": messages,
-                    "temperature": 0.7,
-                    "max_tokens": 300,
-                    "stream": False  # Non-streaming for simple integration
-                }
-            )
+        )
         
         if response.status_code == 200:
             data = response.json()
@@ -1012,25 +591,30 @@ async def groq_fast_chat(request: dict):
             end_time = datetime.utcnow()
             latency_ms = (end_time - start_time).total_seconds() * 1000
             
+            # Non-streaming, so there is no time-to-first-token; cached vs uncached input tokens only
+            usage = TokenUsage.from_openai(data.get("usage"))
+            prompt_cache_metrics.record("groq-chat", usage)
+            
             # Add assistant response to conversation history
-            conversation_history.append({
+            assistant_turn = {
                 "role": "assistant",
                 "content": ai_response,
                 "timestamp": datetime.utcnow().isoformat(),
                 "journey_stage": journey_stage,
                 "model": "groq-llama-3.3-70b",
                 "latency_ms": latency_ms
-            })
+            }
             
-            # Save updated conversation history
-            await save_patient_conversation_history(patient_id, conversation_history)
+            # Append this exchange to the conversation memory store
+            total_turns = await save_patient_conversation_history(patient_id, [user_turn, assistant_turn])
             
             return {
                 "response": ai_response,
                 "latency_ms": latency_ms,
                 "model": "groq-llama-3.3-70b",
                 "tokens_per_second": len(ai_response.split()) / (latency_ms / 1000) if latency_ms > 0 else 0,
-                "conversation_length": len(conversation_history),
+                "prompt_cache": usage.summary(),
+                "conversation_length": total_turns,
                 "patient_id": patient_id
             }
         else:
@@ -1043,7 +627,7 @@ async def groq_fast_chat(request: dict):
         raise HTTPException(status_code=500, detail=f"Ultra-fast chat failed: {str(e)}")
 
 @router.post("/deepgram-stt")
-async def deepgram_ultra_fast_stt(audio_file: UploadFile = File(...)):
+async def deepgram_ultra_fast_stt(audio_file: UploadFile = File(...), client: httpx.AsyncClient = Depends(upstream_client("deepgram"))):
     """
     Ultra-fast STT using Deepgram Nova-2 (100ms latency).
     """
@@ -1057,22 +641,21 @@ async def deepgram_ultra_fast_stt(audio_file: UploadFile = File(...)):
         # Read audio file
         audio_data = await audio_file.read()
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                "https://api.deepgram.com/v1/listen",
-                headers={
-                    "Authorization": f"Token {DEEPGRAM_API_KEY}",
-                    "Content-Type": "audio/wav"
-                },
-                params={
-                    "model": "nova-2",  # Fastest, most accurate model
-                    "language": "en-US",
-                    "punctuate": "true",
-                    "smart_format": "true",
-                    "utterances": "true"
-                },
-                content=audio_data
-            )
+        response = await client.post(
+            "https://api.deepgram.com/v1/listen",
+            headers={
+                "Authorization": f"Token {DEEPGRAM_API_KEY}",
+                "Content-Type": "audio/wav"
+            },
+            params={
+                "model": "nova-2",  # Fastest, most accurate model
+                "language": "en-US",
+                "punctuate": "true",
+                "smart_format": "true",
+                "utterances": "true"
+            },
+            content=audio_data
+        )
         
         if response.status_code == 200:
             data = response.json()
@@ -1110,17 +693,17 @@ async def deepgram_ultra_fast_stt(audio_file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Ultra-fast STT failed: {str(e)}")
 
 @router.get("/patient/{patient_id}/conversation-history")
-async def get_patient_conversation_history(patient_id: str):
-    """Retrieve patient's conversation history from JSON EMR."""
+async def get_patient_conversation_history(patient_id: str, limit: Optional[int] = None):
+    """Retrieve patient's conversation history from the conversation memory store."""
     try:
-        conversation_history = await load_patient_conversation_history(patient_id)
+        conversation_history = await load_patient_conversation_history(patient_id, limit)
         patient_context = await get_patient_context_summary(patient_id)
         
         return {
             "patient_id": patient_id,
             "conversation_history": conversation_history,
             "patient_context": patient_context,
-            "total_messages": len(conversation_history),
+            "total_messages": await count_patient_turns(patient_id),
             "last_interaction": conversation_history[-1]["timestamp"] if conversation_history else None
         }
     except Exception as e:
@@ -1130,10 +713,7 @@ async def get_patient_conversation_history(patient_id: str):
 async def clear_patient_conversation_history(patient_id: str):
     """Clear patient's conversation history (for testing or patient request)."""
     try:
-        memory_file = CONVERSATION_MEMORY_DIR / f"{patient_id}_conversations.json"
-        
-        if memory_file.exists():
-            memory_file.unlink()  # Delete the file
+        await clear_patient_memory(patient_id)
             
         return {
             "patient_id": patient_id,
@@ -1147,42 +727,36 @@ async def clear_patient_conversation_history(patient_id: str):
 async def get_conversation_memory_stats():
     """Get statistics about conversation memory system."""
     try:
-        memory_files = list(CONVERSATION_MEMORY_DIR.glob("*_conversations.json"))
-        total_patients = len(memory_files)
-        
-        total_conversations = 0
-        total_messages = 0
-        
-        for memory_file in memory_files:
-            try:
-                async with aiofiles.open(memory_file, 'r') as f:
-                    content = await f.read()
-                    data = json.loads(content)
-                    conversation_history = data.get("conversation_history", [])
-                    total_messages += len(conversation_history)
-                    # Count conversation pairs (user + assistant = 1 conversation)
-                    total_conversations += len([msg for msg in conversation_history if msg.get("role") == "user"])
-            except Exception as e:
-                print(f"Error reading {memory_file}: {e}")
-                continue
+        stats = await get_memory_stats()
+        total_patients = stats["total_patients"]
+        total_conversations = stats["total_conversations"]
+        total_messages = stats["total_messages"]
         
         return {
             "total_patients": total_patients,
             "total_conversations": total_conversations,
             "total_messages": total_messages,
             "average_messages_per_patient": total_messages / total_patients if total_patients > 0 else 0,
-            "memory_directory": str(CONVERSATION_MEMORY_DIR),
+            "memory_backend": stats["memory_backend"],
+            "cache": stats["cache"],
+            "write_behind": stats["write_behind"],
+            "patient_locks": stats["patient_locks"],
+            "summaries": stats["summaries"],
+            "prompt_tokens": stats["prompt_tokens"],
             "status": "operational"
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get memory stats: {str(e)}")
 
 @router.post("/text-to-speech")
-async def ultra_low_latency_text_to_speech(request: TTSRequest):
+async def ultra_low_latency_text_to_speech(request: TTSRequest, delivery: str = "json"):
     """
     Ultra-low latency text-to-speech for voice chat greeting.
     Uses OpenAI TTS for fast audio generation.
+    `?delivery=binary` returns raw audio/mpeg instead of base64 JSON.
     """
+    if delivery not in DELIVERY_MODES:
+        raise HTTPException(status_code=400, detail=f"delivery must be one of {DELIVERY_MODES}")
     if not openai_client:
         raise HTTPException(status_code=503, detail="OpenAI API not configured")
     
@@ -1194,21 +768,21 @@ async def ultra_low_latency_text_to_speech(request: TTSRequest):
         print(f"🎵 Ultra-low latency TTS: {text[:50]}...")
         start_time = time.time()
         
-        # Use OpenAI's TTS API with optimized settings for speed
-        response = openai_client.audio.speech.create(
-            model="tts-1",  # Fast model for real-time
-            voice="nova",   # Natural female voice - warm and engaging
-            input=text,
-            speed=0.6,      # FIXED: Much slower for natural healthcare conversation
-            response_format="mp3"
-        )
+        spliced = await spliced_speech(text, openai_speech)
+        audio_content, cache_source = spliced or await openai_speech(text)
         
         latency_ms = int((time.time() - start_time) * 1000)
-        print(f"✅ Ultra-low latency TTS completed: {latency_ms}ms")
+        print(f"✅ Ultra-low latency TTS completed: {latency_ms}ms (cache: {cache_source})")
+        
+        if delivery == "binary":
+            return binary_audio_response(audio_content, {
+                "latency_ms": latency_ms,
+                "provider": "openai",
+                "voice": "nova",
+                "tts_cache": cache_source
+            })
         
         # Convert audio to base64 for frontend
-        import base64
-        audio_content = response.content
         audio_base64 = base64.b64encode(audio_content).decode('utf-8')
         
         return {
@@ -1216,6 +790,7 @@ async def ultra_low_latency_text_to_speech(request: TTSRequest):
             "latency_ms": latency_ms,
             "provider": "openai",
             "voice": "nova",
+            "tts_cache": cache_source,
             "status": "success"
         }
         
@@ -1223,13 +798,85 @@ async def ultra_low_latency_text_to_speech(request: TTSRequest):
         print(f"❌ Ultra-low latency TTS error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"TTS failed: {str(e)}")
 
+async def transcribe_voice_audio(audio_content: bytes, deepgram_client: httpx.AsyncClient,
+                                 content_type: str = "audio/wav", suffix: str = ".wav"):
+    """Speech-to-text with Deepgram, falling back to OpenAI Whisper. Returns (transcript, provider)."""
+    if DEEPGRAM_API_KEY:
+        print("⚡ Using Deepgram Nova-3 for ultra-fast STT...")
+        stt_response = await deepgram_client.post(
+            "https://api.deepgram.com/v1/listen",
+            timeout=5.0,
+            headers={
+                "Authorization": f"Token {DEEPGRAM_API_KEY}",
+                "Content-Type": content_type
+            },
+            params={
+                "model": "nova-2-general",  # Latest ultra-fast model
+                "language": "en-US",
+                "punctuate": "true",
+                "smart_format": "true",
+                "diarize": "false",  # Disable for speed
+                "utterances": "false"  # Disable for speed
+            },
+            content=audio_content
+        )
+
+        if stt_response.status_code == 200:
+            stt_data = stt_response.json()
+            transcript = ""
+            if stt_data.get("results") and stt_data["results"].get("channels"):
+                alternatives = stt_data["results"]["channels"][0].get("alternatives", [])
+                if alternatives:
+                    transcript = alternatives[0].get("transcript", "")
+
+            stt_provider = "Deepgram-Nova-2"
+        else:
+            raise Exception(f"Deepgram STT failed: {stt_response.status_code}")
+    else:
+        # Fallback to OpenAI Whisper if Deepgram not available
+        print("⚠️ Deepgram not available, falling back to OpenAI Whisper...")
+        if not openai_client:
+            raise HTTPException(status_code=503, detail="No STT service available")
+
+        transcript_response = await openai_client.audio.transcriptions.create(
+            model="whisper-1",
+            file=whisper_file(audio_content, suffix, content_type),
+            language="en"
+        )
+
+        transcript = transcript_response.text
+        stt_provider = "OpenAI-Whisper"
+    
+    return transcript, stt_provider
+
+async def synthesize_voice_audio(text: str, cartesia_client: httpx.AsyncClient):
+    """
+    Text-to-speech with Cartesia Sonic, falling back to OpenAI TTS.
+    Returns (mp3 bytes, provider, cache source); repeated phrases come from the TTS cache.
+    """
+    if CARTESIA_API_KEY:
+        print("⚡ Using Cartesia Sonic for ultra-fast TTS...")
+        tts_audio_content, cache_source = await cartesia_speech(text, cartesia_client)
+        tts_provider = "Cartesia-Sonic"
+    else:
+        # Fallback to OpenAI TTS
+        print("⚠️ Cartesia not available, using OpenAI TTS...")
+        if not openai_client:
+            raise HTTPException(status_code=503, detail="No TTS service available")
+        tts_audio_content, cache_source = await openai_speech(text)
+        tts_provider = "OpenAI-TTS"
+    
+    return tts_audio_content, tts_provider, cache_source
+
 @router.post("/process-voice")
 async def process_voice_input(
     audio_file: UploadFile = File(...),
     patient_name: str = Form(...),
     journey_stage: str = Form(...),
     emotional_state: str = Form(...),
-    provider: str = Form(default="ultra_optimized")
+    provider: str = Form(default="ultra_optimized"),
+    deepgram_client: httpx.AsyncClient = Depends(upstream_client("deepgram")),
+    cartesia_client: httpx.AsyncClient = Depends(upstream_client("cartesia"))
 ):
     """
     ULTRA-OPTIMIZED voice processing pipeline targeting <400ms total latency:
@@ -1245,61 +892,15 @@ async def process_voice_input(
         # Step 1: Ultra-Fast STT using Deepgram Nova-3 (100ms)
         audio_content = await audio_file.read()
         
-        if DEEPGRAM_API_KEY:
-            print("⚡ Using Deepgram Nova-3 for ultra-fast STT...")
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                stt_response = await client.post(
-                    "https://api.deepgram.com/v1/listen",
-                    headers={
-                        "Authorization": f"Token {DEEPGRAM_API_KEY}",
-                        "Content-Type": "audio/wav"
-                    },
-                    params={
-                        "model": "nova-2-general",  # Latest ultra-fast model
-                        "language": "en-US",
-                        "punctuate": "true",
-                        "smart_format": "true",
-                        "diarize": "false",  # Disable for speed
-                        "utterances": "false"  # Disable for speed
-                    },
-                    content=audio_content
-                )
-            
-            if stt_response.status_code == 200:
-                stt_data = stt_response.json()
-                transcript = ""
-                if stt_data.get("results") and stt_data["results"].get("channels"):
-                    alternatives = stt_data["results"]["channels"][0].get("alternatives", [])
-                    if alternatives:
-                        transcript = alternatives[0].get("transcript", "")
-                
-                stt_provider = "Deepgram-Nova-2"
-            else:
-                raise Exception(f"Deepgram STT failed: {stt_response.status_code}")
-        else:
-            # Fallback to OpenAI Whisper if Deepgram not available
-            print("⚠️ Deepgram not available, falling back to OpenAI Whisper...")
-            if not openai_client:
-                raise HTTPException(status_code=503, detail="No STT service available")
-            
-            import tempfile
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-                temp_file.write(audio_content)
-                temp_file_path = temp_file.name
-            
-            with open(temp_file_path, 'rb') as audio:
-                transcript_response = openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio,
-                    language="en"
-                )
-            
-            transcript = transcript_response.text
-            os.unlink(temp_file_path)
-            stt_provider = "OpenAI-Whisper"
+        # Local preprocessing: 16 kHz mono, silence trimmed, clips with no speech rejected
+        prepared = await prepare_stt_audio(audio_content, audio_file.content_type)
+        preprocess_time = time.time()
+        preprocess_latency = int((preprocess_time - start_time) * 1000)
+        
+        transcript, stt_provider = await transcribe_voice_audio(prepared.audio, deepgram_client, prepared.content_type, prepared.suffix)
         
         stt_time = time.time()
-        stt_latency = int((stt_time - start_time) * 1000)
+        stt_latency = int((stt_time - preprocess_time) * 1000)
         print(f"✅ {stt_provider} STT: {stt_latency}ms - '{transcript[:50]}...'")
         
         # Step 2: Ultra-Fast AI Response using Groq (150ms)
@@ -1308,158 +909,86 @@ async def process_voice_input(
         patient_context = await get_patient_context_summary(patient_id)
         
         # Add user message to history
-        conversation_history.append({
+        user_turn = {
             "role": "user",
             "content": transcript,
             "timestamp": datetime.utcnow().isoformat(),
             "journey_stage": journey_stage,
             "user_role": "patient",
             "emotional_state": emotional_state
-        })
+        }
+        conversation_history.append(user_turn)
         
         # Build ultra-optimized system prompt for voice
         context = {"patient_context": patient_context}
         system_prompt = build_ultra_fast_medical_prompt(patient_name, journey_stage, "patient", context)
         
-        # Ultra-fast AI response with Groq (241+ tokens/second)
-        if GROQ_API_KEY:
-            print("⚡ Using Groq Llama-3.3 for ultra-fast AI response...")
-            
-            messages = [{"role": "system", "content": system_prompt}]
-            
-            # Add recent conversation history (last 6 messages for speed)
-            recent_history = conversation_history[-6:]
-            for msg in recent_history:
-                if msg["role"] in ["user", "assistant"]:
-                    messages.append({"role": msg["role"], "content": msg["content"]})
-            
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                groq_response = await client.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {GROQ_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model": "llama-3.3-70b-versatile",  # Fastest large model
-                        "messages": messages,
-                        "temperature": 0.7,
-                        "max_tokens": 150,  # Shorter for voice conversations
-                        "stream": False
-                    }
-                )
-            
-            if groq_response.status_code == 200:
-                groq_data = groq_response.json()
-                raw_response = groq_data["choices"][0]["message"]["content"]
-                
-                # CRITICAL: Strip out <thinking> tags - only use actual response
-                ai_response = extract_response_after_thinking(raw_response)
-                model_used = "Groq-Llama-3.3"
-            else:
-                raise Exception(f"Groq failed: {groq_response.status_code}")
-        else:
-            # Fallback to Claude or OpenAI
-            print("⚠️ Groq not available, using fallback AI...")
-            from app.routes.ai_chat import (
-                build_healthcare_system_prompt_with_memory,
-                get_claude_response_with_memory,
-                get_openai_response_with_memory
-            )
-            
-            system_prompt = build_healthcare_system_prompt_with_memory(
-                patient_name, emotional_state, journey_stage, patient_context
-            )
-            
-            if anthropic_client:
-                raw_response = await get_claude_response_with_memory(
-                    system_prompt, transcript, conversation_history
-                )
-                # CRITICAL: Strip out <thinking> tags - only use actual response
-                ai_response = extract_response_after_thinking(raw_response)
-                model_used = "Claude-3.5-Sonnet"
-            elif openai_client:
-                raw_response = await get_openai_response_with_memory(
-                    system_prompt, transcript, conversation_history
-                )
-                # CRITICAL: Strip out <thinking> tags - only use actual response
-                ai_response = extract_response_after_thinking(raw_response)
-                model_used = "GPT-4o-Mini"
-            else:
-                ai_response = "I apologize, but I'm having difficulty processing your request right now. Please try again."
-                model_used = "fallback"
+        # Ultra-fast AI response with Groq (241+ tokens/second), hedged/fallen back to Claude or OpenAI
+        from app.routes.ai_chat import (
+            build_healthcare_system_prompt_with_memory,
+            claude_candidate_with_memory,
+            openai_candidate_with_memory
+        )
+        
+        # Add recent conversation history (last 6 messages for speed) on top of the rolling summary
+        recent_messages = recent_prompt_turns(conversation_history, 6)
+        groq = groq_candidate(
+            system_prompt.openai_messages(recent_messages),
+            model="llama-3.3-70b-versatile",  # Fastest large model
+            label="Groq-Llama-3.3",
+            timeout=5.0,
+            temperature=0.7,
+            max_tokens=150  # Shorter for voice conversations
+        )
+        if groq:
+            groq.on_start = lambda: prompt_token_metrics.record("process-voice", system_prompt.text, recent_messages)
+        
+        fallback_prompt = build_healthcare_system_prompt_with_memory(
+            patient_name, emotional_state, journey_stage, patient_context
+        )
+        claude = claude_candidate_with_memory(fallback_prompt, conversation_history)
+        gpt = openai_candidate_with_memory(fallback_prompt, conversation_history)
+        if claude:
+            claude.label = "Claude-3.5-Sonnet"
+        if gpt:
+            gpt.label = "GPT-4o-Mini"
+        
+        try:
+            routed = await llm_router.complete("process-voice", configured(groq, claude, gpt), budget_ms=VOICE_LLM_LATENCY_BUDGET_MS)
+            # CRITICAL: Strip out <thinking> tags - only use actual response
+            ai_response = extract_response_after_thinking(routed.text)
+            model_used = routed.label
+            routing = routed.summary()
+        except NoProviderAvailable as e:
+            print(f"⚠️ {e}")
+            ai_response = "I apologize, but I'm having difficulty processing your request right now. Please try again."
+            model_used = "fallback"
+            routing = None
         
         # Add AI response to history
-        conversation_history.append({
+        assistant_turn = {
             "role": "assistant",
             "content": ai_response,
             "timestamp": datetime.utcnow().isoformat(),
             "journey_stage": journey_stage,
             "model": model_used
-        })
+        }
         
-        # Save conversation history
-        await save_patient_conversation_history(patient_id, conversation_history)
+        # Append this exchange to the conversation memory store
+        total_turns = await save_patient_conversation_history(patient_id, [user_turn, assistant_turn])
         
         ai_time = time.time()
         ai_latency = int((ai_time - stt_time) * 1000)
         print(f"✅ {model_used} AI response: {ai_latency}ms")
         
         # Step 3: Ultra-Fast TTS using Cartesia Sonic (40ms)
-        if CARTESIA_API_KEY:
-            print("⚡ Using Cartesia Sonic for ultra-fast TTS...")
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                cartesia_response = await client.post(
-                    "https://api.cartesia.ai/tts/bytes",
-                    headers={
-                        "X-API-Key": CARTESIA_API_KEY,
-                        "Cartesia-Version": "2024-06-10",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "model_id": "sonic-english",
-                        "transcript": ai_response,
-                        "voice": {
-                            "mode": "id", 
-                            "id": "5abd2130-146a-41b1-bcdb-974ea8e19f56"  # Joan - clear, warm American female voice (Dr. Maya)
-                        },
-                        "output_format": {
-                            "container": "mp3",
-                            "encoding": "mp3",
-                            "sample_rate": 22050  # Natural speech rate (consistent with other endpoint)
-                        },
-                        "language": "en",
-                        "speed": "slow",  # FIXED: Use slow speed for natural, empathetic healthcare conversations
-                        "add_timestamps": False
-                    }
-                )
-            
-            if cartesia_response.status_code == 200:
-                tts_audio_content = cartesia_response.content
-                tts_provider = "Cartesia-Sonic"
-            else:
-                raise Exception(f"Cartesia TTS failed: {cartesia_response.status_code}")
-        else:
-            # Fallback to OpenAI TTS
-            print("⚠️ Cartesia not available, using OpenAI TTS...")
-            if not openai_client:
-                raise HTTPException(status_code=503, detail="No TTS service available")
-            
-            tts_response = openai_client.audio.speech.create(
-                model="tts-1",  # Fast model
-                voice="nova",   # Dr. Maya's voice
-                input=ai_response,
-                speed=0.6,      # FIXED: Much slower speed for natural healthcare conversation
-                response_format="mp3"
-            )
-            tts_audio_content = tts_response.content
-            tts_provider = "OpenAI-TTS"
+        tts_audio_content, tts_provider, tts_cache_source = await synthesize_voice_audio(ai_response, cartesia_client)
         
         tts_time = time.time()
         tts_latency = int((tts_time - ai_time) * 1000)
         total_latency = int((tts_time - start_time) * 1000)
         
-        print(f"✅ {tts_provider} TTS: {tts_latency}ms")
+        print(f"✅ {tts_provider} TTS: {tts_latency}ms (cache: {tts_cache_source})")
         print(f"🚀 TOTAL ULTRA-OPTIMIZED PIPELINE: {total_latency}ms")
         
         # Convert audio to base64
@@ -1471,24 +1000,288 @@ async def process_voice_input(
             "response_text": ai_response,
             "audio_base64": audio_base64,
             "latency_breakdown": {
+                "preprocess_ms": preprocess_latency,
                 "stt_ms": stt_latency,
                 "ai_ms": ai_latency,
                 "tts_ms": tts_latency,
                 "total_ms": total_latency
             },
+            "audio_preprocessing": prepared.summary(),
             "providers_used": {
                 "stt": stt_provider,
                 "ai": model_used,
                 "tts": tts_provider
             },
+            "tts_cache": tts_cache_source,
+            "routing": routing,
             "performance_tier": "ultra-optimized" if total_latency < 500 else "optimized",
-            "conversation_length": len(conversation_history),
+            "conversation_length": total_turns,
             "status": "success"
         }
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Voice processing error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Voice processing failed: {str(e)}")
+
+# Streaming voice pipeline: sentences are synthesized while the LLM is still generating
+OPENAI_CHAT_COMPLETIONS_URL = "https://api.openai.com/v1/chat/completions"
+VOICE_STREAM_TTS_CONCURRENCY = int(os.getenv("VOICE_STREAM_TTS_CONCURRENCY", "3"))
+
+def _voice_stream_event(event: Dict[str, Any], audio: bytes = b"", delivery: str = "json") -> bytes:
+    if delivery == "binary":
+        return encode_audio_frame(event, audio)
+    if audio:
+        event = {**event, "audio_base64": base64.b64encode(audio).decode("utf-8")}
+    return (json.dumps(event) + "\n").encode("utf-8")
+
+@router.post("/process-voice-stream")
+async def process_voice_input_stream(
+    audio_file: UploadFile = File(...),
+    patient_name: str = Form(...),
+    journey_stage: str = Form(...),
+    emotional_state: str = Form(...),
+    delivery: str = Form(default="json"),
+    deepgram_client: httpx.AsyncClient = Depends(upstream_client("deepgram")),
+    groq_client: httpx.AsyncClient = Depends(upstream_client("groq")),
+    cartesia_client: httpx.AsyncClient = Depends(upstream_client("cartesia")),
+    openai_http_client: httpx.AsyncClient = Depends(upstream_client("openai"))
+):
+    """
+    Streaming variant of /process-voice, optimized for time-to-first-audio.
+    
+    LLM tokens are split into sentences as they arrive and each sentence is sent
+    to TTS immediately, so the first sentence is spoken while the model is still
+    writing the rest. The response is newline-delimited JSON:
+    - {"type": "transcript", ...} once STT finishes
+    - {"type": "audio", "index": n, "text": ..., "audio_base64": ...} per sentence, in order
+    - {"type": "complete", "time_to_first_audio_ms": ..., ...} at the end
+    - {"type": "error", "detail": ...} if the pipeline fails mid-stream
+    
+    With delivery=binary the same events are sent as binary audio frames
+    (app.voice.transport) carrying the raw mp3 instead of base64.
+    """
+    if delivery not in DELIVERY_MODES:
+        raise HTTPException(status_code=400, detail=f"delivery must be one of {DELIVERY_MODES}")
+    print(f"🚀 STREAMING voice processing for {patient_name} (stage: {journey_stage})")
+    start_time = time.perf_counter()
+    
+    def elapsed_ms() -> int:
+        return int((time.perf_counter() - start_time) * 1000)
+    
+    audio_content = await audio_file.read()
+    prepared = await prepare_stt_audio(audio_content, audio_file.content_type)
+    try:
+        transcript, stt_provider = await transcribe_voice_audio(prepared.audio, deepgram_client, prepared.content_type, prepared.suffix)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Voice processing error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Voice processing failed: {str(e)}")
+    stt_latency = elapsed_ms()
+    print(f"✅ {stt_provider} STT: {stt_latency}ms - '{transcript[:50]}...'")
+    
+    if GROQ_API_KEY:
+        llm_client, llm_url, llm_key = groq_client, GROQ_CHAT_COMPLETIONS_URL, GROQ_API_KEY
+        llm_model, model_used = "llama-3.3-70b-versatile", "Groq-Llama-3.3"
+    elif openai_client is not None:
+        llm_client, llm_url, llm_key = openai_http_client, OPENAI_CHAT_COMPLETIONS_URL, OPENAI_API_KEY
+        llm_model, model_used = "gpt-4o-mini", "GPT-4o-Mini"
+    else:
+        raise HTTPException(status_code=503, detail="No streaming LLM service available")
+    
+    patient_id = f"patient_{patient_name.lower().replace(' ', '_')}"
+    conversation_history = await load_patient_conversation_history(patient_id)
+    patient_context = await get_patient_context_summary(patient_id)
+    
+    user_turn = {
+        "role": "user",
+        "content": transcript,
+        "timestamp": datetime.utcnow().isoformat(),
+        "journey_stage": journey_stage,
+        "user_role": "patient",
+        "emotional_state": emotional_state
+    }
+    conversation_history.append(user_turn)
+    
+    context = {"patient_context": patient_context}
+    system_prompt = build_ultra_fast_medical_prompt(patient_name, journey_stage, "patient", context)
+    recent_messages = recent_prompt_turns(conversation_history, 6)
+    prompt_token_metrics.record("process-voice-stream", system_prompt.text, recent_messages)
+    payload = {
+        "model": llm_model,
+        "messages": system_prompt.openai_messages(recent_messages),
+        "temperature": 0.7,
+        "max_tokens": 150  # Shorter for voice conversations
+    }
+    if llm_url == OPENAI_CHAT_COMPLETIONS_URL:
+        payload["stream_options"] = {"include_usage": True}  # Groq sends usage on the last chunk unasked
+    
+    async def event_stream():
+        # (sentence, tts_task) in reply order; None when the LLM is done, or the Exception on failure
+        sentence_queue: asyncio.Queue = asyncio.Queue()
+        tts_slots = asyncio.Semaphore(VOICE_STREAM_TTS_CONCURRENCY)
+        tts_tasks: List[asyncio.Task] = []
+        response_parts: List[str] = []
+        timings: Dict[str, int] = {}
+        usage: Dict[str, TokenUsage] = {}
+        
+        async def synthesize(sentence: str):
+            async with tts_slots:
+                return await synthesize_voice_audio(sentence, cartesia_client)
+        
+        async def queue_sentences(sentences: List[str]):
+            for sentence in sentences:
+                task = asyncio.create_task(synthesize(sentence))
+                tts_tasks.append(task)
+                await sentence_queue.put((sentence, task))
+        
+        async def generate():
+            thinking = ThinkingFilter()
+            splitter = SentenceSplitter()
+            llm_started = elapsed_ms()
+            try:
+                async for token in stream_chat_tokens(llm_client, llm_url, llm_key, payload,
+                                                      on_usage=lambda reported: usage.update(llm=TokenUsage.from_openai(reported))):
+                    timings.setdefault("ttft_ms", elapsed_ms())
+                    visible = thinking.feed(token)
+                    response_parts.append(visible)
+                    await queue_sentences(splitter.feed(visible))
+                tail = thinking.flush()
+                response_parts.append(tail)
+                await queue_sentences(splitter.feed(tail) + splitter.flush())
+                timings["llm_complete_ms"] = elapsed_ms()
+                llm_ttft_ms = timings["ttft_ms"] - llm_started if "ttft_ms" in timings else None
+                prompt_cache_metrics.record("process-voice-stream", usage.get("llm"), llm_ttft_ms)
+            except Exception as e:
+                await sentence_queue.put(e)
+                return
+            await sentence_queue.put(None)
+        
+        generator = asyncio.create_task(generate())
+        try:
+            yield _voice_stream_event({
+                "type": "transcript",
+                "transcript": transcript,
+                "stt_provider": stt_provider,
+                "stt_ms": stt_latency,
+                "audio_preprocessing": prepared.summary()
+            }, delivery=delivery)
+            
+            index = 0
+            tts_provider = None
+            while True:
+                item = await sentence_queue.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                sentence, task = item
+                audio_content, tts_provider, cache_source = await task
+                timings.setdefault("time_to_first_audio_ms", elapsed_ms())
+                yield _voice_stream_event({
+                    "type": "audio",
+                    "index": index,
+                    "text": sentence,
+                    "format": "mp3",
+                    "tts_cache": cache_source,
+                    "elapsed_ms": elapsed_ms()
+                }, audio_content, delivery)
+                index += 1
+            
+            ai_response = "".join(response_parts).strip()
+            assistant_turn = {
+                "role": "assistant",
+                "content": ai_response,
+                "timestamp": datetime.utcnow().isoformat(),
+                "journey_stage": journey_stage,
+                "model": model_used
+            }
+            total_turns = await save_patient_conversation_history(patient_id, [user_turn, assistant_turn])
+            
+            total_latency = elapsed_ms()
+            print(f"✅ STREAMING PIPELINE: first audio {timings.get('time_to_first_audio_ms')}ms, total {total_latency}ms ({index} sentences)")
+            
+            yield _voice_stream_event({
+                "type": "complete",
+                "transcript": transcript,
+                "response_text": ai_response,
+                "time_to_first_audio_ms": timings.get("time_to_first_audio_ms"),
+                "latency_breakdown": {
+                    "stt_ms": stt_latency,
+                    "ttft_ms": timings.get("ttft_ms"),
+                    "llm_complete_ms": timings.get("llm_complete_ms"),
+                    "time_to_first_audio_ms": timings.get("time_to_first_audio_ms"),
+                    "total_ms": total_latency
+                },
+                "providers_used": {
+                    "stt": stt_provider,
+                    "ai": model_used,
+                    "tts": tts_provider
+                },
+                "prompt_cache": usage["llm"].summary() if "llm" in usage else None,
+                "sentences": index,
+                "conversation_length": total_turns,
+                "status": "success"
+            }, delivery=delivery)
+        except Exception as e:
+            print(f"❌ Streaming voice processing error: {str(e)}")
+            yield _voice_stream_event({"type": "error", "detail": f"Voice processing failed: {str(e)}"}, delivery=delivery)
+        finally:
+            # Client disconnects and failures must not leave LLM or TTS requests running
+            generator.cancel()
+            for task in tts_tasks:
+                task.cancel()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type=FRAME_MEDIA_TYPE if delivery == "binary" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.websocket("/tts-stream")
+async def binary_tts_stream(websocket: WebSocket, client: httpx.AsyncClient = Depends(upstream_client("cartesia"))):
+    """
+    Text-to-speech over a websocket with binary delivery.
+    
+    The client sends JSON text messages {"text": "...", "id": "optional"}; each
+    one is answered with a single binary audio frame (app.voice.transport)
+    whose metadata carries id, provider, format, tts_cache and latency_ms. Failures are
+    answered with a frame of type "error" and no payload.
+    """
+    await websocket.accept()
+    print("🔊 Binary TTS stream connected")
+    
+    try:
+        while True:
+            message = await websocket.receive_json()
+            utterance_id = message.get("id")
+            text = (message.get("text") or "").strip()
+            if not text:
+                await websocket.send_bytes(encode_audio_frame({"type": "error", "id": utterance_id, "detail": "Text is required"}))
+                continue
+            
+            start_time = time.perf_counter()
+            try:
+                audio_content, tts_provider, cache_source = await synthesize_voice_audio(text, client)
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e)
+                print(f"❌ Binary TTS stream error: {detail}")
+                await websocket.send_bytes(encode_audio_frame({"type": "error", "id": utterance_id, "detail": detail}))
+                continue
+            
+            await websocket.send_bytes(encode_audio_frame({
+                "type": "audio",
+                "id": utterance_id,
+                "provider": tts_provider,
+                "format": "mp3",
+                "tts_cache": cache_source,
+                "latency_ms": int((time.perf_counter() - start_time) * 1000)
+            }, audio_content))
+    
+    except WebSocketDisconnect:
+        print("🔌 Binary TTS stream disconnected")
 
 @router.get("/health")
 async def ultra_low_latency_health():
@@ -1499,7 +1292,18 @@ async def ultra_low_latency_health():
         "cartesia_available": CARTESIA_API_KEY is not None,
         "deepgram_available": DEEPGRAM_API_KEY is not None,
         "conversation_memory_enabled": True,
-        "memory_directory": str(CONVERSATION_MEMORY_DIR),
+        "memory_backend": get_memory_store().backend_name,
+        "upstream_http": http_clients.stats(),
+        "realtime_relay": get_relay_stats(),
+        "deepgram_pool": deepgram_pool.stats(),
+        "stt_audio_preprocessing": get_preprocess_stats(),
+        "whisper_uploads": dict(upload_stats),
+        "tts_cache": get_tts_cache_stats(),
+        "greeting_warmup": get_greeting_stats(),
+        "llm_routing": get_routing_stats(),
+        "prompt_cache": get_prompt_cache_stats(),
+        "prompt_templates": get_prompt_template_stats(),
+        "singleflight": get_singleflight_stats(),
         "target_latency": "200-500ms total",
         "status": "ready_for_optimization"
     }
\ No newline at end of file
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 import os
@@ -7,6 +7,7 @@ import json
 import asyncio
 from jose import jwt
 from datetime import datetime, timedelta
+from app.http_clients import upstream_client
 
 router = APIRouter(prefix="/api/v1/videosdk", tags=["videosdk"])
 
@@ -64,7 +65,7 @@ class AgentRequest(BaseModel):
     avatar_config: Optional[Dict[str, Any]] = None
 
 @router.post("/create-room", response_model=RoomResponse)
-async def create_room(request: RoomRequest):
+async def create_room(request: RoomRequest, client: httpx.AsyncClient = Depends(upstream_client("videosdk"))):
     """
     Create a new VideoSDK room for AI avatar interaction.
     """
@@ -86,33 +87,33 @@ async def create_room(request: RoomRequest):
             "name": request.room_name
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{VIDEOSDK_BASE_URL}/v2/rooms",
-                headers=headers,
-                json=payload
-            )
+        response = await client.post(
+            f"{VIDEOSDK_BASE_URL}/v2/rooms",
+            timeout=30.0,
+            headers=headers,
+            json=payload
+        )
+        
+        print(f"📡 VideoSDK Room API Response Status: {response.status_code}")
+        
+        if response.status_code == 200:
+            data = response.json()
+            room_id = data.get("roomId")
             
-            print(f"📡 VideoSDK Room API Response Status: {response.status_code}")
+            print(f"✅ VideoSDK room created successfully: {room_id}")
             
-            if response.status_code == 200:
-                data = response.json()
-                room_id = data.get("roomId")
-                
-                print(f"✅ VideoSDK room created successfully: {room_id}")
-                
-                return RoomResponse(
-                    room_id=room_id,
-                    auth_token=VIDEOSDK_AUTH_TOKEN,
-                    room_url=f"https://videosdk.live/room/{room_id}"
-                )
-            else:
-                error_text = response.text
-                print(f"❌ VideoSDK Room API Error: {response.status_code} - {error_text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"VideoSDK room creation failed: {error_text}"
-                )
+            return RoomResponse(
+                room_id=room_id,
+                auth_token=VIDEOSDK_AUTH_TOKEN,
+                room_url=f"https://videosdk.live/room/{room_id}"
+            )
+        else:
+            error_text = response.text
+            print(f"❌ VideoSDK Room API Error: {response.status_code} - {error_text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"VideoSDK room creation failed: {error_text}"
+            )
                 
     except httpx.TimeoutException:
         print("❌ VideoSDK Room API timeout")
@@ -122,7 +123,7 @@ async def create_room(request: RoomRequest):
         raise HTTPException(status_code=500, detail=f"Room creation failed: {str(e)}")
 
 @router.post("/start-agent")
-async def start_agent(request: AgentRequest):
+async def start_agent(request: AgentRequest, client: httpx.AsyncClient = Depends(upstream_client("videosdk"))):
     """
     Start an AI agent in a VideoSDK room.
     Note: VideoSDK AI agent functionality may not be available in current plan.
@@ -165,31 +166,30 @@ async def start_agent(request: AgentRequest):
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                f"{VIDEOSDK_BASE_URL}/v2/agents/start",
-                headers=headers,
-                json=agent_config
+        response = await client.post(
+            f"{VIDEOSDK_BASE_URL}/v2/agents/start",
+            headers=headers,
+            json=agent_config
+        )
+        
+        print(f"📡 VideoSDK Agent API Response Status: {response.status_code}")
+        
+        if response.status_code == 200:
+            data = response.json()
+            print(f"✅ AI agent started successfully: {data}")
+            return {
+                "status": "success",
+                "agent_id": data.get("agent_id"),
+                "room_id": request.room_id,
+                "message": f"Dr. Maya is now active in the room"
+            }
+        else:
+            error_text = response.text
+            print(f"❌ VideoSDK Agent API Error: {response.status_code} - {error_text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"VideoSDK agent start failed: {error_text}"
             )
-            
-            print(f"📡 VideoSDK Agent API Response Status: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                print(f"✅ AI agent started successfully: {data}")
-                return {
-                    "status": "success",
-                    "agent_id": data.get("agent_id"),
-                    "room_id": request.room_id,
-                    "message": f"Dr. Maya is now active in the room"
-                }
-            else:
-                error_text = response.text
-                print(f"❌ VideoSDK Agent API Error: {response.status_code} - {error_text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"VideoSDK agent start failed: {error_text}"
-                )
                 
     except httpx.TimeoutException:
         print("❌ VideoSDK Agent API timeout")
@@ -204,7 +204,7 @@ class AgentSpeakRequest(BaseModel):
     voice_config: Optional[Dict[str, Any]] = None
 
 @router.post("/agent-speak")
-async def agent_speak(request: AgentSpeakRequest):
+async def agent_speak(request: AgentSpeakRequest, client: httpx.AsyncClient = Depends(upstream_client("videosdk"))):
     """
     Make the AI agent speak text in the room.
     """
@@ -233,23 +233,23 @@ async def agent_speak(request: AgentSpeakRequest):
             "voice_config": voice_config
         }
         
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.post(
-                f"{VIDEOSDK_BASE_URL}/v2/agents/speak",
-                headers=headers,
-                json=payload
+        response = await client.post(
+            f"{VIDEOSDK_BASE_URL}/v2/agents/speak",
+            timeout=15.0,
+            headers=headers,
+            json=payload
+        )
+        
+        if response.status_code == 200:
+            print("✅ VideoSDK agent speech initiated")
+            return {"status": "success", "message": "Agent is speaking"}
+        else:
+            error_text = response.text
+            print(f"❌ VideoSDK agent speak error: {response.status_code} - {error_text}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Agent speak error: {error_text}"
             )
-            
-            if response.status_code == 200:
-                print("✅ VideoSDK agent speech initiated")
-                return {"status": "success", "message": "Agent is speaking"}
-            else:
-                error_text = response.text
-                print(f"❌ VideoSDK agent speak error: {response.status_code} - {error_text}")
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Agent speak error: {error_text}"
-                )
                 
     except Exception as e:
         print(f"❌ Error making VideoSDK agent speak: {str(e)}")
@@ -260,7 +260,7 @@ class AgentStopRequest(BaseModel):
     agent_id: str
 
 @router.post("/stop-agent")
-async def stop_agent(request: AgentStopRequest):
+async def stop_agent(request: AgentStopRequest, client: httpx.AsyncClient = Depends(upstream_client("videosdk"))):
     """
     Stop an AI agent in a VideoSDK room.
     """
@@ -281,21 +281,20 @@ async def stop_agent(request: AgentStopRequest):
             "agent_id": request.agent_id
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.delete(
-                f"{VIDEOSDK_BASE_URL}/v2/agents/stop",
-                headers=headers,
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                print("✅ VideoSDK agent stopped successfully")
-                return {"status": "success", "message": "Agent stopped"}
-            else:
-                error_text = response.text
-                print(f"❌ VideoSDK agent stop error: {response.status_code} - {error_text}")
-                # Don't raise exception for stop errors, just log
-                return {"status": "warning", "message": f"Stop warning: {error_text}"}
+        response = await client.delete(
+            f"{VIDEOSDK_BASE_URL}/v2/agents/stop",
+            headers=headers,
+            json=payload
+        )
+        
+        if response.status_code == 200:
+            print("✅ VideoSDK agent stopped successfully")
+            return {"status": "success", "message": "Agent stopped"}
+        else:
+            error_text = response.text
+            print(f"❌ VideoSDK agent stop error: {response.status_code} - {error_text}")
+            # Don't raise exception for stop errors, just log
+            return {"status": "warning", "message": f"Stop warning: {error_text}"}
                 
     except Exception as e:
         print(f"❌ Error stopping VideoSDK agent: {str(e)}")
@@ -379,7 +378,7 @@ async def videosdk_health_check():
     }
 
 @router.get("/rooms/{room_id}/info")
-async def get_room_info(room_id: str):
+async def get_room_info(room_id: str, client: httpx.AsyncClient = Depends(upstream_client("videosdk"))):
     """Get information about a VideoSDK room."""
     if not VIDEOSDK_API_KEY:
         raise HTTPException(status_code=503, detail="VideoSDK API key not configured")
@@ -391,20 +390,19 @@ async def get_room_info(room_id: str):
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                f"{VIDEOSDK_BASE_URL}/v2/rooms/{room_id}",
-                headers=headers
+        response = await client.get(
+            f"{VIDEOSDK_BASE_URL}/v2/rooms/{room_id}",
+            headers=headers
+        )
+        
+        if response.status_code == 200:
+            return response.json()
+        else:
+            error_text = response.text
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Room info error: {error_text}"
             )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                error_text = response.text
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Room info error: {error_text}"
-                )
                 
     except Exception as e:
         print(f"❌ Error getting room info: {str(e)}")
@@ -0,0 +1,125 @@
+"""
+Request coalescing (single-flight) for identical in-flight upstream calls.
+
+When many clients ask for the same thing at the same moment, e.g. a clinic
+dashboard loading, each request used to trigger its own upstream call.
+`SingleFlight.do(key, fn)` runs `fn` once per key at a time. Callers that
+arrive while the call is running await the same result, or the same
+exception. Nothing is kept once the call finishes; pair it with a cache
+(e.g. app.llm.response_cache) to serve later requests.
+
+The shared call runs in its own task, so a caller that disconnects does not
+cancel the work for the others still waiting on it.
+
+`@singleflight("name")` applies the same to an async function or route. The
+key is built from its arguments; see `request_key`.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+class SingleFlight:
+    """One in-flight call per key; concurrent identical callers share its outcome."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_waiters = 0
+        self._waiters: Dict[Hashable, int] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """(result of fn, whether it was shared with an earlier identical caller)."""
+        self.calls += 1
+        task = self._inflight.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+            self._waiters[key] += 1
+            self.max_waiters = max(self.max_waiters, self._waiters[key])
+        else:
+            self.executions += 1
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            self._waiters[key] = 1
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(task), shared
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            del self._waiters[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    def stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_rate": self.coalesced / self.calls if self.calls else 0.0,
+            "errors": self.errors,
+            "inflight": len(self._inflight),
+            "max_waiters": self.max_waiters
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def singleflight_group(name: str) -> SingleFlight:
+    """The process-wide group with this name, created on first use."""
+    if name not in _groups:
+        _groups[name] = SingleFlight(name)
+    return _groups[name]
+
+
+def _key_value(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.dict()
+    if isinstance(value, (str, int, float, bool, type(None), list, tuple, dict)):
+        return value
+    return None  # Injected dependencies (HTTP clients, sessions) don't change the answer
+
+
+def request_key(*args, **kwargs) -> str:
+    """Hash of the JSON-representable arguments: pydantic models, primitives and containers."""
+    payload = {
+        "args": [_key_value(arg) for arg in args],
+        "kwargs": {name: _key_value(value) for name, value in sorted(kwargs.items())}
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def singleflight(name: str, key: Optional[Callable[..., Hashable]] = None):
+    """
+    Coalesce concurrent identical calls of an async function (or FastAPI route).
+
+    `key` receives the call's arguments and defaults to `request_key`. The
+    signature is preserved, so FastAPI still sees the route's parameters and
+    dependencies.
+    """
+    group = singleflight_group(name)
+    make_key = key or request_key
+
+    def decorator(fn: Callable[..., Awaitable[Any]]):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            result, _ = await group.do(make_key(*args, **kwargs), lambda: fn(*args, **kwargs))
+            return result
+        return wrapper
+
+    return decorator
+
+
+def get_singleflight_stats() -> Dict:
+    return {name: group.stats() for name, group in _groups.items()}
@@ -0,0 +1,3 @@
+"""
+Voice pipeline building blocks shared by the voice routers.
+"""
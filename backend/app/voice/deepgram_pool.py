@@ -0,0 +1,205 @@
+"""
+Warm standby pool of Deepgram streaming connections.
+
+Opening the Deepgram websocket (DNS, TCP, TLS, HTTP upgrade, auth) adds a
+connect round trip to the first utterance of every STT session.
+`DeepgramConnectionPool` keeps `DEEPGRAM_POOL_SIZE` connections open ahead of
+time. It sends each one Deepgram's `KeepAlive` message every
+`DEEPGRAM_KEEPALIVE_SECONDS` so Deepgram does not close it for inactivity, and
+recycles connections older than `DEEPGRAM_POOL_MAX_AGE_SECONDS`. A new session
+takes a ready connection instantly. A background task refills the pool
+afterwards.
+
+Deepgram streams are single-use: a checked-out connection belongs to its
+session and is closed by it. The pool only ever hands out fresh connections.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import websockets
+
+DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
+DEEPGRAM_POOL_SIZE = int(os.getenv("DEEPGRAM_POOL_SIZE", "2"))
+DEEPGRAM_KEEPALIVE_SECONDS = float(os.getenv("DEEPGRAM_KEEPALIVE_SECONDS", "5"))
+DEEPGRAM_POOL_MAX_AGE_SECONDS = float(os.getenv("DEEPGRAM_POOL_MAX_AGE_SECONDS", "600"))
+
+DEEPGRAM_LISTEN_URL = "wss://api.deepgram.com/v1/listen"
+
+# Streaming settings used by /ultra-low-latency/deepgram-stt
+DEEPGRAM_STREAM_PARAMS = {
+    "model": "nova-2",  # Fastest, most accurate model
+    "language": "en-US",
+    "encoding": "linear16",
+    "sample_rate": "16000",
+    "channels": "1",
+    "interim_results": "true",
+    "endpointing": "300",  # 300ms silence detection
+    "vad_events": "true",
+    "punctuate": "true",
+    "smart_format": "true"
+}
+
+KEEPALIVE_MESSAGE = json.dumps({"type": "KeepAlive"})
+CLOSE_STREAM_MESSAGE = json.dumps({"type": "CloseStream"})
+
+
+def _is_open(connection) -> bool:
+    return bool(getattr(connection, "open", False))
+
+
+class DeepgramConnectionPool:
+    """Pre-opened Deepgram streaming websockets handed out to new STT sessions."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = DEEPGRAM_API_KEY,
+        params: Dict[str, str] = DEEPGRAM_STREAM_PARAMS,
+        size: int = DEEPGRAM_POOL_SIZE,
+        keepalive_seconds: float = DEEPGRAM_KEEPALIVE_SECONDS,
+        max_age_seconds: float = DEEPGRAM_POOL_MAX_AGE_SECONDS
+    ):
+        self.api_key = api_key
+        self.url = f"{DEEPGRAM_LISTEN_URL}?" + "&".join(f"{k}={v}" for k, v in params.items())
+        self.size = size
+        self.keepalive_seconds = keepalive_seconds
+        self.max_age_seconds = max_age_seconds
+        self._idle: Deque[Tuple[object, float]] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._failures = 0
+        self.opened = 0
+        self.connect_failures = 0
+        self.recycled = 0
+        self.hits = 0
+        self.misses = 0
+        self.connect_ms_total = 0.0
+        self.miss_wait_ms_total = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key) and self.size > 0
+
+    async def start(self) -> None:
+        """Start filling the pool in the background; called on application startup."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._maintain())
+            print(f"🎤 Deepgram warm pool starting ({self.size} standby connections)")
+
+    async def _connect(self):
+        started = time.perf_counter()
+        connection = await websockets.connect(self.url, extra_headers={"Authorization": f"Token {self.api_key}"})
+        self.opened += 1
+        self.connect_ms_total += (time.perf_counter() - started) * 1000
+        return connection
+
+    async def acquire(self):
+        """Return an open Deepgram streaming connection, warm if one is available."""
+        while self._idle:
+            connection, _ = self._idle.popleft()
+            if _is_open(connection):
+                self.hits += 1
+                self._wakeup.set()
+                return connection
+            self.recycled += 1
+
+        # Pool empty (cold start, burst or disabled): connect inline
+        self.misses += 1
+        self._wakeup.set()
+        started = time.perf_counter()
+        connection = await self._connect()
+        self.miss_wait_ms_total += (time.perf_counter() - started) * 1000
+        return connection
+
+    async def _maintain(self) -> None:
+        last_keepalive = time.monotonic()
+        while True:
+            self._wakeup.clear()
+            await self._prune()
+            if time.monotonic() - last_keepalive >= self.keepalive_seconds:
+                await self._keepalive()
+                last_keepalive = time.monotonic()
+            await self._fill()
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.keepalive_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fill(self) -> None:
+        while len(self._idle) < self.size:
+            try:
+                connection = await self._connect()
+            except Exception as e:
+                self.connect_failures += 1
+                self._failures += 1
+                backoff = min(30.0, 2.0 ** self._failures)
+                print(f"⚠️ Deepgram standby connection failed ({e}); retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                return
+            self._failures = 0
+            self._idle.append((connection, time.monotonic()))
+
+    async def _prune(self) -> None:
+        now = time.monotonic()
+        stale = [
+            entry for entry in self._idle
+            if not _is_open(entry[0]) or now - entry[1] >= self.max_age_seconds
+        ]
+        # Remove before awaiting so concurrent acquire() never sees a stale entry
+        for entry in stale:
+            self._idle.remove(entry)
+        for connection, _ in stale:
+            self.recycled += 1
+            await self._close(connection)
+
+    async def _keepalive(self) -> None:
+        for connection, _ in list(self._idle):
+            try:
+                await connection.send(KEEPALIVE_MESSAGE)
+            except Exception:
+                # Dead connections are dropped by the next prune
+                pass
+
+    @staticmethod
+    async def _close(connection) -> None:
+        try:
+            await connection.close()
+        except Exception:
+            pass
+
+    async def close(self) -> None:
+        """Stop the maintenance task and close standby connections; called on shutdown."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._idle:
+            connection, _ = self._idle.popleft()
+            await self._close(connection)
+
+    def stats(self) -> Dict:
+        acquires = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "target_size": self.size,
+            "idle": len(self._idle),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / acquires if acquires else 0.0,
+            "opened": self.opened,
+            "connect_failures": self.connect_failures,
+            "recycled": self.recycled,
+            "avg_connect_ms": self.connect_ms_total / self.opened if self.opened else 0.0,
+            "avg_miss_wait_ms": self.miss_wait_ms_total / self.misses if self.misses else 0.0
+        }
+
+
+deepgram_pool = DeepgramConnectionPool()
@@ -0,0 +1,239 @@
+"""
+Greeting and stage-suggestion templates, spliced speech and cache warmup.
+
+Every voice session opens with a greeting that differs only by the patient's
+name. The templates live here with a `{name}` field. Each one is split into
+fixed segments and a short variable segment (the name plus any short words
+around it).
+
+- `warm_greeting_cache` runs once in the background at startup. It renders
+  every fixed segment for each configured voice profile into the TTS cache.
+  The disk tier keeps the result across restarts.
+- `spliced_speech` recognises a rendered template in a TTS request. It
+  synthesizes only the variable segment and concatenates it with the cached
+  fixed segments. Time-to-first-audio is then one short synthesis instead of
+  a whole paragraph.
+
+Segments are joined as raw MP3 frames; every profile in app.voice.speech
+returns MP3, which players decode as one stream.
+"""
+
+import asyncio
+import os
+import re
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.voice.speech import SPEECH_PROFILES, available_profiles
+
+GREETING_WARMUP_ENABLED = os.getenv("GREETING_WARMUP_ENABLED", "true").lower() == "true"
+# Comma-separated app.voice.speech profile names; empty warms every configured provider
+GREETING_WARMUP_PROFILES = [name.strip() for name in os.getenv("GREETING_WARMUP_PROFILES", "").split(",") if name.strip()]
+GREETING_WARMUP_CONCURRENCY = int(os.getenv("GREETING_WARMUP_CONCURRENCY", "2"))
+# Fixed text shorter than this next to the name is spoken with it ("Hello Maria!") for natural prosody
+SPLICE_MIN_FIXED_CHARS = 16
+
+NAME_FIELD = "{name}"
+
+STAGE_GREETINGS = {
+    "awareness": "Hello {name}! 🌟 Welcome to RadiantCompass. I can sense you might be exploring some health concerns, and I want you to know I'm here to support you every step of the way. Would you like me to help you understand what you're experiencing?",
+
+    "diagnosis": "Welcome back, {name}. 💙 I know receiving a diagnosis can bring up many emotions and questions. I'm here to help you process this information at your own pace and guide you through what comes next. How are you feeling today?",
+
+    "treatment": "Hi {name}! ✨ I see you're in your treatment journey. This takes incredible strength, and I'm so proud of you for taking these important steps. I'm here to support you through every aspect of your care. What would be most helpful for you right now?",
+
+    "recovery": "Hello {name}! 🌈 It's wonderful to see you in your recovery phase. You've come so far, and I'm here to help you continue moving forward with confidence. How has your recovery been going?",
+
+    "living": "Welcome, {name}! 🌟 I'm so glad to see you thriving in your ongoing journey. Living well with your condition is an ongoing process, and I'm here to help you maintain your quality of life. What brings you here today?"
+}
+
+FALLBACK_GREETING = "Hello {name}! 💙 Welcome to RadiantCompass. I'm here to support you on your healthcare journey. How can I help you today?"
+
+# Opening line of the premium voice experience
+VOICE_SESSION_GREETING = "Hello {name}, I'm Dr. Maya. I'm here to support you through every step of your journey. How can I help you today?"
+
+STAGE_SUGGESTIONS = {
+    "awareness": [
+        "Hi {name}! I notice you're exploring your symptoms. Would you like me to help you prepare questions for your next doctor's appointment? 🤝",
+        "It's completely normal to feel anxious about health concerns, {name}. I'm here to help you understand what you're experiencing step by step. ✨",
+        "Would you like me to explain any medical terms you've encountered in simple language, {name}? I love helping make complex things clear! 🌟"
+    ],
+    "diagnosis": [
+        "{name}, receiving a diagnosis can feel overwhelming. I'm here to help you process this information at your own pace. 💙",
+        "I can help you understand what your diagnosis means for your journey ahead, {name}. What questions are most important to you right now?",
+        "Would you like me to help you prepare a list of questions for your care team, {name}? I want to make sure you get all the information you need! 🌈"
+    ],
+    "treatment": [
+        "Managing treatment can feel like a lot, {name}. I'm here to help you understand your options and what to expect. What's on your mind? 🤝",
+        "I can help you explore strategies for managing treatment side effects, {name}. Your comfort and well-being are so important! ✨",
+        "Would you like me to help you organize your questions about treatment, {name}? I want to make sure you feel prepared and confident! 🌟"
+    ]
+}
+
+FALLBACK_SUGGESTIONS = [
+    "I'm here for you, {name}! How can I support you today? 💙",
+    "What questions do you have about your healthcare journey?",
+    "I'm ready to help with anything you need to understand better! ✨"
+]
+
+greeting_stats = {
+    "warmup_runs": 0,
+    "warmup_segments": 0,
+    "warmup_synthesized": 0,
+    "warmup_failures": 0,
+    "warmup_ms": None,
+    "spliced": 0,
+    "spliced_fixed_hits": 0,
+    "spliced_fixed_misses": 0
+}
+
+
+def render(template: str, name: str) -> str:
+    return template.replace(NAME_FIELD, name)
+
+
+class GreetingTemplate:
+    """One template split into fixed segments around a variable name segment."""
+
+    def __init__(self, template: str):
+        self.template = template
+        before, _, after = template.partition(NAME_FIELD)
+        # Punctuation right after the name is spoken with it ("Maria!")
+        trailing = re.match(r"[^\w\s]*", after).group(0)
+        self.prefix = before.strip()
+        self.suffix = after[len(trailing):].strip()
+        self.name_prefix = ""
+        self.name_suffix = trailing
+        if len(self.prefix) < SPLICE_MIN_FIXED_CHARS:
+            self.name_prefix, self.prefix = self.prefix, ""
+        if len(self.suffix) < SPLICE_MIN_FIXED_CHARS:
+            self.name_suffix, self.suffix = f"{trailing} {self.suffix}".rstrip(), ""
+        self.pattern = re.compile(re.escape(before) + r"(?P<name>[^\n.!?,]{1,60}?)" + re.escape(after) + r"\Z")
+
+    def match(self, text: str) -> Optional[str]:
+        matched = self.pattern.match(text)
+        return matched.group("name").strip() if matched else None
+
+    def fixed_segments(self) -> List[str]:
+        return [segment for segment in (self.prefix, self.suffix) if segment]
+
+    def segments(self, name: str) -> List[str]:
+        variable = " ".join(part for part in (self.name_prefix, f"{name}{self.name_suffix}") if part)
+        return [segment for segment in (self.prefix, variable, self.suffix) if segment]
+
+
+def _all_templates() -> List[str]:
+    templates = list(STAGE_GREETINGS.values()) + [FALLBACK_GREETING, VOICE_SESSION_GREETING]
+    for suggestions in STAGE_SUGGESTIONS.values():
+        templates.extend(suggestions)
+    return templates + FALLBACK_SUGGESTIONS
+
+
+GREETING_TEMPLATES = [GreetingTemplate(template) for template in _all_templates() if NAME_FIELD in template]
+
+
+def match_greeting(text: str) -> Optional[Tuple[GreetingTemplate, str]]:
+    """(template, name) if `text` is a rendered greeting or suggestion template."""
+    text = text.strip()
+    for template in GREETING_TEMPLATES:
+        name = template.match(text)
+        if name:
+            return template, name
+    return None
+
+
+def warmup_phrases() -> List[str]:
+    """Every fixed segment, plus the templates that have no name at all."""
+    phrases = []
+    for template in GREETING_TEMPLATES:
+        phrases.extend(template.fixed_segments())
+    phrases.extend(template for template in _all_templates() if NAME_FIELD not in template)
+    return list(dict.fromkeys(phrases))
+
+
+async def spliced_speech(text: str, speak: Callable[[str], Awaitable[Tuple[bytes, str]]]) -> Optional[Tuple[bytes, str]]:
+    """
+    Speak a rendered template from cached fixed segments plus a freshly synthesized name.
+
+    `speak` is a cached synthesis function for one voice (see app.voice.speech).
+    Returns (mp3 bytes, "spliced"), or None when `text` is not a known template.
+    """
+    matched = match_greeting(text)
+    if matched is None:
+        return None
+
+    template, name = matched
+    fixed = set(template.fixed_segments())
+    segments = template.segments(name)
+    results = await asyncio.gather(*(speak(segment) for segment in segments))
+
+    greeting_stats["spliced"] += 1
+    for segment, (_, source) in zip(segments, results):
+        if segment in fixed:
+            greeting_stats["spliced_fixed_hits" if source in ("memory", "disk") else "spliced_fixed_misses"] += 1
+    return b"".join(audio for audio, _ in results), "spliced"
+
+
+async def warm_greeting_cache(profile_names: Optional[List[str]] = None) -> Dict:
+    """Render every fixed greeting segment into the TTS cache for each voice profile."""
+    profiles = available_profiles()
+    if profile_names:
+        unknown = [name for name in profile_names if name not in SPEECH_PROFILES]
+        if unknown:
+            print(f"⚠️  Unknown greeting warmup profiles: {unknown}")
+        profiles = {name: speak for name, speak in profiles.items() if name in profile_names}
+    if not profiles:
+        print("⚠️  Greeting warmup skipped - no TTS provider configured")
+        return dict(greeting_stats)
+
+    started = time.perf_counter()
+    phrases = warmup_phrases()
+    slots = asyncio.Semaphore(GREETING_WARMUP_CONCURRENCY)
+    greeting_stats["warmup_runs"] += 1
+
+    async def warm(speak, phrase: str):
+        async with slots:
+            try:
+                _, source = await speak(phrase)
+            except Exception as e:
+                greeting_stats["warmup_failures"] += 1
+                print(f"⚠️  Greeting warmup failed for '{phrase[:40]}': {getattr(e, 'detail', None) or e}")
+                return
+        greeting_stats["warmup_segments"] += 1
+        greeting_stats["warmup_synthesized"] += source == "miss"
+
+    await asyncio.gather(*(warm(speak, phrase) for speak in profiles.values() for phrase in phrases))
+    greeting_stats["warmup_ms"] = int((time.perf_counter() - started) * 1000)
+    print(f"🔥 Greeting warmup: {len(phrases)} segments x {list(profiles)} in {greeting_stats['warmup_ms']}ms "
+          f"({greeting_stats['warmup_synthesized']} synthesized, {greeting_stats['warmup_failures']} failed)")
+    return dict(greeting_stats)
+
+
+_warmup_task: Optional[asyncio.Task] = None
+
+
+def start_greeting_warmup() -> None:
+    """Warm the greeting cache in the background so startup is not delayed."""
+    global _warmup_task
+    if GREETING_WARMUP_ENABLED and _warmup_task is None:
+        _warmup_task = asyncio.create_task(warm_greeting_cache(GREETING_WARMUP_PROFILES))
+
+
+async def stop_greeting_warmup() -> None:
+    global _warmup_task
+    if _warmup_task is not None:
+        _warmup_task.cancel()
+        try:
+            await _warmup_task
+        except asyncio.CancelledError:
+            pass
+        _warmup_task = None
+
+
+def get_greeting_stats() -> Dict:
+    return {
+        "warmup_enabled": GREETING_WARMUP_ENABLED,
+        "templates": len(GREETING_TEMPLATES),
+        "fixed_segments": len(warmup_phrases()),
+        **greeting_stats
+    }
@@ -0,0 +1,145 @@
+"""
+Vectorized audio normalization for STT uploads.
+
+Browsers record at 44.1/48 kHz, often in stereo, while Deepgram and Whisper
+work on 16 kHz mono speech. Uploading the original wastes bandwidth and
+provider time. These helpers decode WAV / raw linear16, downmix to mono,
+resample to `STT_SAMPLE_RATE` and re-encode, all as NumPy array operations.
+
+Codecs (`STT_AUDIO_CODEC`):
+- "pcm16": 16-bit PCM WAV (lossless at the target rate, the default)
+- "mulaw": G.711 µ-law WAV, 8 bits per sample (half the size, telephony
+  quality, accepted by both Deepgram and Whisper)
+
+Every function here is CPU-bound; callers run them in the audio thread pool
+(see app.voice.preprocess).
+"""
+
+import io
+import os
+import struct
+import wave
+from typing import Optional, Tuple
+
+import numpy as np
+
+STT_SAMPLE_RATE = int(os.getenv("STT_SAMPLE_RATE", "16000"))
+STT_AUDIO_CODEC = os.getenv("STT_AUDIO_CODEC", "pcm16").lower()
+AUDIO_CODECS = ("pcm16", "mulaw")
+if STT_AUDIO_CODEC not in AUDIO_CODECS:
+    print(f"⚠️  Unknown STT_AUDIO_CODEC '{STT_AUDIO_CODEC}' - using pcm16")
+    STT_AUDIO_CODEC = "pcm16"
+
+DEFAULT_PCM_SAMPLE_RATE = 16000
+RAW_PCM_CONTENT_TYPES = {"audio/l16", "audio/pcm", "audio/x-raw"}
+
+WAVE_FORMAT_MULAW = 7
+MULAW_BIAS = 0x21
+MULAW_CLIP = 8159
+
+
+def decode_audio(audio: bytes, content_type: Optional[str] = None) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    Decode WAV or raw linear16 into (float32 samples [frames, channels] in -1..1, sample rate).
+
+    Returns None for anything NumPy cannot decode on its own (webm, ogg, mp3,
+    float/extensible WAV); such clips are forwarded to STT unchanged.
+    """
+    if audio[:4] == b"RIFF" and audio[8:12] == b"WAVE":
+        try:
+            with wave.open(io.BytesIO(audio), "rb") as wav:
+                params = wav.getparams()
+                raw = wav.readframes(params.nframes)
+        except (wave.Error, EOFError):
+            return None
+        # Truncated uploads end mid-frame; keep whole frames only
+        frame_bytes = params.sampwidth * params.nchannels
+        raw = raw[:len(raw) // frame_bytes * frame_bytes] if frame_bytes else b""
+        try:
+            if params.sampwidth == 1:
+                samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+            elif params.sampwidth in (2, 4):
+                dtype = np.int16 if params.sampwidth == 2 else np.int32
+                samples = np.frombuffer(raw, dtype=dtype).astype(np.float32) / float(2 ** (8 * params.sampwidth - 1))
+            else:
+                return None
+            return samples.reshape(-1, params.nchannels), params.framerate
+        except ValueError:
+            # Anything else malformed goes to STT unchanged; Deepgram and Whisper tolerate it
+            return None
+
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in RAW_PCM_CONTENT_TYPES:
+        rate = DEFAULT_PCM_SAMPLE_RATE
+        for parameter in (content_type or "").split(";")[1:]:
+            key, _, value = parameter.partition("=")
+            if key.strip().lower() == "rate" and value.strip().isdigit():
+                rate = int(value)
+        samples = np.frombuffer(audio[:len(audio) // 2 * 2], dtype="<i2").astype(np.float32) / 32768.0
+        return samples.reshape(-1, 1), rate
+    return None
+
+
+def downmix(samples: np.ndarray) -> np.ndarray:
+    """[frames, channels] -> mono [frames]."""
+    return samples[:, 0] if samples.shape[1] == 1 else samples.mean(axis=1)
+
+
+def resample(mono: np.ndarray, source_rate: int, target_rate: int = STT_SAMPLE_RATE) -> np.ndarray:
+    """Resample with a moving-average anti-alias filter followed by linear interpolation."""
+    if source_rate == target_rate or len(mono) == 0:
+        return mono.astype(np.float32, copy=False)
+
+    ratio = source_rate / target_rate
+    if ratio > 1:
+        # Box filter as wide as the decimation step; attenuates content above the new Nyquist
+        width = int(np.ceil(ratio))
+        if width > 1:
+            kernel = np.ones(width, dtype=np.float32) / width
+            mono = np.convolve(mono, kernel, mode="same")
+        if ratio == width:
+            return mono[::width].astype(np.float32, copy=False)
+
+    target_length = int(len(mono) * target_rate / source_rate)
+    positions = np.arange(target_length, dtype=np.float64) * ratio
+    return np.interp(positions, np.arange(len(mono)), mono).astype(np.float32)
+
+
+def _mulaw_encode(mono: np.ndarray) -> bytes:
+    # G.711 µ-law on the 14-bit magnitude, as in the reference (Sun / audioop) encoder
+    pcm = np.clip(mono * 32768.0, -32768, 32767).astype(np.int32) >> 2
+    negative = pcm < 0
+    # Clipped magnitudes land on the top code (0x7F before the sign mask)
+    magnitude = np.minimum(np.minimum(np.where(negative, -pcm, pcm), MULAW_CLIP) + MULAW_BIAS, 0x1FFF)
+    segment = np.floor(np.log2(magnitude)).astype(np.int32) - 5
+    mantissa = (magnitude >> (segment + 1)) & 0x0F
+    mask = np.where(negative, 0x7F, 0xFF)
+    return (((segment << 4) | mantissa) ^ mask).astype(np.uint8).tobytes()
+
+
+def _mulaw_wav(data: bytes, sample_rate: int) -> bytes:
+    # The wave module only writes PCM, so build the 18-byte fmt chunk + fact chunk by hand
+    fmt = struct.pack("<HHIIHHH", WAVE_FORMAT_MULAW, 1, sample_rate, sample_rate, 1, 8, 0)
+    fact = struct.pack("<I", len(data))
+    pad = b"\x00" if len(data) % 2 else b""
+    body = (
+        b"WAVE"
+        + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        + b"fact" + struct.pack("<I", len(fact)) + fact
+        + b"data" + struct.pack("<I", len(data)) + data + pad
+    )
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def encode_wav(mono: np.ndarray, sample_rate: int = STT_SAMPLE_RATE, codec: Optional[str] = None) -> bytes:
+    """Encode mono float samples as a WAV file using `codec` (default STT_AUDIO_CODEC)."""
+    if (codec or STT_AUDIO_CODEC) == "mulaw":
+        return _mulaw_wav(_mulaw_encode(mono), sample_rate)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.clip(mono * 32768.0, -32768, 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
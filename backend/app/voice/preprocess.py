@@ -0,0 +1,174 @@
+"""
+STT audio preprocessing stage: normalize, trim silence, re-encode.
+
+`preprocess_stt_audio` decodes an uploaded clip once and then:
+1. downmixes it to mono and resamples it to 16 kHz (app.voice.normalize);
+2. runs local VAD on the normalized signal and trims the leading and
+   trailing silence (app.voice.vad);
+3. re-encodes the speech region with `STT_AUDIO_CODEC`.
+
+The stage is CPU-bound NumPy work. `prepare_stt_audio` runs it on a
+dedicated thread pool (`AUDIO_PREPROCESS_WORKERS`) so it never blocks the event
+loop. NumPy releases the GIL for the heavy array operations, so several
+clips can be processed in parallel. Clips that cannot be decoded locally are
+forwarded unchanged, with a content type and file suffix matching their
+real format.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.voice.normalize import STT_AUDIO_CODEC, STT_SAMPLE_RATE, decode_audio, downmix, encode_wav, resample
+from app.voice.vad import VAD_ENABLED, detect_speech, vad_stats
+
+AUDIO_PREPROCESS_WORKERS = int(os.getenv("AUDIO_PREPROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+audio_executor = ThreadPoolExecutor(max_workers=AUDIO_PREPROCESS_WORKERS, thread_name_prefix="audio-preprocess")
+
+# Upload content types forwarded as-is, and the file suffix Whisper needs to recognise them
+PASSTHROUGH_SUFFIXES = {
+    "audio/webm": ".webm",
+    "video/webm": ".webm",
+    "audio/ogg": ".ogg",
+    "audio/mpeg": ".mp3",
+    "audio/mp3": ".mp3",
+    "audio/mp4": ".m4a",
+    "audio/x-m4a": ".m4a",
+    "audio/flac": ".flac",
+    "audio/wav": ".wav",
+    "audio/x-wav": ".wav",
+}
+
+normalize_stats = {
+    "normalized": 0,
+    "passthrough": 0,
+    "resampled": 0,
+    "downmixed": 0,
+    "input_bytes_total": 0,
+    "output_bytes_total": 0,
+    "audio_seconds_total": 0.0,
+    "processing_ms_total": 0.0
+}
+
+
+class PreparedAudio:
+    """An uploaded clip after preprocessing, ready to send to STT."""
+
+    def __init__(self, audio: bytes, content_type: str = "audio/wav", suffix: str = ".wav",
+                 has_speech: bool = True, normalized: bool = False, vad_applied: bool = False,
+                 original_ms: Optional[int] = None, trimmed_ms: Optional[int] = None,
+                 input_format: Optional[Dict] = None, input_bytes: int = 0):
+        self.audio = audio
+        self.content_type = content_type
+        self.suffix = suffix
+        self.has_speech = has_speech
+        self.normalized = normalized
+        self.vad_applied = vad_applied
+        self.original_ms = original_ms
+        self.trimmed_ms = trimmed_ms
+        self.input_format = input_format
+        self.input_bytes = input_bytes
+
+    @property
+    def saved_ms(self) -> int:
+        if self.original_ms is None or self.trimmed_ms is None:
+            return 0
+        return self.original_ms - self.trimmed_ms
+
+    def summary(self) -> Dict:
+        return {
+            "vad_applied": self.vad_applied,
+            "original_ms": self.original_ms,
+            "trimmed_ms": self.trimmed_ms,
+            "saved_ms": self.saved_ms,
+            "normalized": self.normalized,
+            "input_format": self.input_format,
+            "output_format": {"sample_rate": STT_SAMPLE_RATE, "channels": 1, "codec": STT_AUDIO_CODEC} if self.normalized else None,
+            "input_bytes": self.input_bytes,
+            "output_bytes": len(self.audio)
+        }
+
+
+def upload_format(content_type: Optional[str]) -> Tuple[str, str]:
+    """(media type, file suffix) to forward an unprocessed upload with; unknown types are sent as WAV."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    suffix = PASSTHROUGH_SUFFIXES.get(media_type)
+    if suffix is None:
+        return "audio/wav", ".wav"
+    return media_type, suffix
+
+
+def _passthrough(audio: bytes, content_type: Optional[str]) -> PreparedAudio:
+    media_type, suffix = upload_format(content_type)
+    normalize_stats["passthrough"] += 1
+    vad_stats["passthrough"] += 1
+    return PreparedAudio(audio, content_type=media_type, suffix=suffix, input_bytes=len(audio))
+
+
+def preprocess_stt_audio(audio: bytes, content_type: Optional[str] = None) -> PreparedAudio:
+    """Normalize and trim one clip; CPU-bound, run it through prepare_stt_audio."""
+    started = time.perf_counter()
+    vad_stats["requests"] += 1
+    decoded = decode_audio(audio, content_type) if audio else None
+    if decoded is None:
+        return _passthrough(audio, content_type)
+
+    samples, sample_rate = decoded
+    channels = samples.shape[1]
+    mono = resample(downmix(samples), sample_rate, STT_SAMPLE_RATE)
+    original_ms = int(len(mono) * 1000 / STT_SAMPLE_RATE)
+    input_format = {"sample_rate": sample_rate, "channels": channels}
+
+    normalize_stats["normalized"] += 1
+    normalize_stats["resampled"] += sample_rate != STT_SAMPLE_RATE
+    normalize_stats["downmixed"] += channels > 1
+    normalize_stats["input_bytes_total"] += len(audio)
+    normalize_stats["audio_seconds_total"] += original_ms / 1000
+
+    trimmed_ms = original_ms
+    if VAD_ENABLED:
+        vad_stats["input_ms_total"] += original_ms
+        has_speech, start, end = detect_speech(mono, STT_SAMPLE_RATE)
+        if not has_speech:
+            vad_stats["rejected_no_speech"] += 1
+            return PreparedAudio(audio, has_speech=False, vad_applied=True, original_ms=original_ms,
+                                 trimmed_ms=0, input_format=input_format, input_bytes=len(audio))
+        if start > 0 or end < len(mono):
+            mono = mono[start:end]
+            trimmed_ms = int(len(mono) * 1000 / STT_SAMPLE_RATE)
+            vad_stats["trimmed"] += 1
+            vad_stats["saved_ms_total"] += original_ms - trimmed_ms
+
+    encoded = encode_wav(mono)
+    normalize_stats["output_bytes_total"] += len(encoded)
+    normalize_stats["processing_ms_total"] += (time.perf_counter() - started) * 1000
+    return PreparedAudio(encoded, normalized=True, vad_applied=VAD_ENABLED, original_ms=original_ms,
+                         trimmed_ms=trimmed_ms, input_format=input_format, input_bytes=len(audio))
+
+
+async def prepare_stt_audio(audio: bytes, content_type: Optional[str] = None) -> PreparedAudio:
+    """Preprocess an uploaded clip off the event loop, rejecting it (422) if it holds no speech."""
+    loop = asyncio.get_running_loop()
+    prepared = await loop.run_in_executor(audio_executor, preprocess_stt_audio, audio, content_type)
+    if not prepared.has_speech:
+        print(f"🔇 No speech detected in {prepared.original_ms}ms clip - skipping STT")
+        raise HTTPException(status_code=422, detail="No speech detected in audio")
+    if prepared.normalized:
+        print(f"✂️ Audio prepared for STT: {prepared.input_bytes} -> {len(prepared.audio)} bytes, "
+              f"{prepared.original_ms}ms -> {prepared.trimmed_ms}ms")
+    return prepared
+
+
+def get_preprocess_stats() -> Dict:
+    return {
+        "workers": AUDIO_PREPROCESS_WORKERS,
+        "codec": STT_AUDIO_CODEC,
+        "sample_rate": STT_SAMPLE_RATE,
+        "normalization": dict(normalize_stats),
+        "vad": dict(vad_stats)
+    }
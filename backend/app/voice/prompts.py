@@ -0,0 +1,334 @@
+"""
+Precompiled system prompts for the voice routes (app.routes.ultra_low_latency).
+
+The voice prompt is identical on every turn for a given journey stage, user
+role and set of available tools. Only the patient's name, their memory and
+the tools their last message triggered change. `VoicePromptTemplates`
+compiles each stage x role x tool-set combination once into a
+`CompiledVoicePrompt`:
+
+- cacheable prefix blocks (app.llm.prompt_cache): the shared instructions,
+  then the stage expertise, role guidance and available tools;
+- a `string.Template` suffix holding only the per-turn fields.
+
+Rendering a turn is then a single substitution. Compiled prompts are keyed on
+`JOURNEY_MANIFEST_VERSION` (app.routes.journey), so bumping the version after
+editing stage tools recompiles every combination. Stage names and tool lists
+come from the client, so the cache is a bounded LRU.
+
+Benchmark: `python -m benchmarks.prompt_build`.
+"""
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from string import Template
+from typing import Dict, List, Optional, Tuple
+
+from app.llm.prompt_cache import CachedPrompt
+from app.memory import format_summary_block
+from app.routes import journey
+
+logger = logging.getLogger(__name__)
+
+PROMPT_TEMPLATE_MAX_ENTRIES = int(os.getenv("PROMPT_TEMPLATE_MAX_ENTRIES", "256"))
+
+# Same for every patient and stage, so providers can cache it (app.llm.prompt_cache)
+ULTRA_FAST_PROMPT_PREFIX = """You are Dr. Maya, a warm and empathetic AI healthcare companion helping the patient described in CURRENT CONTEXT below.
+
+CORE IDENTITY:
+- Dr. Maya: Caring, knowledgeable healthcare companion with perfect memory
+- Speak naturally and warmly like a trusted doctor friend
+- Expert in patient healthcare guidance and emotional support
+
+VOICE CONVERSATION RULES:
+- Speak directly as Dr. Maya - NO thinking out loud
+- Keep responses very brief (20-40 words for voice)
+- Use warm, everyday language - no medical jargon
+- Sound caring and genuinely interested in helping
+- When tools are triggered, IMMEDIATELY offer to start using them (e.g., "Let me track that symptom for you")
+- Be proactive about tool activation - don't just mention, but actively suggest starting
+- Say things like "I'll start a symptom log" or "Let me explain this condition"
+- NO verbose explanations or clinical reasoning
+- Just provide direct, compassionate responses with immediate tool activation offers
+
+DR. MAYA'S SUPPORT:
+- Remember everything about your healthcare journey
+- Provide caring guidance for your specific situation
+- Help you understand next steps in simple terms
+- Connect you with the right resources when needed
+
+VOICE CONVERSATION APPROACH:
+- Listen to their concern or question
+- Respond warmly and directly as Dr. Maya
+- Keep it simple and actionable
+- Offer specific next steps or gentle guidance
+- Sound like a caring friend who knows healthcare
+
+VOICE RESPONSE RULES:
+- Maximum 40 words per response
+- Speak naturally as Dr. Maya - no thinking chains
+- Use simple, caring language
+- Be immediately helpful and supportive
+- Sound warm and genuinely interested
+
+IMPORTANT:
+- NO <thinking> tags or reasoning
+- NO verbose medical explanations
+- Just direct, empathetic responses
+- Focus on what they need right now
+
+IMPORTANT MEDICAL GUIDANCE:
+- You're a supportive AI companion, not a replacement for medical care
+- Encourage regular consultation with their healthcare team
+- Respect HIPAA privacy principles
+- Focus on support, education, and healthcare navigation
+- Direct to emergency services for urgent medical situations"""
+
+JOURNEY_STAGE_EXPERTISE = {
+    "first_hints": """
+STAGE 1 EXPERTISE - First Hints & Initial Doctor Visit:
+- Expert in early symptom recognition and medical history taking
+- Skilled in preparing patients for first doctor visits
+- Guide initial testing and documentation strategies
+- Help identify red flags requiring immediate attention""",
+
+    "getting_answers": """
+STAGE 2 EXPERTISE - Getting Answers & Testing:
+- Expert in diagnostic testing interpretation
+- Guide through complex medical workups
+- Help understand test results and next steps
+- Coordinate between multiple specialists and testing""",
+
+    "the_diagnosis": """
+STAGE 3 EXPERTISE - The Diagnosis:
+- Expert in condition-specific diagnosis education
+- Help process emotional impact of diagnosis
+- Guide understanding of prognosis and treatment options
+- Prepare for care team discussions""",
+
+    "second_opinions": """
+STAGE 4 EXPERTISE - Second Opinions & Care Teams:
+- Expert in healthcare provider matching and evaluation
+- Guide second opinion seeking strategies
+- Help build optimal care teams
+- Navigate specialist referrals and coordination""",
+
+    "treatment_decisions": """
+STAGE 5 EXPERTISE - Treatment Decisions:
+- Expert in treatment option analysis and comparison
+- Guide shared decision-making processes
+- Help weigh risks, benefits, and personal preferences
+- Support informed consent processes""",
+
+    "insurance_advocacy": """
+STAGE 6 EXPERTISE - Insurance & Advocacy:
+- Expert in insurance coverage optimization
+- Guide appeals and prior authorization processes
+- Help navigate healthcare financing
+- Support patient advocacy strategies""",
+
+    "active_treatment": """
+STAGE 7 EXPERTISE - Active Treatment:
+- Expert in treatment monitoring and side effect management
+- Guide through treatment protocols and schedules
+- Help optimize treatment adherence and outcomes
+- Support during intensive treatment phases""",
+
+    "care_coordination": """
+STAGE 8 EXPERTISE - Care Coordination:
+- Expert in multi-provider care coordination
+- Guide communication between care team members
+- Help manage complex care schedules
+- Optimize care transitions and handoffs""",
+
+    "monitoring_adjustments": """
+STAGE 9 EXPERTISE - Monitoring & Adjustments:
+- Expert in ongoing treatment monitoring
+- Guide through dose adjustments and modifications
+- Help track symptoms and treatment response
+- Support long-term treatment optimization""",
+
+    "family_impact": """
+STAGE 10 EXPERTISE - Family & Relationships:
+- Expert in family dynamics during illness
+- Guide caregiver support and communication
+- Help manage relationship challenges
+- Support family coordination and planning""",
+
+    "financial_work": """
+STAGE 11 EXPERTISE - Financial & Work Impact:
+- Expert in healthcare financial planning
+- Guide workplace accommodation strategies
+- Help navigate disability and leave policies
+- Support financial assistance programs""",
+
+    "long_term_living": """
+STAGE 12 EXPERTISE - Long-term Living:
+- Expert in chronic condition management
+- Guide lifestyle adaptations and modifications
+- Help maintain quality of life
+- Support long-term health planning"""
+}
+
+ROLE_GUIDANCE = {
+    "patient": """
+PATIENT-FOCUSED GUIDANCE:
+- Speak directly to patient experience and concerns
+- Provide clear, accessible medical explanations
+- Focus on empowerment and self-advocacy
+- Address emotional and psychological aspects of care""",
+
+    "caregiver": """
+CAREGIVER-FOCUSED GUIDANCE:
+- Address caregiver-specific challenges and needs
+- Provide guidance on supporting patient effectively
+- Focus on caregiver self-care and sustainability
+- Help navigate family dynamics and communication""",
+
+    "provider": """
+PROVIDER-FOCUSED GUIDANCE:
+- Use clinical terminology and evidence-based recommendations
+- Focus on care coordination and optimization strategies
+- Provide specialist-level insights and considerations
+- Support clinical decision-making processes"""
+}
+
+TRIGGERED_TOOLS_GUIDANCE = """
+- IMPORTANT: Proactively mention using these tools and starting to track/explain immediately
+- Say things like "Let me start tracking your symptoms" or "I'll help you understand this condition"
+- Be ready to fill out forms and gather specific information"""
+
+
+def get_journey_stage_expertise(stage: str) -> str:
+    """Get specialized expertise for specific journey stages."""
+    return JOURNEY_STAGE_EXPERTISE.get(stage, "GENERAL EXPERTISE - Comprehensive healthcare guidance across all journey stages")
+
+
+def get_role_specific_guidance(role: str) -> str:
+    """Get role-specific guidance and communication style."""
+    return ROLE_GUIDANCE.get(role, "GENERAL GUIDANCE - Comprehensive support for all healthcare stakeholders")
+
+
+def _literal(text: str) -> str:
+    """Escape compile-time text for string.Template; stage and tool names come from requests."""
+    return text.replace("$", "$$")
+
+
+class CompiledVoicePrompt:
+    """One stage x role x tool-set prompt: fixed prefix blocks and a per-turn suffix template."""
+
+    def __init__(self, journey_stage: str, user_role: str, tools: Tuple[str, ...]):
+        stage_block = f"{get_journey_stage_expertise(journey_stage)}\n\n{get_role_specific_guidance(user_role)}"
+        if tools:
+            stage_block += f"""
+
+AVAILABLE TOOLS FOR {journey_stage.upper()} STAGE:
+- You have access to: {', '.join(tools)}
+- These tools can help the patient with stage-specific guidance
+- Naturally mention relevant tools when they would be helpful
+- Present tools as practical solutions, not just features"""
+        self.prefix = (ULTRA_FAST_PROMPT_PREFIX, stage_block.strip())
+        self.has_tools = bool(tools)
+        self.suffix = Template(f"""CURRENT CONTEXT:
+- Patient: $patient_name
+- Journey Stage: {_literal(journey_stage.replace('_', ' ').title())}
+- Role: {_literal(user_role.title())}$memory_context$triggered_tools""")
+
+    def render(self, patient_name: str, memory_context: str = "", triggered_tools: Optional[List[str]] = None) -> CachedPrompt:
+        triggered = ""
+        if self.has_tools and triggered_tools:
+            triggered = f"""
+- TRIGGERED TOOLS: {', '.join(triggered_tools)} (patient's message suggests these would be helpful){TRIGGERED_TOOLS_GUIDANCE}"""
+        suffix = self.suffix.substitute(patient_name=patient_name, memory_context=memory_context, triggered_tools=triggered)
+        return CachedPrompt(*self.prefix, suffix=suffix)
+
+
+class VoicePromptTemplates:
+    """LRU of compiled voice prompts keyed on (manifest version, stage, role, tool names)."""
+
+    def __init__(self, max_entries: int = PROMPT_TEMPLATE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._compiled: "OrderedDict[tuple, CompiledVoicePrompt]" = OrderedDict()
+        self.hits = 0
+        self.compiles = 0
+        self.evictions = 0
+        self.compile_us = 0.0
+
+    def get(self, journey_stage: str, user_role: str, tools: Tuple[str, ...] = ()) -> CompiledVoicePrompt:
+        key = (journey.JOURNEY_MANIFEST_VERSION, journey_stage, user_role, tools)
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            self.hits += 1
+            self._compiled.move_to_end(key)
+            return compiled
+
+        started = time.perf_counter()
+        compiled = CompiledVoicePrompt(journey_stage, user_role, tools)
+        self.compile_us += (time.perf_counter() - started) * 1_000_000
+        self.compiles += 1
+        logger.debug("Compiled voice prompt for stage=%s role=%s tools=%s", journey_stage, user_role, tools)
+        self._compiled[key] = compiled
+        while len(self._compiled) > self.max_entries:
+            self._compiled.popitem(last=False)
+            self.evictions += 1
+        return compiled
+
+    def clear(self) -> None:
+        self._compiled.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.compiles
+        return {
+            "manifest_version": journey.JOURNEY_MANIFEST_VERSION,
+            "compiled": len(self._compiled),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "compiles": self.compiles,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "avg_compile_us": round(self.compile_us / self.compiles, 1) if self.compiles else None
+        }
+
+
+voice_prompt_templates = VoicePromptTemplates()
+
+
+def build_memory_context(patient_context: Dict) -> str:
+    """Per-turn memory section of the voice prompt."""
+    conditions = patient_context.get("conditions", [])
+    key_concerns = patient_context.get("key_concerns", [])
+    total_conversations = patient_context.get("total_conversations", 0)
+
+    memory_context = ""
+    if total_conversations > 0:
+        memory_context = f"""
+PATIENT MEMORY & CONTINUITY:
+- We have had {total_conversations} previous conversations
+- Known conditions: {', '.join(conditions) if conditions else 'None specified yet'}
+- Key concerns: {', '.join(key_concerns[:3]) if key_concerns else 'Exploring together'}
+- Continue our conversation with full awareness of our previous discussions
+- Reference past conversations naturally and show you remember their journey"""
+    return memory_context + format_summary_block(patient_context)
+
+
+def build_ultra_fast_medical_prompt(patient_name: str, journey_stage: str = "general", user_role: str = "patient", context: dict = None) -> CachedPrompt:
+    """
+    Build RadiantCompass-optimized medical prompt with patient memory context and dynamic tools.
+
+    The stage x role x tool-set part is compiled once; each turn only fills in
+    the patient's name, memory and triggered tools.
+    """
+    context = context or {}
+    available_tools = tuple(tool.get("name", "Unknown Tool") for tool in context.get("availableTools", []))
+    triggered_tools = [tool.get("name", "Unknown Tool") for tool in context.get("triggeredTools", [])]
+    if triggered_tools:
+        logger.debug("Triggered tools: %s", triggered_tools)
+
+    compiled = voice_prompt_templates.get(journey_stage, user_role, available_tools)
+    return compiled.render(patient_name, build_memory_context(context.get("patient_context", {})), triggered_tools)
+
+
+def get_prompt_template_stats() -> Dict:
+    return voice_prompt_templates.stats()
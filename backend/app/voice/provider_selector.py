@@ -0,0 +1,180 @@
+"""
+Adaptive TTS provider selection from live latency statistics.
+
+`/api/v1/tts/fastest` used to probe every provider with a full synthesis on
+each call and then synthesize again with the winner: N+1 upstream calls, and
+the slowest probe's latency, per request. `TTSProviderSelector` instead
+learns from traffic the providers already serve:
+
+- each real synthesis (cache misses and bypasses) records its upstream
+  latency and outcome;
+- per provider it keeps an EWMA of latency and of the error rate, plus a
+  bounded window of samples for p50/p95 reporting;
+- the best provider is re-scored whenever a sample arrives, so `choose()`
+  is a dictionary read.
+
+Providers that see no traffic go stale. A background task sends them a
+short probe synthesis at most once per `TTS_PROBE_INTERVAL_SECONDS`.
+
+Scoring keeps the healthcare trade-off from the original `/fastest`: a speed
+score (100 minus 1 point per 50 ms), a quality bonus, OpenAI's reliability
+bonus, and a penalty proportional to the recent error rate.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+TTS_SELECTOR_EWMA_ALPHA = float(os.getenv("TTS_SELECTOR_EWMA_ALPHA", "0.2"))
+TTS_SELECTOR_WINDOW = int(os.getenv("TTS_SELECTOR_WINDOW", "200"))
+TTS_PROBE_ENABLED = os.getenv("TTS_PROBE_ENABLED", "true").lower() == "true"
+TTS_PROBE_INTERVAL_SECONDS = float(os.getenv("TTS_PROBE_INTERVAL_SECONDS", "300"))
+# Latency assumed for a provider before its first sample
+TTS_SELECTOR_PRIOR_MS = float(os.getenv("TTS_SELECTOR_PRIOR_MS", "1500"))
+ERROR_PENALTY = 100
+
+
+class ProviderStats:
+    """Latency and error statistics for one provider."""
+
+    def __init__(self, name: str, quality: int, reliability_bonus: int = 0,
+                 probe: Optional[Callable[[], Awaitable]] = None, alpha: float = TTS_SELECTOR_EWMA_ALPHA,
+                 window: int = TTS_SELECTOR_WINDOW):
+        self.name = name
+        self.quality = quality
+        self.reliability_bonus = reliability_bonus
+        self.probe = probe
+        self.alpha = alpha
+        self.ewma_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.successes = 0
+        self.errors = 0
+        self.probes = 0
+        self.last_sample_at = 0.0
+
+    def record(self, latency_ms: Optional[float], ok: bool) -> None:
+        self.last_sample_at = time.monotonic()
+        self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+        if not ok:
+            self.errors += 1
+            return
+        self.successes += 1
+        self.samples.append(latency_ms)
+        self.ewma_ms = latency_ms if self.ewma_ms is None else self.ewma_ms + self.alpha * (latency_ms - self.ewma_ms)
+
+    def score(self) -> float:
+        latency = self.ewma_ms if self.ewma_ms is not None else TTS_SELECTOR_PRIOR_MS
+        speed_score = max(0, 100 - latency / 50)  # Penalty for slow
+        return speed_score + self.quality * 10 + self.reliability_bonus - self.error_rate * ERROR_PENALTY
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 1)
+
+    def stats(self) -> Dict:
+        return {
+            "ewma_ms": round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "error_rate": round(self.error_rate, 3),
+            "successes": self.successes,
+            "errors": self.errors,
+            "probes": self.probes,
+            "samples": len(self.samples),
+            "seconds_since_sample": round(time.monotonic() - self.last_sample_at, 1) if self.last_sample_at else None,
+            "score": round(self.score(), 1)
+        }
+
+
+class TTSProviderSelector:
+    """Keeps the best-scoring provider up to date as samples arrive."""
+
+    def __init__(self, probe_interval: float = TTS_PROBE_INTERVAL_SECONDS, probes_enabled: bool = TTS_PROBE_ENABLED):
+        self.providers: Dict[str, ProviderStats] = {}
+        self.probe_interval = probe_interval
+        self.probes_enabled = probes_enabled
+        self._best: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self.selections = 0
+
+    def register(self, name: str, quality: int, reliability_bonus: int = 0,
+                 probe: Optional[Callable[[], Awaitable]] = None) -> None:
+        """Add a configured provider; `probe` performs one uncached synthesis through the normal path."""
+        self.providers[name] = ProviderStats(name, quality, reliability_bonus, probe)
+        self._rescore()
+
+    def record(self, name: str, latency_ms: Optional[float], ok: bool = True) -> None:
+        provider = self.providers.get(name)
+        if provider is None:
+            return
+        provider.record(latency_ms, ok)
+        self._rescore()
+
+    @contextmanager
+    def measure(self, name: str):
+        """Record the latency of the wrapped provider call, or a failure if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(name, None, ok=False)
+            raise
+        self.record(name, (time.perf_counter() - started) * 1000)
+
+    def _rescore(self) -> None:
+        # A handful of providers, so this is constant work per sample
+        self._best = max(self.providers, key=lambda name: self.providers[name].score(), default=None)
+
+    def choose(self) -> Optional[str]:
+        """Current best provider, or None if none is configured."""
+        self.selections += 1
+        return self._best
+
+    async def start(self) -> None:
+        """Start the background probe task; called on application startup."""
+        if self.probes_enabled and self._task is None and any(p.probe for p in self.providers.values()):
+            self._task = asyncio.create_task(self._probe_loop())
+            print(f"📈 TTS provider probes every {self.probe_interval:.0f}s for idle providers: {list(self.providers)}")
+
+    async def _probe_loop(self) -> None:
+        while True:
+            for provider in list(self.providers.values()):
+                if provider.probe is None or time.monotonic() - provider.last_sample_at < self.probe_interval:
+                    continue
+                provider.probes += 1
+                try:
+                    await provider.probe()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # The provider's own path already recorded the failure
+                    print(f"⚠️ TTS probe to {provider.name} failed: {getattr(e, 'detail', None) or e}")
+            await asyncio.sleep(self.probe_interval)
+
+    async def close(self) -> None:
+        """Stop the probe task; called on shutdown."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            "selected": self._best,
+            "selections": self.selections,
+            "probes_enabled": self.probes_enabled,
+            "probe_interval_seconds": self.probe_interval,
+            "providers": {name: provider.stats() for name, provider in self.providers.items()}
+        }
+
+
+tts_selector = TTSProviderSelector()
@@ -0,0 +1,162 @@
+"""
+Zero-parse websocket relay between a browser client and the OpenAI Realtime API.
+
+Realtime sessions are dominated by `response.audio.delta` / `input_audio_buffer.append`
+frames carrying base64 PCM. Decoding and re-encoding those as JSON only to
+forward them costs CPU on every frame, so `RealtimeRelay` forwards frames as
+opaque text or bytes. The event type is read from the first few characters of a
+frame with a bounded regex (`peek_event_type`), and only control events
+(errors, session and response lifecycle) are handed to the `on_control`
+callback.
+
+Each direction has its own bounded queue. When one side stops reading, its
+queue fills and the reader for the other socket waits, so backpressure
+propagates through TCP flow control instead of buffering audio in memory.
+"""
+
+import asyncio
+import os
+import re
+from typing import Callable, Dict, Optional, Union
+
+from fastapi import WebSocket
+
+REALTIME_RELAY_QUEUE_SIZE = int(os.getenv("REALTIME_RELAY_QUEUE_SIZE", "64"))
+
+# Event types worth looking at; everything else is forwarded untouched
+CONTROL_EVENT_TYPES = frozenset({
+    "error",
+    "session.created",
+    "session.updated",
+    "response.created",
+    "response.done",
+    "input_audio_buffer.speech_started",
+    "input_audio_buffer.speech_stopped",
+    "conversation.item.input_audio_transcription.completed",
+    "rate_limits.updated",
+})
+
+# "type" is within the first few keys of every Realtime event
+TYPE_SCAN_CHARS = 128
+_TYPE_PATTERN = re.compile(r'"type"\s*:\s*"([^"]+)"')
+_TYPE_PATTERN_BYTES = re.compile(rb'"type"\s*:\s*"([^"]+)"')
+
+Frame = Union[str, bytes]
+
+relay_stats = {
+    "sessions_active": 0,
+    "sessions_total": 0,
+    "frames_to_upstream": 0,
+    "frames_to_client": 0,
+    "chars_to_upstream": 0,
+    "chars_to_client": 0,
+    "backpressure_waits": 0,
+    "control_events": {}
+}
+
+
+def peek_event_type(frame: Frame) -> Optional[str]:
+    """Event type from the head of a JSON frame, without parsing the frame."""
+    if isinstance(frame, bytes):
+        match = _TYPE_PATTERN_BYTES.search(frame, 0, TYPE_SCAN_CHARS)
+        return match.group(1).decode("utf-8", "replace") if match else None
+    match = _TYPE_PATTERN.search(frame, 0, TYPE_SCAN_CHARS)
+    return match.group(1) if match else None
+
+
+class RealtimeRelay:
+    """Bidirectional pass-through between a FastAPI websocket and an upstream `websockets` connection."""
+
+    def __init__(
+        self,
+        client: WebSocket,
+        upstream,
+        queue_size: int = REALTIME_RELAY_QUEUE_SIZE,
+        on_control: Optional[Callable[[str, str, Frame], None]] = None
+    ):
+        self.client = client
+        self.upstream = upstream
+        self.queue_size = queue_size
+        # on_control(direction, event_type, frame) for CONTROL_EVENT_TYPES only
+        self.on_control = on_control
+
+    async def run(self) -> None:
+        """Relay until either side closes, then stop the other direction."""
+        to_upstream: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        to_client: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        pipelines = [
+            asyncio.create_task(self._pipe(self._read_client(), to_upstream, self.upstream.send, "to_upstream")),
+            asyncio.create_task(self._pipe(self._read_upstream(), to_client, self._send_client, "to_client")),
+        ]
+        relay_stats["sessions_active"] += 1
+        relay_stats["sessions_total"] += 1
+        try:
+            done, pending = await asyncio.wait(pipelines, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task in done:
+                task.result()
+        finally:
+            for task in pipelines:
+                task.cancel()
+            relay_stats["sessions_active"] -= 1
+
+    async def _pipe(self, frames, queue: asyncio.Queue, send: Callable, direction: str) -> None:
+        async def read():
+            try:
+                async for frame in frames:
+                    if queue.full():
+                        relay_stats["backpressure_waits"] += 1
+                    await queue.put(frame)
+            except Exception as e:
+                print(f"⚠️ Realtime relay {direction} source closed: {e}")
+            # Let the writer flush what is queued, then stop
+            await queue.put(None)
+
+        reader = asyncio.create_task(read())
+        try:
+            while True:
+                frame = await queue.get()
+                if frame is None:
+                    break
+                self._inspect(frame, direction)
+                await send(frame)
+                relay_stats[f"frames_{direction}"] += 1
+                relay_stats[f"chars_{direction}"] += len(frame)
+            await reader
+        finally:
+            reader.cancel()
+
+    def _inspect(self, frame: Frame, direction: str) -> None:
+        event_type = peek_event_type(frame)
+        if event_type in CONTROL_EVENT_TYPES:
+            counts = relay_stats["control_events"]
+            counts[event_type] = counts.get(event_type, 0) + 1
+            if self.on_control:
+                self.on_control(direction, event_type, frame)
+
+    async def _read_client(self):
+        while True:
+            message = await self.client.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            frame = message.get("text")
+            if frame is None:
+                frame = message.get("bytes")
+            if frame is not None:
+                yield frame
+
+    async def _read_upstream(self):
+        async for frame in self.upstream:
+            yield frame
+
+    async def _send_client(self, frame: Frame) -> None:
+        if isinstance(frame, bytes):
+            await self.client.send_bytes(frame)
+        else:
+            await self.client.send_text(frame)
+
+
+def get_relay_stats() -> Dict:
+    return {**relay_stats, "control_events": dict(relay_stats["control_events"])}
@@ -0,0 +1,53 @@
+"""
+Incremental sentence splitting for streamed LLM output.
+
+`SentenceSplitter` receives tokens as they are generated and releases each
+sentence as soon as it is complete, so text-to-speech can start on the first
+sentence while the model is still writing the rest of the reply.
+"""
+
+import re
+from typing import List
+
+# Abbreviations whose trailing period does not end a sentence ("Dr. Maya")
+ABBREVIATIONS = {"dr", "mr", "mrs", "ms", "st", "vs", "etc", "e.g", "i.e", "approx", "no"}
+
+# Sentence end: terminal punctuation (optionally closed by quotes/brackets) followed by whitespace
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+|\n+')
+
+
+class SentenceSplitter:
+    """Accumulates streamed text and yields complete sentences."""
+
+    def __init__(self, min_chars: int = 20):
+        # Very short fragments ("Yes.") are merged into the next sentence so
+        # each TTS request carries enough text to sound natural.
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text and return any sentences completed by it."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if self._ends_with_abbreviation(candidate) or len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever text remains once the stream has finished."""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return [remainder] if remainder else []
+
+    @staticmethod
+    def _ends_with_abbreviation(sentence: str) -> bool:
+        if not sentence.endswith("."):
+            return False
+        last_word = sentence[:-1].rsplit(None, 1)[-1].lower() if sentence[:-1].strip() else ""
+        return last_word in ABBREVIATIONS
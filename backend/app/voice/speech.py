@@ -0,0 +1,106 @@
+"""
+Provider text-to-speech calls, routed through the TTS cache.
+
+Each function returns (mp3 bytes, cache source). A voice profile names one
+fixed provider/model/voice/speed combination, so greeting warmup
+(app.voice.greetings) can pre-render audio that the routes will hit later.
+"""
+
+import os
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+from fastapi import HTTPException
+
+from app.http_clients import get_http_client
+from app.llm import openai_client
+from app.voice.tts_cache import cached_speech
+
+CARTESIA_API_KEY = os.getenv("CARTESIA_API_KEY")
+CARTESIA_VOICE_ID = "5abd2130-146a-41b1-bcdb-974ea8e19f56"  # Joan - clear, warm American female voice (Dr. Maya)
+CARTESIA_MODEL = "sonic-english"
+CARTESIA_SPEED = "slow"  # FIXED: Use slow speed for natural, empathetic healthcare conversations
+
+ELEVENLABS_MODEL = "eleven_turbo_v2"  # Fastest model
+ELEVENLABS_DEFAULT_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # Rachel - Professional female
+ELEVENLABS_VOICE_SETTINGS = {
+    "stability": 0.7,
+    "similarity_boost": 0.8,
+    "style": 0.2,  # Professional style
+    "use_speaker_boost": True
+}
+
+
+async def openai_speech(text: str, voice: str = "nova", speed: float = 0.6, model: str = "tts-1") -> Tuple[bytes, str]:
+    """OpenAI TTS; defaults are Dr. Maya's real-time voice (tts-1, nova, slow)."""
+    if not openai_client:
+        raise HTTPException(status_code=503, detail="OpenAI API not configured")
+
+    async def synthesize() -> bytes:
+        response = await openai_client.audio.speech.create(
+            model=model,
+            voice=voice,
+            input=text,
+            speed=speed,
+            response_format="mp3"
+        )
+        return response.content
+
+    return await cached_speech("openai", voice, text, synthesize, speed=speed, model=model)
+
+
+async def cartesia_speech(text: str, client: Optional[httpx.AsyncClient] = None) -> Tuple[bytes, str]:
+    """Cartesia Sonic with Dr. Maya's voice."""
+    if not CARTESIA_API_KEY:
+        raise HTTPException(status_code=503, detail="Cartesia API not configured")
+    client = client or get_http_client("cartesia")
+
+    async def synthesize() -> bytes:
+        response = await client.post(
+            "https://api.cartesia.ai/tts/bytes",
+            timeout=10.0,
+            headers={
+                "X-API-Key": CARTESIA_API_KEY,
+                "Cartesia-Version": "2024-06-10",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model_id": CARTESIA_MODEL,
+                "transcript": text,
+                "voice": {"mode": "id", "id": CARTESIA_VOICE_ID},
+                "output_format": {
+                    "container": "mp3",
+                    "encoding": "mp3",
+                    "sample_rate": 22050  # Natural speech rate
+                },
+                "language": "en",
+                "speed": CARTESIA_SPEED,
+                "add_timestamps": False
+            }
+        )
+        if response.status_code != 200:
+            print(f"❌ Cartesia API Error {response.status_code}: {response.text}")
+            raise Exception(f"Cartesia TTS failed: {response.status_code} {response.text}")
+        return response.content
+
+    return await cached_speech("cartesia", CARTESIA_VOICE_ID, text, synthesize, speed=CARTESIA_SPEED, model=CARTESIA_MODEL)
+
+
+# Voice profiles used by the routes, by name
+SPEECH_PROFILES: Dict[str, Callable[[str], Awaitable[Tuple[bytes, str]]]] = {
+    # /cartesia-tts and the voice pipeline
+    "cartesia": lambda text: cartesia_speech(text),
+    # ultra-low-latency /text-to-speech and the pipeline fallback
+    "openai": lambda text: openai_speech(text),
+    # copilot /text-to-speech with the proactive greeting's recommended voice
+    "openai-hd": lambda text: openai_speech(text, voice="nova", speed=0.9, model="tts-1-hd"),
+    # /api/v1/ai/text-to-speech
+    "openai-chat": lambda text: openai_speech(text, voice="nova", speed=0.9, model="tts-1"),
+}
+
+
+def available_profiles() -> Dict[str, Callable[[str], Awaitable[Tuple[bytes, str]]]]:
+    """Profiles whose provider has credentials configured."""
+    configured = {"cartesia": bool(CARTESIA_API_KEY), "openai": openai_client is not None, "openai-hd": openai_client is not None,
+                  "openai-chat": openai_client is not None}
+    return {name: speak for name, speak in SPEECH_PROFILES.items() if configured[name]}
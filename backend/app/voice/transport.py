@@ -0,0 +1,78 @@
+"""
+Binary audio delivery.
+
+Base64-in-JSON inflates audio by a third and costs an encode on the server and
+a decode on the client for every utterance. These helpers send raw bytes
+instead:
+
+- `binary_audio_response` returns a single utterance as an `audio/mpeg` body,
+  with its metadata in `X-` headers (same convention as the /api/v1/tts routes).
+- `encode_audio_frame` packs metadata and audio into one self-describing
+  binary frame. It is used for websocket binary messages and for
+  `application/x-audio-frames` streams that carry several utterances.
+
+Frame layout (network byte order):
+
+    offset  size  field
+    0       2     magic b"AF"
+    2       1     version (1)
+    3       1     reserved (0)
+    4       2     metadata length M (bytes of UTF-8 JSON)
+    6       4     payload length N (audio bytes, may be 0)
+    10      M     metadata JSON, e.g. {"type": "audio", "index": 0, "format": "mp3"}
+    10+M    N     audio payload
+"""
+
+import json
+import struct
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+
+FRAME_MAGIC = b"AF"
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("!2sBBHI")
+FRAME_MEDIA_TYPE = "application/x-audio-frames"
+
+# Accepted values for the `delivery` query parameter on TTS routes
+DELIVERY_MODES = ("json", "binary")
+
+
+def encode_audio_frame(metadata: Dict, audio: bytes = b"") -> bytes:
+    """Pack `metadata` and `audio` into one binary frame."""
+    meta = json.dumps(metadata, separators=(",", ":")).encode("utf-8")
+    return FRAME_HEADER.pack(FRAME_MAGIC, FRAME_VERSION, 0, len(meta), len(audio)) + meta + audio
+
+
+def decode_audio_frame(buffer: bytes, offset: int = 0) -> Optional[Tuple[Dict, bytes, int]]:
+    """
+    Unpack the frame starting at `offset`.
+
+    Returns (metadata, audio, next_offset), or None if `buffer` does not yet
+    hold the whole frame (streamed bodies may split frames across chunks).
+    """
+    if len(buffer) - offset < FRAME_HEADER.size:
+        return None
+    magic, version, _, meta_len, audio_len = FRAME_HEADER.unpack_from(buffer, offset)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        raise ValueError(f"Not an audio frame (magic={magic!r}, version={version})")
+    meta_start = offset + FRAME_HEADER.size
+    audio_start = meta_start + meta_len
+    end = audio_start + audio_len
+    if len(buffer) < end:
+        return None
+    metadata = json.loads(bytes(buffer[meta_start:audio_start]))
+    return metadata, bytes(buffer[audio_start:end]), end
+
+
+def binary_audio_response(audio: bytes, metadata: Dict, media_type: str = "audio/mpeg") -> StreamingResponse:
+    """Raw audio body with metadata exposed as X- headers."""
+    headers = {
+        "X-" + "-".join(part.upper() if part in ("ms", "id") else part.capitalize() for part in key.split("_")): str(value)
+        for key, value in metadata.items()
+        if value is not None
+    }
+    headers["X-Audio-Size"] = str(len(audio))
+    headers["Cache-Control"] = "no-cache"
+    return StreamingResponse(BytesIO(audio), media_type=media_type, headers=headers)
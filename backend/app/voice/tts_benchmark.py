@@ -0,0 +1,230 @@
+"""
+TTS provider benchmarking: warmups, N iterations at a set concurrency, and
+a persisted history so regressions show up across runs.
+
+Each request goes straight to the provider's HTTP API (no TTS cache, no
+selector) with the payload the routes send. The audio is read as a stream, so
+time-to-first-byte and total time are reported separately. Results include
+p50/p90/p99 for both, request and audio-byte throughput, and the error count.
+
+Every provider takes a base URL override, so the same runs work offline
+against local stand-ins (benchmarks/tts_stub_providers.py). Results are
+appended as JSON lines to `TTS_BENCHMARK_RESULTS_PATH`. Each new result is
+compared with the previous run under the same conditions: provider, target
+("live" or "offline"), concurrency and text length.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from app.voice.speech import (
+    CARTESIA_MODEL,
+    CARTESIA_SPEED,
+    CARTESIA_VOICE_ID,
+    ELEVENLABS_DEFAULT_VOICE_ID,
+    ELEVENLABS_MODEL,
+    ELEVENLABS_VOICE_SETTINGS,
+)
+
+TTS_BENCHMARK_RESULTS_PATH = os.getenv("TTS_BENCHMARK_RESULTS_PATH", "benchmark_results/tts.jsonl")
+# A p50 or p90 this much slower than the previous comparable run is flagged
+TTS_BENCHMARK_REGRESSION_PCT = float(os.getenv("TTS_BENCHMARK_REGRESSION_PCT", "20"))
+TTS_BENCHMARK_TIMEOUT_SECONDS = 30.0
+
+PROVIDER_BASE_URLS = {
+    "openai": "https://api.openai.com",
+    "elevenlabs": "https://api.elevenlabs.io",
+    "cartesia": "https://api.cartesia.ai",
+}
+
+PROVIDER_API_KEYS = {
+    "openai": "OPENAI_API_KEY",
+    "elevenlabs": "ELEVENLABS_API_KEY",
+    "cartesia": "CARTESIA_API_KEY",
+}
+
+
+def configured_providers() -> List[str]:
+    """Providers with an API key in the environment."""
+    return [provider for provider, env in PROVIDER_API_KEYS.items() if os.getenv(env)]
+
+
+def build_tts_request(provider: str, text: str, base_url: Optional[str] = None,
+                      api_key: Optional[str] = None) -> Tuple[str, Dict, Dict]:
+    """(url, headers, json payload) for one synthesis, matching what the routes send."""
+    base_url = (base_url or PROVIDER_BASE_URLS[provider]).rstrip("/")
+    api_key = api_key or os.getenv(PROVIDER_API_KEYS[provider]) or "offline"
+    if provider == "openai":
+        return f"{base_url}/v1/audio/speech", {"Authorization": f"Bearer {api_key}"}, {
+            "model": "tts-1-hd",
+            "input": text,
+            "voice": "nova",
+            "speed": 0.6,
+            "response_format": "mp3"
+        }
+    if provider == "elevenlabs":
+        return f"{base_url}/v1/text-to-speech/{ELEVENLABS_DEFAULT_VOICE_ID}", {"xi-api-key": api_key}, {
+            "text": text,
+            "model_id": ELEVENLABS_MODEL,
+            "voice_settings": ELEVENLABS_VOICE_SETTINGS
+        }
+    if provider == "cartesia":
+        return f"{base_url}/tts/bytes", {"X-API-Key": api_key, "Cartesia-Version": "2024-06-10"}, {
+            "model_id": CARTESIA_MODEL,
+            "transcript": text,
+            "voice": {"mode": "id", "id": CARTESIA_VOICE_ID},
+            "output_format": {"container": "mp3", "encoding": "mp3", "sample_rate": 22050},
+            "language": "en",
+            "speed": CARTESIA_SPEED,
+            "add_timestamps": False
+        }
+    raise ValueError(f"Unknown TTS provider: {provider}")
+
+
+async def measure_once(client: httpx.AsyncClient, url: str, headers: Dict, payload: Dict) -> Dict:
+    """One streamed synthesis: time to first audio byte, total time and size."""
+    started = time.perf_counter()
+    ttfb_ms = None
+    size = 0
+    try:
+        async with client.stream("POST", url, headers=headers, json=payload) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise Exception(f"{response.status_code} {body[:200]!r}")
+            async for chunk in response.aiter_bytes():
+                if ttfb_ms is None and chunk:
+                    ttfb_ms = (time.perf_counter() - started) * 1000
+                size += len(chunk)
+    except Exception as e:
+        return {"ok": False, "error": str(e) or type(e).__name__}
+    total_ms = (time.perf_counter() - started) * 1000
+    return {"ok": True, "ttfb_ms": ttfb_ms if ttfb_ms is not None else total_ms, "total_ms": total_ms, "bytes": size}
+
+
+def percentile(samples: List[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 1)
+
+
+def latency_summary(samples: List[float]) -> Dict:
+    return {
+        "p50_ms": percentile(samples, 0.5),
+        "p90_ms": percentile(samples, 0.9),
+        "p99_ms": percentile(samples, 0.99),
+        "mean_ms": round(sum(samples) / len(samples), 1) if samples else None
+    }
+
+
+async def run_benchmark(provider: str, text: str, iterations: int = 20, warmups: int = 2, concurrency: int = 1,
+                        base_url: Optional[str] = None, target: str = "live") -> Dict:
+    """Benchmark one provider; warmup requests are sent first and not counted."""
+    url, headers, payload = build_tts_request(provider, text, base_url)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def measured(client: httpx.AsyncClient) -> Dict:
+        async with slots:
+            return await measure_once(client, url, headers, payload)
+
+    async with httpx.AsyncClient(timeout=TTS_BENCHMARK_TIMEOUT_SECONDS, limits=limits) as client:
+        await asyncio.gather(*(measured(client) for _ in range(warmups)))
+        started = time.perf_counter()
+        samples = await asyncio.gather(*(measured(client) for _ in range(iterations)))
+        wall_seconds = time.perf_counter() - started
+
+    succeeded = [sample for sample in samples if sample["ok"]]
+    errors = [sample["error"] for sample in samples if not sample["ok"]]
+    audio_bytes = sum(sample["bytes"] for sample in succeeded)
+    return {
+        "provider": provider,
+        "target": target,
+        "base_url": base_url or PROVIDER_BASE_URLS[provider],
+        "timestamp": datetime.utcnow().isoformat(),
+        "text_chars": len(text),
+        "iterations": iterations,
+        "warmups": warmups,
+        "concurrency": concurrency,
+        "succeeded": len(succeeded),
+        "errors": len(errors),
+        "error_samples": list(dict.fromkeys(errors))[:3],
+        "ttfb": latency_summary([sample["ttfb_ms"] for sample in succeeded]),
+        "total": latency_summary([sample["total_ms"] for sample in succeeded]),
+        "throughput_rps": round(len(succeeded) / wall_seconds, 2) if wall_seconds else None,
+        "throughput_audio_kbps": round(audio_bytes / 1024 / wall_seconds, 1) if wall_seconds else None,
+        "avg_audio_bytes": int(audio_bytes / len(succeeded)) if succeeded else 0
+    }
+
+
+def _comparable(a: Dict, b: Dict) -> bool:
+    return all(a.get(key) == b.get(key) for key in ("provider", "target", "concurrency", "text_chars"))
+
+
+def load_history(path: str = TTS_BENCHMARK_RESULTS_PATH) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    history = []
+    with open(path) as handle:
+        for line in handle:
+            try:
+                history.append(json.loads(line))
+            except ValueError:
+                continue
+    return history
+
+
+def compare_with_previous(result: Dict, history: List[Dict],
+                          threshold_pct: float = TTS_BENCHMARK_REGRESSION_PCT) -> Optional[Dict]:
+    """Percent change against the last comparable run; None if there is none."""
+    previous = next((entry for entry in reversed(history) if _comparable(entry, result) and entry.get("succeeded")), None)
+    if previous is None or not result["succeeded"]:
+        return None
+
+    changes = {}
+    for metric in ("ttfb", "total"):
+        for stat in ("p50_ms", "p90_ms"):
+            before, after = previous[metric][stat], result[metric][stat]
+            if before:
+                changes[f"{metric}_{stat}"] = round((after - before) / before * 100, 1)
+    regressed = [name for name, change in changes.items() if change > threshold_pct]
+    return {
+        "previous_timestamp": previous["timestamp"],
+        "change_pct": changes,
+        "regressions": regressed,
+        "regression": bool(regressed)
+    }
+
+
+def persist_results(results: List[Dict], path: str = TTS_BENCHMARK_RESULTS_PATH) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a") as handle:
+        for result in results:
+            entry = {key: value for key, value in result.items() if key != "comparison"}
+            handle.write(json.dumps(entry) + "\n")
+
+
+async def run_suite(providers: List[str], text: str, iterations: int = 20, warmups: int = 2, concurrency: int = 1,
+                    base_urls: Optional[Dict[str, str]] = None, target: str = "live", persist: bool = True,
+                    results_path: str = TTS_BENCHMARK_RESULTS_PATH) -> List[Dict]:
+    """Benchmark providers one after another, each compared with its previous run, then persist."""
+    base_urls = base_urls or {}
+    history = load_history(results_path)
+    results = []
+    for provider in providers:
+        result = await run_benchmark(provider, text, iterations, warmups, concurrency, base_urls.get(provider), target)
+        result["comparison"] = compare_with_previous(result, history)
+        if result["comparison"] and result["comparison"]["regression"]:
+            print(f"⚠️ TTS benchmark regression for {provider}: {result['comparison']['regressions']}")
+        results.append(result)
+    if persist:
+        persist_results(results, results_path)
+    return results
@@ -0,0 +1,264 @@
+"""
+Content-addressed cache of synthesized speech.
+
+Greetings, stage suggestions and fallback messages are deterministic strings,
+and re-synthesizing them costs a full provider round-trip every time. Audio is
+keyed by sha256(provider, model, voice, speed, format, text), so the same
+phrase spoken the same way is synthesized once.
+
+Two tiers:
+- memory: LRU bounded by `TTS_CACHE_MEMORY_MAX_BYTES`, answers in microseconds;
+- disk: one file per entry under `TTS_CACHE_DIR`, bounded by
+  `TTS_CACHE_DISK_MAX_BYTES` with least-recently-used eviction. It survives
+  restarts and is shared by every worker on the host. Disk hits are promoted
+  to memory.
+
+Set `TTS_CACHE_DIR=""` to keep the cache in memory only, or
+`TTS_CACHE_ENABLED=false` to bypass it entirely. Failed syntheses are never
+cached.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+TTS_CACHE_MEMORY_MAX_BYTES = int(os.getenv("TTS_CACHE_MEMORY_MAX_BYTES", str(64 * 1024 * 1024)))
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+TTS_CACHE_DISK_MAX_BYTES = int(os.getenv("TTS_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024)))
+
+CACHE_SOURCES = ("memory", "disk", "miss", "bypass")
+
+
+def tts_cache_key(provider: str, voice: str, text: str, speed=None, model: Optional[str] = None,
+                  audio_format: str = "mp3") -> str:
+    """Stable content address for one synthesis request."""
+    identity = json.dumps([provider, model, voice, speed, audio_format, text], ensure_ascii=False)
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Memory LRU in front of a size-bounded directory of audio files."""
+
+    def __init__(self, memory_max_bytes: int = TTS_CACHE_MEMORY_MAX_BYTES, directory: Optional[str] = TTS_CACHE_DIR,
+                 disk_max_bytes: int = TTS_CACHE_DISK_MAX_BYTES, enabled: bool = TTS_CACHE_ENABLED):
+        self.enabled = enabled
+        self.memory_max_bytes = memory_max_bytes
+        self.directory = directory or None
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        # key -> file size, least recently used first; loaded from the directory on first use
+        self._disk_index: Optional["OrderedDict[str, int]"] = None
+        self._disk_bytes = 0
+        self._disk_lock = asyncio.Lock()
+        self.counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stores": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "disk_errors": 0,
+            "hit_us_total": 0.0,
+            "miss_ms_total": 0.0
+        }
+
+    async def get_or_synthesize(self, key: str, synthesize: Callable[[], Awaitable[bytes]]) -> Tuple[bytes, str]:
+        """Return (audio, source), calling `synthesize()` only when neither tier has the key."""
+        if not self.enabled:
+            self.counters["bypassed"] += 1
+            return await synthesize(), "bypass"
+
+        started = time.perf_counter()
+        audio = self._memory_get(key)
+        source = "memory"
+        if audio is None and self.directory:
+            audio = await self._disk_get(key)
+            source = "disk"
+        if audio is not None:
+            self.counters[f"{source}_hits"] += 1
+            self.counters["hit_us_total"] += (time.perf_counter() - started) * 1_000_000
+            return audio, source
+
+        audio = await synthesize()
+        self.counters["misses"] += 1
+        self.counters["miss_ms_total"] += (time.perf_counter() - started) * 1000
+        if audio:
+            await self.put(key, audio)
+        return audio, "miss"
+
+    async def put(self, key: str, audio: bytes) -> None:
+        self.counters["stores"] += 1
+        self._memory_put(key, audio)
+        if self.directory:
+            await self._disk_put(key, audio)
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+        return audio
+
+    def _memory_put(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.counters["memory_evictions"] += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.audio")
+
+    def _scan_disk(self) -> "OrderedDict[str, int]":
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".audio"):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, name[:-len(".audio")], stat.st_size))
+        entries.sort()
+        return OrderedDict((key, size) for _, key, size in entries)
+
+    async def _ensure_disk_index(self) -> "OrderedDict[str, int]":
+        if self._disk_index is None:
+            async with self._disk_lock:
+                if self._disk_index is None:
+                    index = await asyncio.to_thread(self._scan_disk)
+                    self._disk_bytes = sum(index.values())
+                    self._disk_index = index
+                    print(f"🗂️ TTS disk cache: {len(index)} entries, {self._disk_bytes} bytes in {self.directory}")
+        return self._disk_index
+
+    def _read_file(self, path: str) -> bytes:
+        with open(path, "rb") as audio_file:
+            audio = audio_file.read()
+        # mtime doubles as the LRU timestamp when the index is rebuilt after a restart
+        os.utime(path)
+        return audio
+
+    def _write_file(self, path: str, audio: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique per write: concurrent misses for one key (in any worker) must not share a temp file
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp_path, "wb") as audio_file:
+                audio_file.write(audio)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def _remove_files(self, paths) -> None:
+        for path in paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    async def _disk_get(self, key: str) -> Optional[bytes]:
+        index = await self._ensure_disk_index()
+        # Keys missing from the index are still tried: another worker may have written them
+        try:
+            audio = await asyncio.to_thread(self._read_file, self._path(key))
+        except OSError:
+            # Never written, or removed by another worker's eviction
+            self._disk_bytes -= index.pop(key, 0)
+            return None
+        self._disk_bytes += len(audio) - index.pop(key, 0)
+        index[key] = len(audio)
+        self._memory_put(key, audio)
+        return audio
+
+    async def _disk_put(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.disk_max_bytes:
+            return
+        index = await self._ensure_disk_index()
+        try:
+            await asyncio.to_thread(self._write_file, self._path(key), audio)
+        except OSError as e:
+            self.counters["disk_errors"] += 1
+            print(f"⚠️ TTS disk cache write failed: {e}")
+            return
+
+        self._disk_bytes += len(audio) - index.pop(key, 0)
+        index[key] = len(audio)
+        evicted = []
+        while self._disk_bytes > self.disk_max_bytes and len(index) > 1:
+            old_key, size = index.popitem(last=False)
+            self._disk_bytes -= size
+            evicted.append(self._path(old_key))
+        if evicted:
+            self.counters["disk_evictions"] += len(evicted)
+            await asyncio.to_thread(self._remove_files, evicted)
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+        self._memory_bytes = 0
+
+    def stats(self) -> Dict:
+        counters = self.counters
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "memory_max_bytes": self.memory_max_bytes,
+            "disk_directory": self.directory,
+            "disk_entries": len(self._disk_index) if self._disk_index is not None else None,
+            "disk_bytes": self._disk_bytes if self._disk_index is not None else None,
+            "disk_max_bytes": self.disk_max_bytes if self.directory else None,
+            "memory_hits": counters["memory_hits"],
+            "disk_hits": counters["disk_hits"],
+            "misses": counters["misses"],
+            "bypassed": counters["bypassed"],
+            "stores": counters["stores"],
+            "memory_evictions": counters["memory_evictions"],
+            "disk_evictions": counters["disk_evictions"],
+            "disk_errors": counters["disk_errors"],
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "avg_hit_us": counters["hit_us_total"] / hits if hits else None,
+            "avg_miss_ms": counters["miss_ms_total"] / counters["misses"] if counters["misses"] else None
+        }
+
+
+tts_cache = TTSCache()
+
+
+async def cached_speech(provider: str, voice: str, text: str, synthesize: Callable[[], Awaitable[bytes]],
+                        speed=None, model: Optional[str] = None, audio_format: str = "mp3",
+                        use_cache: bool = True) -> Tuple[bytes, str]:
+    """
+    Synthesize `text` through the shared TTS cache.
+
+    Returns (audio, source) where source is one of CACHE_SOURCES. `synthesize`
+    is only awaited on a miss; `use_cache=False` skips the cache (provider
+    benchmarks).
+    """
+    if not use_cache:
+        tts_cache.counters["bypassed"] += 1
+        return await synthesize(), "bypass"
+    key = tts_cache_key(provider, voice, text, speed=speed, model=model, audio_format=audio_format)
+    return await tts_cache.get_or_synthesize(key, synthesize)
+
+
+def get_tts_cache_stats() -> Dict:
+    return tts_cache.stats()
@@ -0,0 +1,71 @@
+"""
+In-memory audio uploads for the async Whisper client.
+
+The OpenAI SDK accepts `(filename, content, content_type)` tuples for file
+parameters; the filename only tells Whisper which container to decode. Passing
+the clip that way avoids writing a temp file, reopening it and unlinking it
+on every utterance, and there is nothing left on disk if a request fails
+halfway.
+
+Uploads above `STT_SPOOL_MAX_BYTES` are not pulled into memory at all.
+Starlette already spools large multipart bodies to a SpooledTemporaryFile, and
+that file object is handed to the SDK as-is, so httpx streams it into the
+Whisper request. Such clips skip local preprocessing, since decoding minutes of
+audio in NumPy would cost more than it saves.
+"""
+
+import os
+from typing import BinaryIO, Dict, Optional, Tuple, Union
+
+from fastapi import HTTPException, UploadFile
+
+from app.voice.preprocess import prepare_stt_audio, upload_format
+
+STT_SPOOL_MAX_BYTES = int(os.getenv("STT_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+# Whisper API request limit
+WHISPER_MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+upload_stats = {
+    "in_memory": 0,
+    "spooled": 0,
+    "rejected_too_large": 0
+}
+
+
+def whisper_file(audio: Union[bytes, BinaryIO], suffix: str = ".wav", content_type: str = "audio/wav") -> Tuple:
+    """Named in-memory file for `openai_client.audio.transcriptions.create(file=...)`."""
+    return (f"speech{suffix}", audio, content_type)
+
+
+async def _upload_size(audio_file: UploadFile) -> int:
+    if audio_file.size is not None:
+        return audio_file.size
+    # UploadFile.seek only takes an offset; measure on the underlying spool
+    audio_file.file.seek(0, os.SEEK_END)
+    size = audio_file.file.tell()
+    await audio_file.seek(0)
+    return size
+
+
+async def whisper_upload(audio_file: UploadFile) -> Tuple[Tuple, Optional[Dict]]:
+    """
+    Turn an uploaded clip into a Whisper file argument.
+
+    Returns (file tuple, preprocessing summary). The summary is None for
+    spooled uploads, which are forwarded without local preprocessing.
+    """
+    size = await _upload_size(audio_file)
+    if size > WHISPER_MAX_UPLOAD_BYTES:
+        upload_stats["rejected_too_large"] += 1
+        raise HTTPException(status_code=413, detail=f"Audio file exceeds Whisper's {WHISPER_MAX_UPLOAD_BYTES // (1024 * 1024)}MB limit")
+
+    if size > STT_SPOOL_MAX_BYTES:
+        upload_stats["spooled"] += 1
+        await audio_file.seek(0)
+        media_type, suffix = upload_format(audio_file.content_type)
+        print(f"📼 Streaming {size} byte upload to Whisper from the request spool")
+        return whisper_file(audio_file.file, suffix, media_type), None
+
+    upload_stats["in_memory"] += 1
+    prepared = await prepare_stt_audio(await audio_file.read(), audio_file.content_type)
+    return whisper_file(prepared.audio, prepared.suffix, prepared.content_type), prepared.summary()
@@ -0,0 +1,76 @@
+"""
+Local voice activity detection and silence trimming before STT.
+
+Recorded clips usually carry leading and trailing silence, and both upload
+size and STT latency scale with clip length. `detect_speech` classifies 20 ms
+frames of normalized mono audio by energy and zero-crossing rate and returns
+the speech region plus a small padding, or reports that the clip holds no
+speech so the route can reject it without calling Deepgram or Whisper.
+Decoding and re-encoding live in app.voice.normalize; the combined stage is
+app.voice.preprocess.
+
+Frame classification:
+- the noise floor is the 10th percentile of frame energy (dBFS);
+- voiced frames are louder than the floor by `VAD_ENERGY_MARGIN_DB` and have
+  a zero-crossing rate below `VAD_MAX_VOICED_ZCR`, which excludes hiss and clicks;
+- unvoiced speech (fricatives such as "s", "f") is slightly quieter but has a
+  high zero-crossing rate; it extends the speech region at the edges.
+"""
+
+import os
+from typing import Tuple
+
+import numpy as np
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+VAD_FRAME_MS = 20
+VAD_PADDING_MS = int(os.getenv("VAD_PADDING_MS", "200"))
+VAD_MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "150"))
+VAD_MIN_ENERGY_DBFS = float(os.getenv("VAD_MIN_ENERGY_DBFS", "-50"))
+VAD_ENERGY_MARGIN_DB = float(os.getenv("VAD_ENERGY_MARGIN_DB", "10"))
+VAD_MAX_VOICED_ZCR = 0.4
+VAD_UNVOICED_ZCR = 0.25
+# Thresholds never sit closer than this to the loudest frame, so clips that are speech throughout are kept whole
+VAD_DYNAMIC_RANGE_DB = 20.0
+
+vad_stats = {
+    "requests": 0,
+    "trimmed": 0,
+    "rejected_no_speech": 0,
+    "passthrough": 0,
+    "input_ms_total": 0,
+    "saved_ms_total": 0
+}
+
+
+def detect_speech(mono: np.ndarray, sample_rate: int) -> Tuple[bool, int, int]:
+    """Return (has_speech, first_sample, end_sample) of the padded speech region."""
+    frame_len = max(1, sample_rate * VAD_FRAME_MS // 1000)
+    frame_count = len(mono) // frame_len
+    if frame_count == 0:
+        return False, 0, 0
+
+    frames = mono[:frame_count * frame_len].reshape(frame_count, frame_len)
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_len
+
+    peak = float(energy_db.max())
+    floor = float(np.percentile(energy_db, 10))
+    threshold = min(max(VAD_MIN_ENERGY_DBFS, floor + VAD_ENERGY_MARGIN_DB), peak - VAD_DYNAMIC_RANGE_DB)
+    threshold = max(threshold, VAD_MIN_ENERGY_DBFS)
+
+    voiced = (energy_db > threshold) & (zcr < VAD_MAX_VOICED_ZCR)
+    unvoiced = (energy_db > threshold - 6.0) & (zcr > VAD_UNVOICED_ZCR)
+
+    speech_ms = int(np.count_nonzero(voiced)) * VAD_FRAME_MS
+    has_speech = peak >= VAD_MIN_ENERGY_DBFS and peak - floor >= 6.0 and speech_ms >= VAD_MIN_SPEECH_MS
+    if not has_speech:
+        return False, 0, 0
+
+    speech_frames = np.flatnonzero(voiced | unvoiced)
+    padding = VAD_PADDING_MS // VAD_FRAME_MS
+    first = max(0, int(speech_frames[0]) - padding)
+    last = min(frame_count, int(speech_frames[-1]) + 1 + padding)
+    end_sample = len(mono) if last == frame_count else last * frame_len
+    return True, first * frame_len, end_sample
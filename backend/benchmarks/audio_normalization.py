@@ -0,0 +1,93 @@
+"""
+Benchmark: STT audio preprocessing throughput.
+
+Feeds synthetic browser-style recordings through
+app.voice.preprocess.preprocess_stt_audio (decode, downmix, resample to
+16 kHz, VAD trim, encode). Each clip is speech-like tones padded with silence.
+The benchmark reports:
+
+- seconds of audio processed per CPU-second, per input format and codec;
+- upload size before and after;
+- wall-clock throughput when the audio thread pool processes many clips
+  at once, which shows how much NumPy's GIL release buys.
+
+Run from the backend directory:
+
+    python -m benchmarks.audio_normalization [--seconds 10] [--iterations 20]
+"""
+
+import argparse
+import asyncio
+import io
+import time
+import wave
+
+import numpy as np
+
+from app.voice import normalize
+from app.voice.preprocess import AUDIO_PREPROCESS_WORKERS, audio_executor, preprocess_stt_audio
+
+# (label, sample rate, channels)
+INPUT_FORMATS = [
+    ("48k stereo", 48000, 2),
+    ("44.1k stereo", 44100, 2),
+    ("48k mono", 48000, 1),
+    ("16k mono", 16000, 1),
+]
+
+
+def synthetic_clip(seconds: float, sample_rate: int, channels: int) -> bytes:
+    rng = np.random.default_rng(7)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = (np.sin(2 * np.pi * 2.5 * t) > -0.3).astype(np.float32)
+    voice = 0.3 * np.sin(2 * np.pi * 180 * t) * envelope + 0.1 * np.sin(2 * np.pi * 900 * t) * envelope
+    silence = np.zeros(sample_rate)
+    mono = np.concatenate([silence, voice, silence]) + rng.normal(0, 0.001, len(voice) + 2 * sample_rate)
+    samples = np.repeat(mono[:, None], channels, axis=1)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def single_thread(clip: bytes, audio_seconds: float, iterations: int):
+    start = time.process_time()
+    for _ in range(iterations):
+        prepared = preprocess_stt_audio(clip, "audio/wav")
+    cpu = time.process_time() - start
+    return audio_seconds * iterations / cpu, len(prepared.audio)
+
+
+async def pooled(clip: bytes, audio_seconds: float, clips: int):
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        loop.run_in_executor(audio_executor, preprocess_stt_audio, clip, "audio/wav")
+        for _ in range(clips)
+    ))
+    return audio_seconds * clips / (time.perf_counter() - start)
+
+
+def run(seconds: float, iterations: int):
+    audio_seconds = seconds + 2  # speech plus one second of silence on each side
+    print(f"{audio_seconds:.0f}s clips, {iterations} iterations, pool of {AUDIO_PREPROCESS_WORKERS} workers\n")
+    print(f"{'input':<14}{'codec':<7}{'in bytes':>11}{'out bytes':>11}{'audio s / cpu s':>17}{'pooled audio s / wall s':>25}")
+    for label, sample_rate, channels in INPUT_FORMATS:
+        clip = synthetic_clip(seconds, sample_rate, channels)
+        for codec in normalize.AUDIO_CODECS:
+            normalize.STT_AUDIO_CODEC = codec
+            per_cpu, out_bytes = single_thread(clip, audio_seconds, iterations)
+            pooled_rate = asyncio.run(pooled(clip, audio_seconds, iterations * 2))
+            print(f"{label:<14}{codec:<7}{len(clip):>11,}{out_bytes:>11,}{per_cpu:>17,.0f}{pooled_rate:>25,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    run(args.seconds, args.iterations)
@@ -0,0 +1,72 @@
+"""
+Benchmark: base64-in-JSON vs binary audio delivery.
+
+Compares, per utterance, the bytes on the wire and the server CPU time spent
+building the response body for the two delivery modes used by the TTS routes:
+
+- json:   {"audio_base64": ..., "latency_ms": ..., ...} serialized with json.dumps
+- binary: one app.voice.transport frame (header + metadata JSON + raw mp3)
+
+Client-side decode time is reported as well, since base64 also has to be
+undone in the browser. Audio payloads are random bytes at sizes typical of
+short, medium and long mp3 utterances (22.05 kHz, ~32 kbps).
+
+Run from the backend directory:
+
+    python -m benchmarks.audio_transport [--iterations 2000]
+"""
+
+import argparse
+import base64
+import json
+import os
+import time
+
+from app.voice.transport import decode_audio_frame, encode_audio_frame
+
+# (label, payload bytes): ~1 s, ~5 s and ~20 s of speech
+UTTERANCE_SIZES = [("short", 4_000), ("medium", 20_000), ("long", 80_000)]
+
+METADATA = {"latency_ms": 42, "provider": "cartesia-sonic", "voice": "joan", "status": "success"}
+
+
+def encode_json(audio: bytes) -> bytes:
+    return json.dumps({"audio_base64": base64.b64encode(audio).decode("utf-8"), **METADATA}).encode("utf-8")
+
+
+def decode_json(body: bytes) -> bytes:
+    return base64.b64decode(json.loads(body)["audio_base64"])
+
+
+def encode_binary(audio: bytes) -> bytes:
+    return encode_audio_frame({"type": "audio", "format": "mp3", **METADATA}, audio)
+
+
+def decode_binary(body: bytes) -> bytes:
+    return decode_audio_frame(body)[1]
+
+
+def cpu_us_per_call(fn, arg, iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.process_time() - start) / iterations * 1_000_000
+
+
+def run(iterations: int):
+    print(f"{'utterance':<10}{'mode':<8}{'wire bytes':>12}{'overhead':>10}{'encode µs':>12}{'decode µs':>12}")
+    for label, size in UTTERANCE_SIZES:
+        audio = os.urandom(size)
+        for mode, encode, decode in (("json", encode_json, decode_json), ("binary", encode_binary, decode_binary)):
+            body = encode(audio)
+            assert decode(body) == audio
+            overhead = (len(body) - size) / size * 100
+            encode_us = cpu_us_per_call(encode, audio, iterations)
+            decode_us = cpu_us_per_call(decode, body, iterations)
+            print(f"{label:<10}{mode:<8}{len(body):>12,}{overhead:>9.1f}%{encode_us:>12.1f}{decode_us:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    run(parser.parse_args().iterations)
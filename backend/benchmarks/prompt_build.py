@@ -0,0 +1,109 @@
+"""
+Benchmark: voice system prompt build time per turn.
+
+Replays `--turns` voice turns across every journey stage x user role, with
+each stage's tool set from the journey manifest and varying patients. Each
+turn is built two ways:
+
+- compile every turn: the stage, role and tool text is assembled on every
+  call, as build_ultra_fast_medical_prompt did before precompilation;
+- precompiled: app.voice.prompts, where the first turn of a combination
+  compiles it and later turns only substitute the patient fields.
+
+Run from the backend directory:
+
+    python -m benchmarks.prompt_build [--turns 5000]
+"""
+
+import argparse
+import statistics
+import time
+
+from app.routes.journey import journey_manifest_registry
+from app.voice.prompts import (
+    JOURNEY_STAGE_EXPERTISE,
+    ROLE_GUIDANCE,
+    CompiledVoicePrompt,
+    build_memory_context,
+    build_ultra_fast_medical_prompt,
+    voice_prompt_templates,
+)
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1 or 0], statistics.fmean(samples)
+
+
+def build_turns(turns: int):
+    tool_sets = [manifest["tools"] for manifest in journey_manifest_registry.values()]
+    combinations = [(stage, role, tool_sets[index % len(tool_sets)])
+                    for index, stage in enumerate(JOURNEY_STAGE_EXPERTISE) for role in ROLE_GUIDANCE]
+    result = []
+    for turn in range(turns):
+        stage, role, tools = combinations[turn % len(combinations)]
+        context = {
+            "availableTools": tools,
+            "triggeredTools": tools[:1] if turn % 3 == 0 else [],
+            "patient_context": {
+                "total_conversations": turn % 7,
+                "conditions": ["hypertension"] if turn % 2 else [],
+                "key_concerns": ["fatigue", "sleep"],
+                "rolling_summary": f"Patient {turn % 50} discussed follow-up scans." if turn % 5 == 0 else None
+            }
+        }
+        result.append((f"Patient {turn % 50}", stage, role, context))
+    return result, len(combinations)
+
+
+def compile_every_turn(patient_name: str, journey_stage: str, user_role: str, context: dict):
+    tools = tuple(tool["name"] for tool in context["availableTools"])
+    triggered = [tool["name"] for tool in context["triggeredTools"]]
+    return CompiledVoicePrompt(journey_stage, user_role, tools).render(
+        patient_name, build_memory_context(context["patient_context"]), triggered
+    )
+
+
+def measure(build, turns):
+    latencies = []
+    for patient_name, stage, role, context in turns:
+        start = time.perf_counter()
+        build(patient_name, stage, role, context)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    return latencies
+
+
+def run(turns: int):
+    replay, combinations = build_turns(turns)
+    voice_prompt_templates.clear()
+
+    # Both paths must produce the same prompt
+    for patient_name, stage, role, context in replay[:combinations]:
+        expected = compile_every_turn(patient_name, stage, role, context)
+        actual = build_ultra_fast_medical_prompt(patient_name, stage, role, context)
+        assert (expected.prefix, expected.suffix) == (actual.prefix, actual.suffix), f"prompt mismatch for {stage}/{role}"
+    voice_prompt_templates.clear()
+    before = voice_prompt_templates.stats()
+
+    results = [
+        ("compile every turn", measure(compile_every_turn, replay)),
+        ("precompiled", measure(build_ultra_fast_medical_prompt, replay))
+    ]
+
+    print(f"{turns} turns over {combinations} stage x role x tool-set combinations\n")
+    print(f"{'path':<20}{'p50 us':>10}{'p95 us':>10}{'mean us':>10}")
+    for label, latencies in results:
+        p50, p95, mean = percentiles(latencies)
+        print(f"{label:<20}{p50:>10,.1f}{p95:>10,.1f}{mean:>10,.1f}")
+
+    stats = voice_prompt_templates.stats()
+    compiles = stats["compiles"] - before["compiles"]
+    hits = stats["hits"] - before["hits"]
+    print(f"\nprecompiled: {compiles} compiles (avg {stats['avg_compile_us']} us), {hits / turns:.1%} of turns reused a compiled prompt")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--turns", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.turns)
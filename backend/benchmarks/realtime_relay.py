@@ -0,0 +1,141 @@
+"""
+Load test: OpenAI Realtime relay, parse/re-serialize vs pass-through.
+
+Runs many concurrent relay sessions in one process against in-memory fake
+sockets. Each upstream fake emits `response.audio.delta` events shaped like
+the Realtime API's: 24 kHz pcm16 in 100 ms chunks, base64 encoded. The test
+measures CPU time per relayed second of audio and reports how many real-time
+sessions one core could sustain:
+
+- parse:       json.loads + add timestamp + send_json (the previous proxy)
+- passthrough: app.voice.relay.RealtimeRelay (opaque frames, prefix peek)
+
+Socket I/O itself is not included, so the numbers are the relay's own cost.
+
+Run from the backend directory:
+
+    python -m benchmarks.realtime_relay [--sessions 50] [--seconds 20]
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+from datetime import datetime
+
+from app.voice.relay import RealtimeRelay
+
+SAMPLE_RATE = 24000
+CHUNK_MS = 100
+
+
+def audio_delta_frames(seconds: int):
+    pcm = os.urandom(SAMPLE_RATE * 2 * CHUNK_MS // 1000)
+    delta = base64.b64encode(pcm).decode("ascii")
+    frame = json.dumps({
+        "type": "response.audio.delta",
+        "event_id": "event_0001",
+        "response_id": "resp_001",
+        "item_id": "item_001",
+        "output_index": 0,
+        "content_index": 0,
+        "delta": delta
+    })
+    return [frame] * (seconds * 1000 // CHUNK_MS)
+
+
+class FakeUpstream:
+    """Stands in for a `websockets` connection to OpenAI."""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    async def send(self, frame):
+        pass
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for index, frame in enumerate(self.frames):
+            if index % 10 == 0:
+                await asyncio.sleep(0)
+            yield frame
+
+
+class FakeClient:
+    """Stands in for the browser-side FastAPI WebSocket."""
+
+    def __init__(self):
+        self.received = 0
+        self._closed = asyncio.Event()
+
+    async def receive(self):
+        await self._closed.wait()
+        return {"type": "websocket.disconnect"}
+
+    async def send_text(self, frame):
+        self.received += 1
+
+    async def send_bytes(self, frame):
+        self.received += 1
+
+    async def send_json(self, data):
+        json.dumps(data)
+        self.received += 1
+
+
+async def parse_session(frames):
+    client = FakeClient()
+    async for message in FakeUpstream(frames):
+        data = json.loads(message)
+        if data.get("type") == "response.audio.delta":
+            data["timestamp"] = datetime.utcnow().isoformat()
+            data["latency_optimized"] = True
+        await client.send_json(data)
+    return client.received
+
+
+async def passthrough_session(frames):
+    client = FakeClient()
+    await RealtimeRelay(client, FakeUpstream(frames)).run()
+    return client.received
+
+
+async def measure(session, sessions: int, seconds: int):
+    frames = audio_delta_frames(seconds)
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    delivered = await asyncio.gather(*(session(frames) for _ in range(sessions)))
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    assert all(count == len(frames) for count in delivered)
+    audio_seconds = sessions * seconds
+    return {
+        "frames": sum(delivered),
+        "cpu_s": cpu,
+        "wall_s": wall,
+        "cpu_ms_per_audio_s": cpu / audio_seconds * 1000,
+        "sessions_per_core": audio_seconds / cpu if cpu else float("inf")
+    }
+
+
+def run(sessions: int, seconds: int):
+    print(f"{sessions} sessions x {seconds}s of 24 kHz pcm16 audio ({CHUNK_MS} ms deltas)\n")
+    print(f"{'mode':<13}{'frames':>9}{'cpu s':>9}{'cpu ms / audio s':>18}{'sessions / core':>17}")
+    for mode, session in (("parse", parse_session), ("passthrough", passthrough_session)):
+        result = asyncio.run(measure(session, sessions, seconds))
+        print(
+            f"{mode:<13}{result['frames']:>9,}{result['cpu_s']:>9.2f}"
+            f"{result['cpu_ms_per_audio_s']:>18.3f}{result['sessions_per_core']:>17,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--seconds", type=int, default=20)
+    args = parser.parse_args()
+    run(args.sessions, args.seconds)
@@ -0,0 +1,87 @@
+"""
+Benchmark: request coalescing of identical concurrent calls.
+
+Fires `--clients` concurrent identical requests at a FastAPI route that
+calls a simulated upstream (`--upstream-ms`). The route is run twice: plain,
+then decorated with app.singleflight. Reports upstream call counts and
+per-request latency, and exits non-zero unless the coalesced run made exactly
+one upstream call.
+
+Run from the backend directory:
+
+    python -m benchmarks.singleflight [--clients 50] [--upstream-ms 400]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from app.singleflight import get_singleflight_stats, singleflight
+
+
+class ImageryRequest(BaseModel):
+    stage: str
+
+
+def build_app(upstream_ms: float, counter: dict) -> FastAPI:
+    app = FastAPI()
+
+    async def upstream(stage: str) -> dict:
+        counter["calls"] += 1
+        await asyncio.sleep(upstream_ms / 1000)
+        return {"stage": stage, "image_url": f"https://images.example/{stage}.png"}
+
+    @app.post("/plain")
+    async def plain(request: ImageryRequest):
+        return await upstream(request.stage)
+
+    @app.post("/coalesced")
+    @singleflight("benchmark-imagery")
+    async def coalesced(request: ImageryRequest):
+        return await upstream(request.stage)
+
+    return app
+
+
+async def burst(client: httpx.AsyncClient, path: str, clients: int):
+    async def one():
+        start = time.perf_counter()
+        response = await client.post(path, json={"stage": "treatment"})
+        response.raise_for_status()
+        return (time.perf_counter() - start) * 1000
+
+    return sorted(await asyncio.gather(*(one() for _ in range(clients))))
+
+
+async def run(clients: int, upstream_ms: float) -> int:
+    counter = {"calls": 0}
+    transport = httpx.ASGITransport(app=build_app(upstream_ms, counter))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{clients} concurrent identical requests, simulated upstream {upstream_ms:.0f} ms\n")
+        print(f"{'route':<12}{'upstream calls':>16}{'p50 ms':>10}{'max ms':>10}")
+        upstream_calls = {}
+        for path in ("/plain", "/coalesced"):
+            counter["calls"] = 0
+            latencies = await burst(client, path, clients)
+            upstream_calls[path] = counter["calls"]
+            print(f"{path:<12}{counter['calls']:>16}{latencies[len(latencies) // 2]:>10.1f}{latencies[-1]:>10.1f}")
+
+    stats = get_singleflight_stats()["benchmark-imagery"]
+    print(f"\ncoalesced {stats['coalesced']} of {stats['calls']} calls (max {stats['max_waiters']} waiters)")
+    if upstream_calls["/coalesced"] != 1:
+        print(f"FAIL: expected exactly one upstream call, got {upstream_calls['/coalesced']}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--upstream-ms", type=float, default=400)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.clients, args.upstream_ms)))
@@ -0,0 +1,71 @@
+"""
+Benchmark: TTS cache hit latency vs provider synthesis.
+
+Replays a set of deterministic phrases (greetings, stage suggestions, fallback
+messages) through app.voice.tts_cache with a simulated provider. The provider
+sleeps for `--provider-ms` and returns `--audio-kb` of audio. The benchmark
+reports per-request latency for:
+
+- miss: the provider is called and both tiers are filled;
+- disk hit: a fresh process's view, with the memory tier cleared;
+- memory hit: the steady state for hot phrases.
+
+Run from the backend directory:
+
+    python -m benchmarks.tts_cache [--phrases 50] [--provider-ms 250] [--audio-kb 40]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from app.voice.tts_cache import TTSCache, tts_cache_key
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1 or 0], statistics.fmean(samples)
+
+
+async def replay(cache: TTSCache, keys, synthesize):
+    latencies = []
+    for key in keys:
+        start = time.perf_counter()
+        await cache.get_or_synthesize(key, synthesize)
+        latencies.append((time.perf_counter() - start) * 1_000_000)
+    return latencies
+
+
+async def run(phrases: int, provider_ms: float, audio_kb: int):
+    audio = os.urandom(audio_kb * 1024)
+
+    async def synthesize() -> bytes:
+        await asyncio.sleep(provider_ms / 1000)
+        return audio
+
+    keys = [tts_cache_key("openai", "nova", f"Welcome back, phrase {i}.", speed=0.6, model="tts-1") for i in range(phrases)]
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSCache(directory=directory, enabled=True)
+        results = [("miss", await replay(cache, keys, synthesize))]
+        cache.clear_memory()
+        results.append(("disk hit", await replay(cache, keys, synthesize)))
+        results.append(("memory hit", await replay(cache, keys, synthesize)))
+
+        print(f"{phrases} phrases, {audio_kb} KB each, simulated provider {provider_ms:.0f} ms\n")
+        print(f"{'path':<12}{'p50 us':>12}{'p95 us':>12}{'mean us':>12}")
+        for label, latencies in results:
+            p50, p95, mean = percentiles(latencies)
+            print(f"{label:<12}{p50:>12,.1f}{p95:>12,.1f}{mean:>12,.1f}")
+        print(f"\nhit rate {cache.stats()['hit_rate']:.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--phrases", type=int, default=50)
+    parser.add_argument("--provider-ms", type=float, default=250)
+    parser.add_argument("--audio-kb", type=int, default=40)
+    args = parser.parse_args()
+    asyncio.run(run(args.phrases, args.provider_ms, args.audio_kb))
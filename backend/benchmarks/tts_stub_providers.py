@@ -0,0 +1,150 @@
+"""
+Local stand-ins for the OpenAI, ElevenLabs and Cartesia TTS APIs.
+
+Each endpoint accepts the same path and JSON body as the real API. It waits
+for a time-to-first-byte drawn from a configurable latency distribution, then
+streams fake MP3 bytes sized to the text in chunks. The pacing between chunks
+follows the provider's real-time factor. An optional error rate returns 500s.
+
+Latency specs:
+
+    fixed:120                      always 120 ms
+    normal:mean=200,sd=40          clipped at 1 ms
+    lognormal:median=250,sigma=0.5 long right tail, like real providers
+
+Used in-process by benchmarks/tts_suite.py --offline, or standalone:
+
+    python -m benchmarks.tts_stub_providers [--port 8787] [--openai lognormal:median=300,sigma=0.4]
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import socket
+from typing import Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Roughly what each provider shows from a nearby region
+DEFAULT_LATENCY = {
+    "openai": "lognormal:median=350,sigma=0.35",
+    "elevenlabs": "lognormal:median=280,sigma=0.45",
+    "cartesia": "lognormal:median=90,sigma=0.3",
+}
+AUDIO_BYTES_PER_CHAR = 180  # ~ 32 kbps MP3 at normal speaking rate
+CHUNK_BYTES = 4096
+REALTIME_FACTOR = 8.0  # Audio generated this many times faster than playback
+
+
+class LatencyDistribution:
+    """Samples a latency in milliseconds from a `kind:params` spec."""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip()
+        if self.kind == "fixed":
+            self.params = {"ms": float(params)}
+        else:
+            self.params = {key.strip(): float(value) for key, value in (item.split("=") for item in params.split(",") if item)}
+        if self.kind not in ("fixed", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params["ms"]
+        if self.kind == "normal":
+            return max(1.0, random.gauss(self.params["mean"], self.params["sd"]))
+        return random.lognormvariate(math.log(self.params["median"]), self.params["sigma"])
+
+
+def create_stub_app(latency: Optional[Dict[str, str]] = None, error_rate: float = 0.0) -> FastAPI:
+    specs = {**DEFAULT_LATENCY, **(latency or {})}
+    distributions = {provider: LatencyDistribution(spec) for provider, spec in specs.items()}
+    app = FastAPI(title="TTS provider stand-ins")
+    app.state.requests = {provider: 0 for provider in specs}
+
+    def synthesize(provider: str, text: str):
+        app.state.requests[provider] += 1
+        if error_rate and random.random() < error_rate:
+            return JSONResponse(status_code=500, content={"error": f"{provider} stub: simulated failure"})
+
+        ttfb_ms = distributions[provider].sample()
+        size = max(CHUNK_BYTES, len(text) * AUDIO_BYTES_PER_CHAR)
+        # Playback time of one chunk at ~32 kbps, sped up by the real-time factor
+        chunk_seconds = CHUNK_BYTES / 4000 / REALTIME_FACTOR
+
+        async def audio():
+            await asyncio.sleep(ttfb_ms / 1000)
+            sent = 0
+            while sent < size:
+                chunk = min(CHUNK_BYTES, size - sent)
+                yield b"\xff\xf3" + bytes(chunk - 2)
+                sent += chunk
+                if sent < size:
+                    await asyncio.sleep(chunk_seconds)
+
+        return StreamingResponse(audio(), media_type="audio/mpeg")
+
+    @app.post("/v1/audio/speech")
+    async def openai_speech(request: Request):
+        body = await request.json()
+        return synthesize("openai", body.get("input", ""))
+
+    @app.post("/v1/text-to-speech/{voice_id}")
+    async def elevenlabs_speech(voice_id: str, request: Request):
+        body = await request.json()
+        return synthesize("elevenlabs", body.get("text", ""))
+
+    @app.post("/tts/bytes")
+    async def cartesia_speech(request: Request):
+        body = await request.json()
+        return synthesize("cartesia", body.get("transcript", ""))
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StubProviders:
+    """Runs the stand-ins in the current event loop: `async with StubProviders() as base_url:`."""
+
+    def __init__(self, latency: Optional[Dict[str, str]] = None, error_rate: float = 0.0, port: Optional[int] = None):
+        self.app = create_stub_app(latency, error_rate)
+        self.port = port or free_port()
+        self.server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def __aenter__(self) -> str:
+        self._task = asyncio.create_task(self.server.serve())
+        while not self.server.started:
+            if self._task.done():
+                self._task.result()
+            await asyncio.sleep(0.01)
+        return self.base_url
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.server.should_exit = True
+        await self._task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    for name in DEFAULT_LATENCY:
+        parser.add_argument(f"--{name}", metavar="SPEC", help=f"latency spec (default {DEFAULT_LATENCY[name]})")
+    args = parser.parse_args()
+    overrides = {name: getattr(args, name) for name in DEFAULT_LATENCY if getattr(args, name)}
+    uvicorn.run(create_stub_app(overrides, args.error_rate), host="127.0.0.1", port=args.port)
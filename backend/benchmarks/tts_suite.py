@@ -0,0 +1,95 @@
+"""
+Benchmark: TTS providers' time-to-first-byte, total time and throughput.
+
+Runs app.voice.tts_benchmark for each provider: `--warmups` discarded
+requests, then `--iterations` measured ones at `--concurrency`. It prints
+p50/p90/p99 for TTFB and total time, plus the change from the previous
+comparable run in the results history. `--offline` starts local stand-ins
+for every API (benchmarks/tts_stub_providers.py), so the suite needs no keys
+or network. Their latency is set with `--latency provider=spec`.
+
+Run from the backend directory:
+
+    python -m benchmarks.tts_suite --offline [--iterations 50] [--concurrency 4]
+    python -m benchmarks.tts_suite --providers openai,cartesia --iterations 20
+"""
+
+import argparse
+import asyncio
+import sys
+
+from app.voice.tts_benchmark import (
+    PROVIDER_BASE_URLS,
+    TTS_BENCHMARK_RESULTS_PATH,
+    configured_providers,
+    run_suite,
+)
+from benchmarks.tts_stub_providers import StubProviders
+
+DEFAULT_TEXT = "Hello Maria, I'm Dr. Maya. I'm here to support you through every step of your journey. How can I help you today?"
+
+
+def print_results(results, offline: bool):
+    print(f"\n{'provider':<12}{'ok':>5}{'err':>5}  {'ttfb p50':>9}{'p90':>8}{'p99':>8}  {'total p50':>10}{'p90':>8}{'p99':>8}"
+          f"  {'req/s':>7}{'KB/s':>9}  vs previous")
+    for result in results:
+        ttfb, total = result["ttfb"], result["total"]
+        comparison = result["comparison"]
+        if comparison is None:
+            change = "first run"
+        else:
+            change = f"total p50 {comparison['change_pct'].get('total_p50_ms', 0):+.1f}%"
+            if comparison["regression"]:
+                change += f"  REGRESSION {comparison['regressions']}"
+        cells = [ttfb["p50_ms"], ttfb["p90_ms"], ttfb["p99_ms"], total["p50_ms"], total["p90_ms"], total["p99_ms"]]
+        ttfb_cells = "".join(f"{value:>{width},.0f}" if value is not None else f"{'-':>{width}}"
+                             for value, width in zip(cells[:3], (9, 8, 8)))
+        total_cells = "".join(f"{value:>{width},.0f}" if value is not None else f"{'-':>{width}}"
+                              for value, width in zip(cells[3:], (10, 8, 8)))
+        print(f"{result['provider']:<12}{result['succeeded']:>5}{result['errors']:>5}  {ttfb_cells}  {total_cells}"
+              f"  {result['throughput_rps'] or 0:>7.1f}{result['throughput_audio_kbps'] or 0:>9.1f}  {change}")
+        for error in result["error_samples"]:
+            print(f"{'':<12}error: {error[:100]}")
+    print(f"\n{'offline stand-ins' if offline else 'live providers'}, latencies in ms")
+
+
+async def run(args) -> int:
+    providers = args.providers.split(",") if args.providers else (list(PROVIDER_BASE_URLS) if args.offline else configured_providers())
+    if not providers:
+        print("No TTS providers configured; set API keys or use --offline")
+        return 2
+    latency = dict(spec.split("=", 1) for spec in args.latency)
+
+    async def suite(base_urls, target):
+        return await run_suite(providers, args.text, args.iterations, args.warmups, args.concurrency, base_urls=base_urls,
+                               target=target, persist=not args.no_persist, results_path=args.results)
+
+    if args.offline:
+        async with StubProviders(latency, args.error_rate) as base_url:
+            results = await suite({provider: base_url for provider in providers}, "offline")
+    else:
+        results = await suite(None, "live")
+
+    print(f"{len(providers)} providers, {args.warmups} warmups + {args.iterations} iterations at concurrency {args.concurrency}")
+    print_results(results, args.offline)
+    if not args.no_persist:
+        print(f"results appended to {args.results}")
+    regressed = any(result["comparison"] and result["comparison"]["regression"] for result in results)
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--providers", help="comma-separated; default every configured provider (all with --offline)")
+    parser.add_argument("--offline", action="store_true", help="benchmark local stand-ins instead of the real APIs")
+    parser.add_argument("--latency", action="append", default=[], metavar="PROVIDER=SPEC",
+                        help="stand-in latency, e.g. openai=lognormal:median=300,sigma=0.4")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="stand-in failure probability")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmups", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--text", default=DEFAULT_TEXT)
+    parser.add_argument("--results", default=TTS_BENCHMARK_RESULTS_PATH)
+    parser.add_argument("--no-persist", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    sys.exit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,102 @@
+"""
+Benchmark: Whisper uploads from a temp file vs from memory.
+
+Sends the same clip through the real AsyncOpenAI transcription call twice:
+
+- "temp file": the old path. It writes a NamedTemporaryFile, reopens it, uploads
+  it and unlinks it;
+- "in memory": the app.voice.uploads.whisper_file tuple.
+
+The OpenAI client runs against an httpx MockTransport that reads the whole
+multipart body and answers at once. The numbers therefore measure only the
+client-side cost of each path: disk I/O, file-handle churn and multipart
+encoding. Run with the temp directory on the same disk the API uses to see
+the production difference.
+
+Run from the backend directory:
+
+    python -m benchmarks.whisper_upload [--iterations 200] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.voice.uploads import whisper_file
+
+SIZES = [("100 KB", 100 * 1024), ("1 MB", 1024 * 1024), ("5 MB", 5 * 1024 * 1024)]
+
+
+def mock_client() -> AsyncOpenAI:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        return httpx.Response(200, json={"text": "ok"})
+
+    http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return AsyncOpenAI(api_key="benchmark", http_client=http_client, max_retries=0)
+
+
+async def via_temp_file(client: AsyncOpenAI, audio: bytes):
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
+        temp_file.write(audio)
+        temp_file_path = temp_file.name
+    try:
+        with open(temp_file_path, "rb") as upload:
+            await client.audio.transcriptions.create(model="whisper-1", file=upload, language="en")
+    finally:
+        os.unlink(temp_file_path)
+
+
+async def in_memory(client: AsyncOpenAI, audio: bytes):
+    await client.audio.transcriptions.create(model="whisper-1", file=whisper_file(audio), language="en")
+
+
+async def measure(path, client: AsyncOpenAI, audio: bytes, iterations: int, concurrency: int):
+    for _ in range(3):
+        await path(client, audio)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await path(client, audio)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(iterations)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "mean": statistics.fmean(latencies),
+        "rps": iterations / wall
+    }
+
+
+async def run(iterations: int, concurrency: int):
+    client = mock_client()
+    print(f"{iterations} uploads per case, concurrency {concurrency}, temp dir {tempfile.gettempdir()}\n")
+    print(f"{'size':<9}{'path':<12}{'p50 ms':>9}{'p95 ms':>9}{'mean ms':>9}{'req/s':>9}")
+    for label, size in SIZES:
+        audio = os.urandom(size)
+        for name, path in (("temp file", via_temp_file), ("in memory", in_memory)):
+            result = await measure(path, client, audio, iterations, concurrency)
+            print(f"{label:<9}{name:<12}{result['p50']:>9.2f}{result['p95']:>9.2f}{result['mean']:>9.2f}{result['rps']:>9.0f}")
+    await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations, args.concurrency))
@@ -17,7 +17,11 @@ from app.models import (
     PatientProfile, MedicalCondition, CareTeam, CareTeamMember,
     JourneyProgress, Treatment, SymptomEntry, Appointment,
     CarePlan, PeerStory, ResourceLibrary, InsuranceInfo,
-    MentalHealthCheckIn, AIGeneratedContent
+    MentalHealthCheckIn, AIGeneratedContent,
+    # Conversation memory models
+    ConversationTurn, PatientMemoryContext,
+    # LLM response cache
+    LLMResponseCacheEntry
 )
 from sqlmodel import SQLModel
 
@@ -0,0 +1,45 @@
+"""Decoding of truncated or malformed WAV uploads (app.voice.normalize)."""
+
+import io
+import wave
+
+import numpy as np
+
+from app.voice.normalize import decode_audio
+from app.voice.preprocess import preprocess_stt_audio
+
+
+def stereo_wav(frames: int = 4800, rate: int = 48000) -> bytes:
+    tone = (np.sin(np.linspace(0, 2 * np.pi * 440 * frames / rate, frames)) * 12000).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.repeat(tone, 2).tobytes())
+    return buffer.getvalue()
+
+
+def test_truncated_wav_keeps_whole_frames():
+    audio = stereo_wav()[:-3]  # Cut mid-frame: 16-bit stereo frames are 4 bytes
+
+    samples, rate = decode_audio(audio, "audio/wav")
+
+    assert rate == 48000
+    assert samples.shape == (4799, 2)
+
+
+def test_truncated_wav_is_still_preprocessed():
+    prepared = preprocess_stt_audio(stereo_wav()[:-3], "audio/wav")
+
+    assert prepared.content_type == "audio/wav"
+    assert prepared.input_bytes == len(stereo_wav()) - 3
+
+
+def test_malformed_wav_is_passed_through():
+    audio = b"RIFF\x24\x00\x00\x00WAVEfmt " + b"\x00" * 7
+
+    assert decode_audio(audio, "audio/wav") is None
+    prepared = preprocess_stt_audio(audio, "audio/wav")
+    assert prepared.audio == audio
+    assert not prepared.normalized
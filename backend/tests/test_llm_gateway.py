@@ -0,0 +1,73 @@
+"""
+The shared async LLM clients (app.llm) must not block the event loop.
+
+An AsyncOpenAI client whose transport takes UPSTREAM_DELAY_S to answer is
+put behind `openai_candidate`, the path every router uses, and N routed
+calls run concurrently with a probe that keeps yielding to the loop.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+from openai import AsyncOpenAI
+
+import app.llm.candidates as candidates
+from app.llm.candidates import openai_candidate
+from app.llm.routing import LLMRouter
+
+UPSTREAM_DELAY_S = 0.5
+CONCURRENT_CALLS = 10
+
+
+def slow_openai_client() -> AsyncOpenAI:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(UPSTREAM_DELAY_S)
+        chunk = {
+            "id": "chatcmpl-test",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "gpt-4o-mini",
+            "choices": [{"index": 0, "delta": {"content": "Hello"}, "finish_reason": None}]
+        }
+        body = f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n"
+        return httpx.Response(200, content=body.encode(), headers={"content-type": "text/event-stream"})
+
+    return AsyncOpenAI(api_key="test", max_retries=0,
+                       http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+def test_event_loop_stays_responsive_during_upstream_calls(monkeypatch):
+    monkeypatch.setattr(candidates, "openai_client", slow_openai_client())
+    router = LLMRouter(hedging=False)
+
+    async def call() -> str:
+        candidate = openai_candidate([{"role": "user", "content": "hi"}])
+        return (await router.complete("gateway-test", [candidate])).text
+
+    async def probe(stop: asyncio.Event) -> float:
+        # Longest gap between two turns of the event loop while the calls are in flight
+        worst = 0.0
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0)
+            worst = max(worst, time.perf_counter() - started)
+        return worst
+
+    async def scenario():
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(stop))
+        started = time.perf_counter()
+        texts = await asyncio.gather(*(call() for _ in range(CONCURRENT_CALLS)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        return texts, elapsed, await probe_task
+
+    texts, elapsed, worst_gap = asyncio.run(scenario())
+
+    assert texts == ["Hello"] * CONCURRENT_CALLS
+    # Concurrent, not one after another
+    assert elapsed < UPSTREAM_DELAY_S * 3
+    # The loop kept running other work while every call waited on the upstream
+    assert worst_gap < UPSTREAM_DELAY_S / 10
@@ -0,0 +1,88 @@
+"""Hedge delay and time-to-first-token accounting of the LLM router (app.llm.routing)."""
+
+import asyncio
+
+from app.llm.candidates import LLMCandidate
+from app.llm.routing import LLM_HEDGE_DEFAULT_MS, LLM_HEDGE_MIN_MS, LLMRouter
+
+VOICE_BUDGET_MS = 800
+
+
+def candidate(provider: str, first_token_ms: float = 0, text: str = "ok") -> LLMCandidate:
+    async def stream():
+        await asyncio.sleep(first_token_ms / 1000)
+        yield text
+
+    return LLMCandidate(provider, f"{provider}-model", stream)
+
+
+def with_samples(router: LLMRouter, provider: str, ttft_ms: float) -> None:
+    router._health(provider).ttft_ms.extend([ttft_ms] * 20)
+
+
+def test_hedge_delay_is_primary_p95():
+    router = LLMRouter()
+    with_samples(router, "groq", 300)
+    with_samples(router, "anthropic", 400)
+
+    assert router.hedge_delay_ms(candidate("groq"), candidate("anthropic"), 0, VOICE_BUDGET_MS) == 300
+    assert router.hedge_delay_ms(candidate("groq"), candidate("anthropic"), 0, None) == 300
+
+
+def test_no_hedge_when_it_cannot_answer_inside_800ms_budget():
+    router = LLMRouter()
+    groq, anthropic = candidate("groq"), candidate("anthropic")
+
+    # No samples yet: 1500ms default p95 alone exceeds the budget
+    assert router.hedge_delay_ms(groq, anthropic, 0, VOICE_BUDGET_MS) is None
+    assert router.hedge_delay_ms(groq, anthropic, 0, None) == LLM_HEDGE_DEFAULT_MS
+
+    # Groq p95 300ms, Claude p50 600ms: a hedge at 300ms would answer at ~900ms
+    with_samples(router, "groq", 300)
+    with_samples(router, "anthropic", 600)
+    assert router.hedge_delay_ms(groq, anthropic, 0, VOICE_BUDGET_MS) is None
+
+
+def test_hedge_budget_counts_from_when_the_primary_started():
+    router = LLMRouter()
+    with_samples(router, "groq", 300)
+    with_samples(router, "anthropic", 400)
+
+    assert router.hedge_delay_ms(candidate("groq"), candidate("anthropic"), 100, VOICE_BUDGET_MS) == 300
+    assert router.hedge_delay_ms(candidate("groq"), candidate("anthropic"), 200, VOICE_BUDGET_MS) is None
+
+
+def test_hedge_delay_has_a_floor():
+    router = LLMRouter()
+    with_samples(router, "groq", 20)
+    with_samples(router, "anthropic", 100)
+
+    assert router.hedge_delay_ms(candidate("groq"), candidate("anthropic"), 0, VOICE_BUDGET_MS) == LLM_HEDGE_MIN_MS
+
+
+def test_skipped_hedge_does_not_start_follower():
+    router = LLMRouter(hedging=True)
+
+    result = asyncio.run(router.complete("voice", [candidate("groq", 200, "fast"), candidate("anthropic", 10)],
+                                         budget_ms=VOICE_BUDGET_MS))
+
+    assert result.text == "fast"
+    assert result.attempts == ["groq"]
+    assert result.hedge_skipped and not result.hedged
+    counters = router.stats()["routes"]["voice"]
+    assert (counters["hedges_fired"], counters["hedges_skipped"]) == (0, 1)
+
+
+def test_cancelled_loser_is_not_a_ttft_sample():
+    router = LLMRouter(hedging=True)
+    with_samples(router, "groq", 50)
+
+    result = asyncio.run(router.complete("chat", [candidate("groq", 500, "slow"), candidate("anthropic", 10, "hedge")]))
+
+    assert result.text == "hedge"
+    assert result.hedged
+    groq = router.stats()["providers"]["groq"]
+    assert groq["cancelled"] == 1
+    assert groq["ttft_samples"] == 20
+    assert groq["ttft_p50_ms"] == 50
+    assert router.stats()["providers"]["anthropic"]["ttft_samples"] == 1
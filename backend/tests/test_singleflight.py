@@ -0,0 +1,136 @@
+"""N concurrent identical calls through app.singleflight make exactly one upstream call."""
+
+import asyncio
+import inspect
+
+import pytest
+
+from app.singleflight import SingleFlight, singleflight
+
+CONCURRENT_CALLS = 20
+
+
+def test_concurrent_identical_calls_execute_once():
+    group = SingleFlight("test-once")
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"image_url": "https://images.example/treatment.png"}
+
+    async def scenario():
+        return await asyncio.gather(*(group.do("treatment", upstream) for _ in range(CONCURRENT_CALLS)))
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(value == {"image_url": "https://images.example/treatment.png"} for value, _ in results)
+    assert sum(shared for _, shared in results) == CONCURRENT_CALLS - 1
+    stats = group.stats()
+    assert (stats["calls"], stats["executions"], stats["coalesced"]) == (CONCURRENT_CALLS, 1, CONCURRENT_CALLS - 1)
+    assert stats["max_waiters"] == CONCURRENT_CALLS
+
+
+def test_different_keys_are_not_coalesced():
+    group = SingleFlight("test-keys")
+    calls = []
+
+    async def upstream(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def scenario():
+        return await asyncio.gather(*(group.do(key, lambda key=key: upstream(key)) for key in ("a", "b", "a")))
+
+    results = asyncio.run(scenario())
+
+    assert sorted(calls) == ["a", "b"]
+    assert [value for value, _ in results] == ["a", "b", "a"]
+
+
+def test_exception_is_shared_by_every_waiter():
+    group = SingleFlight("test-errors")
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        return await asyncio.gather(*(group.do("key", upstream) for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) and str(result) == "upstream down" for result in results)
+    assert group.stats()["errors"] == 1
+
+
+def test_finished_calls_are_cleaned_up():
+    group = SingleFlight("test-cleanup")
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        return len(calls)
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        first, _ = await group.do("key", upstream)
+        assert group.stats()["inflight"] == 0
+        # Nothing is kept once a call finishes: the next one runs again
+        second, shared = await group.do("key", upstream)
+        with pytest.raises(RuntimeError):
+            await group.do("other", failing)
+        return first, second, shared
+
+    first, second, shared = asyncio.run(scenario())
+
+    assert (first, second, shared) == (1, 2, False)
+    assert group.stats()["inflight"] == 0
+    assert group._waiters == {}
+
+
+def test_cancelled_caller_does_not_cancel_shared_call():
+    group = SingleFlight("test-cancel")
+
+    async def upstream():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        leaver = asyncio.create_task(group.do("key", upstream))
+        stayer = asyncio.create_task(group.do("key", upstream))
+        await asyncio.sleep(0.01)
+        leaver.cancel()
+        return await stayer
+
+    assert asyncio.run(scenario()) == ("done", True)
+
+
+def test_decorator_coalesces_identical_arguments():
+    calls = []
+
+    @singleflight("test-decorator")
+    async def generate_imagery(stage: str, style: str = "luxury"):
+        calls.append((stage, style))
+        await asyncio.sleep(0.05)
+        return f"{stage}-{style}"
+
+    async def scenario():
+        return await asyncio.gather(
+            *(generate_imagery("treatment") for _ in range(CONCURRENT_CALLS)),
+            generate_imagery("treatment", style="calm")
+        )
+
+    results = asyncio.run(scenario())
+
+    assert sorted(calls) == [("treatment", "calm"), ("treatment", "luxury")]
+    assert results == ["treatment-luxury"] * CONCURRENT_CALLS + ["treatment-calm"]
+    # FastAPI reads the route's parameters from the wrapped signature
+    assert list(inspect.signature(generate_imagery).parameters) == ["stage", "style"]
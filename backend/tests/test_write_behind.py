@@ -0,0 +1,116 @@
+"""Turns being flushed by the write-behind queue stay visible to memory reads (app.memory)."""
+
+import asyncio
+from typing import Dict, List
+
+import app.memory.service as service
+import app.memory.write_behind as write_behind
+from app.memory.cache import PatientMemoryCache
+from app.memory.write_behind import WriteBehindQueue
+
+APPEND_DELAY_S = 0.2
+
+
+class SlowStore:
+    """In-memory store whose appends take APPEND_DELAY_S to land."""
+
+    def __init__(self):
+        self.turns: Dict[str, List[Dict]] = {}
+        self.contexts: Dict[str, Dict] = {}
+
+    async def append_turns(self, patient_id: str, turns: List[Dict]) -> int:
+        await asyncio.sleep(APPEND_DELAY_S)
+        self.turns.setdefault(patient_id, []).extend(turns)
+        return len(self.turns[patient_id])
+
+    async def save_patient_context(self, patient_id: str, context: Dict) -> None:
+        self.contexts[patient_id] = dict(context)
+
+    async def load_recent_turns(self, patient_id: str, limit=20) -> List[Dict]:
+        turns = self.turns.get(patient_id, [])
+        return list(turns[-limit:] if limit is not None else turns)
+
+    async def get_patient_context(self, patient_id: str) -> Dict:
+        return dict(self.contexts.get(patient_id, {}))
+
+    async def count_turns(self, patient_id: str) -> int:
+        return len(self.turns.get(patient_id, []))
+
+
+def turn(index: int) -> Dict:
+    return {"role": "user" if index % 2 == 0 else "assistant", "content": f"turn {index}"}
+
+
+def setup(monkeypatch) -> SlowStore:
+    store = SlowStore()
+    store.turns["patient_a"] = [turn(0), turn(1)]
+    monkeypatch.setattr(service, "get_memory_store", lambda: store)
+    monkeypatch.setattr(write_behind, "get_memory_store", lambda: store)
+    monkeypatch.setattr(service, "write_queue", WriteBehindQueue(flush_interval=60))
+    monkeypatch.setattr(service, "memory_cache", PatientMemoryCache())
+    return store
+
+
+def test_cache_miss_during_slow_append_sees_inflight_turns(monkeypatch):
+    setup(monkeypatch)
+
+    async def scenario():
+        queue = service.write_queue
+        queue.enqueue("patient_a", [turn(2), turn(3)], {"conditions": ["asthma"]})
+        flush = asyncio.create_task(queue.flush())
+        await asyncio.sleep(APPEND_DELAY_S / 4)  # The flush is inside append_turns
+
+        assert queue.pending_for("patient_a")["turns"] == [turn(2), turn(3)]
+        record = await service._get_patient_record("patient_a")
+        await flush
+        await queue.drain()
+        return record
+
+    record = asyncio.run(scenario())
+
+    assert record["turns"] == [turn(0), turn(1), turn(2), turn(3)]
+    assert record["turn_count"] == 4
+    assert record["context"] == {"conditions": ["asthma"]}
+
+
+def test_cache_miss_racing_the_write_counts_turns_once(monkeypatch):
+    store = setup(monkeypatch)
+
+    async def scenario():
+        queue = service.write_queue
+        queue.enqueue("patient_a", [turn(2), turn(3)])
+        flush = asyncio.create_task(queue.flush())
+        await asyncio.sleep(0)
+
+        # The append lands while the miss is reading the store
+        original_count = store.count_turns
+
+        async def slow_count(patient_id: str) -> int:
+            await asyncio.sleep(APPEND_DELAY_S * 1.5)
+            return await original_count(patient_id)
+
+        store.count_turns = slow_count
+        record = await service._get_patient_record("patient_a")
+        await flush
+        await queue.drain()
+        return record
+
+    record = asyncio.run(scenario())
+
+    assert record["turns"] == [turn(0), turn(1), turn(2), turn(3)]
+    assert record["turn_count"] == 4
+
+
+def test_inflight_entry_is_released_after_write(monkeypatch):
+    setup(monkeypatch)
+
+    async def scenario():
+        queue = service.write_queue
+        queue.enqueue("patient_a", [turn(2)])
+        await queue.flush()
+        return queue.pending_for("patient_a"), queue.stats()
+
+    pending, stats = asyncio.run(scenario())
+
+    assert pending == {"turns": [], "context": None}
+    assert stats["inflight_patients"] == 0